@@ -1,43 +1,19 @@
 
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef, Suspense } from 'react';
+import { Loader2 } from 'lucide-react';
 import { supabase } from './supabase';
 import { Sidebar } from './components/Sidebar';
 import { Header } from './components/Header';
 import { Login } from './views/Login';
-import { Dashboard } from './views/Dashboard';
-import { MetricsReplenishment } from './views/MetricsReplenishment';
-import { Annotations } from './views/Annotations';
-import { OrderList } from './views/OrderList';
-import { CreateBudget } from './views/CreateBudget';
-import { OrderSheet } from './views/OrderSheet';
-import { PaymentsOverview } from './views/PaymentsOverview';
-import { PaymentsProviders } from './views/PaymentsProviders';
-import { PaymentsHistory } from './views/PaymentsHistory';
-import { ProviderStatements } from './views/ProviderStatements';
-import { ClientsMaster } from './views/ClientsMaster';
-import { ClientCollections } from './views/ClientCollections';
-import { AccountStatements } from './views/AccountStatements';
-import { Catalog } from './views/Catalog';
-import { SuppliersMaster } from './views/SuppliersMaster';
-import { Presupuestador } from './views/Presupuestador';
-import { Etiquetador } from './views/Etiquetador';
-import { PriceManagement } from './views/PriceManagement';
-import { Settings } from './views/Settings';
-import { StockControl } from './views/StockControl';
-import { Attendance } from './views/Attendance';
-import { InventoryInbounds } from './views/InventoryInbounds';
-import { InventoryAdjustments } from './views/InventoryAdjustments';
-import { InventoryTransfers } from './views/InventoryTransfers';
-import { InventoryHistory } from './views/InventoryHistory';
-import { SupplierOrders } from './views/SupplierOrders';
-import { ListaChina } from './views/ListaChina';
-import { Expirations } from './views/Expirations';
-import { CashCount } from './views/CashCount';
-import { CashConcepts } from './views/CashConcepts';
-import { CashMovements } from './views/CashMovements';
-import { DailyCashSheet } from './views/DailyCashSheet';
-import { BankMovements } from './views/BankMovements';
-import { OrderAssemblyModal } from './components/OrderAssemblyModal';
+import {
+    Dashboard, MetricsReplenishment, Annotations, OrderList, CreateBudget, OrderSheet,
+    PaymentsOverview, PaymentsProviders, PaymentsHistory, ProviderStatements,
+    ClientsMaster, ClientCollections, AccountStatements, Catalog, SuppliersMaster,
+    Presupuestador, Etiquetador, PriceManagement, Settings, StockControl, Attendance,
+    InventoryInbounds, InventoryAdjustments, InventoryTransfers, InventoryHistory,
+    SupplierOrders, ListaChina, Expirations, CashCount, CashConcepts, CashMovements,
+    DailyCashSheet, BankMovements, OrderAssemblyModal, prefetchRelatedViews
+} from './lazyViews';
 import { StockQueryModal } from './components/StockQueryModal';
 import { 
     View, User, DetailedOrder, OrderStatus, Trip, Provider, Transfer, 
@@ -53,8 +29,15 @@ import {
     updateProductPrice, 
     removeProductFromOrder, 
     updatePaymentMethod,
-    toggleAllProductsCheck
+    toggleAllProductsCheck,
+    appendHistoryEntry,
+    productKey,
+    generateId,
+    buildTripDiff,
+    isTripDiffEmpty
 } from './logic';
+import { mapOrderItem, withOrderLines, invalidateOrderLines } from './orderLines';
+import { TransferIndex, EMPTY_TRANSFER_INDEX, buildTransferIndex, applyTransferChange, mapTransfer } from './transferIndex';
 
 // Helper local si no existe en logic.ts
 const isActiveStatus = (status: OrderStatus) => {
@@ -70,6 +53,19 @@ const isActiveStatus = (status: OrderStatus) => {
 
 const VIEW_STORAGE_KEY = 'alfonsa_last_view';
 
+// Planilla de viajes: se cargan los viajes recientes y el resto bajo demanda
+const TRIPS_WINDOW_DAYS = 45;
+const TRIPS_PAGE_SIZE = 30;
+// Historial de pagos no pendientes que se trae (los pendientes van siempre)
+const TRANSFERS_WINDOW_DAYS = 90;
+const TRANSFERS_HISTORY_LIMIT = 500;
+
+const mapTrip = (t: any): Trip => ({
+    id: t.id, displayId: t.display_id, name: t.name, status: t.status, driverName: t.driver_name, date: t.date_text, route: t.route, createdAt: t.created_at,
+    clients: (t.trip_clients || []).map((c: any) => ({ ...c, previousBalance: c.previous_balance, currentInvoiceAmount: c.current_invoice_amount, paymentCash: c.payment_cash, paymentTransfer: c.payment_transfer, isTransferExpected: c.is_transfer_expected })),
+    expenses: t.trip_expenses || []
+});
+
 export default function App() {
     const [session, setSession] = useState<any>(null);
     const [currentUser, setCurrentUser] = useState<User | null>(null);
@@ -94,9 +90,16 @@ export default function App() {
     const [notifications, setNotifications] = useState<AppNotification[]>([]);
     const [expirations, setExpirations] = useState<ProductExpiration[]>([]);
     const [trips, setTrips] = useState<Trip[]>([]);
+    // Última versión de los viajes para armar diffs: dos guardados seguidos no esperan al render
+    const tripsRef = useRef<Trip[]>(trips);
+    tripsRef.current = trips;
     const [providers, setProviders] = useState<Provider[]>([]);
     const [transfers, setTransfers] = useState<Transfer[]>([]);
+    const [transferIndex, setTransferIndex] = useState<TransferIndex>(EMPTY_TRANSFER_INDEX);
     const [selectedTripId, setSelectedTripId] = useState<string | null>(null);
+    const [hasMoreTrips, setHasMoreTrips] = useState(false);
+    // Guardados de viaje en curso: se encadenan por viaje para que lleguen en orden
+    const tripSaveQueue = useRef<Map<string, { pending: number; chain: Promise<void> }>>(new Map());
 
     // History Filters
     const [historyFilter, setHistoryFilter] = useState({ month: new Date().getMonth(), year: new Date().getFullYear(), search: '' });
@@ -149,6 +152,12 @@ export default function App() {
         }
     }, [currentView, currentUser]);
 
+    // Precargar en segundo plano las vistas hermanas de la actual
+    useEffect(() => {
+        if (!currentUser) return;
+        return prefetchRelatedViews(currentView, currentUser);
+    }, [currentView, currentUser]);
+
     // F12 key listener for Stock Query
     useEffect(() => {
         const handleKeyDown = (e: KeyboardEvent) => {
@@ -204,7 +213,7 @@ export default function App() {
     const fetchActiveOrders = async () => {
         const { data, error } = await supabase
             .from('orders')
-            .select('*, order_items(*)')
+            .select('*')
             .not('status', 'in', '("entregado","pagado")')
             .order('created_at', { ascending: false });
             
@@ -237,20 +246,27 @@ export default function App() {
             interdepositoDestination: o.interdeposito_destination,
             scheduledDate: o.scheduled_date,
             history: typeof o.history === 'string' ? JSON.parse(o.history) : o.history || [],
-            productCount: (o.order_items || []).length,
-            products: (o.order_items || []).map((i: any) => ({
-                code: i.code,
-                name: i.name,
-                quantity: i.quantity,
-                originalQuantity: i.original_quantity,
-                shippedQuantity: i.shipped_quantity,
-                unitPrice: i.unit_price,
-                subtotal: i.subtotal,
-                isChecked: i.is_checked
-            }))
+            productCount: o.item_count ?? (o.order_items || []).length,
+            checkedCount: o.checked_count ?? 0,
+            linesVersion: o.lines_version ?? 0,
+            // Las líneas se cargan al abrir el pedido (orderLines.ts)
+            products: (o.order_items || []).map(mapOrderItem)
         }));
     };
 
+    const [isOpeningOrder, setIsOpeningOrder] = useState(false);
+
+    const handleOpenOrder = async (order: DetailedOrder) => {
+        setIsOpeningOrder(true);
+        try {
+            setActiveOrder(await withOrderLines(order));
+        } catch (err: any) {
+            alert("Error al abrir el pedido: " + err.message);
+        } finally {
+            setIsOpeningOrder(false);
+        }
+    };
+
     const fetchHistoryOrders = async (month: number, year: number, search: string, page: number) => {
         // Implementation for history fetching
         // This would append to orders or set a separate history state in a real app with pagination
@@ -435,41 +451,81 @@ export default function App() {
     };
 
     const fetchTransfers = async () => {
-        // Fetch ALL pending transfers to ensure they never disappear
-        const { data: pendingData } = await supabase
-            .from('transfers')
-            .select('*')
-            .eq('status', 'Pendiente')
-            .order('created_at', { ascending: false });
-
-        // Fetch recent history (non-pending) - limit to 500 to avoid performance issues
-        const { data: historyData } = await supabase
-            .from('transfers')
-            .select('*')
-            .neq('status', 'Pendiente')
-            .order('created_at', { ascending: false })
-            .limit(500);
-
-        const allTransfers = [...(pendingData || []), ...(historyData || [])];
+        const since = new Date(Date.now() - TRANSFERS_WINDOW_DAYS * 24 * 60 * 60 * 1000).toISOString();
+        // Pendientes completos (nunca deben desaparecer), historial reciente acotado
+        // y los totales que mantiene el servidor, todo en paralelo
+        const [pendingRes, historyRes, totalsRes] = await Promise.all([
+            supabase
+                .from('transfers')
+                .select('*')
+                .eq('status', 'Pendiente')
+                .order('created_at', { ascending: false }),
+            supabase
+                .from('transfers')
+                .select('*')
+                .neq('status', 'Pendiente')
+                .gte('created_at', since)
+                .order('created_at', { ascending: false })
+                .limit(TRANSFERS_HISTORY_LIMIT),
+            supabase.from('transfer_totals').select('provider_id, account_id, realized, pending')
+        ]);
+
+        const allTransfers = [...(pendingRes.data || []), ...(historyRes.data || [])];
         
         // Sort combined list by date descending
         allTransfers.sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime());
 
-        if (allTransfers) {
-            setTransfers(allTransfers.map((t: any) => ({
-                ...t, clientName: t.client_name, date: t.date_text, providerId: t.provider_id, accountId: t.account_id, isLoadedInSystem: t.is_loaded_in_system
-            })));
-        }
+        const mapped = allTransfers.map(mapTransfer);
+        setTransfers(mapped);
+        // Sin la tabla de totales el índice suma lo cargado
+        setTransferIndex(buildTransferIndex(mapped, totalsRes.error ? null : totalsRes.data));
+    };
+
+    // Refleja un cambio puntual sin volver a bajar la lista completa
+    const patchTransfer = (prev: Transfer | undefined, next: Transfer | undefined) => {
+        setTransfers(list => {
+            if (!prev) return next ? [next, ...list] : list;
+            return next ? list.map(t => t.id === prev.id ? next : t) : list.filter(t => t.id !== prev.id);
+        });
+        setTransferIndex(index => applyTransferChange(index, prev, next));
     };
 
     const fetchTrips = async () => {
-        const { data } = await supabase.from('trips').select(`*, trip_clients(*), trip_expenses(*)`).order('created_at', { ascending: false });
+        const since = new Date(Date.now() - TRIPS_WINDOW_DAYS * 24 * 60 * 60 * 1000).toISOString();
+        const [{ data, error }, older] = await Promise.all([
+            supabase
+                .from('trips')
+                .select(`*, trip_clients(*), trip_expenses(*)`)
+                .gte('created_at', since)
+                .order('created_at', { ascending: false })
+                .limit(TRIPS_PAGE_SIZE),
+            // Un solo id alcanza para saber si hay viajes anteriores a la ventana
+            supabase.from('trips').select('id').lt('created_at', since).limit(1)
+        ]);
+        if (error) { console.error("Error fetching trips:", error); return; }
         if (data) {
-            setTrips(data.map((t: any) => ({
-                id: t.id, displayId: t.display_id, name: t.name, status: t.status, driverName: t.driver_name, date: t.date_text, route: t.route,
-                clients: t.trip_clients.map((c: any) => ({ ...c, previousBalance: c.previous_balance, currentInvoiceAmount: c.current_invoice_amount, paymentCash: c.payment_cash, paymentTransfer: c.payment_transfer, isTransferExpected: c.is_transfer_expected })),
-                expenses: t.trip_expenses
-            })));
+            setTrips(data.map(mapTrip));
+            // "Cargar anteriores" si la ventana se cortó por tamaño o hay viajes más viejos
+            setHasMoreTrips(data.length === TRIPS_PAGE_SIZE || (older.data?.length ?? 0) > 0);
+        }
+    };
+
+    const loadMoreTrips = async () => {
+        const oldest = trips[trips.length - 1];
+        let query = supabase
+            .from('trips')
+            .select(`*, trip_clients(*), trip_expenses(*)`)
+            .order('created_at', { ascending: false })
+            .limit(TRIPS_PAGE_SIZE);
+        if (oldest?.createdAt) query = query.lt('created_at', oldest.createdAt);
+        const { data, error } = await query;
+        if (error) { console.error("Error fetching trips:", error); return; }
+        if (data) {
+            setTrips(prev => {
+                const known = new Set(prev.map(t => t.id));
+                return [...prev, ...data.map(mapTrip).filter(t => !known.has(t.id))];
+            });
+            setHasMoreTrips(data.length === TRIPS_PAGE_SIZE);
         }
     };
 
@@ -519,7 +575,7 @@ export default function App() {
                 // Buscamos el pedido en el estado actual
                 const order = orders.find(o => o.id === n.link_id);
                 if (order) {
-                    setActiveOrder(order);
+                    handleOpenOrder(order);
                 } else {
                     // Si no está en el estado (quizás no es "activo"), 
                     // podríamos intentar buscarlo en la DB pero por ahora 
@@ -584,6 +640,16 @@ export default function App() {
         const next = advanceOrderStatus(o);
         
         if (next.status === OrderStatus.FACTURADO) {
+            // Desde la lista llega solo la cabecera: facturar necesita las líneas
+            if (o.products.length === 0) {
+                try {
+                    o = await withOrderLines(o);
+                } catch (err: any) {
+                    showDialog("Error", "No se pudieron cargar los productos del pedido: " + err.message, 'alert');
+                    return;
+                }
+            }
+
             let clientCode = '';
             
             // Check if client exists - BYPASS for inter-depot movements
@@ -734,42 +800,49 @@ export default function App() {
     };
     
     // --- TRIPS HANDLERS ---
-    const handleSaveTrip = async (trip: Trip) => {
-        const isNew = !trip.id || trip.id.startsWith('trip-');
-        const payload = { display_id: trip.displayId, name: trip.name, status: trip.status, driver_name: trip.driverName, date_text: trip.date, route: trip.route };
-        let tripId = trip.id;
-        
-        if (isNew) {
-            const { data } = await supabase.from('trips').insert([payload]).select().single();
-            if(data) tripId = data.id;
-        } else {
-            await supabase.from('trips').update(payload).eq('id', tripId);
-        }
-
-        // Sync Clients
-        await supabase.from('trip_clients').delete().eq('trip_id', tripId);
-        if (trip.clients.length > 0) {
-            const clients = trip.clients.map(c => ({
-                trip_id: tripId, name: c.name, address: c.address, previous_balance: c.previousBalance, current_invoice_amount: c.currentInvoiceAmount,
-                payment_cash: c.paymentCash, payment_transfer: c.paymentTransfer, is_transfer_expected: c.isTransferExpected, status: c.status
-            }));
-            await supabase.from('trip_clients').insert(clients);
-        }
-
-        // Sync Expenses
-        await supabase.from('trip_expenses').delete().eq('trip_id', tripId);
-        if (trip.expenses.length > 0) {
-            const expenses = trip.expenses.map(e => ({ trip_id: tripId, type: e.type, amount: e.amount, note: e.note }));
-            await supabase.from('trip_expenses').insert(expenses);
-        }
-        fetchTrips();
+    const handleSaveTrip = async (input: Trip) => {
+        const isNew = !input.id || input.id.startsWith('trip-');
+        const trip = isNew ? { ...input, id: generateId() } : input;
+        const previous = isNew ? undefined : tripsRef.current.find(t => t.id === trip.id);
+
+        // Solo viaja lo que cambió: registrar un cobro desde el camión es un único request chico
+        const diff = buildTripDiff(previous, trip);
+        if (isTripDiffEmpty(diff)) return;
+
+        tripsRef.current = previous ? tripsRef.current.map(t => t.id === trip.id ? trip : t) : [trip, ...tripsRef.current];
+        setTrips(prev => previous ? prev.map(t => t.id === trip.id ? trip : t) : [trip, ...prev]);
+
+        const queue = tripSaveQueue.current;
+        const entry = queue.get(trip.id) || { pending: 0, chain: Promise.resolve() };
+        entry.pending++;
+        entry.chain = entry.chain.then(async () => {
+            try {
+                const { data, error } = await supabase.rpc('guardar_viaje', diff);
+                if (error) throw error;
+                // Si hay otro guardado encolado, su estado optimista es más nuevo que esta respuesta
+                if (entry.pending === 1 && data) {
+                    setTrips(prev => prev.map(t => t.id === trip.id ? mapTrip(data) : t));
+                }
+            } catch (err: any) {
+                console.error("Error saving trip:", err);
+                alert("Error al guardar el viaje: " + (err.message || 'Error desconocido'));
+                fetchTrips();
+            } finally {
+                entry.pending--;
+                if (entry.pending === 0) queue.delete(trip.id);
+            }
+        });
+        queue.set(trip.id, entry);
+        await entry.chain;
     };
 
     const handleDeleteTrip = async (id: string) => {
-        await supabase.from('trip_expenses').delete().eq('trip_id', id);
-        await supabase.from('trip_clients').delete().eq('trip_id', id);
-        await supabase.from('trips').delete().eq('id', id);
-        fetchTrips();
+        const { error } = await supabase.rpc('eliminar_viaje', { p_trip_id: id });
+        if (error) {
+            alert("Error al eliminar el viaje: " + error.message);
+            return;
+        }
+        setTrips(prev => prev.filter(t => t.id !== id));
     };
     
     // --- PROVIDERS HANDLERS ---
@@ -831,22 +904,26 @@ export default function App() {
     // --- PAYMENTS HANDLERS ---
     const handleUpdateTransfer = async (t: Transfer) => {
         const payload = { client_name: t.clientName, amount: t.amount, date_text: t.date, provider_id: t.providerId, account_id: t.accountId, notes: t.notes, status: t.status, is_loaded_in_system: t.isLoadedInSystem };
-        if (t.id.startsWith('t-')) {
-            await supabase.from('transfers').insert([payload]);
-        } else {
-            await supabase.from('transfers').update(payload).eq('id', t.id);
-        }
-        fetchTransfers();
+        const isNew = t.id.startsWith('t-');
+        const { data, error } = isNew
+            ? await supabase.from('transfers').insert([payload]).select().single()
+            : await supabase.from('transfers').update(payload).eq('id', t.id).select().single();
+        if (error || !data) return fetchTransfers();
+        patchTransfer(isNew ? undefined : transfers.find(x => x.id === t.id), mapTransfer(data));
     };
 
     const handleConfirmTransfer = async (id: string, status: any) => {
-        await supabase.from('transfers').update({ status }).eq('id', id);
-        fetchTransfers();
+        const { error } = await supabase.from('transfers').update({ status }).eq('id', id);
+        const prev = transfers.find(t => t.id === id);
+        if (error || !prev) return fetchTransfers();
+        patchTransfer(prev, { ...prev, status });
     };
 
     const handleDeleteTransfer = async (id: string) => {
-        await supabase.from('transfers').delete().eq('id', id);
-        fetchTransfers();
+        const { error } = await supabase.from('transfers').delete().eq('id', id);
+        const prev = transfers.find(t => t.id === id);
+        if (error || !prev) return fetchTransfers();
+        patchTransfer(prev, undefined);
     };
 
     const handleClearHistory = async () => {
@@ -855,10 +932,7 @@ export default function App() {
         // fetchTransfers();
     };
 
-    const handleUpdateTransferStatus = async (id: string, status: any) => {
-        await supabase.from('transfers').update({ status }).eq('id', id);
-        fetchTransfers();
-    };
+    const handleUpdateTransferStatus = handleConfirmTransfer;
 
     const handleUpdateOrderTotal = async (orderId: string, newTotal: number) => {
         if (!currentUser) return;
@@ -906,20 +980,23 @@ export default function App() {
     };
 
     const handleUpdateProductQuantity = (code: string, newQty: number, unitPrice?: number) => {
-        if (!activeOrder) return;
-        const historyEntry: HistoryEntry = {
-            timestamp: new Date().toISOString(),
-            userId: currentUser?.id || 'unknown',
-            userName: currentUser?.name || 'Usuario',
-            action: 'QUANTITY_UPDATE',
-            details: `Actualizó cantidad de ${code} a ${newQty}`,
-            previousState: activeOrder.status,
-            newState: activeOrder.status
-        };
-
-        let updatedOrder = applyQuantityChange(activeOrder, code, newQty, unitPrice);
-        updatedOrder = { ...updatedOrder, history: [...(updatedOrder.history || []), historyEntry] };
-        setActiveOrder(updatedOrder as DetailedOrder);
+        setActiveOrder(prev => {
+            if (!prev) return prev;
+            const updatedOrder = applyQuantityChange(prev, code, newQty, unitPrice);
+            if (updatedOrder === prev) return prev;
+            const historyEntry: HistoryEntry = {
+                timestamp: new Date().toISOString(),
+                userId: currentUser?.id || 'unknown',
+                userName: currentUser?.name || 'Usuario',
+                action: 'QUANTITY_UPDATE',
+                details: `Actualizó cantidad de ${code} a ${newQty}`,
+                previousState: prev.status,
+                newState: prev.status
+            };
+            // Correcciones seguidas de la misma línea quedan en un solo registro
+            const coalesceKey = productKey(code, unitPrice ?? NaN);
+            return { ...updatedOrder, history: appendHistoryEntry(updatedOrder.history, historyEntry, coalesceKey) } as DetailedOrder;
+        });
     };
 
     const handleSaveAssembly = async (updatedOrder: any, shouldAdvance: boolean, notes?: string) => {
@@ -998,6 +1075,7 @@ export default function App() {
                 await sendNotificationToRole('vale', `Pedido ${updatedOrder.displayId} controlado y listo para facturar (${updatedOrder.clientName})`, updatedOrder.id);
             }
 
+            invalidateOrderLines(updatedOrder.id);
             setActiveOrder(null); 
             fetchActiveOrders(); 
 
@@ -1041,135 +1119,155 @@ export default function App() {
                 />
 
                 <main className="flex-1 overflow-y-auto p-4 md:p-8 relative">
-                    {currentView === View.DASHBOARD && <Dashboard orders={orders} expirations={expirations} onNavigate={setCurrentView} />}
-                    {currentView === View.METRICS_REPLENISHMENT && <MetricsReplenishment />}
-                    {currentView === View.ANOTACIONES && <Annotations currentUser={currentUser} />}
-                    {currentView === View.ORDERS && (
-                        <OrderList 
-                            onNavigate={setCurrentView} 
-                            orders={orders} 
-                            onFetchHistory={(m, y, s) => fetchHistoryOrders(m, y, s, 0)}
-                            onLoadMoreHistory={loadMoreHistory}
-                            hasMoreHistory={hasMoreHistory}
-                            historyFilter={historyFilter}
-                            currentUser={currentUser}
-                            onOpenAssembly={setActiveOrder}
-                            onClaimOrder={handleClaimOrder}
-                            onDeleteOrder={handleDeleteOrder}
-                            onDeleteOrders={handleDeleteOrders}
-                            onAdvanceOrder={handleAdvanceOrder}
-                            onToggleLock={handleToggleLock}
-                            onUpdateOrderTotal={handleUpdateOrderTotal}
-                            onRefresh={async () => {
-                                await fetchActiveOrders();
-                                await fetchNotifications();
-                            }}
-                        />
-                    )}
-                    {currentView === View.CREATE_BUDGET && (
-                        <CreateBudget 
-                            onNavigate={setCurrentView} 
-                            currentUser={currentUser}
-                            onCreateOrder={async (order) => {
-                                try {
-                                    const { data, error } = await supabase.from('orders').insert({
-                                        display_id: order.displayId, client_name: order.clientName, total: order.total, status: order.status,
-                                        zone: order.zone, observations: order.observations, history: order.history, is_reservation: order.isReservation,
-                                        is_interdeposito: order.isInterdeposito,
-                                        interdeposito_origin: order.interdepositoOrigin,
-                                        interdeposito_destination: order.interdepositoDestination,
-                                        scheduled_date: order.scheduledDate, created_by: currentUser.id 
-                                    }).select().single();
-                                    if (error) throw error;
-                                    if (data) {
-                                        const items = order.products.map(p => ({
-                                            order_id: data.id, code: p.code, name: p.name, quantity: p.quantity, original_quantity: p.originalQuantity, unit_price: p.unitPrice, subtotal: p.subtotal, is_checked: false
-                                        }));
-                                        await supabase.from('order_items').insert(items);
+                    <Suspense fallback={
+                        <div className="flex items-center justify-center h-64 text-muted">
+                            <Loader2 size={32} className="animate-spin text-primary" />
+                        </div>
+                    }>
+                        {currentView === View.DASHBOARD && <Dashboard orders={orders} expirations={expirations} onNavigate={setCurrentView} />}
+                        {currentView === View.METRICS_REPLENISHMENT && <MetricsReplenishment />}
+                        {currentView === View.ANOTACIONES && <Annotations currentUser={currentUser} />}
+                        {currentView === View.ORDERS && (
+                            <OrderList 
+                                onNavigate={setCurrentView} 
+                                orders={orders} 
+                                onFetchHistory={(m, y, s) => fetchHistoryOrders(m, y, s, 0)}
+                                onLoadMoreHistory={loadMoreHistory}
+                                hasMoreHistory={hasMoreHistory}
+                                historyFilter={historyFilter}
+                                currentUser={currentUser}
+                                onOpenAssembly={handleOpenOrder}
+                                onClaimOrder={handleClaimOrder}
+                                onDeleteOrder={handleDeleteOrder}
+                                onDeleteOrders={handleDeleteOrders}
+                                onAdvanceOrder={handleAdvanceOrder}
+                                onToggleLock={handleToggleLock}
+                                onUpdateOrderTotal={handleUpdateOrderTotal}
+                                onRefresh={async () => {
+                                    await fetchActiveOrders();
+                                    await fetchNotifications();
+                                }}
+                            />
+                        )}
+                        {currentView === View.CREATE_BUDGET && (
+                            <CreateBudget 
+                                onNavigate={setCurrentView} 
+                                currentUser={currentUser}
+                                onCreateOrder={async (order) => {
+                                    try {
+                                        const { data, error } = await supabase.from('orders').insert({
+                                            display_id: order.displayId, client_name: order.clientName, total: order.total, status: order.status,
+                                            zone: order.zone, observations: order.observations, history: order.history, is_reservation: order.isReservation,
+                                            is_interdeposito: order.isInterdeposito,
+                                            interdeposito_origin: order.interdepositoOrigin,
+                                            interdeposito_destination: order.interdepositoDestination,
+                                            scheduled_date: order.scheduledDate, created_by: currentUser.id 
+                                        }).select().single();
+                                        if (error) throw error;
+                                        if (data) {
+                                            const items = order.products.map(p => ({
+                                                order_id: data.id, code: p.code, name: p.name, quantity: p.quantity, original_quantity: p.originalQuantity, unit_price: p.unitPrice, subtotal: p.subtotal, is_checked: false
+                                            }));
+                                            await supabase.from('order_items').insert(items);
                                         
-                                        // Notify Armadores about new order
-                                        await sendNotificationToRole('armador', `Nuevo pedido disponible: ${order.displayId} - ${order.clientName}`, data.id);
+                                            // Notify Armadores about new order
+                                            await sendNotificationToRole('armador', `Nuevo pedido disponible: ${order.displayId} - ${order.clientName}`, data.id);
                                         
-                                        await fetchActiveOrders();
-                                        setCurrentView(View.ORDERS);
-                                    }
-                                } catch (e: any) { alert("Error al crear: " + e.message); }
-                            }}
-                        />
-                    )}
-                    {currentView === View.ORDER_SHEET && <OrderSheet currentUser={currentUser} orders={orders} trips={trips} onSaveTrip={handleSaveTrip} onDeleteTrip={handleDeleteTrip} selectedTripId={selectedTripId} onSelectTrip={setSelectedTripId} providers={providers} transfers={transfers} />}
-                    {currentView === View.PAYMENTS_OVERVIEW && <PaymentsOverview providers={providers} onDeleteProvider={handleDeleteProvider} onUpdateProviders={handleUpdateProvider} transfers={transfers} onUpdateTransfers={handleUpdateTransfer} onConfirmTransfer={handleConfirmTransfer} onDeleteTransfer={handleDeleteTransfer} onRefresh={async () => { await fetchProviders(); await fetchTransfers(); }} />}
-                    {currentView === View.PAYMENTS_PROVIDERS && <PaymentsProviders providers={providers} onUpdateProviders={handleUpdateProvider} onDeleteProvider={handleDeleteProvider} onResetProvider={handleResetProvider} />}
-                    {currentView === View.PAYMENTS_HISTORY && <PaymentsHistory transfers={transfers} onDeleteTransfer={handleDeleteTransfer} onClearHistory={handleClearHistory} onUpdateTransfers={handleUpdateTransfer} onUpdateStatus={handleUpdateTransferStatus} providers={providers} />}
-                    {currentView === View.PROVIDER_STATEMENTS && <ProviderStatements currentUser={currentUser} />}
-                    {currentView === View.CLIENTS_MASTER && <ClientsMaster currentUser={currentUser} />}
-                    {currentView === View.CLIENT_COLLECTIONS && <ClientCollections currentUser={currentUser} />}
-                    {currentView === View.CLIENT_STATEMENTS && <AccountStatements currentUser={currentUser} />}
-                    {currentView === View.CATALOG && <Catalog currentUser={currentUser} />}
-                    {currentView === View.SUPPLIERS_MASTER && <SuppliersMaster currentUser={currentUser} />}
-                    {currentView === View.PRESUPUESTADOR && <Presupuestador />}
-                    {currentView === View.ETIQUETADOR && <Etiquetador />}
-                    {currentView === View.PRICE_MANAGEMENT && <PriceManagement currentUser={currentUser} />}
-                    {currentView === View.SETTINGS && <Settings 
-                        currentUser={currentUser} 
-                        onUpdateProfile={async (n, a, b, t) => { 
-                            await supabase.from('profiles').update({ name: n, avatar_url: a, preferred_branch: b, theme_preference: t }).eq('id', currentUser.id); 
-                            await fetchProfile(currentUser.id); 
-                        }} 
-                        isDarkMode={isDarkMode} 
-                        onToggleTheme={() => toggleTheme()} 
-                        onLogout={handleLogout}
-                    />}
-                    {currentView === View.STOCK_CONTROL && <StockControl currentUser={currentUser} />}
-                    {currentView === View.ATTENDANCE && <Attendance currentUser={currentUser} />}
-                    {currentView === View.INV_INBOUNDS && <InventoryInbounds currentUser={currentUser} />}
-                    {currentView === View.INV_ADJUSTMENTS && <InventoryAdjustments currentUser={currentUser} />}
-                    {currentView === View.INV_TRANSFERS && <InventoryTransfers currentUser={currentUser} />}
-                    {currentView === View.INV_HISTORY && <InventoryHistory currentUser={currentUser} />}
-                    {currentView === View.INV_SUPPLIER_ORDERS && <SupplierOrders currentUser={currentUser} />}
-                    {currentView === View.LISTA_CHINA && <ListaChina />}
-                    {currentView === View.EXPIRATIONS && <Expirations />}
-                    {currentView === View.CASH_COUNT && <CashCount currentUser={currentUser} />}
-                    {currentView === View.DAILY_CASH_SHEET && <DailyCashSheet currentUser={currentUser} onNavigate={setCurrentView} />}
-                    {currentView === View.CASH_MOVEMENTS && <CashMovements currentUser={currentUser} />}
-                    {currentView === View.BANK_MOVEMENTS && <BankMovements currentUser={currentUser} />}
-                    {currentView === View.CASH_CONCEPTS && <CashConcepts />}
+                                            await fetchActiveOrders();
+                                            setCurrentView(View.ORDERS);
+                                        }
+                                    } catch (e: any) { alert("Error al crear: " + e.message); }
+                                }}
+                                onBudgetConverted={async (order) => {
+                                    await sendNotificationToRole('armador', `Nuevo pedido disponible: ${order.displayId} - ${order.clientName}`, order.id);
+                                    await fetchActiveOrders();
+                                    setCurrentView(View.ORDERS);
+                                }}
+                            />
+                        )}
+                        {currentView === View.ORDER_SHEET && <OrderSheet currentUser={currentUser} orders={orders} trips={trips} onSaveTrip={handleSaveTrip} onDeleteTrip={handleDeleteTrip} hasMoreTrips={hasMoreTrips} onLoadMoreTrips={loadMoreTrips} selectedTripId={selectedTripId} onSelectTrip={setSelectedTripId} providers={providers} transferIndex={transferIndex} />}
+                        {currentView === View.PAYMENTS_OVERVIEW && <PaymentsOverview providers={providers} onDeleteProvider={handleDeleteProvider} onUpdateProviders={handleUpdateProvider} transfers={transfers} transferIndex={transferIndex} onUpdateTransfers={handleUpdateTransfer} onConfirmTransfer={handleConfirmTransfer} onDeleteTransfer={handleDeleteTransfer} onRefresh={async () => { await fetchProviders(); await fetchTransfers(); }} />}
+                        {currentView === View.PAYMENTS_PROVIDERS && <PaymentsProviders providers={providers} onUpdateProviders={handleUpdateProvider} onDeleteProvider={handleDeleteProvider} onResetProvider={handleResetProvider} />}
+                        {currentView === View.PAYMENTS_HISTORY && <PaymentsHistory transfers={transfers} onDeleteTransfer={handleDeleteTransfer} onClearHistory={handleClearHistory} onUpdateTransfers={handleUpdateTransfer} onUpdateStatus={handleUpdateTransferStatus} providers={providers} />}
+                        {currentView === View.PROVIDER_STATEMENTS && <ProviderStatements currentUser={currentUser} />}
+                        {currentView === View.CLIENTS_MASTER && <ClientsMaster currentUser={currentUser} />}
+                        {currentView === View.CLIENT_COLLECTIONS && <ClientCollections currentUser={currentUser} />}
+                        {currentView === View.CLIENT_STATEMENTS && <AccountStatements currentUser={currentUser} />}
+                        {currentView === View.CATALOG && <Catalog currentUser={currentUser} />}
+                        {currentView === View.SUPPLIERS_MASTER && <SuppliersMaster currentUser={currentUser} />}
+                        {currentView === View.PRESUPUESTADOR && <Presupuestador />}
+                        {currentView === View.ETIQUETADOR && <Etiquetador />}
+                        {currentView === View.PRICE_MANAGEMENT && <PriceManagement currentUser={currentUser} />}
+                        {currentView === View.SETTINGS && <Settings 
+                            currentUser={currentUser} 
+                            onUpdateProfile={async (n, a, b, t) => { 
+                                await supabase.from('profiles').update({ name: n, avatar_url: a, preferred_branch: b, theme_preference: t }).eq('id', currentUser.id); 
+                                await fetchProfile(currentUser.id); 
+                            }} 
+                            isDarkMode={isDarkMode} 
+                            onToggleTheme={() => toggleTheme()} 
+                            onLogout={handleLogout}
+                        />}
+                        {currentView === View.STOCK_CONTROL && <StockControl currentUser={currentUser} />}
+                        {currentView === View.ATTENDANCE && <Attendance currentUser={currentUser} />}
+                        {currentView === View.INV_INBOUNDS && <InventoryInbounds currentUser={currentUser} />}
+                        {currentView === View.INV_ADJUSTMENTS && <InventoryAdjustments currentUser={currentUser} />}
+                        {currentView === View.INV_TRANSFERS && <InventoryTransfers currentUser={currentUser} />}
+                        {currentView === View.INV_HISTORY && <InventoryHistory currentUser={currentUser} />}
+                        {currentView === View.INV_SUPPLIER_ORDERS && <SupplierOrders currentUser={currentUser} />}
+                        {currentView === View.LISTA_CHINA && <ListaChina />}
+                        {currentView === View.EXPIRATIONS && <Expirations />}
+                        {currentView === View.CASH_COUNT && <CashCount currentUser={currentUser} />}
+                        {currentView === View.DAILY_CASH_SHEET && <DailyCashSheet currentUser={currentUser} onNavigate={setCurrentView} />}
+                        {currentView === View.CASH_MOVEMENTS && <CashMovements currentUser={currentUser} />}
+                        {currentView === View.BANK_MOVEMENTS && <BankMovements currentUser={currentUser} />}
+                        {currentView === View.CASH_CONCEPTS && <CashConcepts />}
                     
-                    {/* HIDDEN / ADMIN TOOLS */}
+                        {/* HIDDEN / ADMIN TOOLS */}
+                    </Suspense>
                 </main>
 
+                {isOpeningOrder && (
+                    <div className="fixed inset-0 z-[90] flex items-center justify-center bg-black/20 backdrop-blur-[1px]">
+                        <Loader2 size={32} className="animate-spin text-primary" />
+                    </div>
+                )}
+
                 {activeOrder && (
-                    <OrderAssemblyModal 
-                        order={activeOrder} 
-                        currentUser={currentUser} 
-                        onClose={() => handleReleaseOrder(activeOrder)}
-                        onSave={handleSaveAssembly}
-                        onUpdateProduct={handleUpdateProductQuantity}
-                        onToggleCheck={(code, unitPrice) => setActiveOrder(toggleProductCheck(activeOrder, code, unitPrice) as DetailedOrder)}
-                        onToggleAllChecks={(check) => setActiveOrder(toggleAllProductsCheck(activeOrder, check) as DetailedOrder)}
-                        onUpdateObservations={(text) => setActiveOrder(updateObservations(activeOrder, text) as DetailedOrder)}
-                        onAddProduct={(prod) => {
-                            const updatedOrder = addProductToOrder(activeOrder, prod);
-                            updatedOrder.history = [...(updatedOrder.history || []), {
-                                timestamp: new Date().toISOString(),
-                                userId: currentUser.id,
-                                userName: currentUser.name,
-                                action: 'ITEM_ADDED_NEW',
-                                details: `Agregó nuevo ítem: ${prod.name} (${prod.quantity} un.)`,
-                                previousState: activeOrder.status,
-                                newState: activeOrder.status
-                            }];
-                            const detailed = { ...updatedOrder, productCount: updatedOrder.products.length } as DetailedOrder;
-                            setActiveOrder(detailed);
-                        }}
-                        onUpdatePrice={(code, price, oldUnitPrice) => setActiveOrder(updateProductPrice(activeOrder, code, price, oldUnitPrice) as DetailedOrder)}
-                        onRemoveProduct={(code, unitPrice) => {
-                            const updatedOrder = removeProductFromOrder(activeOrder, code, unitPrice);
-                            const detailed = { ...updatedOrder, productCount: updatedOrder.products.length } as DetailedOrder;
-                            setActiveOrder(detailed);
-                        }}
-                        onDeleteOrder={handleDeleteOrder}
-                    />
+                    <Suspense fallback={null}>
+                        <OrderAssemblyModal 
+                            order={activeOrder} 
+                            currentUser={currentUser} 
+                            onClose={() => handleReleaseOrder(activeOrder)}
+                            onSave={handleSaveAssembly}
+                            onUpdateProduct={handleUpdateProductQuantity}
+                            onToggleCheck={(code, unitPrice) => setActiveOrder(prev => prev && toggleProductCheck(prev, code, unitPrice) as DetailedOrder)}
+                            onToggleAllChecks={(check) => setActiveOrder(prev => prev && toggleAllProductsCheck(prev, check) as DetailedOrder)}
+                            onUpdateObservations={(text) => setActiveOrder(prev => prev && updateObservations(prev, text) as DetailedOrder)}
+                            onAddProduct={(prod) => setActiveOrder(prev => {
+                                if (!prev) return prev;
+                                const updatedOrder = addProductToOrder(prev, prod);
+                                if (updatedOrder === prev) return prev;
+                                const history = [...(updatedOrder.history || []), {
+                                    timestamp: new Date().toISOString(),
+                                    userId: currentUser.id,
+                                    userName: currentUser.name,
+                                    action: 'ITEM_ADDED_NEW',
+                                    details: `Agregó nuevo ítem: ${prod.name} (${prod.quantity} un.)`,
+                                    previousState: prev.status,
+                                    newState: prev.status
+                                }];
+                                return { ...updatedOrder, history, productCount: updatedOrder.products.length } as DetailedOrder;
+                            })}
+                            onUpdatePrice={(code, price, oldUnitPrice) => setActiveOrder(prev => prev && updateProductPrice(prev, code, price, oldUnitPrice) as DetailedOrder)}
+                            onRemoveProduct={(code, unitPrice) => setActiveOrder(prev => {
+                                if (!prev) return prev;
+                                const updatedOrder = removeProductFromOrder(prev, code, unitPrice);
+                                return { ...updatedOrder, productCount: updatedOrder.products.length } as DetailedOrder;
+                            })}
+                            onDeleteOrder={handleDeleteOrder}
+                        />
+                    </Suspense>
                 )}
 
                 {/* Generic Dialog Modal */}
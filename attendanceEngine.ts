@@ -0,0 +1,528 @@
+import type { WorkerAttendanceConfig, GlobalAttendanceSettings } from './types';
+
+// ==========================================
+// MOTOR DE LIQUIDACIÓN DE ASISTENCIA
+// ==========================================
+// Lectura de los informes del reloj (Llerena y Betbeder), evaluación de cada
+// día según el horario del trabajador y cálculo de la quincena. No depende de
+// React ni de Supabase: la pantalla lo usa para un trabajador y la
+// liquidación general lo corre para todos los armadores de un mismo informe
+// en una pasada. Las fechas se manejan como número de día (días desde
+// 1970-01-01), sin crear un Date por cada día del período.
+
+export const DAYS_OF_WEEK = [
+    { key: 'Lunes', short: 'Lun' },
+    { key: 'Martes', short: 'Mar' },
+    { key: 'Miércoles', short: 'Mié' },
+    { key: 'Jueves', short: 'Ju' },
+    { key: 'Viernes', short: 'Vie' },
+    { key: 'Sábado', short: 'Sáb' },
+    { key: 'Domingo', short: 'Dom' }
+];
+
+const DAY_MAP: Record<string, string> = {
+    'Lu': 'Lunes', 'Ma': 'Martes', 'Mi': 'Miércoles', 'Ju': 'Jueves', 'Vi': 'Viernes', 'Sa': 'Sábado', 'Do': 'Domingo',
+    'Lunes': 'Lunes', 'Martes': 'Martes', 'Miercoles': 'Miércoles', 'Miércoles': 'Miércoles', 'Jueves': 'Jueves', 'Viernes': 'Viernes', 'Sabado': 'Sábado', 'Sábado': 'Sábado', 'Domingo': 'Domingo'
+};
+
+const MONTH_NAMES = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre'];
+
+const DEFAULT_SETTINGS = { bonus_1: 30000, bonus_2: 20000 };
+
+export interface ParsedDay {
+    date: string; // YYYY-MM-DD
+    dayName: string;
+    entry: string;
+    exit: string;
+    observation: string;
+    isFeriado: boolean;
+    isJustified: boolean;
+    isNoMark: boolean;
+    hours: number;
+    penaltyHours: number;
+    status: string;
+    isEarly: boolean;
+    isLate: boolean;
+    minutesLate: number;
+    originalRawDate?: string;
+}
+
+export interface AttendanceMetrics {
+    user_id: string;
+    early_arrivals: number;
+    late_arrivals: number;
+    justified_count: number;
+    total_issues: number;
+    holidays_worked: number;
+    absences: number;
+    scheduled_days: number;
+    marked_days: number;
+}
+
+/** Resultado de evaluar los días: depende del informe y del horario, no de montos. */
+export interface AttendanceEvaluation {
+    detailedDays: ParsedDay[];
+    startIso: string;
+    endIso: string;
+    grossHours: number;
+    totalHours: number;
+    totalPenaltyHours: number;
+    totalLateCount: number;
+    daysWorked: number;
+    isAlwaysEarly: boolean;
+    hasFatalIssues: boolean;
+    hasJustifiedAbsence: boolean;
+    hasJustifiedLateness: boolean;
+    metrics: AttendanceMetrics;
+}
+
+export interface PayAdjustments {
+    extraHours: number;
+    manualExtra: number;
+    debt: number;
+}
+
+export interface AttendancePay {
+    subtotal: number;
+    penaltyDeduction: number;
+    bonusAmount: number;
+    bonusStatus: string;
+    calculatedExtraFromHours: number;
+    totalToPay: number;
+}
+
+export interface WorkerPayroll {
+    userId: string;
+    evaluation: AttendanceEvaluation;
+    pay: AttendancePay;
+}
+
+// --- Fechas como número de día ---
+
+const dayNumber = (y: number, m: number, d: number) => Date.UTC(y, m - 1, d) / 86400000;
+
+const pad2 = (n: number) => (n < 10 ? '0' : '') + n;
+
+// Conversión inversa sin Date (algoritmo civil de H. Hinnant)
+const isoFromDayNumber = (n: number): string => {
+    const z = n + 719468;
+    const era = Math.floor(z / 146097);
+    const doe = z - era * 146097;
+    const yoe = Math.floor((doe - Math.floor(doe / 1460) + Math.floor(doe / 36524) - Math.floor(doe / 146096)) / 365);
+    const doy = doe - (365 * yoe + Math.floor(yoe / 4) - Math.floor(yoe / 100));
+    const mp = Math.floor((5 * doy + 2) / 153);
+    const d = doy - Math.floor((153 * mp + 2) / 5) + 1;
+    const m = mp < 10 ? mp + 3 : mp - 9;
+    const y = yoe + era * 400 + (m <= 2 ? 1 : 0);
+    return `${y}-${pad2(m)}-${pad2(d)}`;
+};
+
+const dayNumberFromIso = (iso: string) => {
+    const [y, m, d] = iso.split('-').map(Number);
+    return dayNumber(y, m, d);
+};
+
+// 1970-01-01 fue jueves (índice 3 con lunes = 0)
+const weekdayName = (n: number) => DAYS_OF_WEEK[((n + 3) % 7 + 7) % 7].key;
+
+export const timeToMinutes = (time: string) => {
+    if (!time) return 0;
+    const [h, m] = (time || "00:00").split(':').map(Number);
+    return h * 60 + m;
+};
+
+const emptyDay = (date: string, dayName: string, originalRawDate: string): ParsedDay => ({
+    date, dayName, entry: "", exit: "", observation: "",
+    isFeriado: false, isJustified: false, isNoMark: false,
+    hours: 0, penaltyHours: 0, status: "",
+    isEarly: false, isLate: false, minutesLate: 0,
+    originalRawDate
+});
+
+// --- Lectura del informe del reloj ---
+
+const isNoiseLine = (trimmed: string) =>
+    !trimmed || /tabla|asistencia|dd\/ss|ent|sal|am|pm|extra|Primer registro|Ultimo registro|Horas cumplidas/i.test(trimmed) || trimmed.includes('==');
+
+/**
+ * Convierte el texto del reloj (Llerena: "05 Lu 07:58 16:02", Betbeder:
+ * "05/03 07:58 16:02 ... Lunes") en días. Con una sola marca decide si es
+ * entrada o salida por cercanía al horario del trabajador.
+ */
+export const parseClockExport = (raw: string, config: WorkerAttendanceConfig, today: Date = new Date()): ParsedDay[] => {
+    const lines = raw.split('\n');
+    const results: ParsedDay[] = [];
+
+    // Si el primer día del informe está "en el futuro", el informe es del mes anterior
+    let monthOffset = 0;
+    for (const line of lines) {
+        const match = line.trim().match(/^(\d{2})\s+([A-Za-z]+)/);
+        if (match) {
+            if (parseInt(match[1]) > today.getDate() + 5) monthOffset = -1;
+            break;
+        }
+    }
+
+    let currentYear = today.getFullYear();
+    let currentMonth = today.getMonth() + monthOffset;
+    if (currentMonth < 0) {
+        currentMonth = 11;
+        currentYear -= 1;
+    }
+    let previousDayNum = -1;
+
+    const schedEntry = timeToMinutes(config.entry_time);
+    const schedExit = timeToMinutes(config.exit_time);
+    const schedEntryPm = config.entry_time_pm ? timeToMinutes(config.entry_time_pm) : null;
+    const schedExitPm = config.exit_time_pm ? timeToMinutes(config.exit_time_pm) : null;
+
+    for (const line of lines) {
+        const trimmed = line.trim();
+        if (isNoiseLine(trimmed)) continue;
+
+        const matchLlerena = trimmed.match(/^(\d{2})\s+([A-Za-z]+)(.*)/);
+        if (matchLlerena) {
+            const dayNumStr = matchLlerena[1];
+            const dayNum = parseInt(dayNumStr);
+            const dayShort = matchLlerena[2];
+
+            if (previousDayNum !== -1 && dayNum < previousDayNum) {
+                currentMonth++;
+                if (currentMonth > 11) {
+                    currentMonth = 0;
+                    currentYear++;
+                }
+            }
+            previousDayNum = dayNum;
+
+            const timesMatch = matchLlerena[3].match(/(\d{1,2}:\d{2})/g) || [];
+            let entry = "";
+            let exit = "";
+
+            if (timesMatch.length >= 2) {
+                entry = timesMatch[0];
+                exit = timesMatch[timesMatch.length - 1];
+            } else if (timesMatch.length === 1) {
+                // ¿Qué está más cerca según la configuración del trabajador?
+                const foundMins = timeToMinutes(timesMatch[0]);
+                const distEntry = Math.abs(foundMins - schedEntry);
+                const distExit = Math.abs(foundMins - schedExit);
+                const distEntryPm = schedEntryPm !== null ? Math.abs(foundMins - schedEntryPm) : 9999;
+                const distExitPm = schedExitPm !== null ? Math.abs(foundMins - schedExitPm) : 9999;
+                const minDist = Math.min(distEntry, distExit, distEntryPm, distExitPm);
+                if (minDist === distEntry || minDist === distEntryPm) entry = timesMatch[0];
+                else exit = timesMatch[0];
+            }
+
+            const day = emptyDay(isoFromDayNumber(dayNumber(currentYear, currentMonth + 1, dayNum)), DAY_MAP[dayShort.substring(0, 2)] || dayShort, dayNumStr);
+            day.entry = entry;
+            day.exit = exit;
+            results.push(day);
+            continue;
+        }
+
+        const matchBetbeder = trimmed.match(/^(\d{2}\/\d{2})\s+(\d{2}:\d{2})\s+(\d{2}:\d{2}).*?([a-zA-Z]+)$/);
+        if (matchBetbeder) {
+            const [d, m] = matchBetbeder[1].split('/').map(Number);
+            let itemYear = today.getFullYear();
+            if (today.getMonth() === 0 && m === 12) itemYear -= 1;
+
+            const day = emptyDay(isoFromDayNumber(dayNumber(itemYear, m, d)), DAY_MAP[matchBetbeder[4]] || matchBetbeder[4], pad2(d));
+            day.entry = matchBetbeder[2];
+            day.exit = matchBetbeder[3];
+            results.push(day);
+        }
+    }
+
+    return results;
+};
+
+const normalizeName = (text: string) =>
+    text.normalize('NFD').replace(/[̀-ͯ]/g, '').toUpperCase();
+
+/**
+ * Separa un informe con varios trabajadores: cada renglón que no es un día y
+ * contiene todas las palabras del nombre de un armador abre su sección.
+ * Devuelve el texto de cada trabajador encontrado (por id).
+ */
+export const splitClockExportByWorker = (raw: string, workers: { id: string; name: string }[]): Map<string, string> => {
+    const candidates = workers
+        .map(w => ({ id: w.id, words: normalizeName(w.name || '').split(/\s+/).filter(t => t.length >= 3) }))
+        .filter(w => w.words.length > 0)
+        // Primero los nombres más largos: "JUAN PEREZ" antes que "JUAN"
+        .sort((a, b) => b.words.length - a.words.length);
+
+    const sections = new Map<string, string[]>();
+    let current: string[] | null = null;
+
+    for (const line of raw.split('\n')) {
+        const trimmed = line.trim();
+        if (trimmed && !/^\d{2}[\s/]/.test(trimmed)) {
+            const words = new Set(normalizeName(trimmed).split(/[^A-Z0-9]+/));
+            const owner = candidates.find(c => c.words.every(t => words.has(t)));
+            if (owner) {
+                if (!sections.has(owner.id)) sections.set(owner.id, []);
+                current = sections.get(owner.id)!;
+                continue;
+            }
+        }
+        if (current) current.push(line);
+    }
+
+    const out = new Map<string, string>();
+    sections.forEach((lines, id) => out.set(id, lines.join('\n')));
+    return out;
+};
+
+// --- Evaluación de los días ---
+
+/**
+ * Completa el período (días sin marca incluidos) y clasifica cada día según
+ * el horario del trabajador, acumulando totales e indicadores en la misma pasada.
+ */
+export const evaluateAttendance = (userId: string, parsed: ParsedDay[], config: WorkerAttendanceConfig): AttendanceEvaluation | null => {
+    if (parsed.length === 0) return null;
+
+    const byDay = new Map<number, ParsedDay>();
+    let start = Infinity;
+    let end = -Infinity;
+    for (const p of parsed) {
+        const n = dayNumberFromIso(p.date);
+        byDay.set(n, p);
+        if (n < start) start = n;
+        if (n > end) end = n;
+    }
+
+    const workDays = new Set(config.work_days || []);
+    const amEntry = timeToMinutes(config.entry_time);
+    const pmEntry = config.entry_time_pm ? timeToMinutes(config.entry_time_pm) : null;
+    const isLlerena = config.location === 'LLERENA';
+
+    const detailedDays: ParsedDay[] = new Array(end - start + 1);
+    let grossHours = 0;
+    let totalPenaltyHours = 0;
+    let totalLateCount = 0;
+    let daysWorked = 0;
+    let workedCount = 0;
+    let workedEarlyCount = 0;
+    let hasFatalIssues = false;
+    let hasJustifiedAbsence = false;
+    let hasJustifiedLateness = false;
+    const metrics: AttendanceMetrics = {
+        user_id: userId,
+        early_arrivals: 0, late_arrivals: 0, justified_count: 0, total_issues: 0,
+        holidays_worked: 0, absences: 0, scheduled_days: 0, marked_days: 0
+    };
+
+    for (let n = start; n <= end; n++) {
+        const iso = isoFromDayNumber(n);
+        const day = byDay.get(n) || emptyDay(iso, weekdayName(n), iso.slice(8, 10));
+
+        let hours = 0; let penaltyHours = 0; let status = "";
+        const isWorkDay = workDays.has(day.dayName);
+        const entryMins = day.entry ? timeToMinutes(day.entry) : null;
+        const exitMins = day.exit ? timeToMinutes(day.exit) : null;
+
+        let targetEntry = amEntry;
+        if (entryMins !== null && pmEntry !== null && Math.abs(entryMins - pmEntry) < Math.abs(entryMins - amEntry)) {
+            targetEntry = pmEntry;
+        }
+
+        let isEarly = false; let isLate = false;
+        let diffMinutes = 0;
+
+        if (day.isFeriado) {
+            if (day.entry && day.exit) {
+                hours = ((exitMins! - entryMins!) / 60) * 2;
+                status = "FERIADO TRABAJADO";
+            } else {
+                hours = 7;
+                status = "FERIADO";
+            }
+        } else if (day.entry && day.exit) {
+            hours = (exitMins! - entryMins!) / 60;
+            diffMinutes = entryMins! - targetEntry;
+
+            if (diffMinutes <= 0) {
+                isEarly = true;
+                status = "TRABAJADO";
+            } else {
+                isLate = true;
+                if (diffMinutes <= 10) {
+                    status = isLlerena ? "TARDE (SIN BONO)" : "TARDE (TOLERANCIA)";
+                } else {
+                    totalLateCount++;
+                    if (diffMinutes >= 120) {
+                        penaltyHours = 4; status = "TARDE (>2H) -4Hs";
+                    } else if (diffMinutes >= 60) {
+                        penaltyHours = 2; status = "TARDE (>1H) -2Hs";
+                    } else if (isLlerena) {
+                        penaltyHours = 1; status = diffMinutes > 30 ? "TARDE (>30m) -1Hs" : "TARDE (11-30m) -1Hs";
+                    } else {
+                        penaltyHours = 1; status = "TARDE (>10m) -1Hs";
+                    }
+                }
+            }
+        } else if (day.entry || day.exit) {
+            status = "REGISTRO INCOMPLETO (-6Hs)";
+            penaltyHours = 6;
+            totalLateCount++;
+        } else if (isWorkDay) {
+            if (day.isJustified) {
+                hours = 3.5;
+                status = "FALTA JUSTIFICADA";
+            } else {
+                status = "FALTA";
+            }
+        } else {
+            status = "NO TRABAJA";
+        }
+
+        const minutesLate = Math.max(0, diffMinutes);
+        const evaluated: ParsedDay = { ...day, hours, penaltyHours, status, isEarly, isLate, minutesLate };
+        detailedDays[n - start] = evaluated;
+
+        // Horas reales sin restar multa
+        grossHours += hours;
+        totalPenaltyHours += penaltyHours;
+        if (hours > 0) daysWorked++;
+
+        const marked = !!(day.entry && day.exit);
+        const isAbsence = status === 'FALTA';
+        const isIncomplete = status.includes('INCOMPLETO');
+        if (marked) {
+            workedCount++;
+            if (isEarly) workedEarlyCount++;
+            if (!day.isNoMark) metrics.marked_days++;
+        }
+        if ((minutesLate > 10 || isAbsence || isIncomplete) && !day.isJustified) hasFatalIssues = true;
+        if (status === 'FALTA JUSTIFICADA') hasJustifiedAbsence = true;
+        if (minutesLate > 10 && day.isJustified) hasJustifiedLateness = true;
+
+        if (isEarly) metrics.early_arrivals++;
+        if (day.isJustified && (isLate || status.includes('FALTA'))) metrics.justified_count++;
+        if (minutesLate > 0 || isAbsence || isIncomplete) metrics.total_issues++;
+        if (status === 'FERIADO TRABAJADO') metrics.holidays_worked++;
+        if (isAbsence) metrics.absences++;
+        if (isWorkDay && status !== 'FERIADO' && !day.isJustified) metrics.scheduled_days++;
+    }
+    metrics.late_arrivals = totalLateCount;
+
+    return {
+        detailedDays,
+        startIso: isoFromDayNumber(start),
+        endIso: isoFromDayNumber(end),
+        grossHours,
+        totalHours: Math.round(grossHours),
+        totalPenaltyHours,
+        totalLateCount,
+        daysWorked,
+        isAlwaysEarly: workedCount > 0 && workedEarlyCount === workedCount,
+        hasFatalIssues,
+        hasJustifiedAbsence,
+        hasJustifiedLateness,
+        metrics
+    };
+};
+
+// --- Montos ---
+
+/** Liquidación a partir de la evaluación: solo aritmética, no recorre los días. */
+export const computeAttendancePay = (
+    evaluation: AttendanceEvaluation,
+    config: WorkerAttendanceConfig,
+    settingsByLocation: Record<string, GlobalAttendanceSettings>,
+    adjustments: PayAdjustments
+): AttendancePay => {
+    const settings = settingsByLocation[config.location] || DEFAULT_SETTINGS;
+    const rate = config.hourly_rate;
+    const subtotal = evaluation.totalHours * rate; // Salario base bruto
+    const penaltyDeduction = evaluation.totalPenaltyHours * rate;
+
+    let bonusAmount = 0;
+    let bonusStatus = "SIN BONO";
+    if (!evaluation.hasFatalIssues) {
+        if (evaluation.isAlwaysEarly && !evaluation.hasJustifiedAbsence && !evaluation.hasJustifiedLateness) {
+            bonusAmount = settings.bonus_1;
+            bonusStatus = "BONO EXCELENCIA (1)";
+        } else {
+            bonusAmount = settings.bonus_2;
+            bonusStatus = "BONO CUMPLIMIENTO (2)";
+        }
+    }
+
+    const calculatedExtraFromHours = adjustments.extraHours * rate;
+    // (Base bruto - multas) + bonos + extras - deuda
+    const totalToPay = subtotal - penaltyDeduction + bonusAmount + calculatedExtraFromHours + adjustments.manualExtra - adjustments.debt;
+
+    return { subtotal, penaltyDeduction, bonusAmount, bonusStatus, calculatedExtraFromHours, totalToPay };
+};
+
+export const periodScore = (m: AttendanceMetrics): number => {
+    let score = 0;
+    score += m.early_arrivals * 1;
+    score -= m.late_arrivals * 1;
+    score -= m.absences * 1;
+    if (m.late_arrivals > 0 && (m.justified_count / m.late_arrivals) >= 0.8) score += 1;
+    else if (m.late_arrivals > 0) score -= 1;
+
+    const markingEff = m.marked_days / (m.scheduled_days || 1);
+    if (markingEff >= 1) score += 2;
+    else if (markingEff > 0.8) score += 1;
+    else if (markingEff < 0.5) score -= 1;
+    return score;
+};
+
+export const periodLabel = (startIso: string): string => {
+    const [y, m, d] = startIso.split('-').map(Number);
+    return `${d <= 15 ? 'Primera' : 'Segunda'} Quincena ${MONTH_NAMES[m - 1]} ${y}`;
+};
+
+/** Fila de attendance_periods para una liquidación. */
+export const buildPeriodRecord = (
+    userId: string,
+    evaluation: AttendanceEvaluation,
+    pay: AttendancePay,
+    config: WorkerAttendanceConfig,
+    adjustments: PayAdjustments
+) => ({
+    user_id: userId,
+    start_date: evaluation.startIso,
+    end_date: evaluation.endIso,
+    period_label: periodLabel(evaluation.startIso),
+    total_hours: evaluation.totalHours, // Horas brutas
+    total_penalty_hours: evaluation.totalPenaltyHours,
+    hourly_rate: config.hourly_rate,
+    bonus_amount: pay.bonusAmount,
+    extra_amount: pay.calculatedExtraFromHours + adjustments.manualExtra,
+    debt_amount: adjustments.debt,
+    total_to_pay: pay.totalToPay,
+    details: evaluation.detailedDays,
+    score_obtained: periodScore(evaluation.metrics),
+    days_worked: evaluation.daysWorked
+});
+
+/**
+ * Liquidación general: separa el informe por trabajador y calcula cada uno
+ * con su configuración. Los trabajadores sin sección o sin configuración
+ * quedan afuera.
+ */
+export const computePayroll = (
+    raw: string,
+    workers: { id: string; name: string }[],
+    configs: Record<string, WorkerAttendanceConfig>,
+    settingsByLocation: Record<string, GlobalAttendanceSettings>,
+    today: Date = new Date()
+): WorkerPayroll[] => {
+    const sections = splitClockExportByWorker(raw, workers);
+    const out: WorkerPayroll[] = [];
+    const noAdjustments: PayAdjustments = { extraHours: 0, manualExtra: 0, debt: 0 };
+    sections.forEach((text, userId) => {
+        const config = configs[userId];
+        if (!config) return;
+        const evaluation = evaluateAttendance(userId, parseClockExport(text, config, today), config);
+        if (!evaluation) return;
+        out.push({ userId, evaluation, pay: computeAttendancePay(evaluation, config, settingsByLocation, noAdjustments) });
+    });
+    return out;
+};
@@ -0,0 +1,45 @@
+import type { Product } from '../types';
+
+// ==========================================
+// CORPUS DE TEXTO PEGADO PARA parseOrderText
+// ==========================================
+// Renglones con los formatos que llegan del sistema de cada depósito, con el
+// resultado esperado. Lo usa parseOrderText.bench.ts como regresión y como
+// base para medir throughput. Si aparece un formato nuevo, agregarlo acá.
+
+type Expected = Pick<Product, 'code' | 'name' | 'quantity' | 'unitPrice'>;
+
+export interface CorpusCase {
+    format: string;
+    line: string;
+    expected: Expected | null;   // null: el renglón tiene que quedar como no interpretado
+}
+
+export const ORDER_PASTE_CORPUS: CorpusCase[] = [
+    // --- Llerena: PDF del pedido, bultos con multiplicador y separador " - " ---
+    { format: 'llerena', line: '2 (x6) 8287 PATAGONIA 24.7 LATA 410CC - $ 1.250,00 $ 15.000,00', expected: { code: '8287', name: 'PATAGONIA 24.7 LATA 410CC', quantity: 12, unitPrice: 1250 } },
+    { format: 'llerena', line: '1 (x6) 4 4464 FERNET BRANCA 750CC - $ 9.850,50 $ 98.505,00', expected: { code: '4464', name: 'FERNET BRANCA 750CC', quantity: 10, unitPrice: 9850.5 } },
+    { format: 'llerena', line: '3 (x12) 1020 VINO TORO TINTO 1LT – $ 1.100,00 $ 39.600,00', expected: { code: '1020', name: 'VINO TORO TINTO 1LT', quantity: 36, unitPrice: 1100 } },
+    { format: 'llerena', line: '1 (X6) 2 3310 GANCIA AMERICANO 950CC — $ 4.320 $ 34.560', expected: { code: '3310', name: 'GANCIA AMERICANO 950CC', quantity: 8, unitPrice: 4320 } },
+    { format: 'llerena', line: '10 (x24) 7781 AGUA VILLAVICENCIO 500 -$ 380,25 $ 91.260,00', expected: { code: '7781', name: 'AGUA VILLAVICENCIO 500', quantity: 240, unitPrice: 380.25 } },
+    { format: 'llerena', line: '1(x6) 5512 CHANDON EXTRA BRUT - $ 12.990,00 $ 77.940,00', expected: { code: '5512', name: 'CHANDON EXTRA BRUT', quantity: 6, unitPrice: 12990 } },
+
+    // --- Betbeder: copia del sistema, sin multiplicador y con tabs entre columnas ---
+    { format: 'betbeder', line: '4\t6001\tCOCA COLA 2.25LT\t$\t2.150,00\t$\t8.600,00', expected: { code: '6001', name: 'COCA COLA 2.25LT', quantity: 4, unitPrice: 2150 } },
+    { format: 'betbeder', line: '12 6002 SPRITE 1.5LT $ 1.480 $ 17.760', expected: { code: '6002', name: 'SPRITE 1.5LT', quantity: 12, unitPrice: 1480 } },
+    { format: 'betbeder', line: '1 9100 HIELO $ 900 $ 900', expected: { code: '9100', name: 'HIELO', quantity: 1, unitPrice: 900 } },
+    { format: 'betbeder', line: '2 9101 $ 450 $ 900', expected: { code: '9101', name: '', quantity: 2, unitPrice: 450 } },
+    { format: 'betbeder', line: '  6 A-220 SIDRA 1888 750   $ 3.210,90   $ 19.265,40  ', expected: { code: 'A-220', name: 'SIDRA 1888 750', quantity: 6, unitPrice: 3210.9 } },
+    { format: 'betbeder', line: '3 5 6003 FANTA 2.25LT $ 2.050 $ 16.400', expected: { code: '6003', name: 'FANTA 2.25LT', quantity: 8, unitPrice: 2050 } },
+
+    // --- Presupuesto cargado (CreateBudget arma el texto con este formato) ---
+    { format: 'presupuesto', line: '7 (x1) 8287 PATAGONIA 24.7 LATA 410CC - $ 1.250,00 $ 8.750,00', expected: { code: '8287', name: 'PATAGONIA 24.7 LATA 410CC', quantity: 7, unitPrice: 1250 } },
+    { format: 'presupuesto', line: '1 (x1) 12 FERNET 1882 - $ 7.400,00 $ 7.400,00', expected: { code: '12', name: 'FERNET 1882', quantity: 1, unitPrice: 7400 } },
+
+    // --- Renglones que no son productos ---
+    { format: 'ruido', line: 'Cant. Código Descripción P.Unit Total', expected: null },
+    { format: 'ruido', line: 'TOTAL $ 285.410,90', expected: null },
+    { format: 'ruido', line: '3 (x6) 8287 PATAGONIA SIN PRECIO', expected: null },
+    { format: 'ruido', line: '5', expected: null },
+    { format: 'ruido', line: '2 (x6) 8287 PATAGONIA $ ., $ 1', expected: null }
+];
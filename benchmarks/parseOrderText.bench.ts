@@ -0,0 +1,43 @@
+import { parseOrderTextDetailed } from '../logic';
+import { ORDER_PASTE_CORPUS } from './orderPasteCorpus';
+
+// ==========================================
+// REGRESIÓN + THROUGHPUT DE parseOrderText
+// ==========================================
+// npm run bench:parser
+// 1. Cada renglón del corpus tiene que dar el resultado esperado.
+// 2. Se arma un pegado grande repitiendo el corpus y se mide renglones/segundo,
+//    más un caso patológico (nombre con miles de espacios antes del "$") que con
+//    la regex anterior hacía backtracking cuadrático.
+
+const REPEAT = 5000;
+
+let failures = 0;
+ORDER_PASTE_CORPUS.forEach(({ format, line, expected }) => {
+    const { products, unparsed } = parseOrderTextDetailed(line);
+    const got = products[0]
+        ? { code: products[0].code, name: products[0].name, quantity: products[0].quantity, unitPrice: products[0].unitPrice }
+        : null;
+    if (JSON.stringify(got) !== JSON.stringify(expected)) {
+        failures++;
+        console.error(`[${format}] ${JSON.stringify(line)}\n  esperado: ${JSON.stringify(expected)}\n  obtenido: ${JSON.stringify(got)}${unparsed[0] ? ` (${unparsed[0].reason})` : ''}`);
+    }
+});
+console.log(`Corpus: ${ORDER_PASTE_CORPUS.length - failures}/${ORDER_PASTE_CORPUS.length} OK`);
+
+const measure = (label: string, text: string) => {
+    const lines = text.split('\n').length;
+    const start = performance.now();
+    const { products, unparsed } = parseOrderTextDetailed(text);
+    const ms = performance.now() - start;
+    console.log(`${label}: ${lines} renglones en ${ms.toFixed(1)} ms (${Math.round(lines / (ms / 1000)).toLocaleString('es-AR')} renglones/s) -> ${products.length} productos, ${unparsed.length} sin interpretar`);
+};
+
+const corpusText = ORDER_PASTE_CORPUS.map(c => c.line).join('\n');
+measure('Pegado grande', Array(REPEAT).fill(corpusText).join('\n'));
+measure('Patológico', `1 (x6) 4 4464 PATAGONIA${' '.repeat(20000)}$ 1`);
+
+if (failures > 0) {
+    console.error(`${failures} renglones del corpus no dieron lo esperado`);
+    process.exit(1);
+}
@@ -0,0 +1,22 @@
+import { createServer } from 'vite';
+
+// Corre un benchmark .ts con el transformador de Vite (ya está en devDependencies):
+// node benchmarks/run.mjs benchmarks/parseOrderText.bench.ts
+const [entry] = process.argv.slice(2);
+if (!entry) {
+    console.error('Uso: node benchmarks/run.mjs <archivo.bench.ts>');
+    process.exit(1);
+}
+
+const server = await createServer({
+    configFile: false,
+    logLevel: 'error',
+    server: { middlewareMode: true, hmr: false },
+    appType: 'custom'
+});
+
+try {
+    await server.ssrLoadModule(`/${entry.replace(/^\.?\//, '')}`);
+} finally {
+    await server.close();
+}
@@ -1,5 +1,6 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import { supabase } from '../supabase';
+import { useReferenceData } from '../referenceData';
 import { ClientMaster } from '../types';
 import { AlertCircle, Loader2, Save, X, Building2, Contact2, MapPin, Phone, Mail, Hash, CheckCircle2 } from 'lucide-react';
 
@@ -12,8 +13,8 @@ interface ClientModalProps {
 export const ClientModal: React.FC<ClientModalProps> = ({ initialData, onClose, onSuccess }) => {
     const [isSaving, setIsSaving] = useState(false);
     const [error, setError] = useState<string | null>(null);
-    const [classifications, setClassifications] = useState<any[]>([]);
-    const [zones, setZones] = useState<any[]>([]);
+    const { rows: classifications } = useReferenceData('client_classifications');
+    const { rows: zones } = useReferenceData('delivery_zones');
     const [formData, setFormData] = useState({
         codigo: initialData?.codigo || '',
         nombre: initialData?.nombre || '',
@@ -31,18 +32,6 @@ export const ClientModal: React.FC<ClientModalProps> = ({ initialData, onClose,
 
     const isEdit = !!initialData;
 
-    useEffect(() => {
-        const fetchData = async () => {
-            const [classRes, zonesRes] = await Promise.all([
-                supabase.from('client_classifications').select('*').order('name'),
-                supabase.from('delivery_zones').select('*').order('name')
-            ]);
-            if (!classRes.error && classRes.data) setClassifications(classRes.data);
-            if (!zonesRes.error && zonesRes.data) setZones(zonesRes.data);
-        };
-        fetchData();
-    }, []);
-
     const handleSave = async (e: React.FormEvent) => {
         e.preventDefault();
         if (!formData.codigo || !formData.nombre) return setError("Código y Nombre son obligatorios.");
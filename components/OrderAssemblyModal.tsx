@@ -1,5 +1,5 @@
 
-import React, { useState, useEffect, useRef } from 'react';
+import React, { useState, useEffect, useRef, useCallback, useMemo } from 'react';
 import { 
     X, 
     Check, 
@@ -42,8 +42,8 @@ import {
     Pencil
 } from 'lucide-react';
 import { Order, Product, User as UserType, OrderStatus, PaymentMethod, MasterProduct, HistoryEntry } from '../types';
-import { updatePaymentMethod } from '../logic';
-import { jsPDF } from 'jspdf';
+import { updatePaymentMethod, productKey } from '../logic';
+import { loadJsPDF } from '../lazyLibs';
 import { supabase } from '../supabase';
 
 interface OrderAssemblyModalProps {
@@ -78,7 +78,6 @@ export const OrderAssemblyModal: React.FC<OrderAssemblyModalProps> = ({
     const [activeTab, setActiveTab] = useState<'products' | 'history'>('products');
     const [editingProductKey, setEditingProductKey] = useState<string | null>(null);
     const [editingPriceKey, setEditingPriceKey] = useState<string | null>(null);
-    const [tempValue, setTempValue] = useState<string>("");
     const [isConfirmingDelete, setIsConfirmingDelete] = useState(false);
     const [isGeneratingInvoice, setIsGeneratingInvoice] = useState(false);
     const [isSharing, setIsSharing] = useState(false);
@@ -121,6 +120,11 @@ export const OrderAssemblyModal: React.FC<OrderAssemblyModalProps> = ({
 
     const canPrint = (isStatusBilling || isInvoiceControlStep || isReadyForTransit || isTransitStep || isFinishedStep) && hasAdminPrivileges;
 
+    // Precarga jsPDF solo si este usuario puede imprimir, así compartir por WhatsApp no espera la descarga
+    useEffect(() => {
+        if (canPrint) loadJsPDF().catch(() => {});
+    }, [canPrint]);
+
     useEffect(() => {
         const fetchClientPhone = async () => {
             try {
@@ -199,7 +203,10 @@ export const OrderAssemblyModal: React.FC<OrderAssemblyModalProps> = ({
     
     const showFinancials = hasAdminPrivileges;
 
-    const originalInvoiceTotal = order.products.reduce((acc, p) => acc + (Math.max(0, p.originalQuantity) * p.unitPrice), 0);
+    const originalInvoiceTotal = useMemo(
+        () => order.products.reduce((acc, p) => acc + (Math.max(0, p.originalQuantity) * p.unitPrice), 0),
+        [order.products]
+    );
     const finalTotal = order.total;
     const refundTotal = originalInvoiceTotal - finalTotal;
 
@@ -257,7 +264,8 @@ export const OrderAssemblyModal: React.FC<OrderAssemblyModalProps> = ({
         return { label, colorClass, dotColor, dateStr, timeStr };
     };
 
-    const buildInvoicePDF = () => {
+    const buildInvoicePDF = async () => {
+        const jsPDF = await loadJsPDF();
         const doc = new jsPDF();
         const primaryColor = [228, 124, 0]; 
         const textColor = [17, 24, 39]; 
@@ -415,8 +423,8 @@ export const OrderAssemblyModal: React.FC<OrderAssemblyModalProps> = ({
         return doc;
     };
 
-    const handlePrint = () => {
-        const doc = buildInvoicePDF();
+    const handlePrint = async () => {
+        const doc = await buildInvoicePDF();
         doc.save(`factura-${order.clientName.replace(/\s+/g, '-').toLowerCase()}-${order.displayId}.pdf`);
     };
 
@@ -424,7 +432,7 @@ export const OrderAssemblyModal: React.FC<OrderAssemblyModalProps> = ({
         if (!clientPhone) return;
         setIsSharing(true);
         try {
-            const doc = buildInvoicePDF();
+            const doc = await buildInvoicePDF();
             const pdfBlob = doc.output('blob');
             const fileName = `Factura-${order.clientName.replace(/\s+/g, '-')}-${order.displayId}.pdf`;
             const file = new File([pdfBlob], fileName, { type: 'application/pdf' });
@@ -442,35 +450,36 @@ export const OrderAssemblyModal: React.FC<OrderAssemblyModalProps> = ({
         } catch (err) { console.error(err); } finally { setIsSharing(false); }
     };
 
-    const handleEditQtyClick = (product: Product) => {
-        if (!canEditProducts) return;
-        setEditingProductKey(`${product.code}-${product.unitPrice}`);
-        setTempValue(product.quantity.toString());
-        setEditingPriceKey(null);
-    };
+    // Handlers estables para las líneas memoizadas: leen las props actuales por ref
+    const rowHandlersRef = useRef({ onUpdateProduct, onToggleCheck, onUpdatePrice });
+    rowHandlersRef.current = { onUpdateProduct, onToggleCheck, onUpdatePrice };
 
-    const handleQtySave = (product: Product) => {
-        const qty = parseInt(tempValue);
-        if (!isNaN(qty) && qty >= 0) { onUpdateProduct(product.code, qty, product.unitPrice); }
-        setEditingProductKey(null);
-    };
+    const handleRowToggleCheck = useCallback((product: Product) => {
+        rowHandlersRef.current.onToggleCheck(product.code, product.unitPrice);
+    }, []);
+
+    const handleStartEdit = useCallback((product: Product, field: 'qty' | 'price') => {
+        const key = productKey(product.code, product.unitPrice);
+        setEditingProductKey(field === 'qty' ? key : null);
+        setEditingPriceKey(field === 'price' ? key : null);
+    }, []);
 
-    const handleEditPriceClick = (product: Product) => {
-        if (!canEditPrice) return;
-        setEditingPriceKey(`${product.code}-${product.unitPrice}`);
-        setTempValue(product.unitPrice.toString());
+    const handleQtySave = useCallback((product: Product, value: string) => {
+        const qty = parseInt(value);
+        if (!isNaN(qty) && qty >= 0) { rowHandlersRef.current.onUpdateProduct(product.code, qty, product.unitPrice); }
         setEditingProductKey(null);
-    };
+    }, []);
 
-    const handlePriceSave = (product: Product) => {
-        const price = parseFloat(tempValue);
+    const handlePriceSave = useCallback((product: Product, value: string) => {
+        const price = parseFloat(value);
+        const { onUpdatePrice } = rowHandlersRef.current;
         if (!isNaN(price) && price >= 0 && onUpdatePrice) { onUpdatePrice(product.code, price, product.unitPrice); }
         setEditingPriceKey(null);
-    };
+    }, []);
 
-    const handleKeyDown = (e: React.KeyboardEvent, product: Product, type: 'qty' | 'price') => {
-        if (e.key === 'Enter') { if (type === 'qty') handleQtySave(product); else handlePriceSave(product); }
-    };
+    const handleCancelEdit = useCallback(() => { setEditingPriceKey(null); }, []);
+
+    const isPostShipping = [OrderStatus.FACTURADO, OrderStatus.FACTURA_CONTROLADA, OrderStatus.EN_TRANSITO, OrderStatus.ENTREGADO, OrderStatus.PAGADO].includes(order.status);
 
     const handleSaveNewProduct = () => {
         if (!newProdCode || !newProdName || !onAddProduct) return;
@@ -534,7 +543,7 @@ export const OrderAssemblyModal: React.FC<OrderAssemblyModalProps> = ({
     const handleAdvanceClick = () => { setShowTransitionModal(true); };
     const handleConfirmTransition = (notes: string) => { handleSafeSave(order, true, notes); setShowTransitionModal(false); };
 
-    const uncheckedCount = order.products.filter(p => !p.isChecked).length;
+    const uncheckedCount = useMemo(() => order.products.filter(p => !p.isChecked).length, [order.products]);
     const isReady = isAutoCheckStep ? true : uncheckedCount === 0;
 
     let titleText = "Armado de Pedido";
@@ -903,139 +912,26 @@ export const OrderAssemblyModal: React.FC<OrderAssemblyModalProps> = ({
                                     
                                     <div className="flex flex-col gap-3">
                                         {order.products.map((product) => {
-                                            const isEditingQty = editingProductKey === `${product.code}-${product.unitPrice}`;
-                                            const isEditingPrice = editingPriceKey === `${product.code}-${product.unitPrice}`;
-                                            const isPostShipping = [OrderStatus.FACTURADO, OrderStatus.FACTURA_CONTROLADA, OrderStatus.EN_TRANSITO, OrderStatus.ENTREGADO, OrderStatus.PAGADO].includes(order.status);
-                                            
-                                            // DETERMINACIÓN DE PRODUCTO AGREGADO (originalQuantity <= 0 indica agregado a posteriori)
-                                            const isAddedNew = product.originalQuantity <= 0;
-                                            const isSinCargo = product.unitPrice === 0;
-                                            const absOriginal = Math.abs(product.originalQuantity);
-
-                                            // Faltante: Original (Absoluto) - Cantidad Actual.
-                                            const missingAmount = isPostShipping
-                                                ? Math.max(0, absOriginal - (product.shippedQuantity ?? product.quantity))
-                                                : Math.max(0, absOriginal - product.quantity);
-
-                                            const returnedAmount = isPostShipping && product.shippedQuantity 
-                                                ? Math.max(0, product.shippedQuantity - product.quantity) 
-                                                : 0;
-
-                                            const isShortage = missingAmount > 0;
-                                            const isReturned = !order.isInterdeposito && returnedAmount > 0;
-                                            const displayChecked = isAutoCheckStep ? true : product.isChecked;
-
+                                            const key = productKey(product.code, product.unitPrice);
                                             return (
-                                                <div key={`${product.code}-${product.unitPrice}`} className={`flex items-start md:items-center gap-3 p-4 rounded-xl border transition-all 
-                                                    ${isSinCargo ? 'bg-purple-50/70 dark:bg-purple-900/10 border-purple-200' : (isAddedNew ? 'bg-orange-50/70 dark:bg-orange-900/10 border-orange-200' : (displayChecked && !isFinishedStep ? 'bg-green-50/5 border-green-500/20' : 'bg-surface border-surfaceHighlight shadow-sm'))}
-                                                `}>
-                                                    {!isFinishedStep && (
-                                                        <input 
-                                                            type="checkbox"
-                                                            checked={displayChecked}
-                                                            onChange={() => {
-                                                                if (canEditProducts && !isAutoCheckStep) onToggleCheck(product.code, product.unitPrice);
-                                                            }}
-                                                            disabled={!canEditProducts || isAutoCheckStep}
-                                                            className={`w-5 h-5 rounded border-surfaceHighlight text-primary focus:ring-primary cursor-pointer accent-primary ${isAutoCheckStep ? 'opacity-50' : ''}`}
-                                                        />
-                                                    )}
-                                                    
-                                                    <div className="flex-1 min-w-0">
-                                                        <div className="flex items-center gap-2">
-                                                            <p className="font-bold text-sm leading-tight text-text uppercase">{product.name}</p>
-                                                            {isSinCargo ? (
-                                                                <span className="text-[7px] font-black uppercase bg-purple-500 text-white px-1.5 py-0.5 rounded shadow-sm flex items-center gap-0.5 animate-in fade-in zoom-in">
-                                                                    Sin Cargo
-                                                                </span>
-                                                            ) : isAddedNew && (
-                                                                <span className="text-[7px] font-black uppercase bg-orange-500 text-white px-1.5 py-0.5 rounded shadow-sm flex items-center gap-0.5 animate-in fade-in zoom-in">
-                                                                    Agregado
-                                                                </span>
-                                                            )}
-                                                        </div>
-                                                        <div className="flex flex-wrap gap-2 mt-1">
-                                                            <span className="text-[10px] font-mono text-muted bg-surfaceHighlight/50 px-1.5 rounded">#{product.code}</span>
-                                                            
-                                                            {isShortage && (
-                                                                <span className="text-[10px] font-bold text-orange-600 bg-orange-500/10 px-1.5 rounded italic flex items-center gap-1 border border-orange-500/20">
-                                                                    <AlertTriangle size={10} /> Faltante: {missingAmount}
-                                                                </span>
-                                                            )}
-                                                            
-                                                            {isReturned && (
-                                                                <span className="text-[10px] font-black text-red-600 bg-red-500/10 px-1.5 py-0.5 rounded border border-red-500/20 uppercase tracking-tighter flex items-center gap-1 animate-pulse">
-                                                                    <ArrowDownLeft size={8}/> Nota de Crédito: {returnedAmount}
-                                                                </span>
-                                                            )}
-                                                        </div>
-                                                    </div>
-
-                                                    <div className="w-24 text-center">
-                                                        {isEditingQty ? (
-                                                            <div className="flex items-center gap-1">
-                                                                <input type="number" value={tempValue} onChange={e => setTempValue(e.target.value)} onKeyDown={e => handleKeyDown(e, product, 'qty')} className="w-16 px-2 py-1 rounded bg-background border border-primary text-sm font-bold text-center" autoFocus />
-                                                                <button onClick={() => handleQtySave(product)} className="text-green-500"><Check size={16}/></button>
-                                                            </div>
-                                                        ) : (
-                                                            <div className="flex flex-col items-center">
-                                                                <div className="flex items-center gap-2">
-                                                                    <span className={`text-lg font-black ${isSinCargo ? 'text-purple-600' : (isAddedNew ? 'text-orange-600' : 'text-text')}`}>{product.quantity}</span>
-                                                                    {canEditProducts && <button onClick={() => handleEditQtyClick(product)} className="p-1 text-muted hover:text-primary"><Pencil size={14} /></button>}
-                                                                </div>
-                                                                {isShortage && !isPostShipping && (
-                                                                    <span className="text-[9px] text-muted font-bold uppercase tracking-tighter">de {absOriginal}</span>
-                                                                )}
-                                                            </div>
-                                                        )}
-                                                    </div>
-
-                                                    {showFinancials && (
-                                                        <div className="w-28 md:w-32 text-right">
-                                                            {isEditingPrice ? (
-                                                                <div className="flex items-center justify-end gap-1 animate-in slide-in-from-right-2">
-                                                                    <span className="text-[10px] text-muted font-bold">$</span>
-                                                                    <input 
-                                                                        type="number" 
-                                                                        value={tempValue} 
-                                                                        onChange={e => setTempValue(e.target.value)} 
-                                                                        onKeyDown={e => handleKeyDown(e, product, 'price')} 
-                                                                        className="w-16 md:w-20 px-1 md:px-2 py-1 rounded bg-background border border-primary text-xs font-bold text-right outline-none" 
-                                                                        autoFocus 
-                                                                    />
-                                                                    <button 
-                                                                        onClick={() => handlePriceSave(product)} 
-                                                                        className="p-1 text-green-500 hover:bg-green-500/10 rounded transition-colors"
-                                                                    >
-                                                                        <Check size={14}/>
-                                                                    </button>
-                                                                    <button 
-                                                                        onClick={() => setEditingPriceKey(null)} 
-                                                                        className="p-1 text-muted hover:bg-surfaceHighlight rounded transition-colors"
-                                                                    >
-                                                                        <X size={14}/>
-                                                                    </button>
-                                                                </div>
-                                                            ) : (
-                                                                <div className="group/price relative">
-                                                                    <p className="text-xs font-bold text-green-600 tracking-tighter">$ {product.subtotal.toLocaleString('es-AR')}</p>
-                                                                    <div className="flex items-center justify-end gap-1.5">
-                                                                        <p className="text-[9px] text-muted italic">$ {product.unitPrice.toLocaleString('es-AR')} un.</p>
-                                                                        {canEditPrice && (
-                                                                            <button 
-                                                                                onClick={() => handleEditPriceClick(product)} 
-                                                                                className="p-1 text-muted hover:text-primary transition-all"
-                                                                                title="Editar precio unitario"
-                                                                            >
-                                                                                <Pencil size={10} />
-                                                                            </button>
-                                                                        )}
-                                                                    </div>
-                                                                </div>
-                                                            )}
-                                                        </div>
-                                                    )}
-                                                </div>
+                                                <AssemblyProductRow
+                                                    key={key}
+                                                    product={product}
+                                                    isEditingQty={editingProductKey === key}
+                                                    isEditingPrice={editingPriceKey === key}
+                                                    isPostShipping={isPostShipping}
+                                                    isAutoCheckStep={isAutoCheckStep}
+                                                    isFinishedStep={isFinishedStep}
+                                                    isInterdeposito={!!order.isInterdeposito}
+                                                    canEditProducts={canEditProducts}
+                                                    canEditPrice={canEditPrice}
+                                                    showFinancials={showFinancials}
+                                                    onToggleCheck={handleRowToggleCheck}
+                                                    onStartEdit={handleStartEdit}
+                                                    onCommitQty={handleQtySave}
+                                                    onCommitPrice={handlePriceSave}
+                                                    onCancelEdit={handleCancelEdit}
+                                                />
                                             );
                                         })}
                                     </div>
@@ -1162,6 +1058,182 @@ export const OrderAssemblyModal: React.FC<OrderAssemblyModalProps> = ({
     );
 };
 
+interface AssemblyProductRowProps {
+    product: Product;
+    isEditingQty: boolean;
+    isEditingPrice: boolean;
+    isPostShipping: boolean;
+    isAutoCheckStep: boolean;
+    isFinishedStep: boolean;
+    isInterdeposito: boolean;
+    canEditProducts: boolean;
+    canEditPrice: boolean;
+    showFinancials: boolean;
+    onToggleCheck: (product: Product) => void;
+    onStartEdit: (product: Product, field: 'qty' | 'price') => void;
+    onCommitQty: (product: Product, value: string) => void;
+    onCommitPrice: (product: Product, value: string) => void;
+    onCancelEdit: () => void;
+}
+
+// Memoizada: al editar una línea solo se vuelve a renderizar esa línea. El valor
+// en edición vive acá, así tipear no re-renderiza el modal ni el resto del pedido.
+const AssemblyProductRow = React.memo<AssemblyProductRowProps>(({
+    product,
+    isEditingQty,
+    isEditingPrice,
+    isPostShipping,
+    isAutoCheckStep,
+    isFinishedStep,
+    isInterdeposito,
+    canEditProducts,
+    canEditPrice,
+    showFinancials,
+    onToggleCheck,
+    onStartEdit,
+    onCommitQty,
+    onCommitPrice,
+    onCancelEdit
+}) => {
+    const [draft, setDraft] = useState('');
+
+    const startEdit = (field: 'qty' | 'price') => {
+        setDraft((field === 'qty' ? product.quantity : product.unitPrice).toString());
+        onStartEdit(product, field);
+    };
+
+    // DETERMINACIÓN DE PRODUCTO AGREGADO (originalQuantity <= 0 indica agregado a posteriori)
+    const isAddedNew = product.originalQuantity <= 0;
+    const isSinCargo = product.unitPrice === 0;
+    const absOriginal = Math.abs(product.originalQuantity);
+
+    // Faltante: Original (Absoluto) - Cantidad Actual.
+    const missingAmount = isPostShipping
+        ? Math.max(0, absOriginal - (product.shippedQuantity ?? product.quantity))
+        : Math.max(0, absOriginal - product.quantity);
+
+    const returnedAmount = isPostShipping && product.shippedQuantity 
+        ? Math.max(0, product.shippedQuantity - product.quantity) 
+        : 0;
+
+    const isShortage = missingAmount > 0;
+    const isReturned = !isInterdeposito && returnedAmount > 0;
+    const displayChecked = isAutoCheckStep ? true : product.isChecked;
+
+    return (
+        <div className={`flex items-start md:items-center gap-3 p-4 rounded-xl border transition-all 
+            ${isSinCargo ? 'bg-purple-50/70 dark:bg-purple-900/10 border-purple-200' : (isAddedNew ? 'bg-orange-50/70 dark:bg-orange-900/10 border-orange-200' : (displayChecked && !isFinishedStep ? 'bg-green-50/5 border-green-500/20' : 'bg-surface border-surfaceHighlight shadow-sm'))}
+        `}>
+            {!isFinishedStep && (
+                <input 
+                    type="checkbox"
+                    checked={displayChecked}
+                    onChange={() => {
+                        if (canEditProducts && !isAutoCheckStep) onToggleCheck(product);
+                    }}
+                    disabled={!canEditProducts || isAutoCheckStep}
+                    className={`w-5 h-5 rounded border-surfaceHighlight text-primary focus:ring-primary cursor-pointer accent-primary ${isAutoCheckStep ? 'opacity-50' : ''}`}
+                />
+            )}
+
+            <div className="flex-1 min-w-0">
+                <div className="flex items-center gap-2">
+                    <p className="font-bold text-sm leading-tight text-text uppercase">{product.name}</p>
+                    {isSinCargo ? (
+                        <span className="text-[7px] font-black uppercase bg-purple-500 text-white px-1.5 py-0.5 rounded shadow-sm flex items-center gap-0.5 animate-in fade-in zoom-in">
+                            Sin Cargo
+                        </span>
+                    ) : isAddedNew && (
+                        <span className="text-[7px] font-black uppercase bg-orange-500 text-white px-1.5 py-0.5 rounded shadow-sm flex items-center gap-0.5 animate-in fade-in zoom-in">
+                            Agregado
+                        </span>
+                    )}
+                </div>
+                <div className="flex flex-wrap gap-2 mt-1">
+                    <span className="text-[10px] font-mono text-muted bg-surfaceHighlight/50 px-1.5 rounded">#{product.code}</span>
+
+                    {isShortage && (
+                        <span className="text-[10px] font-bold text-orange-600 bg-orange-500/10 px-1.5 rounded italic flex items-center gap-1 border border-orange-500/20">
+                            <AlertTriangle size={10} /> Faltante: {missingAmount}
+                        </span>
+                    )}
+
+                    {isReturned && (
+                        <span className="text-[10px] font-black text-red-600 bg-red-500/10 px-1.5 py-0.5 rounded border border-red-500/20 uppercase tracking-tighter flex items-center gap-1 animate-pulse">
+                            <ArrowDownLeft size={8}/> Nota de Crédito: {returnedAmount}
+                        </span>
+                    )}
+                </div>
+            </div>
+
+            <div className="w-24 text-center">
+                {isEditingQty ? (
+                    <div className="flex items-center gap-1">
+                        <input type="number" value={draft} onChange={e => setDraft(e.target.value)} onKeyDown={e => { if (e.key === 'Enter') onCommitQty(product, draft); }} className="w-16 px-2 py-1 rounded bg-background border border-primary text-sm font-bold text-center" autoFocus />
+                        <button onClick={() => onCommitQty(product, draft)} className="text-green-500"><Check size={16}/></button>
+                    </div>
+                ) : (
+                    <div className="flex flex-col items-center">
+                        <div className="flex items-center gap-2">
+                            <span className={`text-lg font-black ${isSinCargo ? 'text-purple-600' : (isAddedNew ? 'text-orange-600' : 'text-text')}`}>{product.quantity}</span>
+                            {canEditProducts && <button onClick={() => startEdit('qty')} className="p-1 text-muted hover:text-primary"><Pencil size={14} /></button>}
+                        </div>
+                        {isShortage && !isPostShipping && (
+                            <span className="text-[9px] text-muted font-bold uppercase tracking-tighter">de {absOriginal}</span>
+                        )}
+                    </div>
+                )}
+            </div>
+
+            {showFinancials && (
+                <div className="w-28 md:w-32 text-right">
+                    {isEditingPrice ? (
+                        <div className="flex items-center justify-end gap-1 animate-in slide-in-from-right-2">
+                            <span className="text-[10px] text-muted font-bold">$</span>
+                            <input 
+                                type="number" 
+                                value={draft} 
+                                onChange={e => setDraft(e.target.value)} 
+                                onKeyDown={e => { if (e.key === 'Enter') onCommitPrice(product, draft); }} 
+                                className="w-16 md:w-20 px-1 md:px-2 py-1 rounded bg-background border border-primary text-xs font-bold text-right outline-none" 
+                                autoFocus 
+                            />
+                            <button 
+                                onClick={() => onCommitPrice(product, draft)} 
+                                className="p-1 text-green-500 hover:bg-green-500/10 rounded transition-colors"
+                            >
+                                <Check size={14}/>
+                            </button>
+                            <button 
+                                onClick={onCancelEdit} 
+                                className="p-1 text-muted hover:bg-surfaceHighlight rounded transition-colors"
+                            >
+                                <X size={14}/>
+                            </button>
+                        </div>
+                    ) : (
+                        <div className="group/price relative">
+                            <p className="text-xs font-bold text-green-600 tracking-tighter">$ {product.subtotal.toLocaleString('es-AR')}</p>
+                            <div className="flex items-center justify-end gap-1.5">
+                                <p className="text-[9px] text-muted italic">$ {product.unitPrice.toLocaleString('es-AR')} un.</p>
+                                {canEditPrice && (
+                                    <button 
+                                        onClick={() => startEdit('price')} 
+                                        className="p-1 text-muted hover:text-primary transition-all"
+                                        title="Editar precio unitario"
+                                    >
+                                        <Pencil size={10} />
+                                    </button>
+                                )}
+                            </div>
+                        </div>
+                    )}
+                </div>
+            )}
+        </div>
+    );
+});
+
 const TransitionModal: React.FC<{ order: Order, onClose: () => void, onConfirm: (notes: string) => void }> = ({ order, onClose, onConfirm }) => {
     const [notes, setNotes] = useState('');
     const nextLabel = "Siguiente Estado"; 
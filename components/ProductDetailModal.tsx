@@ -1,5 +1,5 @@
 
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { 
     X, 
     Save, 
@@ -15,7 +15,9 @@ import {
     Type,
     Building2,
     Package,
-    Trash2
+    Trash2,
+    History,
+    CalendarDays
 } from 'lucide-react';
 import { MasterProduct, User, SupplierMaster } from '../types';
 import { supabase } from '../supabase';
@@ -65,6 +67,41 @@ export const ProductDetailModal: React.FC<ProductDetailModalProps> = ({
 
     const isVale = currentUser.role === 'vale';
 
+    // Kardex: últimos movimientos con saldo y stock a una fecha dada
+    const [kardexRows, setKardexRows] = useState<any[]>([]);
+    const [kardexDate, setKardexDate] = useState(() => new Date().toISOString().split('T')[0]);
+    const [stockAtDate, setStockAtDate] = useState<{ warehouse_name: string, balance: number }[]>([]);
+    const [isLoadingKardex, setIsLoadingKardex] = useState(false);
+
+    useEffect(() => {
+        if (!product) return;
+        supabase
+            .from('stock_movements')
+            .select('id, created_at, type, quantity, balance_after, warehouses(name)')
+            .eq('codart', product.codart)
+            .order('created_at', { ascending: false })
+            .limit(15)
+            .then(({ data }) => setKardexRows((data as any[]) || []));
+    }, [product?.codart]);
+
+    useEffect(() => {
+        if (!product || !kardexDate) return;
+        const loadStockAtDate = async () => {
+            setIsLoadingKardex(true);
+            try {
+                const { data, error } = await supabase
+                    .rpc('stock_a_fecha', { p_codarts: [product.codart], p_fecha: `${kardexDate}T23:59:59` });
+                if (error) console.error("Error kardex:", error);
+                setStockAtDate((data as any[]) || []);
+            } catch (e) {
+                console.error("Error kardex:", e);
+            } finally {
+                setIsLoadingKardex(false);
+            }
+        };
+        loadStockAtDate();
+    }, [product?.codart, kardexDate]);
+
     const handleSave = async () => {
         if (!formData.codart || !formData.desart) {
             alert("Código y Descripción son obligatorios.");
@@ -437,6 +474,48 @@ export const ProductDetailModal: React.FC<ProductDetailModalProps> = ({
                             </button>
                         </div>
 
+                        {!isCreate && (
+                            <div className="bg-surface rounded-2xl p-6 border border-surfaceHighlight shadow-sm flex flex-col gap-4">
+                                <span className="text-[10px] font-black text-muted uppercase tracking-widest border-b border-surfaceHighlight pb-2 mb-2 text-center flex items-center justify-center gap-2">
+                                    <History size={12} /> Kardex
+                                </span>
+                                <div className="flex items-center gap-2 bg-background border border-surfaceHighlight rounded-xl px-3 py-2 shadow-inner">
+                                    <CalendarDays size={14} className="text-muted" />
+                                    <input 
+                                        type="date" 
+                                        value={kardexDate}
+                                        onChange={(e) => setKardexDate(e.target.value)}
+                                        className="bg-transparent text-[11px] font-black text-text outline-none flex-1"
+                                    />
+                                    {isLoadingKardex && <Loader2 size={14} className="animate-spin text-primary" />}
+                                </div>
+                                <div className="grid grid-cols-2 gap-2">
+                                    {stockAtDate.map(s => (
+                                        <div key={s.warehouse_name} className="bg-background/50 border border-surfaceHighlight rounded-xl px-3 py-2 flex flex-col items-center">
+                                            <span className="text-[8px] font-black text-muted uppercase">{s.warehouse_name}</span>
+                                            <span className="text-base font-black text-text leading-none">{s.balance}</span>
+                                        </div>
+                                    ))}
+                                </div>
+                                <div className="divide-y divide-surfaceHighlight/50 max-h-56 overflow-y-auto">
+                                    {kardexRows.length === 0 ? (
+                                        <p className="text-[10px] text-muted font-bold uppercase text-center py-2">Sin movimientos</p>
+                                    ) : kardexRows.map(m => (
+                                        <div key={m.id} className="py-2 flex items-center justify-between gap-2">
+                                            <div className="flex flex-col">
+                                                <span className="text-[9px] font-black text-muted uppercase">{new Date(m.created_at).toLocaleDateString()} · {m.warehouses?.name || 'N/A'}</span>
+                                                <span className="text-[9px] font-bold text-text uppercase">{m.type}</span>
+                                            </div>
+                                            <div className="flex flex-col items-end">
+                                                <span className={`text-xs font-black ${m.quantity < 0 ? 'text-red-500' : 'text-green-600'}`}>{m.quantity > 0 ? '+' : ''}{m.quantity}</span>
+                                                <span className="text-[9px] font-bold text-muted">Saldo: {m.balance_after ?? '-'}</span>
+                                            </div>
+                                        </div>
+                                    ))}
+                                </div>
+                            </div>
+                        )}
+
                         <div className="bg-primary/5 rounded-2xl p-5 border border-primary/20">
                             <div className="flex items-center gap-3 text-primary mb-3">
                                 <AlertCircle size={18} />
@@ -0,0 +1,41 @@
+import React, { useState, useEffect } from 'react';
+import { RefreshCw, X } from 'lucide-react';
+import { onUpdateAvailable, applyUpdate } from '../serviceWorker';
+
+export const UpdateBanner: React.FC = () => {
+    const [hasUpdate, setHasUpdate] = useState(false);
+    const [isApplying, setIsApplying] = useState(false);
+
+    useEffect(() => onUpdateAvailable(() => setHasUpdate(true)), []);
+
+    if (!hasUpdate) return null;
+
+    const handleUpdate = () => {
+        setIsApplying(true);
+        applyUpdate();
+    };
+
+    return (
+        <div className="fixed bottom-4 left-1/2 -translate-x-1/2 z-[200] w-[calc(100%-2rem)] max-w-md">
+            <div className="flex items-center gap-3 bg-surface border border-primary/30 shadow-2xl rounded-2xl px-4 py-3">
+                <div className="p-2 rounded-xl bg-primary/10 text-primary">
+                    <RefreshCw size={18} className={isApplying ? 'animate-spin' : ''} />
+                </div>
+                <div className="flex-1 min-w-0">
+                    <p className="text-sm font-black text-text">Nueva versión disponible</p>
+                    <p className="text-xs text-muted">Actualizá cuando termines lo que estás cargando.</p>
+                </div>
+                <button
+                    onClick={handleUpdate}
+                    disabled={isApplying}
+                    className="px-4 py-2 rounded-xl bg-primary hover:bg-primaryHover text-white text-[10px] font-black uppercase disabled:opacity-50 transition-all active:scale-95"
+                >
+                    Actualizar
+                </button>
+                <button onClick={() => setHasUpdate(false)} className="p-1.5 text-muted hover:text-text rounded-lg" title="Más tarde">
+                    <X size={16} />
+                </button>
+            </div>
+        </div>
+    );
+};
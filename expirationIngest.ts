@@ -0,0 +1,81 @@
+import { supabase } from './supabase';
+
+// ==========================================
+// CARGA MANUAL DE VENCIMIENTOS
+// ==========================================
+// Separa el texto pegado renglón por renglón ("2x4 speed 250 (02/06/26)") y
+// manda todos los renglones válidos en una sola llamada a
+// ingresar_vencimientos, que vincula cada uno con su codart de
+// master_products. Lo que no se pudo leer o vincular vuelve para revisar.
+
+// Un renglón puede traer varios productos: "2x4 speed (02/06/26) amstel (15/12/25)"
+const ENTRY_REGEX = /(?:(\d+)\s*x\s*(\d+)\s+)?(.*?)\s*\(([\d/]+)\)/gi;
+
+export interface ExpirationDraft {
+    raw_line: string;
+    product_name: string;
+    quantity: number;
+    expiry_date: string; // YYYY-MM-DD
+}
+
+export interface ExpirationIngestRow {
+    id: string;
+    raw_line: string;
+    product_name: string;
+    codart: string | null;
+    desart: string | null;
+    match_score: number | null;
+}
+
+export interface ExpirationIngestResult {
+    linked: ExpirationIngestRow[];
+    unmatched: ExpirationIngestRow[];
+    /** Renglones sin el formato esperado (no se guardaron) */
+    invalidLines: string[];
+}
+
+const toIsoDate = (dateStr: string): string | null => {
+    const [d, m, y] = dateStr.split('/').map(n => parseInt(n));
+    if (!d || !m || !y || m > 12 || d > 31) return null;
+    const year = y < 100 ? y + 2000 : y;
+    return `${year}-${String(m).padStart(2, '0')}-${String(d).padStart(2, '0')}`;
+};
+
+export const parseExpirationText = (text: string): { drafts: ExpirationDraft[]; invalidLines: string[] } => {
+    const drafts: ExpirationDraft[] = [];
+    const invalidLines: string[] = [];
+
+    for (const line of text.split('\n')) {
+        const trimmed = line.trim();
+        if (!trimmed) continue;
+
+        let found = 0;
+        for (const match of trimmed.matchAll(ENTRY_REGEX)) {
+            const productName = match[3].trim();
+            const expiryDate = toIsoDate(match[4]);
+            if (!productName || !expiryDate) continue;
+            const qty1 = match[1] ? parseInt(match[1]) : 1;
+            const qty2 = match[2] ? parseInt(match[2]) : 1;
+            drafts.push({ raw_line: trimmed, product_name: productName, quantity: qty1 * qty2, expiry_date: expiryDate });
+            found++;
+        }
+        if (found === 0) invalidLines.push(trimmed);
+    }
+
+    return { drafts, invalidLines };
+};
+
+export const ingestExpirations = async (text: string): Promise<ExpirationIngestResult> => {
+    const { drafts, invalidLines } = parseExpirationText(text);
+    if (drafts.length === 0) return { linked: [], unmatched: [], invalidLines };
+
+    const { data, error } = await supabase.rpc('ingresar_vencimientos', { p_items: drafts });
+    if (error) throw error;
+
+    const rows = (data || []) as ExpirationIngestRow[];
+    return {
+        linked: rows.filter(r => r.codart),
+        unmatched: rows.filter(r => !r.codart),
+        invalidLines
+    };
+};
@@ -0,0 +1,28 @@
+// ==========================================
+// LIBRERÍAS PESADAS BAJO DEMANDA
+// ==========================================
+// xlsx, jsPDF y jspdf-autotable pesan más que el resto de la app junta.
+// Se importan recién cuando el usuario exporta o imprime, así el armador
+// que solo usa Gestión de pedidos no las descarga al iniciar.
+
+let xlsxPromise: Promise<typeof import('xlsx')> | null = null;
+
+export const loadXLSX = () => {
+    if (!xlsxPromise) {
+        xlsxPromise = import('xlsx').catch(err => { xlsxPromise = null; throw err; });
+    }
+    return xlsxPromise;
+};
+
+export const loadJsPDF = async () => (await import('jspdf')).jsPDF;
+
+export const loadAutoTable = async () => (await import('jspdf-autotable')).default;
+
+/** Exporta filas planas a un .xlsx de una sola hoja. */
+export const exportRowsToExcel = async (rows: any[], sheetName: string, fileName: string) => {
+    const XLSX = await loadXLSX();
+    const ws = XLSX.utils.json_to_sheet(rows);
+    const wb = XLSX.utils.book_new();
+    XLSX.utils.book_append_sheet(wb, ws, sheetName);
+    XLSX.writeFile(wb, fileName);
+};
@@ -0,0 +1,105 @@
+import { lazy } from 'react';
+import { View, User } from './types';
+import { getRelatedViews } from './logic';
+
+// ==========================================
+// CARGA DIFERIDA DE VISTAS
+// ==========================================
+// Cada vista es su propio chunk: al iniciar solo se descarga la que se abre.
+// Las vistas del mismo grupo del menú (SYSTEM_NAV_STRUCTURE) se precargan
+// en segundo plano, porque son las que el usuario suele abrir a continuación.
+
+const VIEW_LOADERS = {
+    [View.DASHBOARD]: () => import('./views/Dashboard'),
+    [View.METRICS_REPLENISHMENT]: () => import('./views/MetricsReplenishment'),
+    [View.ANOTACIONES]: () => import('./views/Annotations'),
+    [View.ORDERS]: () => import('./views/OrderList'),
+    [View.CREATE_BUDGET]: () => import('./views/CreateBudget'),
+    [View.ORDER_SHEET]: () => import('./views/OrderSheet'),
+    [View.PAYMENTS_OVERVIEW]: () => import('./views/PaymentsOverview'),
+    [View.PAYMENTS_PROVIDERS]: () => import('./views/PaymentsProviders'),
+    [View.PAYMENTS_HISTORY]: () => import('./views/PaymentsHistory'),
+    [View.PROVIDER_STATEMENTS]: () => import('./views/ProviderStatements'),
+    [View.CLIENTS_MASTER]: () => import('./views/ClientsMaster'),
+    [View.CLIENT_COLLECTIONS]: () => import('./views/ClientCollections'),
+    [View.CLIENT_STATEMENTS]: () => import('./views/AccountStatements'),
+    [View.CATALOG]: () => import('./views/Catalog'),
+    [View.SUPPLIERS_MASTER]: () => import('./views/SuppliersMaster'),
+    [View.PRESUPUESTADOR]: () => import('./views/Presupuestador'),
+    [View.ETIQUETADOR]: () => import('./views/Etiquetador'),
+    [View.PRICE_MANAGEMENT]: () => import('./views/PriceManagement'),
+    [View.SETTINGS]: () => import('./views/Settings'),
+    [View.STOCK_CONTROL]: () => import('./views/StockControl'),
+    [View.ATTENDANCE]: () => import('./views/Attendance'),
+    [View.INV_INBOUNDS]: () => import('./views/InventoryInbounds'),
+    [View.INV_ADJUSTMENTS]: () => import('./views/InventoryAdjustments'),
+    [View.INV_TRANSFERS]: () => import('./views/InventoryTransfers'),
+    [View.INV_HISTORY]: () => import('./views/InventoryHistory'),
+    [View.INV_SUPPLIER_ORDERS]: () => import('./views/SupplierOrders'),
+    [View.LISTA_CHINA]: () => import('./views/ListaChina'),
+    [View.EXPIRATIONS]: () => import('./views/Expirations'),
+    [View.CASH_COUNT]: () => import('./views/CashCount'),
+    [View.DAILY_CASH_SHEET]: () => import('./views/DailyCashSheet'),
+    [View.CASH_MOVEMENTS]: () => import('./views/CashMovements'),
+    [View.BANK_MOVEMENTS]: () => import('./views/BankMovements'),
+    [View.CASH_CONCEPTS]: () => import('./views/CashConcepts'),
+};
+
+export const Dashboard = lazy(() => VIEW_LOADERS[View.DASHBOARD]().then(m => ({ default: m.Dashboard })));
+export const MetricsReplenishment = lazy(() => VIEW_LOADERS[View.METRICS_REPLENISHMENT]().then(m => ({ default: m.MetricsReplenishment })));
+export const Annotations = lazy(() => VIEW_LOADERS[View.ANOTACIONES]().then(m => ({ default: m.Annotations })));
+export const OrderList = lazy(() => VIEW_LOADERS[View.ORDERS]().then(m => ({ default: m.OrderList })));
+export const CreateBudget = lazy(() => VIEW_LOADERS[View.CREATE_BUDGET]().then(m => ({ default: m.CreateBudget })));
+export const OrderSheet = lazy(() => VIEW_LOADERS[View.ORDER_SHEET]().then(m => ({ default: m.OrderSheet })));
+export const PaymentsOverview = lazy(() => VIEW_LOADERS[View.PAYMENTS_OVERVIEW]().then(m => ({ default: m.PaymentsOverview })));
+export const PaymentsProviders = lazy(() => VIEW_LOADERS[View.PAYMENTS_PROVIDERS]().then(m => ({ default: m.PaymentsProviders })));
+export const PaymentsHistory = lazy(() => VIEW_LOADERS[View.PAYMENTS_HISTORY]().then(m => ({ default: m.PaymentsHistory })));
+export const ProviderStatements = lazy(() => VIEW_LOADERS[View.PROVIDER_STATEMENTS]().then(m => ({ default: m.ProviderStatements })));
+export const ClientsMaster = lazy(() => VIEW_LOADERS[View.CLIENTS_MASTER]().then(m => ({ default: m.ClientsMaster })));
+export const ClientCollections = lazy(() => VIEW_LOADERS[View.CLIENT_COLLECTIONS]().then(m => ({ default: m.ClientCollections })));
+export const AccountStatements = lazy(() => VIEW_LOADERS[View.CLIENT_STATEMENTS]().then(m => ({ default: m.AccountStatements })));
+export const Catalog = lazy(() => VIEW_LOADERS[View.CATALOG]().then(m => ({ default: m.Catalog })));
+export const SuppliersMaster = lazy(() => VIEW_LOADERS[View.SUPPLIERS_MASTER]().then(m => ({ default: m.SuppliersMaster })));
+export const Presupuestador = lazy(() => VIEW_LOADERS[View.PRESUPUESTADOR]().then(m => ({ default: m.Presupuestador })));
+export const Etiquetador = lazy(() => VIEW_LOADERS[View.ETIQUETADOR]().then(m => ({ default: m.Etiquetador })));
+export const PriceManagement = lazy(() => VIEW_LOADERS[View.PRICE_MANAGEMENT]().then(m => ({ default: m.PriceManagement })));
+export const Settings = lazy(() => VIEW_LOADERS[View.SETTINGS]().then(m => ({ default: m.Settings })));
+export const StockControl = lazy(() => VIEW_LOADERS[View.STOCK_CONTROL]().then(m => ({ default: m.StockControl })));
+export const Attendance = lazy(() => VIEW_LOADERS[View.ATTENDANCE]().then(m => ({ default: m.Attendance })));
+export const InventoryInbounds = lazy(() => VIEW_LOADERS[View.INV_INBOUNDS]().then(m => ({ default: m.InventoryInbounds })));
+export const InventoryAdjustments = lazy(() => VIEW_LOADERS[View.INV_ADJUSTMENTS]().then(m => ({ default: m.InventoryAdjustments })));
+export const InventoryTransfers = lazy(() => VIEW_LOADERS[View.INV_TRANSFERS]().then(m => ({ default: m.InventoryTransfers })));
+export const InventoryHistory = lazy(() => VIEW_LOADERS[View.INV_HISTORY]().then(m => ({ default: m.InventoryHistory })));
+export const SupplierOrders = lazy(() => VIEW_LOADERS[View.INV_SUPPLIER_ORDERS]().then(m => ({ default: m.SupplierOrders })));
+export const ListaChina = lazy(() => VIEW_LOADERS[View.LISTA_CHINA]().then(m => ({ default: m.ListaChina })));
+export const Expirations = lazy(() => VIEW_LOADERS[View.EXPIRATIONS]().then(m => ({ default: m.Expirations })));
+export const CashCount = lazy(() => VIEW_LOADERS[View.CASH_COUNT]().then(m => ({ default: m.CashCount })));
+export const DailyCashSheet = lazy(() => VIEW_LOADERS[View.DAILY_CASH_SHEET]().then(m => ({ default: m.DailyCashSheet })));
+export const CashMovements = lazy(() => VIEW_LOADERS[View.CASH_MOVEMENTS]().then(m => ({ default: m.CashMovements })));
+export const BankMovements = lazy(() => VIEW_LOADERS[View.BANK_MOVEMENTS]().then(m => ({ default: m.BankMovements })));
+export const CashConcepts = lazy(() => VIEW_LOADERS[View.CASH_CONCEPTS]().then(m => ({ default: m.CashConcepts })));
+
+// El modal de armado arrastra jsPDF en su chunk; solo se baja al abrir un pedido
+export const OrderAssemblyModal = lazy(() => import('./components/OrderAssemblyModal').then(m => ({ default: m.OrderAssemblyModal })));
+
+const prefetched = new Set<View>();
+
+export const prefetchView = (view: View) => {
+    const loader = (VIEW_LOADERS as Partial<Record<View, () => Promise<unknown>>>)[view];
+    if (!loader || prefetched.has(view)) return;
+    prefetched.add(view);
+    loader().catch(() => prefetched.delete(view));
+};
+
+/** Precarga en tiempo ocioso las vistas hermanas de la actual, salvo en modo ahorro de datos. */
+export const prefetchRelatedViews = (view: View, user: User): (() => void) => {
+    if ((navigator as any).connection?.saveData) return () => {};
+
+    const run = () => getRelatedViews(view, user).forEach(prefetchView);
+    if ('requestIdleCallback' in window) {
+        const handle = window.requestIdleCallback(run, { timeout: 5000 });
+        return () => window.cancelIdleCallback(handle);
+    }
+    const timer = setTimeout(run, 2000);
+    return () => clearTimeout(timer);
+};
@@ -7,7 +7,10 @@ import {
     OrderZone,
     PaymentMethod,
     HistoryEntry,
-    View
+    View,
+    Trip,
+    TripClient,
+    TripExpense
 } from './types';
 
 // ==========================================
@@ -138,11 +141,26 @@ export const EXTRA_PERMISSIONS = [
     { key: 'global.stock_queries', label: 'Permitir Consultas de Stock', module: 'General' }
 ];
 
+// Vistas del mismo grupo del menú que el usuario puede abrir: son las candidatas a precargar
+export const getRelatedViews = (view: View, user: User): View[] => {
+    const group = SYSTEM_NAV_STRUCTURE.find(item => item.subItems?.some(sub => sub.id === view));
+    if (!group?.subItems) return [];
+    return group.subItems
+        .filter(sub => sub.id !== view && hasPermission(user, sub.permission))
+        .map(sub => sub.id);
+};
+
 export const roundToCommercial = (val: number): number => {
     if (!val || isNaN(val)) return 0;
     return Math.round(val / 50) * 50;
 };
 
+// Precio unitario de un presupuesto: mismo criterio que redondeo_comercial en la base
+export const budgetUnitPrice = (listPrice: number): number => {
+    const rounded = roundToCommercial(listPrice);
+    return rounded > 0 ? rounded : (Number(listPrice) || 0);
+};
+
 // --- LOGIC EXPORTS ---
 
 export const ORDER_WORKFLOW: Record<OrderStatus, { label: string; color: string; next?: OrderStatus }> = {
@@ -231,27 +249,118 @@ export const getReturnedProducts = (order: Order) => {
     return order.products.filter(p => p.shippedQuantity && p.shippedQuantity > p.quantity);
 };
 
-export const applyQuantityChange = (order: Order, code: string, qty: number, unitPrice?: number): Order => {
-    const products = order.products.map(p => {
-        if (p.code !== code) return p;
-        if (unitPrice !== undefined && p.unitPrice !== unitPrice) return p;
-        return { ...p, quantity: qty, subtotal: qty * p.unitPrice };
+// --- EDICIÓN DE LÍNEAS DEL PEDIDO ---
+// Las líneas se identifican por código + precio unitario (un mismo código puede
+// venir a dos precios). Cada array de productos lleva asociado un índice
+// clave -> posición y la suma de subtotales, así editar una línea no recorre
+// el pedido entero: se copia el array, se reemplaza solo esa línea (las demás
+// conservan su identidad y no se vuelven a renderizar) y el total se ajusta
+// con la diferencia.
+
+export const productKey = (code: string, unitPrice: number) => `${code}-${unitPrice}`;
+
+interface ProductIndex {
+    byKey: Map<string, number>;
+    total: number;
+    hasDuplicates: boolean;   // Líneas repetidas (no debería pasar): se edita recorriendo como antes
+}
+
+const productIndexes = new WeakMap<Product[], ProductIndex>();
+
+// Sumas redondeadas a centavos, igual al armar el índice que al ajustarlo,
+// para no arrastrar error de punto flotante
+const roundMoney = (value: number) => Math.round(value * 100) / 100;
+
+const getProductIndex = (products: Product[]): ProductIndex => {
+    let index = productIndexes.get(products);
+    if (!index) {
+        const byKey = new Map<string, number>();
+        let total = 0;
+        let hasDuplicates = false;
+        products.forEach((p, i) => {
+            const key = productKey(p.code, p.unitPrice);
+            if (byKey.has(key)) hasDuplicates = true;
+            else byKey.set(key, i);
+            total += p.subtotal;
+        });
+        index = { byKey, total: roundMoney(total), hasDuplicates };
+        productIndexes.set(products, index);
+    }
+    return index;
+};
+
+const withProducts = (order: Order, products: Product[], index: ProductIndex): Order => {
+    productIndexes.set(products, index);
+    return { ...order, products, total: index.total };
+};
+
+const rebuildOrder = (order: Order, products: Product[]): Order => {
+    return { ...order, products, total: getProductIndex(products).total };
+};
+
+/**
+ * Reemplaza la línea `code`/`unitPrice` por `update(línea)`. Sin `unitPrice`
+ * (o con líneas repetidas) afecta a todas las del código, como antes.
+ */
+const updateProductLine = (order: Order, code: string, unitPrice: number | undefined, update: (p: Product) => Product): Order => {
+    const index = getProductIndex(order.products);
+
+    if (unitPrice === undefined || index.hasDuplicates) {
+        let changed = false;
+        const products = order.products.map(p => {
+            if (p.code !== code) return p;
+            if (unitPrice !== undefined && p.unitPrice !== unitPrice) return p;
+            changed = true;
+            return update(p);
+        });
+        return changed ? rebuildOrder(order, products) : order;
+    }
+
+    const position = index.byKey.get(productKey(code, unitPrice));
+    if (position === undefined) return order;
+
+    const current = order.products[position];
+    const next = update(current);
+    if (next === current) return order;
+
+    const products = order.products.slice();
+    products[position] = next;
+
+    let byKey = index.byKey;
+    const nextKey = productKey(next.code, next.unitPrice);
+    const currentKey = productKey(current.code, current.unitPrice);
+    if (nextKey !== currentKey) {
+        // Cambio de precio: si choca con otra línea, el índice se arma de cero
+        if (byKey.has(nextKey)) return rebuildOrder(order, products);
+        byKey = new Map(byKey);
+        byKey.delete(currentKey);
+        byKey.set(nextKey, position);
+    }
+
+    return withProducts(order, products, {
+        byKey,
+        total: roundMoney(index.total - current.subtotal + next.subtotal),
+        hasDuplicates: false
     });
-    const total = products.reduce((acc, p) => acc + p.subtotal, 0);
-    return { ...order, products, total };
 };
 
+export const applyQuantityChange = (order: Order, code: string, qty: number, unitPrice?: number): Order => {
+    return updateProductLine(order, code, unitPrice, p =>
+        p.quantity === qty ? p : { ...p, quantity: qty, subtotal: qty * p.unitPrice }
+    );
+};
+
+// Marcar no toca importes: el total del pedido queda como estaba
 export const toggleProductCheck = (order: Order, code: string, unitPrice?: number): Order => {
-    const products = order.products.map(p => {
-        if (p.code !== code) return p;
-        if (unitPrice !== undefined && p.unitPrice !== unitPrice) return p;
-        return { ...p, isChecked: !p.isChecked };
-    });
-    return { ...order, products };
+    const next = updateProductLine(order, code, unitPrice, p => ({ ...p, isChecked: !p.isChecked }));
+    return next === order ? order : { ...next, total: order.total };
 };
 
 export const toggleAllProductsCheck = (order: Order, check: boolean): Order => {
-    const products = order.products.map(p => ({ ...p, isChecked: check }));
+    if (order.products.every(p => p.isChecked === check)) return order;
+    const products = order.products.map(p => p.isChecked === check ? p : { ...p, isChecked: check });
+    // Marcar no cambia claves ni subtotales: el índice se comparte
+    productIndexes.set(products, getProductIndex(order.products));
     return { ...order, products };
 };
 
@@ -266,23 +375,25 @@ export const advanceOrderStatus = (order: Order): Order => {
 };
 
 export const addProductToOrder = (order: Order, product: Product): Order => {
-    const exists = order.products.find(p => p.code === product.code && p.unitPrice === product.unitPrice);
-    if (exists) {
+    const index = getProductIndex(order.products);
+    const key = productKey(product.code, product.unitPrice);
+    if (index.byKey.has(key)) {
         return order; // Do not add if a product with the exact same code and price already exists
     }
     const products = [...order.products, product];
-    const total = products.reduce((acc, p) => acc + p.subtotal, 0);
-    return { ...order, products, total };
+    const byKey = new Map(index.byKey);
+    byKey.set(key, products.length - 1);
+    return withProducts(order, products, {
+        byKey,
+        total: roundMoney(index.total + product.subtotal),
+        hasDuplicates: index.hasDuplicates
+    });
 };
 
 export const updateProductPrice = (order: Order, code: string, price: number, oldUnitPrice?: number): Order => {
-    const products = order.products.map(p => {
-        if (p.code !== code) return p;
-        if (oldUnitPrice !== undefined && p.unitPrice !== oldUnitPrice) return p;
-        return { ...p, unitPrice: price, subtotal: p.quantity * price };
-    });
-    const total = products.reduce((acc, p) => acc + p.subtotal, 0);
-    return { ...order, products, total };
+    return updateProductLine(order, code, oldUnitPrice, p =>
+        p.unitPrice === price ? p : { ...p, unitPrice: price, subtotal: p.quantity * price }
+    );
 };
 
 export const removeProductFromOrder = (order: Order, code: string, unitPrice?: number): Order => {
@@ -291,86 +402,293 @@ export const removeProductFromOrder = (order: Order, code: string, unitPrice?: n
         if (unitPrice !== undefined && p.unitPrice !== unitPrice) return true;
         return false;
     });
-    const total = products.reduce((acc, p) => acc + p.subtotal, 0);
-    return { ...order, products, total };
+    if (products.length === order.products.length) return order;
+    // Las posiciones se corren: el índice nuevo se arma al primer uso
+    return rebuildOrder(order, products);
 };
 
+// --- HISTORIAL DEL PEDIDO ---
+
+// Ediciones seguidas de la misma línea por el mismo usuario dentro de esta
+// ventana quedan como un solo registro con el último valor
+const HISTORY_COALESCE_MS = 60 * 1000;
+
+// La clave de agrupación vive fuera del registro para no persistirla en `history`
+const historyCoalesceKeys = new WeakMap<HistoryEntry, string>();
+
 /**
- * Parsea el texto pegado del PDF/Sistema.
- * Optimizada para detectar bultos, multiplicadores, UNIDADES SUELTAS, códigos y nombres.
+ * Agrega un registro al historial. Si `coalesceKey` coincide con el del último
+ * registro (mismo usuario y acción, dentro de la ventana), lo reemplaza.
+ */
+export const appendHistoryEntry = (history: HistoryEntry[] = [], entry: HistoryEntry, coalesceKey?: string): HistoryEntry[] => {
+    const last = history[history.length - 1];
+    if (
+        coalesceKey && last &&
+        last.action === entry.action &&
+        last.userId === entry.userId &&
+        historyCoalesceKeys.get(last) === coalesceKey &&
+        new Date(entry.timestamp).getTime() - new Date(last.timestamp).getTime() < HISTORY_COALESCE_MS
+    ) {
+        historyCoalesceKeys.set(entry, coalesceKey);
+        return [...history.slice(0, -1), entry];
+    }
+    if (coalesceKey) historyCoalesceKeys.set(entry, coalesceKey);
+    return [...history, entry];
+};
+
+// --- PARSER DE TEXTO PEGADO (PDF / SISTEMA) ---
+// Formato de cada renglón:
+//   <bultos> [(x<mult>)] <tokenA> [<tokenB>] <nombre> [-] $ <unitario> $ <total>
+// Se recorre cada renglón una sola vez, caracter por caracter: sin regex con
+// grupos opcionales no hay backtracking y el costo es lineal en el largo del texto.
+
+export interface UnparsedOrderLine {
+    line: number;   // 1-based, como lo ve el usuario en el textarea
+    text: string;
+    reason: string;
+}
+
+export interface OrderTextParseResult {
+    products: Product[];
+    unparsed: UnparsedOrderLine[];
+}
+
+const isSpaceCode = (c: number) =>
+    c === 32 || (c >= 9 && c <= 13) || c === 160 || c === 0x1680 || (c >= 0x2000 && c <= 0x200a) ||
+    c === 0x2028 || c === 0x2029 || c === 0x202f || c === 0x205f || c === 0x3000 || c === 0xfeff;
+const isDigitCode = (c: number) => c >= 48 && c <= 57;
+const isAmountCode = (c: number) => isDigitCode(c) || c === 44 || c === 46; // dígitos , .
+const isDashCode = (c: number) => c === 45 || c === 0x2013 || c === 0x2014; // - – —
+const isDigitsOnly = (s: string) => {
+    for (let i = 0; i < s.length; i++) if (!isDigitCode(s.charCodeAt(i))) return false;
+    return s.length > 0;
+};
+
+const skipSpaces = (s: string, i: number, end = s.length) => {
+    while (i < end && isSpaceCode(s.charCodeAt(i))) i++;
+    return i;
+};
+const skipToken = (s: string, i: number, end = s.length) => {
+    while (i < end && !isSpaceCode(s.charCodeAt(i))) i++;
+    return i;
+};
+
+/** Saca un guion final y los espacios que lo preceden ("NOMBRE -" -> "NOMBRE"). */
+const stripTrailingDash = (s: string) =>
+    s.length > 0 && isDashCode(s.charCodeAt(s.length - 1)) ? s.slice(0, -1).trimEnd() : s;
+
+/** Si en `at` hay "$ <número> $ <número>", devuelve el primer número (unitario). */
+const readPricePair = (s: string, at: number): string | null => {
+    let i = skipSpaces(s, at + 1);
+    const unitStart = i;
+    while (i < s.length && isAmountCode(s.charCodeAt(i))) i++;
+    if (i === unitStart) return null;
+    const unitEnd = i;
+    i = skipSpaces(s, i);
+    if (s.charCodeAt(i) !== 36) return null; // $
+    i = skipSpaces(s, i + 1);
+    if (!isAmountCode(s.charCodeAt(i))) return null;
+    return s.slice(unitStart, unitEnd);
+};
+
+/** Primer "$ unitario $ total" que arranque en `from` o después. */
+const findPricePair = (s: string, from: number): { at: number; unit: string } | null => {
+    for (let p = s.indexOf('$', from); p !== -1; p = s.indexOf('$', p + 1)) {
+        const unit = readPricePair(s, p);
+        if (unit !== null) return { at: p, unit };
+    }
+    return null;
+};
+
+/** Lee "(x6)" / "(6)" después de los bultos. */
+const readMultiplier = (s: string, from: number): { value: number; end: number } | null => {
+    const open = skipSpaces(s, from);
+    if (s.charCodeAt(open) !== 40) return null; // (
+    let k = open + 1;
+    if (s[k] === 'x' || s[k] === 'X') k++;
+    const start = k;
+    while (k < s.length && isDigitCode(s.charCodeAt(k))) k++;
+    if (k === start || s.charCodeAt(k) !== 41) return null; // )
+    return { value: parseInt(s.slice(start, k)), end: k + 1 };
+};
+
+const parseOrderItem = (s: string, bultos: number, multiplier: number, from: number): Product | string => {
+    if (from >= s.length || !isSpaceCode(s.charCodeAt(from))) return 'No empieza con la cantidad de bultos';
+    const aStart = skipSpaces(s, from);
+    if (aStart >= s.length) return 'Falta el código del producto';
+    const aEnd = skipToken(s, aStart);
+    const tokenA = s.slice(aStart, aEnd);
+
+    // Token B es el segundo token, si después de él todavía aparece el precio;
+    // si no, el nombre arranca justo después del token A.
+    let tokenB: string | null = null;
+    let nameStart = aEnd;
+    let price: { at: number; unit: string } | null = null;
+    const bStart = skipSpaces(s, aEnd);
+    const bEnd = skipToken(s, bStart);
+    if (bStart > aEnd && bStart < s.length && bEnd < s.length) {
+        price = findPricePair(s, bEnd + 1);
+        if (price) {
+            tokenB = s.slice(bStart, bEnd);
+            nameStart = bEnd;
+        }
+    }
+    if (!price) price = findPricePair(s, aEnd + 1);
+    if (!price) return aEnd >= s.length ? 'Falta la descripción y el precio' : 'No se encontró el precio ($ unitario $ total)';
+
+    const unitPrice = parseFloat(price.unit.replace(/\./g, '').replace(',', '.'));
+    if (isNaN(unitPrice)) return `Precio unitario inválido: "${price.unit}"`;
+
+    // El separador opcional " - " antes del "$" no es parte del nombre
+    const nameRest = stripTrailingDash(s.slice(nameStart, price.at).trimEnd()).trim();
+
+    // Desambiguación: si A y B son numéricos, A son unidades sueltas y B el código
+    // CASO: 1 (x6) 4 4464 ...        -> A=4 (Sueltas), B=4464 (Código)
+    // CASO: 1 (x6) 8287 PATAGONIA ... -> A=8287 (Código), B=PATAGONIA (Nombre)
+    let looseUnits = 0;
+    let code = tokenA;
+    let finalName = nameRest;
+    if (tokenB !== null) {
+        if (isDigitsOnly(tokenA) && isDigitsOnly(tokenB)) {
+            looseUnits = parseInt(tokenA);
+            code = tokenB;
+        } else {
+            finalName = `${tokenB} ${nameRest}`;
+        }
+    }
+    finalName = stripTrailingDash(finalName).trim();
+
+    const finalQty = (bultos * multiplier) + looseUnits;
+    return {
+        code,
+        name: finalName,
+        originalQuantity: finalQty,
+        quantity: finalQty,
+        unitPrice,
+        subtotal: finalQty * unitPrice,
+        isChecked: false
+    };
+};
+
+const parseOrderLine = (raw: string): Product | string => {
+    const s = raw.trim();
+    let i = 0;
+    while (i < s.length && isDigitCode(s.charCodeAt(i))) i++;
+    if (i === 0) return 'No empieza con la cantidad de bultos';
+    const bultos = parseInt(s.slice(0, i));
+
+    // Con multiplicador primero; si así no cierra, "(x6)" se lee como un token más
+    const multiplier = readMultiplier(s, i);
+    if (multiplier) {
+        const withMultiplier = parseOrderItem(s, bultos, multiplier.value, multiplier.end);
+        if (typeof withMultiplier !== 'string') return withMultiplier;
+        const plain = parseOrderItem(s, bultos, 1, i);
+        return typeof plain !== 'string' ? plain : withMultiplier;
+    }
+    return parseOrderItem(s, bultos, 1, i);
+};
+
+/**
+ * Parsea el texto pegado y devuelve además los renglones que no se pudieron
+ * interpretar, con el motivo. Los renglones vacíos se ignoran.
  */
-export const parseOrderText = (text: string): Product[] => {
-    const lines = text.split('\n');
+export const parseOrderTextDetailed = (text: string): OrderTextParseResult => {
     const products: Product[] = [];
-    
-    /**
-     * REGEX ACTUALIZADA PARA SOPORTAR UNIDADES SUELTAS
-     * 1. ^(\d+) -> Cantidad de Bultos/Cajas.
-     * 2. (?:\s*\(x?(\d+)\))? -> Multiplicador opcional (x6).
-     * 3. \s+(\S+) -> Token A (Puede ser sueltas o código).
-     * 4. (?:\s+(\S+))? -> Token B (Opcional, puede ser código o parte del nombre).
-     * 5. \s+(.*?) -> El resto del nombre.
-     * 6. ... precios ...
-     */
-    const regex = /^(\d+)(?:\s*\(x?(\d+)\))?\s+(\S+)(?:\s+(\S+))?\s+(.*?)(?:\s*[-–—]\s*)?\$[\s\t]*([\d,.]+)\s*\$[\s\t]*([\d,.]+)/i;
-
-    lines.forEach(line => {
-        const match = line.trim().match(regex);
-        if (match) {
-            const bultos = parseInt(match[1]);
-            const multiplier = match[2] ? parseInt(match[2]) : 1;
-            
-            const tokenA = match[3].trim(); // Podría ser '4' o '8287'
-            const tokenB = match[4] ? match[4].trim() : null; // Podría ser '4464' o 'PATAGONIA'
-            let nameRest = match[5].trim();
-            
-            let looseUnits = 0;
-            let code = tokenA;
-            let finalName = nameRest;
-
-            // Lógica de desambiguación para detectar si TokenA es unidad suelta
-            const isTokenANumeric = /^\d+$/.test(tokenA);
-            const isTokenBNumeric = tokenB ? /^\d+$/.test(tokenB) : false;
-
-            if (tokenB) {
-                if (isTokenANumeric && isTokenBNumeric) {
-                    // CASO: 1 (x6) 4 4464 ... -> A=4 (Sueltas), B=4464 (Código)
-                    looseUnits = parseInt(tokenA);
-                    code = tokenB;
-                    finalName = nameRest; 
-                } else {
-                    // CASO: 1 (x6) 8287 PATAGONIA ... -> A=8287 (Código), B=PATAGONIA (Nombre)
-                    code = tokenA;
-                    finalName = `${tokenB} ${nameRest}`;
-                }
-            } else {
-                // Solo Token A capturado antes del nombre
-                code = tokenA;
-            }
-
-            // Limpieza final del nombre
-            finalName = finalName.replace(/\s*[-–—]$/, '').trim();
-            
-            const unitPrice = parseFloat(match[6].replace(/\./g, '').replace(',', '.'));
-            
-            // CÁLCULO FINAL DE CANTIDAD
-            const finalQty = (bultos * multiplier) + looseUnits;
-            const finalSubtotal = finalQty * unitPrice;
-
-            products.push({
-                code,
-                name: finalName,
-                originalQuantity: finalQty,
-                quantity: finalQty,
-                unitPrice,
-                subtotal: finalSubtotal,
-                isChecked: false
-            });
+    const unparsed: UnparsedOrderLine[] = [];
+    let lineNumber = 0;
+    let start = 0;
+    while (start <= text.length) {
+        let end = text.indexOf('\n', start);
+        if (end === -1) end = text.length;
+        lineNumber++;
+        const line = text.slice(start, end);
+        if (line.trim()) {
+            const result = parseOrderLine(line);
+            if (typeof result === 'string') unparsed.push({ line: lineNumber, text: line.trim(), reason: result });
+            else products.push(result);
         }
-    });
-    return products;
+        start = end + 1;
+    }
+    return { products, unparsed };
 };
 
+/**
+ * Parsea el texto pegado del PDF/Sistema.
+ * Detecta bultos, multiplicadores, UNIDADES SUELTAS, códigos y nombres.
+ */
+export const parseOrderText = (text: string): Product[] => parseOrderTextDetailed(text).products;
+
 export const updatePaymentMethod = (order: Order, method: PaymentMethod): Order => {
     return { ...order, paymentMethod: method };
 };
+
+// --- TRIPS (PLANILLA DE VIAJES) ---
+
+/** UUID v4 generado en el cliente, con fallback para navegadores viejos de las tablets. */
+export const generateId = (): string => {
+    if (typeof crypto !== 'undefined' && 'randomUUID' in crypto) return crypto.randomUUID();
+    return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, c => {
+        const r = (Math.random() * 16) | 0;
+        return (c === 'x' ? r : (r & 0x3) | 0x8).toString(16);
+    });
+};
+
+const TRIP_COLUMNS: [keyof Trip, string][] = [
+    ['displayId', 'display_id'],
+    ['name', 'name'],
+    ['status', 'status'],
+    ['driverName', 'driver_name'],
+    ['date', 'date_text'],
+    ['route', 'route']
+];
+
+const tripClientRow = (c: TripClient) => ({
+    id: c.id, name: c.name, address: c.address, previous_balance: c.previousBalance, current_invoice_amount: c.currentInvoiceAmount,
+    payment_cash: c.paymentCash, payment_transfer: c.paymentTransfer, is_transfer_expected: c.isTransferExpected, status: c.status
+});
+
+const tripExpenseRow = (e: TripExpense) => ({ id: e.id, type: e.type, amount: e.amount, note: e.note });
+
+export interface TripSaveDiff {
+    p_trip_id: string;
+    p_trip: Record<string, any>;
+    p_clients_upsert: ReturnType<typeof tripClientRow>[];
+    p_clients_delete: string[];
+    p_expenses_upsert: ReturnType<typeof tripExpenseRow>[];
+    p_expenses_delete: string[];
+}
+
+const diffRows = <T extends { id: string }>(prev: T[], next: T[], toRow: (item: T) => any) => {
+    const prevById = new Map(prev.map(item => [item.id, JSON.stringify(toRow(item))]));
+    const nextIds = new Set(next.map(item => item.id));
+    return {
+        upsert: next.map(toRow).filter(row => prevById.get(row.id) !== JSON.stringify(row)),
+        remove: prev.filter(item => !nextIds.has(item.id)).map(item => item.id)
+    };
+};
+
+/**
+ * Parámetros de `guardar_viaje` con solo lo que cambió entre dos versiones
+ * del viaje. Sin `prev` el viaje es nuevo y se envía completo.
+ */
+export const buildTripDiff = (prev: Trip | undefined, next: Trip): TripSaveDiff => {
+    const p_trip: Record<string, any> = {};
+    TRIP_COLUMNS.forEach(([key, column]) => {
+        if (!prev || prev[key] !== next[key]) p_trip[column] = next[key];
+    });
+    const clients = diffRows(prev?.clients || [], next.clients || [], tripClientRow);
+    const expenses = diffRows(prev?.expenses || [], next.expenses || [], tripExpenseRow);
+    return {
+        p_trip_id: next.id,
+        p_trip,
+        p_clients_upsert: clients.upsert,
+        p_clients_delete: clients.remove,
+        p_expenses_upsert: expenses.upsert,
+        p_expenses_delete: expenses.remove
+    };
+};
+
+export const isTripDiffEmpty = (diff: TripSaveDiff): boolean =>
+    Object.keys(diff.p_trip).length === 0 &&
+    diff.p_clients_upsert.length === 0 && diff.p_clients_delete.length === 0 &&
+    diff.p_expenses_upsert.length === 0 && diff.p_expenses_delete.length === 0;
@@ -0,0 +1,68 @@
+import { supabase } from './supabase';
+import type { DetailedOrder, Product } from './types';
+
+// ==========================================
+// LÍNEAS DE PEDIDO BAJO DEMANDA
+// ==========================================
+// Las listas traen solo la cabecera (item_count, checked_count, total). Las
+// líneas se piden al abrir el pedido y quedan cacheadas por `lines_version`,
+// que el trigger de order_items sube con cada cambio: reabrir un pedido que
+// nadie tocó cuesta una consulta de un solo número.
+
+interface CachedLines {
+    version: number;
+    products: Product[];
+}
+
+const linesCache = new Map<string, CachedLines>();
+
+export const mapOrderItem = (i: any): Product => ({
+    code: i.code,
+    name: i.name || (i.master_products?.desart) || 'S/N',
+    quantity: i.quantity,
+    originalQuantity: i.original_quantity,
+    shippedQuantity: i.shipped_quantity,
+    unitPrice: i.unit_price,
+    subtotal: i.subtotal,
+    isChecked: i.is_checked
+});
+
+const fetchLines = async (orderId: string): Promise<CachedLines> => {
+    const { data, error } = await supabase
+        .from('orders')
+        .select('lines_version, order_items(*)')
+        .eq('id', orderId)
+        .single();
+    if (error) throw error;
+    const entry = {
+        version: Number(data.lines_version) || 0,
+        products: ((data as any).order_items || []).map(mapOrderItem)
+    };
+    linesCache.set(orderId, entry);
+    return entry;
+};
+
+/** Líneas actuales del pedido; solo baja order_items si cambiaron desde la última vez. */
+export const loadOrderLines = async (orderId: string): Promise<Product[]> => {
+    const cached = linesCache.get(orderId);
+    if (!cached) return (await fetchLines(orderId)).products;
+
+    const { data, error } = await supabase
+        .from('orders')
+        .select('lines_version')
+        .eq('id', orderId)
+        .single();
+    if (error) throw error;
+    if (Number(data.lines_version) === cached.version) return cached.products;
+    return (await fetchLines(orderId)).products;
+};
+
+/** Devuelve el pedido de la lista con sus líneas cargadas. */
+export const withOrderLines = async (order: DetailedOrder): Promise<DetailedOrder> => {
+    const products = await loadOrderLines(order.id);
+    return { ...order, products, productCount: products.length };
+};
+
+export const invalidateOrderLines = (orderId: string) => {
+    linesCache.delete(orderId);
+};
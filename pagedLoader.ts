@@ -0,0 +1,131 @@
+// ==========================================
+// CARGA PAGINADA DE TABLAS COMPLETAS
+// ==========================================
+// La API corta cada respuesta en 1000 filas. En lugar de pedir página tras
+// página y copiar el arreglo acumulado en cada vuelta, la primera página trae
+// también el total: con eso se piden las restantes en paralelo (con un tope
+// de pedidos simultáneos) y se entregan en orden a medida que llegan. La vista
+// puede mostrar la primera página enseguida e ir completando el resto.
+
+/**
+ * Arma la consulta sin `.range()`: filtros y orden. `withCount` indica que es
+ * la primera página y debe pedir el total, p. ej.
+ * `(withCount) => supabase.from('t').select('*', withCount ? { count: 'exact' } : undefined).order('x')`
+ */
+export type PagedQuery = (withCount: boolean) => any;
+
+export interface PagedLoadOptions {
+    pageSize?: number;
+    concurrency?: number;
+    signal?: AbortSignal;
+    /** Total de filas según la primera página (null si la consulta no lo pidió). */
+    onTotal?: (total: number | null) => void;
+}
+
+export interface PagedProgressOptions<T> extends PagedLoadOptions {
+    /** Recibe el acumulado (mismo arreglo, crece en el lugar) y el total si se conoce. */
+    onProgress?: (rows: T[], total: number | null) => void;
+    /** Intervalo mínimo entre avisos de progreso; la primera página se avisa siempre. */
+    progressIntervalMs?: number;
+}
+
+const DEFAULT_PAGE_SIZE = 1000;
+const DEFAULT_CONCURRENCY = 4;
+
+/**
+ * Recorre todas las páginas de la consulta y las entrega en orden.
+ * Si la señal se cancela termina sin error: quien consume debe revisar
+ * `signal.aborted` antes de usar lo cargado.
+ */
+export async function* iteratePages<T>(query: PagedQuery, options: PagedLoadOptions = {}): AsyncGenerator<T[], void, unknown> {
+    const pageSize = options.pageSize ?? DEFAULT_PAGE_SIZE;
+    const concurrency = Math.max(1, options.concurrency ?? DEFAULT_CONCURRENCY);
+    const { signal } = options;
+
+    const fetchPage = (from: number, withCount: boolean): Promise<{ data: T[] | null; error: any; count?: number | null }> => {
+        let q = query(withCount).range(from, from + pageSize - 1);
+        if (signal) q = q.abortSignal(signal);
+        return Promise.resolve(q);
+    };
+
+    if (signal?.aborted) return;
+    const first = await fetchPage(0, true);
+    if (signal?.aborted) return;
+    if (first.error) throw first.error;
+    const firstRows = first.data || [];
+    const total = firstRows.length < pageSize
+        ? firstRows.length
+        : typeof first.count === 'number' ? first.count : null;
+    options.onTotal?.(total);
+    yield firstRows;
+    if (firstRows.length < pageSize) return;
+
+    let nextFrom = pageSize;
+
+    if (total !== null) {
+        const inflight: Promise<{ data: T[] | null; error: any }>[] = [];
+        const launch = () => {
+            const p = fetchPage(nextFrom, false);
+            // Si una página anterior falla, las que siguen en vuelo no quedan sin manejar
+            p.catch(() => {});
+            inflight.push(p);
+            nextFrom += pageSize;
+        };
+        while (nextFrom < total && inflight.length < concurrency) launch();
+
+        let lastLength = pageSize;
+        while (inflight.length > 0) {
+            const { data, error } = await inflight.shift()!;
+            if (signal?.aborted) return;
+            if (error) throw error;
+            if (nextFrom < total) launch();
+            const rows = data || [];
+            lastLength = rows.length;
+            yield rows;
+        }
+        // Si entraron filas después de contar, el resto se sigue de a una página
+        if (lastLength < pageSize) return;
+    }
+
+    while (true) {
+        const { data, error } = await fetchPage(nextFrom, false);
+        if (signal?.aborted) return;
+        if (error) throw error;
+        const rows = data || [];
+        if (rows.length > 0) yield rows;
+        if (rows.length < pageSize) return;
+        nextFrom += pageSize;
+    }
+}
+
+/** Junta todas las páginas en un solo arreglo (sin copiarlo en cada página). */
+export const loadAllPages = async <T>(query: PagedQuery, options: PagedProgressOptions<T> = {}): Promise<T[]> => {
+    const { onProgress, progressIntervalMs = 200 } = options;
+    const rows: T[] = [];
+    let total: number | null = null;
+    let lastNotified = 0;
+    let pendingNotify = false;
+
+    const onTotal = (n: number | null) => {
+        total = n;
+        options.onTotal?.(n);
+    };
+
+    for await (const page of iteratePages<T>(query, { ...options, onTotal })) {
+        for (let i = 0; i < page.length; i++) rows.push(page[i]);
+        if (!onProgress) continue;
+        const now = Date.now();
+        if (lastNotified === 0 || now - lastNotified >= progressIntervalMs) {
+            lastNotified = now;
+            pendingNotify = false;
+            onProgress(rows, total);
+        } else {
+            pendingNotify = true;
+        }
+    }
+    if (onProgress && pendingNotify && !options.signal?.aborted) onProgress(rows, total);
+    return rows;
+};
+
+export const isAbortError = (err: any) =>
+    err?.name === 'AbortError' || /abort/i.test(err?.message || '');
@@ -1,19 +1,61 @@
-const CACHE_NAME = 'alfonsa-cache-v5';
+// La versión llega en la URL de registro (sw.js?v=<build>): cada deploy instala un SW nuevo
+const VERSION = new URL(self.location.href).searchParams.get('v') || 'dev';
 
-const ASSETS_TO_CACHE = [
+const SHELL_CACHE = `alfonsa-shell-${VERSION}`;
+const FONTS_CACHE = 'alfonsa-fonts-v1';
+const REFERENCE_CACHE = 'alfonsa-reference-v1';
+const KEEP_CACHES = [SHELL_CACHE, FONTS_CACHE, REFERENCE_CACHE];
+
+const SHELL_ASSETS = [
   '/',
   '/index.html',
   '/manifest.json',
   '/icon.png'
 ];
 
+// Manifiesto que genera Vite en el build (build.manifest en vite.config.ts)
+const BUILD_MANIFEST = '/asset-manifest.json';
+
+// Tablas de referencia que casi no cambian: se sirven de caché y se revalidan en segundo plano
+const REFERENCE_TABLES = ['delivery_zones', 'cash_concepts', 'warehouses', 'client_classifications'];
+
+const NAVIGATION_TIMEOUT_MS = 3000;
+
+// Solo el punto de entrada, sus imports estáticos y su CSS: los chunks que se
+// cargan con import() (xlsx, jspdf, vistas) se guardan la primera vez que se
+// piden, desde el fetch de /assets/
+const getBuildAssets = async () => {
+  try {
+    const res = await fetch(BUILD_MANIFEST, { cache: 'no-store' });
+    if (!res.ok) return [];
+    const manifest = await res.json();
+    const files = new Set();
+    const visited = new Set();
+    const addChunk = (key) => {
+      const chunk = manifest[key];
+      if (!chunk || visited.has(key)) return;
+      visited.add(key);
+      if (chunk.file) files.add('/' + chunk.file);
+      (chunk.css || []).forEach((f) => files.add('/' + f));
+      (chunk.imports || []).forEach(addChunk);
+    };
+    Object.keys(manifest).filter((key) => manifest[key].isEntry).forEach(addChunk);
+    return [...files];
+  } catch (err) {
+    // En desarrollo no hay manifiesto: solo se precachea el shell
+    return [];
+  }
+};
+
 self.addEventListener('install', (event) => {
-  event.waitUntil(
-    caches.open(CACHE_NAME).then((cache) => {
-      return cache.addAll(ASSETS_TO_CACHE);
-    })
-  );
-  self.skipWaiting();
+  event.waitUntil((async () => {
+    const cache = await caches.open(SHELL_CACHE);
+    await cache.addAll(SHELL_ASSETS);
+    const assets = await getBuildAssets();
+    // Cada chunk por separado: uno que falle no debe tirar abajo toda la instalación
+    await Promise.all(assets.map((url) => cache.add(url).catch(() => {})));
+  })());
+  // No se llama a skipWaiting acá: la app avisa que hay versión nueva y el usuario decide cuándo
 });
 
 self.addEventListener('activate', (event) => {
@@ -21,18 +63,123 @@ self.addEventListener('activate', (event) => {
     caches.keys().then((cacheNames) => {
       return Promise.all(
         cacheNames.map((name) => {
-          if (name !== CACHE_NAME) {
+          if (!KEEP_CACHES.includes(name)) {
             return caches.delete(name);
           }
         })
       );
-    })
+    }).then(() => self.clients.claim())
   );
-  self.clients.claim();
 });
 
+self.addEventListener('message', (event) => {
+  if (event.data && event.data.type === 'SKIP_WAITING') {
+    self.skipWaiting();
+  }
+  if (event.data && event.data.type === 'INVALIDATE_REFERENCE') {
+    event.waitUntil(
+      invalidateReferenceTable(event.data.table).then(() => {
+        if (event.ports[0]) event.ports[0].postMessage('ok');
+      })
+    );
+  }
+});
+
+const getReferenceTable = (url) => {
+  const match = url.pathname.match(/\/rest\/v1\/([^/?]+)/);
+  return match && REFERENCE_TABLES.includes(match[1]) ? match[1] : null;
+};
+
+// Una escritura sobre la tabla invalida todas sus consultas cacheadas
+const invalidateReferenceTable = async (table) => {
+  const cache = await caches.open(REFERENCE_CACHE);
+  const keys = await cache.keys();
+  await Promise.all(keys
+    .filter((req) => getReferenceTable(new URL(req.url)) === table)
+    .map((req) => cache.delete(req)));
+};
+
+// Las hojas de Google Fonts llegan opacas (link sin crossorigin) y también se guardan
+const isCacheable = (res) => res.ok || res.type === 'opaque';
+
+const staleWhileRevalidate = async (event, cacheName) => {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(event.request);
+  const network = fetch(event.request).then((res) => {
+    if (isCacheable(res)) cache.put(event.request, res.clone());
+    return res;
+  });
+  if (cached) {
+    event.waitUntil(network.catch(() => {}));
+    return cached;
+  }
+  return network;
+};
+
+const cacheFirst = async (request, cacheName) => {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(request);
+  if (cached) return cached;
+  const res = await fetch(request);
+  if (isCacheable(res)) cache.put(request, res.clone());
+  return res;
+};
+
+const networkFirstNavigation = async (request) => {
+  const cache = await caches.open(SHELL_CACHE);
+  try {
+    const res = await Promise.race([
+      fetch(request),
+      new Promise((_, reject) => setTimeout(() => reject(new Error('timeout')), NAVIGATION_TIMEOUT_MS))
+    ]);
+    if (res.ok) cache.put('/index.html', res.clone());
+    return res;
+  } catch (err) {
+    return (await cache.match('/index.html')) || (await cache.match('/')) || Response.error();
+  }
+};
+
 self.addEventListener('fetch', (event) => {
-  event.respondWith(
-    fetch(event.request).catch(() => caches.match(event.request))
-  );
+  const { request } = event;
+  const url = new URL(request.url);
+
+  const referenceTable = getReferenceTable(url);
+  if (referenceTable) {
+    if (request.method === 'GET') {
+      event.respondWith(staleWhileRevalidate(event, REFERENCE_CACHE));
+    } else if (request.method !== 'HEAD') {
+      event.respondWith(fetch(request).finally(() => invalidateReferenceTable(referenceTable)));
+    }
+    return;
+  }
+
+  if (request.method !== 'GET') return;
+
+  if (request.mode === 'navigate') {
+    event.respondWith(networkFirstNavigation(request));
+    return;
+  }
+
+  if (url.origin === 'https://fonts.googleapis.com') {
+    event.respondWith(staleWhileRevalidate(event, FONTS_CACHE));
+    return;
+  }
+
+  if (url.origin === 'https://fonts.gstatic.com') {
+    event.respondWith(cacheFirst(request, FONTS_CACHE));
+    return;
+  }
+
+  // Assets del build: llevan hash en el nombre, son inmutables. Los chunks
+  // diferidos entran acá la primera vez que se usan
+  if (url.origin === self.location.origin && url.pathname.startsWith('/assets/')) {
+    event.respondWith(cacheFirst(request, SHELL_CACHE));
+    return;
+  }
+
+  if (url.origin === self.location.origin) {
+    event.respondWith(
+      fetch(request).catch(() => caches.match(request))
+    );
+  }
 });
@@ -0,0 +1,144 @@
+import { useCallback, useEffect, useState } from 'react';
+import { supabase } from './supabase';
+import { invalidateServiceWorkerReference } from './serviceWorker';
+import { DeliveryZone, ClientClassification, CashConcept, SupplierMaster, WarehouseMapping } from './types';
+
+// ==========================================
+// CACHÉ COMPARTIDA DE DATOS DE REFERENCIA
+// ==========================================
+// Tablas chicas que casi no cambian y que leen muchas vistas. Se bajan una
+// vez por TTL, las llamadas concurrentes comparten la misma promesa y un
+// canal realtime invalida la tabla cuando alguien la modifica. Los filtros
+// (activos, categoría, etc.) se aplican en memoria sobre la tabla completa.
+
+export interface ReferenceTables {
+    delivery_zones: DeliveryZone;
+    client_classifications: ClientClassification;
+    cash_concepts: CashConcept;
+    providers_master: SupplierMaster & Record<string, any>;
+    warehouses: WarehouseMapping;
+}
+
+export type ReferenceTable = keyof ReferenceTables;
+
+const TABLES: Record<ReferenceTable, { orderBy: string; ttlMs: number }> = {
+    delivery_zones: { orderBy: 'name', ttlMs: 30 * 60 * 1000 },
+    client_classifications: { orderBy: 'name', ttlMs: 30 * 60 * 1000 },
+    cash_concepts: { orderBy: 'name', ttlMs: 30 * 60 * 1000 },
+    providers_master: { orderBy: 'razon_social', ttlMs: 10 * 60 * 1000 },
+    warehouses: { orderBy: 'name', ttlMs: 60 * 60 * 1000 }
+};
+
+const PAGE_SIZE = 1000;
+
+interface CacheEntry {
+    rows: any[];
+    fetchedAt: number;
+}
+
+const cache = new Map<ReferenceTable, CacheEntry>();
+const inflight = new Map<ReferenceTable, Promise<any[]>>();
+const subscribers = new Map<ReferenceTable, Set<() => void>>();
+
+const notify = (table: ReferenceTable) => {
+    subscribers.get(table)?.forEach(listener => listener());
+};
+
+const fetchTable = async (table: ReferenceTable): Promise<any[]> => {
+    const rows: any[] = [];
+    let from = 0;
+    while (true) {
+        const { data, error } = await supabase
+            .from(table)
+            .select('*')
+            .order(TABLES[table].orderBy, { ascending: true })
+            .range(from, from + PAGE_SIZE - 1);
+        if (error) throw error;
+        rows.push(...(data || []));
+        if (!data || data.length < PAGE_SIZE) break;
+        from += PAGE_SIZE;
+    }
+    return rows;
+};
+
+const isFresh = (table: ReferenceTable) => {
+    const entry = cache.get(table);
+    return !!entry && Date.now() - entry.fetchedAt < TABLES[table].ttlMs;
+};
+
+/** Devuelve la tabla completa desde la caché, bajándola solo si venció el TTL. */
+export const getReferenceData = <T extends ReferenceTable>(table: T, options: { force?: boolean } = {}): Promise<ReferenceTables[T][]> => {
+    ensureRealtime();
+    if (!options.force && isFresh(table)) return Promise.resolve(cache.get(table)!.rows);
+
+    const pending = inflight.get(table);
+    if (pending) return pending;
+
+    const request = fetchTable(table)
+        .then(rows => {
+            cache.set(table, { rows, fetchedAt: Date.now() });
+            notify(table);
+            return rows;
+        })
+        .finally(() => { inflight.delete(table); });
+
+    inflight.set(table, request);
+    return request;
+};
+
+/** Marca la tabla como vencida y la recarga si alguna vista la está mostrando. */
+export const invalidateReferenceData = async (table: ReferenceTable) => {
+    cache.delete(table);
+    await invalidateServiceWorkerReference(table);
+    if (subscribers.get(table)?.size) {
+        await getReferenceData(table, { force: true }).catch(err => console.error(`Error recargando ${table}:`, err));
+    }
+};
+
+let realtimeChannel: ReturnType<typeof supabase.channel> | null = null;
+
+const ensureRealtime = () => {
+    if (realtimeChannel) return;
+    realtimeChannel = supabase.channel('public:reference_data');
+    (Object.keys(TABLES) as ReferenceTable[]).forEach(table => {
+        realtimeChannel!.on('postgres_changes', { event: '*', schema: 'public', table }, () => {
+            invalidateReferenceData(table);
+        });
+    });
+    realtimeChannel.subscribe();
+};
+
+/**
+ * Hook para leer una tabla de referencia. Se re-renderiza cuando la tabla
+ * se recarga (TTL, invalidación manual o cambio realtime).
+ */
+export const useReferenceData = <T extends ReferenceTable>(table: T) => {
+    const [rows, setRows] = useState<ReferenceTables[T][]>(() => (cache.get(table)?.rows as ReferenceTables[T][]) || []);
+    const [isLoading, setIsLoading] = useState(!isFresh(table));
+
+    useEffect(() => {
+        let active = true;
+        const sync = () => {
+            const entry = cache.get(table);
+            if (active && entry) setRows(entry.rows as ReferenceTables[T][]);
+        };
+
+        const listeners = subscribers.get(table) || new Set<() => void>();
+        listeners.add(sync);
+        subscribers.set(table, listeners);
+
+        getReferenceData(table)
+            .then(sync)
+            .catch(err => console.error(`Error cargando ${table}:`, err))
+            .finally(() => { if (active) setIsLoading(false); });
+
+        return () => {
+            active = false;
+            listeners.delete(sync);
+        };
+    }, [table]);
+
+    const refresh = useCallback(() => invalidateReferenceData(table), [table]);
+
+    return { rows, isLoading, refresh };
+};
@@ -0,0 +1,80 @@
+// ==========================================
+// REGISTRO DEL SERVICE WORKER Y AVISO DE ACTUALIZACIÓN
+// ==========================================
+// El SW nuevo queda en espera hasta que el usuario acepta actualizar,
+// así no se recarga la app en medio de un armado.
+
+declare const __APP_VERSION__: string;
+
+type UpdateListener = (waiting: ServiceWorker) => void;
+
+const listeners = new Set<UpdateListener>();
+let waitingWorker: ServiceWorker | null = null;
+let updateRequested = false;
+
+const notifyUpdate = (worker: ServiceWorker) => {
+    waitingWorker = worker;
+    listeners.forEach(listener => listener(worker));
+};
+
+export const onUpdateAvailable = (listener: UpdateListener): (() => void) => {
+    listeners.add(listener);
+    if (waitingWorker) listener(waitingWorker);
+    return () => { listeners.delete(listener); };
+};
+
+/** Activa la versión en espera; la página se recarga cuando toma el control. */
+export const applyUpdate = () => {
+    updateRequested = true;
+    waitingWorker?.postMessage({ type: 'SKIP_WAITING' });
+};
+
+/**
+ * Borra del SW las respuestas cacheadas de una tabla de referencia, para que la
+ * próxima lectura vaya a la red. No bloquea más de un momento si el SW no responde.
+ */
+export const invalidateServiceWorkerReference = (table: string): Promise<void> => {
+    const controller = typeof navigator !== 'undefined' && 'serviceWorker' in navigator ? navigator.serviceWorker.controller : null;
+    if (!controller) return Promise.resolve();
+
+    return new Promise(resolve => {
+        const channel = new MessageChannel();
+        const timer = setTimeout(resolve, 500);
+        channel.port1.onmessage = () => { clearTimeout(timer); resolve(); };
+        controller.postMessage({ type: 'INVALIDATE_REFERENCE', table }, [channel.port2]);
+    });
+};
+
+export const registerServiceWorker = () => {
+    if (!('serviceWorker' in navigator)) return;
+
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register(`./sw.js?v=${encodeURIComponent(__APP_VERSION__)}`)
+            .then(reg => {
+                console.log('Alfonsa PWA: Service Worker activo en el scope:', reg.scope);
+
+                if (reg.waiting && navigator.serviceWorker.controller) notifyUpdate(reg.waiting);
+
+                reg.addEventListener('updatefound', () => {
+                    const installing = reg.installing;
+                    if (!installing) return;
+                    installing.addEventListener('statechange', () => {
+                        // Sin controller es la primera instalación, no una actualización
+                        if (installing.state === 'installed' && navigator.serviceWorker.controller) {
+                            notifyUpdate(installing);
+                        }
+                    });
+                });
+            })
+            .catch(err => {
+                console.warn('Alfonsa PWA: Falló el registro del Service Worker (esto es normal en desarrollo local sin HTTPS):', err.message);
+            });
+
+        // Solo recargar si el cambio de controller lo pidió el usuario (no en la primera instalación)
+        navigator.serviceWorker.addEventListener('controllerchange', () => {
+            if (!updateRequested) return;
+            updateRequested = false;
+            window.location.reload();
+        });
+    });
+};
@@ -0,0 +1,160 @@
+import { supabase } from './supabase';
+
+// ==========================================
+// COLA OFFLINE DE CONTEOS (CONTROL DE STOCK)
+// ==========================================
+// Los conteos se guardan primero en IndexedDB y se sincronizan en lotes
+// con `sincronizar_conteos`, de modo que el armador puede seguir contando
+// aunque el Wi-Fi del depósito se corte.
+
+const DB_NAME = 'alfonsa-offline';
+const DB_VERSION = 1;
+const COUNTS_STORE = 'stock_control_counts';
+const ITEMS_STORE = 'stock_control_items';
+
+const SYNC_BATCH_SIZE = 200;
+
+export interface QueuedCount {
+    key: string;          // `${item_id}|${user_id}`: un conteo vigente por ítem y contador
+    client_id: string;    // Id generado en el cliente, clave de idempotencia en el servidor
+    session_id: string;
+    item_id: string;
+    user_id: string;
+    qty: number;
+    counted_at: string;
+}
+
+export interface CountConflict {
+    client_id: string;
+    item_id: string;
+    reason: 'stale' | 'session_finished' | 'item_missing';
+    server_qty?: number;
+}
+
+export interface SyncResult {
+    applied: number;
+    conflicts: CountConflict[];
+}
+
+let dbPromise: Promise<IDBDatabase> | null = null;
+
+const openDb = (): Promise<IDBDatabase> => {
+    if (!dbPromise) {
+        dbPromise = new Promise((resolve, reject) => {
+            const req = indexedDB.open(DB_NAME, DB_VERSION);
+            req.onupgradeneeded = () => {
+                const db = req.result;
+                if (!db.objectStoreNames.contains(COUNTS_STORE)) {
+                    const store = db.createObjectStore(COUNTS_STORE, { keyPath: 'key' });
+                    store.createIndex('session_id', 'session_id');
+                }
+                if (!db.objectStoreNames.contains(ITEMS_STORE)) {
+                    db.createObjectStore(ITEMS_STORE, { keyPath: 'session_id' });
+                }
+            };
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = () => { dbPromise = null; reject(req.error); };
+        });
+    }
+    return dbPromise;
+};
+
+const run = <T>(storeName: string, mode: IDBTransactionMode, fn: (store: IDBObjectStore) => IDBRequest<T>): Promise<T> => {
+    return openDb().then(db => new Promise<T>((resolve, reject) => {
+        const tx = db.transaction(storeName, mode);
+        const req = fn(tx.objectStore(storeName));
+        tx.oncomplete = () => resolve(req.result);
+        tx.onerror = () => reject(tx.error);
+        tx.onabort = () => reject(tx.error);
+    }));
+};
+
+const newClientId = (): string => {
+    if (typeof crypto !== 'undefined' && 'randomUUID' in crypto) return crypto.randomUUID();
+    // Fallback RFC4122 v4 para navegadores viejos de las tablets
+    return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, c => {
+        const r = (Math.random() * 16) | 0;
+        return (c === 'x' ? r : (r & 0x3) | 0x8).toString(16);
+    });
+};
+
+/** Guarda (o reemplaza) el conteo de un ítem para el usuario. No toca la red. */
+export const enqueueCount = async (sessionId: string, itemId: string, userId: string, qty: number): Promise<QueuedCount> => {
+    const entry: QueuedCount = {
+        key: `${itemId}|${userId}`,
+        client_id: newClientId(),
+        session_id: sessionId,
+        item_id: itemId,
+        user_id: userId,
+        qty,
+        counted_at: new Date().toISOString()
+    };
+    await run(COUNTS_STORE, 'readwrite', store => store.put(entry));
+    return entry;
+};
+
+export const getPendingCounts = (sessionId?: string): Promise<QueuedCount[]> => {
+    return run<QueuedCount[]>(COUNTS_STORE, 'readonly', store =>
+        sessionId ? store.index('session_id').getAll(sessionId) : store.getAll()
+    );
+};
+
+/** Quita de la cola solo si el conteo no fue reemplazado mientras se sincronizaba. */
+const removeIfUnchanged = async (entries: QueuedCount[]) => {
+    const db = await openDb();
+    await new Promise<void>((resolve, reject) => {
+        const tx = db.transaction(COUNTS_STORE, 'readwrite');
+        const store = tx.objectStore(COUNTS_STORE);
+        entries.forEach(e => {
+            const req = store.get(e.key);
+            req.onsuccess = () => {
+                if (req.result && req.result.client_id === e.client_id) store.delete(e.key);
+            };
+        });
+        tx.oncomplete = () => resolve();
+        tx.onerror = () => reject(tx.error);
+    });
+};
+
+let syncInFlight: Promise<SyncResult> | null = null;
+
+/**
+ * Envía la cola en lotes. Es idempotente: reenviar un lote ya aplicado
+ * no duplica conteos porque el servidor reconoce el client_id.
+ */
+export const syncPendingCounts = (): Promise<SyncResult> => {
+    if (syncInFlight) return syncInFlight;
+
+    syncInFlight = (async () => {
+        const result: SyncResult = { applied: 0, conflicts: [] };
+        const pending = await getPendingCounts();
+
+        for (let i = 0; i < pending.length; i += SYNC_BATCH_SIZE) {
+            const batch = pending.slice(i, i + SYNC_BATCH_SIZE);
+            const { data, error } = await supabase.rpc('sincronizar_conteos', {
+                p_counts: batch.map(({ client_id, item_id, user_id, qty, counted_at }) => ({ client_id, item_id, user_id, qty, counted_at }))
+            });
+            if (error) throw error;
+
+            const conflicts: CountConflict[] = data?.conflicts || [];
+            result.applied += (data?.applied || []).length;
+            result.conflicts.push(...conflicts);
+
+            // Aplicados y en conflicto salen de la cola: el conflicto se informa y no se reintenta
+            await removeIfUnchanged(batch);
+        }
+        return result;
+    })().finally(() => { syncInFlight = null; });
+
+    return syncInFlight;
+};
+
+// --- Copia local de los ítems de una sesión, para abrirla sin conexión ---
+export const cacheSessionItems = (sessionId: string, items: any[]) => {
+    return run(ITEMS_STORE, 'readwrite', store => store.put({ session_id: sessionId, items, cached_at: new Date().toISOString() }));
+};
+
+export const getCachedSessionItems = async (sessionId: string): Promise<any[] | null> => {
+    const row = await run<any>(ITEMS_STORE, 'readonly', store => store.get(sessionId));
+    return row ? row.items : null;
+};
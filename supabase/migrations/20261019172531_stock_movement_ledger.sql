@@ -0,0 +1,109 @@
+-- ========================================================
+-- LIBRO DE MOVIMIENTOS DE STOCK (SEGUIMIENTO)
+-- Vista desnormalizada + RPC paginada por cursor para InventoryHistory.
+-- Reemplaza la cascada movimientos -> ingresos -> pedidos -> transferencias
+-- por una única consulta indexada.
+-- ========================================================
+
+-- Índices para el recorrido por fecha (keyset) y los filtros habituales
+CREATE INDEX IF NOT EXISTS idx_stock_movements_created_id
+    ON stock_movements (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_stock_movements_codart_created
+    ON stock_movements (codart, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_stock_movements_warehouse_created
+    ON stock_movements (warehouse_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_stock_movements_type_created
+    ON stock_movements (type, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_stock_movements_reference
+    ON stock_movements (reference_id);
+
+-- Vista con los datos de referencia ya resueltos y la clave de agrupación calculada.
+-- security_invoker: respeta el RLS de las tablas de abajo para quien consulta.
+CREATE OR REPLACE VIEW stock_movement_ledger WITH (security_invoker = true) AS
+SELECT
+    m.id,
+    m.created_at,
+    m.codart,
+    p.desart,
+    m.warehouse_id,
+    COALESCE(w.name, 'N/A') AS warehouse_name,
+    m.quantity,
+    m.type::text AS type,
+    m.status,
+    m.reference_id,
+    m.transfer_group_code,
+    m.created_by,
+    COALESCE(pr.name, 'Sistema') AS user_name,
+    -- Ingresos
+    inb.display_number AS inbound_display_number,
+    inb.observations AS inbound_observations,
+    inb.supplier_code AS inbound_supplier_code,
+    CASE WHEN inb.id IS NOT NULL THEN COALESCE(pm.razon_social, inb.supplier_code, 'S/D') END AS supplier_name,
+    -- Ventas / Notas de crédito
+    o.display_id AS order_display_id,
+    o.client_name AS order_client_name,
+    -- Transferencias
+    t.reference_code AS transfer_reference_code,
+    -- Agrupación (misma regla que usaba el cliente)
+    CASE
+        WHEN m.type::text = 'ingreso' THEN COALESCE(m.reference_id::text, 'SIN_REF')
+        WHEN m.type::text IN ('venta', 'nota de crédito') THEN m.reference_id::text
+        WHEN m.type::text IN ('transferencia', 'ajuste') THEN COALESCE(m.transfer_group_code, m.reference_id::text)
+    END AS group_key,
+    CASE
+        WHEN m.type::text = 'ingreso' THEN
+            CASE WHEN inb.id IS NOT NULL THEN COALESCE(pm.razon_social, inb.supplier_code, 'S/D')
+                 ELSE 'OTROS / MANUALES' END
+        WHEN m.type::text IN ('venta', 'nota de crédito') THEN
+            CASE WHEN o.id IS NOT NULL THEN 'Pedido #' || o.display_id || ' - ' || o.client_name
+                 ELSE COALESCE(m.transfer_group_code, m.reference_id::text, 'S/REF') END
+        WHEN m.type::text = 'transferencia' THEN
+            CASE WHEN t.id IS NOT NULL THEN 'Transferencia ' || t.reference_code
+                 ELSE COALESCE(m.transfer_group_code, m.reference_id::text, 'S/REF') END
+        WHEN m.type::text = 'ajuste' THEN COALESCE(m.transfer_group_code, m.reference_id::text)
+    END AS group_label
+FROM stock_movements m
+LEFT JOIN master_products p ON p.codart = m.codart
+LEFT JOIN warehouses w ON w.id = m.warehouse_id
+LEFT JOIN profiles pr ON pr.id = m.created_by
+LEFT JOIN stock_inbounds inb ON m.type::text = 'ingreso' AND inb.id = m.reference_id
+LEFT JOIN providers_master pm ON pm.codigo = inb.supplier_code
+LEFT JOIN orders o ON m.type::text IN ('venta', 'nota de crédito') AND o.id = m.reference_id
+LEFT JOIN stock_transfers t ON m.type::text = 'transferencia' AND t.id = m.reference_id;
+
+-- Página de movimientos ordenada por (created_at, id) descendente.
+-- El cursor es el (created_at, id) del último registro de la página anterior.
+-- p_search: palabras sueltas; cada una debe aparecer en artículo, código,
+-- proveedor u observaciones del ingreso (mismo criterio que el buscador).
+DROP FUNCTION IF EXISTS obtener_libro_movimientos(DATE, DATE, TEXT, TEXT, TEXT, TIMESTAMPTZ, UUID, INT);
+CREATE OR REPLACE FUNCTION obtener_libro_movimientos(
+    p_desde DATE,
+    p_hasta DATE,
+    p_codart TEXT DEFAULT NULL,
+    p_warehouse TEXT DEFAULT NULL,
+    p_type TEXT DEFAULT NULL,
+    p_cursor_created_at TIMESTAMPTZ DEFAULT NULL,
+    p_cursor_id UUID DEFAULT NULL,
+    p_limit INT DEFAULT 500,
+    p_search TEXT DEFAULT NULL
+) RETURNS SETOF stock_movement_ledger AS $$
+    SELECT *
+    FROM stock_movement_ledger l
+    WHERE l.created_at >= p_desde::timestamp
+      AND l.created_at < (p_hasta + 1)::timestamp
+      AND (p_codart IS NULL OR l.codart = p_codart)
+      AND (p_warehouse IS NULL OR l.warehouse_name = p_warehouse)
+      AND (p_type IS NULL OR l.type = p_type)
+      AND (p_search IS NULL OR NOT EXISTS (
+          SELECT 1
+          FROM unnest(regexp_split_to_array(lower(trim(p_search)), '\s+')) AS k(palabra)
+          WHERE k.palabra <> ''
+            AND position(k.palabra IN lower(concat_ws(' ', l.desart, l.codart, l.supplier_name, l.inbound_observations))) = 0
+      ))
+      AND (
+          p_cursor_created_at IS NULL
+          OR (l.created_at, l.id) < (p_cursor_created_at, p_cursor_id)
+      )
+    ORDER BY l.created_at DESC, l.id DESC
+    LIMIT LEAST(GREATEST(p_limit, 1), 2000);
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,206 @@
+-- ========================================================
+-- KARDEX DE STOCK POR PRODUCTO Y DEPÓSITO
+-- Cada movimiento guarda el saldo resultante (balance_after) y
+-- stock_kardex_saldos mantiene el saldo vigente por (codart, depósito).
+-- Permite consultar "stock a la fecha X" sin recorrer el historial.
+-- ========================================================
+
+ALTER TABLE stock_movements ADD COLUMN IF NOT EXISTS balance_after NUMERIC;
+
+CREATE TABLE IF NOT EXISTS stock_kardex_saldos (
+    codart TEXT NOT NULL,
+    warehouse_id UUID NOT NULL REFERENCES warehouses(id),
+    balance NUMERIC NOT NULL DEFAULT 0,
+    last_movement_id UUID,
+    last_movement_at TIMESTAMPTZ,
+    PRIMARY KEY (codart, warehouse_id)
+);
+
+-- Solo lectura: el saldo lo mantienen los triggers (SECURITY DEFINER)
+ALTER TABLE stock_kardex_saldos ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Saldos de kardex: lectura" ON stock_kardex_saldos;
+CREATE POLICY "Saldos de kardex: lectura" ON stock_kardex_saldos
+    FOR SELECT TO authenticated USING (TRUE);
+
+-- Búsqueda del último movimiento anterior a una fecha (un solo salto de índice)
+CREATE INDEX IF NOT EXISTS idx_stock_movements_kardex
+    ON stock_movements (codart, warehouse_id, created_at DESC, id DESC);
+
+-- --------------------------------------------------------
+-- Trigger: acumula el saldo al insertar un movimiento.
+-- El upsert bloquea la fila del saldo, por lo que dos RPCs concurrentes
+-- (transferir_stock, facturar_pedido, aprobar_ingreso_stock, ajustar_stock...)
+-- quedan serializadas por producto/depósito. Un movimiento que ya entra
+-- anulado no mueve el saldo.
+-- --------------------------------------------------------
+CREATE OR REPLACE FUNCTION kardex_registrar_saldo() RETURNS TRIGGER AS $$
+DECLARE
+    v_balance NUMERIC;
+BEGIN
+    IF NEW.status IS NOT DISTINCT FROM 'anulado' THEN
+        NEW.balance_after := NULL;
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO stock_kardex_saldos (codart, warehouse_id, balance, last_movement_id, last_movement_at)
+    VALUES (NEW.codart, NEW.warehouse_id, NEW.quantity, NEW.id, COALESCE(NEW.created_at, now()))
+    ON CONFLICT (codart, warehouse_id) DO UPDATE
+        SET balance = stock_kardex_saldos.balance + EXCLUDED.balance,
+            last_movement_id = EXCLUDED.last_movement_id,
+            last_movement_at = EXCLUDED.last_movement_at
+    RETURNING balance INTO v_balance;
+
+    NEW.balance_after := v_balance;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS trg_kardex_registrar_saldo ON stock_movements;
+CREATE TRIGGER trg_kardex_registrar_saldo
+    BEFORE INSERT ON stock_movements
+    FOR EACH ROW EXECUTE FUNCTION kardex_registrar_saldo();
+
+-- --------------------------------------------------------
+-- Anular (o reactivar) un movimiento revierte (o repone) su cantidad en el
+-- saldo vigente y en el balance_after de los movimientos posteriores.
+-- --------------------------------------------------------
+CREATE OR REPLACE FUNCTION kardex_cambio_estado() RETURNS TRIGGER AS $$
+DECLARE
+    v_delta NUMERIC;
+BEGIN
+    IF (OLD.status IS NOT DISTINCT FROM 'anulado') = (NEW.status IS NOT DISTINCT FROM 'anulado') THEN
+        RETURN NULL;
+    END IF;
+
+    v_delta := CASE WHEN NEW.status IS NOT DISTINCT FROM 'anulado' THEN -OLD.quantity ELSE OLD.quantity END;
+
+    INSERT INTO stock_kardex_saldos (codart, warehouse_id, balance)
+    VALUES (OLD.codart, OLD.warehouse_id, v_delta)
+    ON CONFLICT (codart, warehouse_id) DO UPDATE
+        SET balance = stock_kardex_saldos.balance + EXCLUDED.balance;
+
+    UPDATE stock_movements
+    SET balance_after = balance_after + v_delta
+    WHERE codart = OLD.codart
+      AND warehouse_id = OLD.warehouse_id
+      AND (created_at, id) > (OLD.created_at, OLD.id)
+      AND status IS DISTINCT FROM 'anulado';
+
+    -- Al reactivarlo, su propio saldo es el del movimiento vigente anterior más su cantidad
+    UPDATE stock_movements m
+    SET balance_after = CASE WHEN NEW.status IS NOT DISTINCT FROM 'anulado' THEN NULL ELSE COALESCE((
+            SELECT p.balance_after FROM stock_movements p
+            WHERE p.codart = OLD.codart AND p.warehouse_id = OLD.warehouse_id
+              AND (p.created_at, p.id) < (OLD.created_at, OLD.id)
+              AND p.status IS DISTINCT FROM 'anulado'
+            ORDER BY p.created_at DESC, p.id DESC
+            LIMIT 1
+        ), 0) + OLD.quantity END
+    WHERE m.id = OLD.id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS trg_kardex_cambio_estado ON stock_movements;
+CREATE TRIGGER trg_kardex_cambio_estado
+    AFTER UPDATE OF status ON stock_movements
+    FOR EACH ROW EXECUTE FUNCTION kardex_cambio_estado();
+
+-- --------------------------------------------------------
+-- Carga inicial: el saldo de apertura es el stock actual menos la suma
+-- de los movimientos vigentes, así el último balance_after coincide
+-- con master_products. Los anulados no suman ni llevan saldo.
+-- --------------------------------------------------------
+WITH stock_actual AS (
+    SELECT p.codart, w.id AS warehouse_id,
+           CASE w.name WHEN 'LLERENA' THEN COALESCE(p.stock_llerena, 0)
+                       WHEN 'BETBEDER' THEN COALESCE(p.stock_betbeder, 0)
+                       ELSE 0 END AS stock
+    FROM master_products p
+    CROSS JOIN warehouses w
+),
+totales AS (
+    SELECT codart, warehouse_id, SUM(quantity) AS total
+    FROM stock_movements
+    WHERE status IS DISTINCT FROM 'anulado'
+    GROUP BY codart, warehouse_id
+),
+acumulado AS (
+    SELECT m.id,
+           COALESCE(s.stock, 0) - t.total
+               + SUM(m.quantity) OVER (PARTITION BY m.codart, m.warehouse_id ORDER BY m.created_at, m.id) AS balance_after
+    FROM stock_movements m
+    JOIN totales t ON t.codart = m.codart AND t.warehouse_id = m.warehouse_id
+    LEFT JOIN stock_actual s ON s.codart = m.codart AND s.warehouse_id = m.warehouse_id
+    WHERE m.status IS DISTINCT FROM 'anulado'
+)
+UPDATE stock_movements m
+SET balance_after = a.balance_after
+FROM acumulado a
+WHERE a.id = m.id AND m.balance_after IS NULL;
+
+INSERT INTO stock_kardex_saldos (codart, warehouse_id, balance, last_movement_id, last_movement_at)
+SELECT p.codart, w.id,
+       CASE w.name WHEN 'LLERENA' THEN COALESCE(p.stock_llerena, 0)
+                   WHEN 'BETBEDER' THEN COALESCE(p.stock_betbeder, 0)
+                   ELSE 0 END,
+       ult.id, ult.created_at
+FROM master_products p
+CROSS JOIN warehouses w
+LEFT JOIN LATERAL (
+    SELECT m.id, m.created_at FROM stock_movements m
+    WHERE m.codart = p.codart AND m.warehouse_id = w.id
+      AND m.status IS DISTINCT FROM 'anulado'
+    ORDER BY m.created_at DESC, m.id DESC
+    LIMIT 1
+) ult ON true
+ON CONFLICT (codart, warehouse_id) DO NOTHING;
+
+-- --------------------------------------------------------
+-- Stock a una fecha para una lista de productos, por depósito.
+-- Si no hay movimientos anteriores a la fecha se usa el saldo de apertura
+-- (primer movimiento posterior menos su cantidad) o el saldo vigente.
+-- --------------------------------------------------------
+CREATE OR REPLACE FUNCTION stock_a_fecha(
+    p_codarts TEXT[],
+    p_fecha TIMESTAMPTZ
+) RETURNS TABLE (codart TEXT, warehouse_id UUID, warehouse_name TEXT, balance NUMERIC) AS $$
+    SELECT c.codart, w.id, w.name::text,
+           COALESCE(antes.balance_after, despues.balance_after - despues.quantity, s.balance, 0)
+    FROM unnest(p_codarts) AS c(codart)
+    CROSS JOIN warehouses w
+    LEFT JOIN stock_kardex_saldos s ON s.codart = c.codart AND s.warehouse_id = w.id
+    LEFT JOIN LATERAL (
+        SELECT m.balance_after FROM stock_movements m
+        WHERE m.codart = c.codart AND m.warehouse_id = w.id AND m.created_at <= p_fecha
+          AND m.status IS DISTINCT FROM 'anulado'
+        ORDER BY m.created_at DESC, m.id DESC
+        LIMIT 1
+    ) antes ON true
+    LEFT JOIN LATERAL (
+        SELECT m.balance_after, m.quantity FROM stock_movements m
+        WHERE m.codart = c.codart AND m.warehouse_id = w.id AND m.created_at > p_fecha
+          AND m.status IS DISTINCT FROM 'anulado'
+        ORDER BY m.created_at ASC, m.id ASC
+        LIMIT 1
+    ) despues ON antes.balance_after IS NULL;
+$$ LANGUAGE sql STABLE;
+
+-- --------------------------------------------------------
+-- Conciliación: diferencias entre el saldo del kardex y las columnas
+-- stock_llerena / stock_betbeder del maestro (cambios sin movimiento).
+-- --------------------------------------------------------
+CREATE OR REPLACE VIEW stock_kardex_conciliacion WITH (security_invoker = true) AS
+SELECT s.codart, p.desart, w.name AS warehouse_name,
+       s.balance AS kardex_balance,
+       CASE w.name WHEN 'LLERENA' THEN COALESCE(p.stock_llerena, 0)
+                   WHEN 'BETBEDER' THEN COALESCE(p.stock_betbeder, 0)
+                   ELSE 0 END AS master_stock
+FROM stock_kardex_saldos s
+JOIN warehouses w ON w.id = s.warehouse_id
+JOIN master_products p ON p.codart = s.codart
+WHERE s.balance <> CASE w.name WHEN 'LLERENA' THEN COALESCE(p.stock_llerena, 0)
+                               WHEN 'BETBEDER' THEN COALESCE(p.stock_betbeder, 0)
+                               ELSE 0 END;
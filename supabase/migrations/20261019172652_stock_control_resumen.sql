@@ -0,0 +1,51 @@
+-- ========================================================
+-- CONTROL DE STOCK: RESUMEN DE SESIONES Y FILTROS DEL CATÁLOGO
+-- Evita que la pantalla de auditoría ciega descargue todos los ítems
+-- y conteos de sesiones pasadas para mostrar el listado.
+-- ========================================================
+
+CREATE INDEX IF NOT EXISTS idx_stock_control_items_session
+    ON stock_control_items (session_id);
+CREATE INDEX IF NOT EXISTS idx_stock_control_counts_item
+    ON stock_control_counts (item_id);
+
+-- Una fila por sesión con la cantidad de ítems y el avance de cada contador
+CREATE OR REPLACE VIEW stock_control_session_resumen WITH (security_invoker = true) AS
+SELECT
+    s.*,
+    w.name AS warehouse_name,
+    COALESCE(ic.item_count, 0) AS item_count,
+    COALESCE(up.user_progress, '[]'::jsonb) AS user_progress
+FROM stock_control_sessions s
+LEFT JOIN warehouses w ON w.id = s.warehouse_id
+LEFT JOIN (
+    SELECT session_id, COUNT(*) AS item_count
+    FROM stock_control_items
+    GROUP BY session_id
+) ic ON ic.session_id = s.id
+LEFT JOIN (
+    SELECT x.session_id,
+           jsonb_agg(jsonb_build_object('userId', x.user_id, 'count', x.counted) ORDER BY x.user_id) AS user_progress
+    FROM (
+        SELECT i.session_id, c.user_id, COUNT(DISTINCT c.item_id) AS counted
+        FROM stock_control_counts c
+        JOIN stock_control_items i ON i.id = c.item_id
+        GROUP BY i.session_id, c.user_id
+    ) x
+    GROUP BY x.session_id
+) up ON up.session_id = s.id;
+
+-- Valores distintos para los desplegables de familia, subfamilia y proveedor
+CREATE OR REPLACE FUNCTION valores_filtro_productos() RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'familias', COALESCE((SELECT jsonb_agg(v ORDER BY v) FROM (
+            SELECT DISTINCT familia AS v FROM master_products
+            WHERE familia IS NOT NULL AND familia <> '' AND familia <> 'ELIMINADOS') f), '[]'::jsonb),
+        'subfamilias', COALESCE((SELECT jsonb_agg(v ORDER BY v) FROM (
+            SELECT DISTINCT nsubf AS v FROM master_products
+            WHERE nsubf IS NOT NULL AND nsubf <> '' AND familia IS DISTINCT FROM 'ELIMINADOS') s), '[]'::jsonb),
+        'proveedores', COALESCE((SELECT jsonb_agg(v ORDER BY v) FROM (
+            SELECT DISTINCT nomprov AS v FROM master_products
+            WHERE nomprov IS NOT NULL AND nomprov <> '' AND familia IS DISTINCT FROM 'ELIMINADOS') p), '[]'::jsonb)
+    );
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,74 @@
+-- ========================================================
+-- SINCRONIZACIÓN POR LOTES DE CONTEOS OFFLINE (CONTROL DE STOCK)
+-- Las tablets guardan los conteos en IndexedDB con un client_id y los
+-- envían en lotes. El upsert es idempotente y gana el conteo más reciente.
+-- ========================================================
+
+ALTER TABLE stock_control_counts ADD COLUMN IF NOT EXISTS client_id UUID;
+ALTER TABLE stock_control_counts ADD COLUMN IF NOT EXISTS counted_at TIMESTAMPTZ DEFAULT now();
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_stock_control_counts_client_id
+    ON stock_control_counts (client_id) WHERE client_id IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION sincronizar_conteos(
+    p_counts JSONB
+) RETURNS JSONB AS $$
+DECLARE
+    v_count RECORD;
+    v_status TEXT;
+    v_existing RECORD;
+    v_applied JSONB := '[]'::jsonb;
+    v_conflicts JSONB := '[]'::jsonb;
+BEGIN
+    FOR v_count IN
+        SELECT * FROM jsonb_to_recordset(p_counts)
+            AS x(client_id UUID, item_id UUID, user_id UUID, qty NUMERIC, counted_at TIMESTAMPTZ)
+    LOOP
+        -- Reenvío de un lote ya aplicado: se confirma sin volver a escribir
+        IF EXISTS (SELECT 1 FROM stock_control_counts WHERE client_id = v_count.client_id) THEN
+            v_applied := v_applied || to_jsonb(v_count.client_id);
+            CONTINUE;
+        END IF;
+
+        SELECT s.status INTO v_status
+        FROM stock_control_items i
+        JOIN stock_control_sessions s ON s.id = i.session_id
+        WHERE i.id = v_count.item_id;
+
+        IF NOT FOUND THEN
+            v_conflicts := v_conflicts || jsonb_build_object(
+                'client_id', v_count.client_id, 'item_id', v_count.item_id, 'reason', 'item_missing');
+            CONTINUE;
+        END IF;
+
+        IF v_status = 'finished' THEN
+            v_conflicts := v_conflicts || jsonb_build_object(
+                'client_id', v_count.client_id, 'item_id', v_count.item_id, 'reason', 'session_finished');
+            CONTINUE;
+        END IF;
+
+        SELECT qty, counted_at INTO v_existing
+        FROM stock_control_counts
+        WHERE item_id = v_count.item_id AND user_id = v_count.user_id
+        FOR UPDATE;
+
+        -- Otro dispositivo del mismo usuario registró un conteo posterior
+        IF FOUND AND v_existing.counted_at IS NOT NULL AND v_existing.counted_at > v_count.counted_at THEN
+            v_conflicts := v_conflicts || jsonb_build_object(
+                'client_id', v_count.client_id, 'item_id', v_count.item_id, 'reason', 'stale', 'server_qty', v_existing.qty);
+            CONTINUE;
+        END IF;
+
+        INSERT INTO stock_control_counts (item_id, user_id, qty, client_id, counted_at)
+        VALUES (v_count.item_id, v_count.user_id, v_count.qty, v_count.client_id, v_count.counted_at)
+        ON CONFLICT (item_id, user_id) DO UPDATE
+            SET qty = EXCLUDED.qty,
+                client_id = EXCLUDED.client_id,
+                counted_at = EXCLUDED.counted_at;
+
+        v_applied := v_applied || to_jsonb(v_count.client_id);
+    END LOOP;
+
+    RETURN jsonb_build_object('applied', v_applied, 'conflicts', v_conflicts);
+END;
+$$ LANGUAGE plpgsql;
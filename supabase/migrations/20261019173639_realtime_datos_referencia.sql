@@ -0,0 +1,20 @@
+-- ========================================================
+-- REALTIME PARA TABLAS DE REFERENCIA
+-- La caché compartida del cliente (referenceData.ts) escucha cambios en
+-- estas tablas para invalidarse; tienen que estar en la publicación.
+-- ========================================================
+
+DO $$
+DECLARE
+    v_table TEXT;
+BEGIN
+    FOREACH v_table IN ARRAY ARRAY['delivery_zones', 'client_classifications', 'cash_concepts', 'providers_master', 'warehouses']
+    LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_publication_tables
+            WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = v_table
+        ) THEN
+            EXECUTE format('ALTER PUBLICATION supabase_realtime ADD TABLE public.%I', v_table);
+        END IF;
+    END LOOP;
+END $$;
@@ -0,0 +1,107 @@
+-- ========================================================
+-- GUARDADO INCREMENTAL DE VIAJES (PLANILLA DE VIAJES)
+-- El cliente envía solo lo que cambió: campos del viaje, clientes y
+-- gastos nuevos/modificados y los ids borrados. Los ids los genera el
+-- cliente, así reintentar un guardado no duplica filas. Todo corre en una
+-- sola transacción y devuelve el viaje completo con la misma forma que
+-- `trips?select=*,trip_clients(*),trip_expenses(*)`.
+-- ========================================================
+
+CREATE INDEX IF NOT EXISTS idx_trips_created_at ON trips (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_trip_clients_trip_id ON trip_clients (trip_id);
+CREATE INDEX IF NOT EXISTS idx_trip_expenses_trip_id ON trip_expenses (trip_id);
+
+CREATE OR REPLACE FUNCTION guardar_viaje(
+    p_trip_id UUID,
+    p_trip JSONB DEFAULT '{}'::jsonb,       -- Solo las columnas de trips que cambiaron
+    p_clients_upsert JSONB DEFAULT '[]'::jsonb,
+    p_clients_delete UUID[] DEFAULT '{}',
+    p_expenses_upsert JSONB DEFAULT '[]'::jsonb,
+    p_expenses_delete UUID[] DEFAULT '{}'
+) RETURNS JSONB AS $$
+DECLARE
+    v_trip_id UUID := p_trip_id;
+    v_trip trips;
+    v_item JSONB;
+    v_client trip_clients;
+    v_expense trip_expenses;
+BEGIN
+    -- jsonb_populate_record tipa cada valor según la columna (numéricos, enums de estado, etc.)
+    v_trip := jsonb_populate_record(NULL::trips, p_trip);
+
+    IF NOT EXISTS (SELECT 1 FROM trips WHERE id = v_trip_id) THEN
+        INSERT INTO trips (id, display_id, name, status, driver_name, date_text, route)
+        VALUES (v_trip_id, v_trip.display_id, v_trip.name, v_trip.status, v_trip.driver_name, v_trip.date_text, v_trip.route);
+    ELSIF p_trip <> '{}'::jsonb THEN
+        UPDATE trips SET
+            display_id  = CASE WHEN p_trip ? 'display_id'  THEN v_trip.display_id  ELSE display_id END,
+            name        = CASE WHEN p_trip ? 'name'        THEN v_trip.name        ELSE name END,
+            status      = CASE WHEN p_trip ? 'status'      THEN v_trip.status      ELSE status END,
+            driver_name = CASE WHEN p_trip ? 'driver_name' THEN v_trip.driver_name ELSE driver_name END,
+            date_text   = CASE WHEN p_trip ? 'date_text'   THEN v_trip.date_text   ELSE date_text END,
+            route       = CASE WHEN p_trip ? 'route'       THEN v_trip.route       ELSE route END
+        WHERE id = v_trip_id;
+    END IF;
+
+    -- Clientes: alta o modificación por id
+    IF array_length(p_clients_delete, 1) > 0 THEN
+        DELETE FROM trip_clients WHERE trip_id = v_trip_id AND id = ANY(p_clients_delete);
+    END IF;
+
+    FOR v_item IN SELECT * FROM jsonb_array_elements(p_clients_upsert) LOOP
+        v_client := jsonb_populate_record(NULL::trip_clients, v_item);
+        INSERT INTO trip_clients (
+            id, trip_id, name, address, previous_balance, current_invoice_amount,
+            payment_cash, payment_transfer, is_transfer_expected, status
+        ) VALUES (
+            v_client.id, v_trip_id, v_client.name, v_client.address, v_client.previous_balance, v_client.current_invoice_amount,
+            v_client.payment_cash, v_client.payment_transfer, v_client.is_transfer_expected, v_client.status
+        )
+        ON CONFLICT (id) DO UPDATE SET
+            name = EXCLUDED.name,
+            address = EXCLUDED.address,
+            previous_balance = EXCLUDED.previous_balance,
+            current_invoice_amount = EXCLUDED.current_invoice_amount,
+            payment_cash = EXCLUDED.payment_cash,
+            payment_transfer = EXCLUDED.payment_transfer,
+            is_transfer_expected = EXCLUDED.is_transfer_expected,
+            status = EXCLUDED.status
+        WHERE trip_clients.trip_id = v_trip_id;
+    END LOOP;
+
+    -- Gastos
+    IF array_length(p_expenses_delete, 1) > 0 THEN
+        DELETE FROM trip_expenses WHERE trip_id = v_trip_id AND id = ANY(p_expenses_delete);
+    END IF;
+
+    FOR v_item IN SELECT * FROM jsonb_array_elements(p_expenses_upsert) LOOP
+        v_expense := jsonb_populate_record(NULL::trip_expenses, v_item);
+        INSERT INTO trip_expenses (id, trip_id, type, amount, note)
+        VALUES (v_expense.id, v_trip_id, v_expense.type, v_expense.amount, v_expense.note)
+        ON CONFLICT (id) DO UPDATE SET
+            type = EXCLUDED.type,
+            amount = EXCLUDED.amount,
+            note = EXCLUDED.note
+        WHERE trip_expenses.trip_id = v_trip_id;
+    END LOOP;
+
+    RETURN (
+        SELECT to_jsonb(t)
+            || jsonb_build_object(
+                'trip_clients', COALESCE((SELECT jsonb_agg(to_jsonb(c)) FROM trip_clients c WHERE c.trip_id = t.id), '[]'::jsonb),
+                'trip_expenses', COALESCE((SELECT jsonb_agg(to_jsonb(e)) FROM trip_expenses e WHERE e.trip_id = t.id), '[]'::jsonb)
+            )
+        FROM trips t
+        WHERE t.id = v_trip_id
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Borrado del viaje con sus clientes y gastos en una sola transacción
+CREATE OR REPLACE FUNCTION eliminar_viaje(p_trip_id UUID) RETURNS VOID AS $$
+BEGIN
+    DELETE FROM trip_expenses WHERE trip_id = p_trip_id;
+    DELETE FROM trip_clients WHERE trip_id = p_trip_id;
+    DELETE FROM trips WHERE id = p_trip_id;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,19 @@
+-- ========================================================
+-- CACHÉ DE PLANILLAS DE VIAJE EN PDF (tripSheets.ts)
+-- Los PDFs se guardan como <tipo>/<hash del contenido>.pdf: un archivo
+-- nunca se sobreescribe, si el viaje cambia se genera otro nombre.
+-- ========================================================
+
+INSERT INTO storage.buckets (id, name, public)
+VALUES ('trip-sheets', 'trip-sheets', FALSE)
+ON CONFLICT (id) DO NOTHING;
+
+DROP POLICY IF EXISTS "Planillas de viaje: lectura" ON storage.objects;
+CREATE POLICY "Planillas de viaje: lectura" ON storage.objects
+    FOR SELECT TO authenticated
+    USING (bucket_id = 'trip-sheets');
+
+DROP POLICY IF EXISTS "Planillas de viaje: alta" ON storage.objects;
+CREATE POLICY "Planillas de viaje: alta" ON storage.objects
+    FOR INSERT TO authenticated
+    WITH CHECK (bucket_id = 'trip-sheets');
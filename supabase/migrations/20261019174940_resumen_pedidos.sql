@@ -0,0 +1,54 @@
+-- ========================================================
+-- RESUMEN DE LÍNEAS EN LA CABECERA DEL PEDIDO
+-- Las listas (Gestión de pedidos, historial, dashboard) solo muestran
+-- cantidad de productos, total y avance del armado: con estas columnas no
+-- hace falta traer `order_items` de cada pedido. Las líneas se bajan al abrir
+-- el pedido y el cliente las cachea por `lines_version`.
+-- ========================================================
+
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS item_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS checked_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS lines_version BIGINT NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_order_items_order_id ON order_items (order_id);
+
+-- Mantiene contadores y versión con deltas: O(1) por línea tocada
+CREATE OR REPLACE FUNCTION actualizar_resumen_pedido() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE orders SET
+            item_count = item_count - 1,
+            checked_count = checked_count - (CASE WHEN OLD.is_checked THEN 1 ELSE 0 END),
+            lines_version = lines_version + 1
+        WHERE id = OLD.order_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE orders SET
+            item_count = item_count + 1,
+            checked_count = checked_count + (CASE WHEN NEW.is_checked THEN 1 ELSE 0 END),
+            lines_version = lines_version + (CASE WHEN TG_OP = 'INSERT' OR NEW.order_id <> OLD.order_id THEN 1 ELSE 0 END)
+        WHERE id = NEW.order_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_resumen_pedido ON order_items;
+CREATE TRIGGER trg_resumen_pedido
+    AFTER INSERT OR UPDATE OR DELETE ON order_items
+    FOR EACH ROW EXECUTE FUNCTION actualizar_resumen_pedido();
+
+-- Carga inicial de los pedidos existentes
+UPDATE orders o SET
+    item_count = s.item_count,
+    checked_count = s.checked_count
+FROM (
+    SELECT order_id,
+           COUNT(*) AS item_count,
+           COUNT(*) FILTER (WHERE is_checked) AS checked_count
+    FROM order_items
+    GROUP BY order_id
+) s
+WHERE s.order_id = o.id;
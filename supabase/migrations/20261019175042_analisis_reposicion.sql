@@ -0,0 +1,111 @@
+-- ========================================================
+-- REPOSICIÓN: ANÁLISIS CALCULADO EN EL SERVIDOR
+-- El tablero de Reposición bajaba master_products completo (cortado por el
+-- límite de filas de la API) y calculaba estados y sugeridos en el navegador.
+-- Ahora pide una página ya filtrada, ordenada y con los totales del filtro,
+-- más la velocidad de venta de cada artículo según order_items.
+-- ========================================================
+
+CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders (created_at);
+CREATE INDEX IF NOT EXISTS idx_order_items_code ON order_items (code);
+
+CREATE OR REPLACE FUNCTION analisis_reposicion(
+    p_search TEXT DEFAULT '',
+    p_status TEXT DEFAULT 'all',
+    p_provider TEXT DEFAULT 'all',
+    p_offset INTEGER DEFAULT 0,
+    p_limit INTEGER DEFAULT 100,
+    p_velocity_days INTEGER DEFAULT 30
+) RETURNS JSONB AS $$
+    WITH ventas AS (
+        -- Unidades despachadas en la ventana (pedidos ya facturados en adelante)
+        SELECT oi.code, SUM(COALESCE(oi.shipped_quantity, oi.quantity)) AS unidades
+        FROM order_items oi
+        JOIN orders o ON o.id = oi.order_id
+        WHERE o.created_at >= NOW() - make_interval(days => p_velocity_days)
+          AND o.status IN ('facturado', 'factura_controlada', 'en_transito', 'entregado', 'pagado')
+          AND COALESCE(o.is_interdeposito, FALSE) = FALSE
+        GROUP BY oi.code
+    ),
+    base AS (
+        SELECT
+            p.codart,
+            p.desart,
+            p.nomprov,
+            COALESCE(p.stock_llerena, 0) AS current,
+            COALESCE(p.stock_minimo, 0) AS min,
+            COALESCE(p.stock_ideal, 0) AS ideal,
+            COALESCE(v.unidades, 0) AS units_sold
+        FROM master_products p
+        LEFT JOIN ventas v ON v.code = p.codart
+        WHERE (p_provider = 'all' OR p.nomprov = p_provider)
+          AND (COALESCE(p_search, '') = ''
+               OR p.desart ILIKE '%' || p_search || '%'
+               OR p.codart ILIKE '%' || p_search || '%')
+    ),
+    calc AS (
+        SELECT
+            b.*,
+            CASE WHEN b.current = 0 THEN 'sin_stock'
+                 WHEN b.current <= b.min THEN 'reponer'
+                 ELSE 'normal' END AS status,
+            GREATEST(b.ideal - b.current, 0) AS suggested,
+            ROUND(b.units_sold::NUMERIC / GREATEST(p_velocity_days, 1), 2) AS daily_velocity
+        FROM base b
+    ),
+    filtrado AS (
+        SELECT * FROM calc WHERE p_status = 'all' OR status = p_status
+    ),
+    pagina AS (
+        SELECT * FROM filtrado
+        ORDER BY
+            CASE status WHEN 'sin_stock' THEN 1 WHEN 'reponer' THEN 2 ELSE 3 END,
+            suggested DESC,
+            desart
+        OFFSET p_offset
+        LIMIT p_limit
+    )
+    SELECT jsonb_build_object(
+        'total', (SELECT COUNT(*) FROM filtrado),
+        'stats', (SELECT jsonb_build_object(
+            'normal', COUNT(*) FILTER (WHERE status = 'normal'),
+            'reponer', COUNT(*) FILTER (WHERE status = 'reponer'),
+            'sin_stock', COUNT(*) FILTER (WHERE status = 'sin_stock'),
+            'total_suggested', COALESCE(SUM(suggested), 0)
+        ) FROM filtrado),
+        'items', COALESCE((SELECT jsonb_agg(jsonb_build_object(
+            'codart', codart,
+            'desart', desart,
+            'nomprov', nomprov,
+            'current', current,
+            'min', min,
+            'ideal', ideal,
+            'status', status,
+            'suggested', suggested,
+            'units_sold', units_sold,
+            'daily_velocity', daily_velocity,
+            'days_of_cover', CASE WHEN daily_velocity > 0 THEN FLOOR(GREATEST(current, 0) / daily_velocity) END
+        ) ORDER BY
+            CASE status WHEN 'sin_stock' THEN 1 WHEN 'reponer' THEN 2 ELSE 3 END,
+            suggested DESC,
+            desart) FROM pagina), '[]'::jsonb)
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Guarda en una sola sentencia las ediciones de mínimo/ideal acumuladas
+-- p_items: [{ "codart": "...", "stock_minimo": 5, "stock_ideal": 12 }, ...]
+-- Un campo ausente en el ítem conserva el valor actual.
+CREATE OR REPLACE FUNCTION actualizar_niveles_stock(p_items JSONB) RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    UPDATE master_products p SET
+        stock_minimo = COALESCE(x.stock_minimo, p.stock_minimo),
+        stock_ideal = COALESCE(x.stock_ideal, p.stock_ideal)
+    FROM jsonb_to_recordset(p_items) AS x(codart TEXT, stock_minimo INTEGER, stock_ideal INTEGER)
+    WHERE p.codart = x.codart;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,150 @@
+-- ========================================================
+-- SUGERENCIAS DE STOCK MÍNIMO / IDEAL POR VELOCIDAD DE CONSUMO
+-- Proceso por lotes fuera del camino de las pantallas: arma la serie diaria
+-- de salidas por venta de cada (artículo, depósito) desde stock_movements,
+-- calcula promedios móviles, estacionalidad y dispersión, y deja en
+-- sugerencias_stock los niveles sugeridos que Reposición muestra junto a
+-- los cargados a mano. Todo se resuelve en pocas pasadas agregadas, sin
+-- bucles por artículo.
+-- ========================================================
+
+CREATE TABLE IF NOT EXISTS sugerencias_stock (
+    codart TEXT NOT NULL,
+    warehouse_id UUID NOT NULL REFERENCES warehouses(id),
+    avg_7 NUMERIC NOT NULL DEFAULT 0,
+    avg_28 NUMERIC NOT NULL DEFAULT 0,
+    avg_90 NUMERIC NOT NULL DEFAULT 0,
+    seasonal_factor NUMERIC NOT NULL DEFAULT 1,
+    forecast_daily NUMERIC NOT NULL DEFAULT 0,
+    suggested_min INTEGER NOT NULL DEFAULT 0,
+    suggested_ideal INTEGER NOT NULL DEFAULT 0,
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (codart, warehouse_id)
+);
+
+ALTER TABLE sugerencias_stock ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Sugerencias de stock: lectura" ON sugerencias_stock;
+CREATE POLICY "Sugerencias de stock: lectura" ON sugerencias_stock
+    FOR SELECT TO authenticated USING (TRUE);
+
+-- Salidas por fecha: el recorrido por rango usa este índice
+CREATE INDEX IF NOT EXISTS idx_stock_movements_type_created_codart
+    ON stock_movements (type, created_at, codart, warehouse_id);
+
+-- p_lead_days: días que tarda en llegar una reposición (cubre el mínimo)
+-- p_cover_days: días de venta que debe cubrir el ideal por encima del mínimo
+-- p_service_z: factor de nivel de servicio para el stock de seguridad (1.65 ≈ 95%)
+CREATE OR REPLACE FUNCTION calcular_sugerencias_stock(
+    p_lead_days INTEGER DEFAULT 7,
+    p_cover_days INTEGER DEFAULT 21,
+    p_service_z NUMERIC DEFAULT 1.65
+) RETURNS INTEGER AS $$
+DECLARE
+    v_today DATE := CURRENT_DATE;
+    v_count INTEGER;
+BEGIN
+    -- Desde la app solo quien ve Reposición (mismo criterio que hasPermission);
+    -- la corrida de pg_cron no tiene usuario y pasa
+    IF auth.uid() IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM profiles pr
+        WHERE pr.id = auth.uid()
+          AND (pr.role = 'vale' OR (pr.role <> 'armador' AND EXISTS (
+              SELECT 1 FROM user_permissions up
+              WHERE up.user_id = pr.id AND up.permission_key = 'dashboard.view'
+          )))
+    ) THEN
+        RAISE EXCEPTION 'Sin permiso para recalcular las sugerencias de stock';
+    END IF;
+
+    -- Salida neta diaria por venta (las reversiones y notas de crédito restan)
+    CREATE TEMP TABLE tmp_consumo_diario ON COMMIT DROP AS
+    SELECT m.codart,
+           m.warehouse_id,
+           m.created_at::date AS dia,
+           GREATEST(-SUM(m.quantity), 0) AS unidades
+    FROM stock_movements m
+    WHERE m.type::text IN ('venta', 'nota de crédito')
+      AND m.status IS DISTINCT FROM 'anulado'
+      AND m.created_at >= v_today - 455
+      AND m.created_at < v_today
+    GROUP BY m.codart, m.warehouse_id, m.created_at::date;
+
+    -- Los días sin movimiento cuentan como cero: los promedios dividen por
+    -- la cantidad de días de la ventana, no por los días con venta.
+    CREATE TEMP TABLE tmp_metricas ON COMMIT DROP AS
+    WITH ventanas AS (
+        SELECT codart, warehouse_id,
+               SUM(unidades) FILTER (WHERE dia >= v_today - 7) / 7.0 AS avg_7,
+               SUM(unidades) FILTER (WHERE dia >= v_today - 28) / 28.0 AS avg_28,
+               SUM(unidades) FILTER (WHERE dia >= v_today - 90) / 90.0 AS avg_90,
+               -- Mismo período del año pasado: los 30 días que vienen y los 90 previos
+               SUM(unidades) FILTER (WHERE dia >= v_today - 365 AND dia < v_today - 335) / 30.0 AS ly_next_30,
+               SUM(unidades) FILTER (WHERE dia >= v_today - 455 AND dia < v_today - 365) / 90.0 AS ly_prev_90,
+               SUM(unidades * unidades) FILTER (WHERE dia >= v_today - 90) AS sum_sq_90
+        FROM tmp_consumo_diario
+        GROUP BY codart, warehouse_id
+    )
+    SELECT codart, warehouse_id,
+           COALESCE(avg_7, 0) AS avg_7,
+           COALESCE(avg_28, 0) AS avg_28,
+           COALESCE(avg_90, 0) AS avg_90,
+           -- Estacionalidad acotada para que un pico aislado no dispare el pedido
+           CASE WHEN COALESCE(ly_prev_90, 0) > 0
+                THEN LEAST(GREATEST(COALESCE(ly_next_30, 0) / ly_prev_90, 0.5), 2.0)
+                ELSE 1 END AS seasonal_factor,
+           -- Desvío estándar diario de los últimos 90 días (incluye días en cero)
+           SQRT(GREATEST(COALESCE(sum_sq_90, 0) / 90.0 - POWER(COALESCE(avg_90, 0), 2), 0)) AS std_90
+    FROM ventanas;
+
+    INSERT INTO sugerencias_stock AS s (
+        codart, warehouse_id, avg_7, avg_28, avg_90, seasonal_factor,
+        forecast_daily, suggested_min, suggested_ideal, computed_at
+    )
+    SELECT codart, warehouse_id,
+           ROUND(avg_7, 3), ROUND(avg_28, 3), ROUND(avg_90, 3), ROUND(seasonal_factor, 3),
+           ROUND(forecast, 3),
+           CEIL(forecast * p_lead_days + p_service_z * std_90 * SQRT(p_lead_days))::INTEGER,
+           CEIL(forecast * (p_lead_days + p_cover_days) + p_service_z * std_90 * SQRT(p_lead_days))::INTEGER,
+           NOW()
+    FROM (
+        -- Pronóstico: promedios móviles ponderados hacia lo reciente
+        SELECT *, (0.2 * avg_7 + 0.3 * avg_28 + 0.5 * avg_90) * seasonal_factor AS forecast
+        FROM tmp_metricas
+    ) f
+    ON CONFLICT (codart, warehouse_id) DO UPDATE SET
+        avg_7 = EXCLUDED.avg_7,
+        avg_28 = EXCLUDED.avg_28,
+        avg_90 = EXCLUDED.avg_90,
+        seasonal_factor = EXCLUDED.seasonal_factor,
+        forecast_daily = EXCLUDED.forecast_daily,
+        suggested_min = EXCLUDED.suggested_min,
+        suggested_ideal = EXCLUDED.suggested_ideal,
+        computed_at = EXCLUDED.computed_at;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+
+    -- Artículos que dejaron de venderse: la sugerencia baja a cero
+    UPDATE sugerencias_stock s SET
+        avg_7 = 0, avg_28 = 0, avg_90 = 0, seasonal_factor = 1,
+        forecast_daily = 0, suggested_min = 0, suggested_ideal = 0, computed_at = NOW()
+    WHERE NOT EXISTS (
+        SELECT 1 FROM tmp_metricas t
+        WHERE t.codart = s.codart AND t.warehouse_id = s.warehouse_id
+    );
+
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION calcular_sugerencias_stock(INTEGER, INTEGER, NUMERIC) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION calcular_sugerencias_stock(INTEGER, INTEGER, NUMERIC) TO authenticated;
+
+-- Corrida nocturna si la extensión pg_cron está habilitada en el proyecto
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('sugerencias-stock-nocturnas', '30 3 * * *', 'SELECT calcular_sugerencias_stock()');
+    END IF;
+END;
+$$;
@@ -0,0 +1,168 @@
+-- ========================================================
+-- LISTA WHATSAPP: BASE VERSIONADA E INCREMENTAL
+-- "Fijar base" borraba whatsapp_list_snapshot entero y lo volvía a cargar
+-- en tandas desde el navegador: miles de filas por guardado y, si fallaba a
+-- mitad de camino, la base quedaba vacía. Ahora una sola RPC compara la lista
+-- vigente contra la base y aplica solo altas, bajas y cambios de precio en
+-- una transacción, dejando registro de cada versión. Las novedades también
+-- se calculan en el servidor.
+-- ========================================================
+
+CREATE TABLE IF NOT EXISTS whatsapp_list_versions (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    created_by UUID,
+    item_count INTEGER NOT NULL DEFAULT 0,
+    added INTEGER NOT NULL DEFAULT 0,
+    changed INTEGER NOT NULL DEFAULT 0,
+    removed INTEGER NOT NULL DEFAULT 0
+);
+
+-- Solo lo que cambió en cada versión (old_price NULL = alta, new_price NULL = baja)
+CREATE TABLE IF NOT EXISTS whatsapp_list_changes (
+    version_id BIGINT NOT NULL REFERENCES whatsapp_list_versions(id) ON DELETE CASCADE,
+    codart TEXT NOT NULL,
+    old_price NUMERIC,
+    new_price NUMERIC,
+    PRIMARY KEY (version_id, codart)
+);
+
+ALTER TABLE whatsapp_list_versions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE whatsapp_list_changes ENABLE ROW LEVEL SECURITY;
+
+-- Lectura para todos los usuarios; las escrituras pasan por fijar_lista_whatsapp
+DROP POLICY IF EXISTS "Versiones lista WhatsApp: lectura" ON whatsapp_list_versions;
+CREATE POLICY "Versiones lista WhatsApp: lectura" ON whatsapp_list_versions
+    FOR SELECT TO authenticated USING (TRUE);
+
+DROP POLICY IF EXISTS "Cambios lista WhatsApp: lectura" ON whatsapp_list_changes;
+CREATE POLICY "Cambios lista WhatsApp: lectura" ON whatsapp_list_changes
+    FOR SELECT TO authenticated USING (TRUE);
+
+ALTER TABLE whatsapp_list_snapshot ADD COLUMN IF NOT EXISTS version_id BIGINT;
+
+-- La base existente pasa a ser la versión inicial
+INSERT INTO whatsapp_list_versions (created_at, item_count)
+SELECT MAX(created_at), COUNT(*) FROM whatsapp_list_snapshot
+HAVING COUNT(*) > 0 AND NOT EXISTS (SELECT 1 FROM whatsapp_list_versions);
+
+UPDATE whatsapp_list_snapshot
+SET version_id = (SELECT MIN(id) FROM whatsapp_list_versions)
+WHERE version_id IS NULL;
+
+-- Lista vigente: mismo criterio que la pantalla (activos con stock en Llerena).
+-- Igual que .neq('familia', 'ELIMINADOS') de ListaChina, familia NULL queda afuera.
+CREATE OR REPLACE VIEW whatsapp_list_vigente WITH (security_invoker = true) AS
+SELECT codart, desart, pventa_4 AS price
+FROM master_products
+WHERE familia <> 'ELIMINADOS'
+  AND stock_llerena > 0;
+
+-- Novedades respecto de la última base fijada
+CREATE OR REPLACE FUNCTION novedades_lista_whatsapp() RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'version', v.id,
+        'created_at', v.created_at,
+        'base_count', (SELECT COUNT(*) FROM whatsapp_list_snapshot),
+        'new_codes', COALESCE((
+            SELECT jsonb_agg(l.codart)
+            FROM whatsapp_list_vigente l
+            WHERE NOT EXISTS (SELECT 1 FROM whatsapp_list_snapshot s WHERE s.codart = l.codart)
+        ), '[]'::jsonb),
+        'changed_codes', COALESCE((
+            SELECT jsonb_agg(l.codart)
+            FROM whatsapp_list_vigente l
+            JOIN whatsapp_list_snapshot s ON s.codart = l.codart
+            WHERE s.last_price IS DISTINCT FROM l.price
+        ), '[]'::jsonb)
+    )
+    FROM (SELECT NULL) x
+    LEFT JOIN LATERAL (
+        SELECT id, created_at FROM whatsapp_list_versions ORDER BY id DESC LIMIT 1
+    ) v ON TRUE;
+$$ LANGUAGE sql STABLE;
+
+-- Fija la lista vigente como nueva base en una sola transacción.
+-- created_by es el usuario de la sesión (auditoría: no lo elige quien llama).
+DROP FUNCTION IF EXISTS fijar_lista_whatsapp(UUID);
+
+CREATE OR REPLACE FUNCTION fijar_lista_whatsapp() RETURNS JSONB AS $$
+DECLARE
+    v_version BIGINT;
+    v_added INTEGER;
+    v_changed INTEGER;
+    v_removed INTEGER;
+    v_total INTEGER;
+    v_created TIMESTAMPTZ;
+BEGIN
+    -- Dos guardados a la vez se ordenan en lugar de pisarse
+    PERFORM pg_advisory_xact_lock(hashtext('whatsapp_list_snapshot'));
+
+    INSERT INTO whatsapp_list_versions (created_by) VALUES (auth.uid())
+    RETURNING id, created_at INTO v_version, v_created;
+
+    CREATE TEMP TABLE tmp_lista_diff ON COMMIT DROP AS
+    SELECT COALESCE(l.codart, s.codart) AS codart,
+           l.desart,
+           s.last_price AS old_price,
+           l.price AS new_price,
+           CASE WHEN s.codart IS NULL THEN 'alta'
+                WHEN l.codart IS NULL THEN 'baja'
+                ELSE 'cambio' END AS kind
+    FROM whatsapp_list_vigente l
+    FULL JOIN whatsapp_list_snapshot s ON s.codart = l.codart
+    WHERE s.codart IS NULL
+       OR l.codart IS NULL
+       OR s.last_price IS DISTINCT FROM l.price
+       OR s.desart IS DISTINCT FROM l.desart;
+
+    DELETE FROM whatsapp_list_snapshot s
+    USING tmp_lista_diff d
+    WHERE d.kind = 'baja' AND s.codart = d.codart;
+    GET DIAGNOSTICS v_removed = ROW_COUNT;
+
+    UPDATE whatsapp_list_snapshot s SET
+        desart = d.desart,
+        last_price = d.new_price,
+        version_id = v_version
+    FROM tmp_lista_diff d
+    WHERE d.kind = 'cambio' AND s.codart = d.codart;
+
+    INSERT INTO whatsapp_list_snapshot (codart, desart, last_price, version_id, created_at)
+    SELECT codart, desart, new_price, v_version, v_created
+    FROM tmp_lista_diff
+    WHERE kind = 'alta';
+    GET DIAGNOSTICS v_added = ROW_COUNT;
+
+    -- Un cambio solo de descripción no cuenta como cambio de precio
+    INSERT INTO whatsapp_list_changes (version_id, codart, old_price, new_price)
+    SELECT v_version, codart, old_price, new_price
+    FROM tmp_lista_diff
+    WHERE kind <> 'cambio' OR old_price IS DISTINCT FROM new_price;
+
+    SELECT COUNT(*) INTO v_changed
+    FROM tmp_lista_diff
+    WHERE kind = 'cambio' AND old_price IS DISTINCT FROM new_price;
+
+    SELECT COUNT(*) INTO v_total FROM whatsapp_list_snapshot;
+
+    UPDATE whatsapp_list_versions SET
+        item_count = v_total,
+        added = v_added,
+        changed = v_changed,
+        removed = v_removed
+    WHERE id = v_version;
+
+    RETURN jsonb_build_object(
+        'version', v_version,
+        'created_at', v_created,
+        'base_count', v_total,
+        'added', v_added,
+        'changed', v_changed,
+        'removed', v_removed
+    );
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION fijar_lista_whatsapp() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION fijar_lista_whatsapp() TO authenticated;
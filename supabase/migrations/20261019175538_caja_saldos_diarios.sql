@@ -0,0 +1,293 @@
+-- ========================================================
+-- CAJA: TOTALES DIARIOS POR SUCURSAL MANTENIDOS AL ESCRIBIR
+-- Movimientos de Caja, Planilla Diaria y Arqueo sumaban cada uno por su
+-- cuenta los movimientos del día. Ahora cash_daily_totals guarda ingresos,
+-- egresos (ARS/USD) y cheques por (sucursal, día), actualizado por triggers
+-- con deltas, y planilla_caja_diaria devuelve en un solo pedido los
+-- movimientos con sus cheques y los totales ya calculados. Cerrar la caja
+-- marca el día y bloquea cambios posteriores sobre ese día; lo puede hacer
+-- quien tiene permiso de movimientos de caja, y solo un administrador
+-- (vale) la puede reabrir.
+-- ========================================================
+
+CREATE TABLE IF NOT EXISTS cash_daily_totals (
+    branch TEXT NOT NULL,
+    date DATE NOT NULL,
+    ingresos_ars NUMERIC NOT NULL DEFAULT 0,
+    egresos_ars NUMERIC NOT NULL DEFAULT 0,
+    ingresos_usd NUMERIC NOT NULL DEFAULT 0,
+    egresos_usd NUMERIC NOT NULL DEFAULT 0,
+    cheques_total NUMERIC NOT NULL DEFAULT 0,
+    cheques_count INTEGER NOT NULL DEFAULT 0,
+    movement_count INTEGER NOT NULL DEFAULT 0,
+    closed_at TIMESTAMPTZ,
+    closed_by UUID,
+    PRIMARY KEY (branch, date)
+);
+
+-- Solo lectura para los usuarios: las escrituras las hacen los triggers y
+-- cerrar_caja_diaria, que corren como dueño de la tabla (SECURITY DEFINER)
+ALTER TABLE cash_daily_totals ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Totales de caja: lectura" ON cash_daily_totals;
+CREATE POLICY "Totales de caja: lectura" ON cash_daily_totals
+    FOR SELECT TO authenticated USING (TRUE);
+
+CREATE INDEX IF NOT EXISTS idx_cash_movements_date_branch ON cash_movements (date, branch);
+CREATE INDEX IF NOT EXISTS idx_checks_movement_id ON checks (movement_id);
+
+-- Suma (p_sign = 1) o resta (p_sign = -1) un aporte al total del día
+CREATE OR REPLACE FUNCTION caja_aplicar_delta(
+    p_branch TEXT, p_date DATE, p_sign INTEGER,
+    p_ars_in NUMERIC, p_ars_out NUMERIC, p_usd_in NUMERIC, p_usd_out NUMERIC,
+    p_cheques NUMERIC, p_cheques_count INTEGER, p_movements INTEGER
+) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO cash_daily_totals AS t (
+        branch, date, ingresos_ars, egresos_ars, ingresos_usd, egresos_usd,
+        cheques_total, cheques_count, movement_count
+    ) VALUES (
+        p_branch, p_date, p_sign * p_ars_in, p_sign * p_ars_out, p_sign * p_usd_in, p_sign * p_usd_out,
+        p_sign * p_cheques, p_sign * p_cheques_count, p_sign * p_movements
+    )
+    ON CONFLICT (branch, date) DO UPDATE SET
+        ingresos_ars = t.ingresos_ars + EXCLUDED.ingresos_ars,
+        egresos_ars = t.egresos_ars + EXCLUDED.egresos_ars,
+        ingresos_usd = t.ingresos_usd + EXCLUDED.ingresos_usd,
+        egresos_usd = t.egresos_usd + EXCLUDED.egresos_usd,
+        cheques_total = t.cheques_total + EXCLUDED.cheques_total,
+        cheques_count = t.cheques_count + EXCLUDED.cheques_count,
+        movement_count = t.movement_count + EXCLUDED.movement_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION caja_verificar_abierta(p_branch TEXT, p_date DATE) RETURNS VOID AS $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM cash_daily_totals
+        WHERE branch = p_branch AND date = p_date AND closed_at IS NOT NULL
+    ) THEN
+        RAISE EXCEPTION 'La caja de % del % ya está cerrada', p_branch, to_char(p_date, 'DD/MM/YYYY');
+    END IF;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Movimientos: importes en ARS/USD
+CREATE OR REPLACE FUNCTION caja_movimiento_totales() RETURNS TRIGGER AS $$
+DECLARE
+    v_cheques NUMERIC;
+    v_cheques_count INTEGER;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM caja_verificar_abierta(OLD.branch, OLD.date);
+        PERFORM caja_aplicar_delta(OLD.branch, OLD.date, -1,
+            CASE WHEN OLD.type = 'ingreso' THEN COALESCE(OLD.amount_ars, 0) ELSE 0 END,
+            CASE WHEN OLD.type = 'egreso' THEN COALESCE(OLD.amount_ars, 0) ELSE 0 END,
+            CASE WHEN OLD.type = 'ingreso' THEN COALESCE(OLD.amount_usd, 0) ELSE 0 END,
+            CASE WHEN OLD.type = 'egreso' THEN COALESCE(OLD.amount_usd, 0) ELSE 0 END,
+            0, 0, 1);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM caja_verificar_abierta(NEW.branch, NEW.date);
+        PERFORM caja_aplicar_delta(NEW.branch, NEW.date, 1,
+            CASE WHEN NEW.type = 'ingreso' THEN COALESCE(NEW.amount_ars, 0) ELSE 0 END,
+            CASE WHEN NEW.type = 'egreso' THEN COALESCE(NEW.amount_ars, 0) ELSE 0 END,
+            CASE WHEN NEW.type = 'ingreso' THEN COALESCE(NEW.amount_usd, 0) ELSE 0 END,
+            CASE WHEN NEW.type = 'egreso' THEN COALESCE(NEW.amount_usd, 0) ELSE 0 END,
+            0, 0, 1);
+    END IF;
+
+    -- Si el movimiento cambió de día o sucursal, sus cheques lo acompañan
+    IF TG_OP = 'UPDATE' AND (OLD.branch IS DISTINCT FROM NEW.branch OR OLD.date IS DISTINCT FROM NEW.date) THEN
+        SELECT COALESCE(SUM(amount), 0), COUNT(*) INTO v_cheques, v_cheques_count
+        FROM checks WHERE movement_id = NEW.id;
+        IF v_cheques_count > 0 THEN
+            PERFORM caja_aplicar_delta(OLD.branch, OLD.date, -1, 0, 0, 0, 0, v_cheques, v_cheques_count, 0);
+            PERFORM caja_aplicar_delta(NEW.branch, NEW.date, 1, 0, 0, 0, 0, v_cheques, v_cheques_count, 0);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS trg_caja_movimiento_totales ON cash_movements;
+CREATE TRIGGER trg_caja_movimiento_totales
+    AFTER INSERT OR UPDATE OR DELETE ON cash_movements
+    FOR EACH ROW EXECUTE FUNCTION caja_movimiento_totales();
+
+-- Al borrar un movimiento se descuentan sus cheques antes de que la
+-- cascada los elimine (después ya no se sabe a qué día pertenecían)
+CREATE OR REPLACE FUNCTION caja_movimiento_baja_cheques() RETURNS TRIGGER AS $$
+DECLARE
+    v_cheques NUMERIC;
+    v_cheques_count INTEGER;
+BEGIN
+    SELECT COALESCE(SUM(amount), 0), COUNT(*) INTO v_cheques, v_cheques_count
+    FROM checks WHERE movement_id = OLD.id;
+    IF v_cheques_count > 0 THEN
+        PERFORM caja_aplicar_delta(OLD.branch, OLD.date, -1, 0, 0, 0, 0, v_cheques, v_cheques_count, 0);
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS trg_caja_movimiento_baja_cheques ON cash_movements;
+CREATE TRIGGER trg_caja_movimiento_baja_cheques
+    BEFORE DELETE ON cash_movements
+    FOR EACH ROW EXECUTE FUNCTION caja_movimiento_baja_cheques();
+
+-- Cheques: se imputan al día y sucursal de su movimiento
+CREATE OR REPLACE FUNCTION caja_cheque_totales() RETURNS TRIGGER AS $$
+DECLARE
+    v_branch TEXT;
+    v_date DATE;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT branch, date INTO v_branch, v_date FROM cash_movements WHERE id = OLD.movement_id;
+        -- Sin movimiento: la baja vino en cascada y ya se descontó
+        IF FOUND THEN
+            PERFORM caja_verificar_abierta(v_branch, v_date);
+            PERFORM caja_aplicar_delta(v_branch, v_date, -1, 0, 0, 0, 0, COALESCE(OLD.amount, 0), 1, 0);
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT branch, date INTO v_branch, v_date FROM cash_movements WHERE id = NEW.movement_id;
+        IF FOUND THEN
+            PERFORM caja_verificar_abierta(v_branch, v_date);
+            PERFORM caja_aplicar_delta(v_branch, v_date, 1, 0, 0, 0, 0, COALESCE(NEW.amount, 0), 1, 0);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS trg_caja_cheque_totales ON checks;
+CREATE TRIGGER trg_caja_cheque_totales
+    AFTER INSERT OR UPDATE OF amount, movement_id OR DELETE ON checks
+    FOR EACH ROW EXECUTE FUNCTION caja_cheque_totales();
+
+-- Carga inicial desde los movimientos existentes
+INSERT INTO cash_daily_totals AS t (
+    branch, date, ingresos_ars, egresos_ars, ingresos_usd, egresos_usd,
+    cheques_total, cheques_count, movement_count
+)
+SELECT m.branch, m.date,
+       SUM(CASE WHEN m.type = 'ingreso' THEN COALESCE(m.amount_ars, 0) ELSE 0 END),
+       SUM(CASE WHEN m.type = 'egreso' THEN COALESCE(m.amount_ars, 0) ELSE 0 END),
+       SUM(CASE WHEN m.type = 'ingreso' THEN COALESCE(m.amount_usd, 0) ELSE 0 END),
+       SUM(CASE WHEN m.type = 'egreso' THEN COALESCE(m.amount_usd, 0) ELSE 0 END),
+       COALESCE(SUM(c.total), 0),
+       COALESCE(SUM(c.cantidad), 0),
+       COUNT(*)
+FROM cash_movements m
+LEFT JOIN (
+    SELECT movement_id, SUM(amount) AS total, COUNT(*) AS cantidad
+    FROM checks GROUP BY movement_id
+) c ON c.movement_id = m.id
+WHERE m.branch IS NOT NULL AND m.date IS NOT NULL
+GROUP BY m.branch, m.date
+ON CONFLICT (branch, date) DO UPDATE SET
+    ingresos_ars = EXCLUDED.ingresos_ars,
+    egresos_ars = EXCLUDED.egresos_ars,
+    ingresos_usd = EXCLUDED.ingresos_usd,
+    egresos_usd = EXCLUDED.egresos_usd,
+    cheques_total = EXCLUDED.cheques_total,
+    cheques_count = EXCLUDED.cheques_count,
+    movement_count = EXCLUDED.movement_count;
+
+-- Planilla del día: movimientos con concepto y cheques, más los totales
+CREATE OR REPLACE FUNCTION planilla_caja_diaria(p_date DATE, p_branch TEXT) RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'totals', COALESCE((
+            SELECT to_jsonb(t) || jsonb_build_object('saldo_ars', t.ingresos_ars - t.egresos_ars)
+            FROM cash_daily_totals t
+            WHERE t.branch = p_branch AND t.date = p_date
+        ), jsonb_build_object(
+            'branch', p_branch, 'date', p_date,
+            'ingresos_ars', 0, 'egresos_ars', 0, 'ingresos_usd', 0, 'egresos_usd', 0,
+            'cheques_total', 0, 'cheques_count', 0, 'movement_count', 0,
+            'closed_at', NULL, 'closed_by', NULL, 'saldo_ars', 0
+        )),
+        'movements', COALESCE((
+            SELECT jsonb_agg(
+                to_jsonb(m)
+                || jsonb_build_object('cash_concepts', jsonb_build_object('name', cc.name, 'type', cc.type))
+                || jsonb_build_object('checks', COALESCE((
+                    SELECT jsonb_agg(to_jsonb(ch) ORDER BY ch.due_date)
+                    FROM checks ch WHERE ch.movement_id = m.id
+                ), '[]'::jsonb))
+                ORDER BY m.created_at
+            )
+            FROM cash_movements m
+            LEFT JOIN cash_concepts cc ON cc.id = m.concept_id
+            WHERE m.date = p_date AND m.branch = p_branch
+        ), '[]'::jsonb)
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Cierre del día: instantáneo, los totales ya están calculados
+DROP FUNCTION IF EXISTS cerrar_caja_diaria(DATE, TEXT, UUID);
+
+CREATE OR REPLACE FUNCTION cerrar_caja_diaria(p_date DATE, p_branch TEXT) RETURNS JSONB AS $$
+DECLARE
+    v_row cash_daily_totals;
+BEGIN
+    -- Mismo criterio que la app: vale siempre, armador nunca, el resto con cash.movements
+    IF NOT EXISTS (
+        SELECT 1 FROM profiles pr
+        WHERE pr.id = auth.uid()
+          AND (pr.role = 'vale' OR (pr.role <> 'armador' AND EXISTS (
+              SELECT 1 FROM user_permissions up
+              WHERE up.user_id = pr.id AND up.permission_key = 'cash.movements'
+          )))
+    ) THEN
+        RAISE EXCEPTION 'No tenés permiso para cerrar la caja';
+    END IF;
+
+    INSERT INTO cash_daily_totals (branch, date) VALUES (p_branch, p_date)
+    ON CONFLICT (branch, date) DO NOTHING;
+
+    UPDATE cash_daily_totals SET closed_at = NOW(), closed_by = auth.uid()
+    WHERE branch = p_branch AND date = p_date AND closed_at IS NULL
+    RETURNING * INTO v_row;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'La caja de % del % ya está cerrada', p_branch, to_char(p_date, 'DD/MM/YYYY');
+    END IF;
+
+    RETURN to_jsonb(v_row) || jsonb_build_object('saldo_ars', v_row.ingresos_ars - v_row.egresos_ars);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- El ajuste de totales solo lo llaman los triggers, no se expone por RPC
+REVOKE EXECUTE ON FUNCTION caja_aplicar_delta(TEXT, DATE, INTEGER, NUMERIC, NUMERIC, NUMERIC, NUMERIC, NUMERIC, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+
+-- Reabrir un día cerrado por error: solo administradores
+CREATE OR REPLACE FUNCTION reabrir_caja_diaria(p_date DATE, p_branch TEXT) RETURNS JSONB AS $$
+DECLARE
+    v_row cash_daily_totals;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM profiles WHERE id = auth.uid() AND role = 'vale') THEN
+        RAISE EXCEPTION 'Solo un administrador puede reabrir la caja';
+    END IF;
+
+    UPDATE cash_daily_totals SET closed_at = NULL, closed_by = NULL
+    WHERE branch = p_branch AND date = p_date AND closed_at IS NOT NULL
+    RETURNING * INTO v_row;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'La caja de % del % no está cerrada', p_branch, to_char(p_date, 'DD/MM/YYYY');
+    END IF;
+
+    RETURN to_jsonb(v_row) || jsonb_build_object('saldo_ars', v_row.ingresos_ars - v_row.egresos_ars);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION cerrar_caja_diaria(DATE, TEXT) FROM PUBLIC, anon;
+REVOKE EXECUTE ON FUNCTION reabrir_caja_diaria(DATE, TEXT) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION cerrar_caja_diaria(DATE, TEXT) TO authenticated;
+GRANT EXECUTE ON FUNCTION reabrir_caja_diaria(DATE, TEXT) TO authenticated;
@@ -0,0 +1,94 @@
+-- ========================================================
+-- RESUMEN DE PAGOS POR PROVEEDOR Y CUENTA
+-- El tablero de pagos sumaba en el navegador las transferencias que tenía
+-- cargadas (pendientes + últimas 500), así que los totales dependían de cuánto
+-- historial se había bajado. Esta tabla guarda lo realizado y lo pendiente de
+-- cada (proveedor, cuenta) y un trigger la ajusta con cada alta, cambio o baja
+-- de transferencias. Las archivadas no suman.
+-- ========================================================
+
+CREATE TABLE IF NOT EXISTS transfer_totals (
+    provider_id TEXT NOT NULL,
+    account_id TEXT NOT NULL DEFAULT '',
+    realized NUMERIC NOT NULL DEFAULT 0,
+    pending NUMERIC NOT NULL DEFAULT 0,
+    realized_count INTEGER NOT NULL DEFAULT 0,
+    pending_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (provider_id, account_id)
+);
+
+ALTER TABLE transfer_totals ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Totales de pagos: lectura" ON transfer_totals;
+CREATE POLICY "Totales de pagos: lectura" ON transfer_totals
+    FOR SELECT TO authenticated USING (TRUE);
+
+-- La lista de pagos pide pendientes por un lado e historial reciente por otro
+CREATE INDEX IF NOT EXISTS idx_transfers_status_created
+    ON transfers (status, created_at DESC);
+
+CREATE OR REPLACE FUNCTION pagos_aplicar_delta(
+    p_provider_id TEXT,
+    p_account_id TEXT,
+    p_status TEXT,
+    p_amount NUMERIC,
+    p_sign INTEGER
+) RETURNS VOID AS $$
+BEGIN
+    IF p_provider_id IS NULL OR p_status NOT IN ('Realizado', 'Pendiente') THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO transfer_totals AS t (provider_id, account_id, realized, pending, realized_count, pending_count)
+    VALUES (
+        p_provider_id,
+        COALESCE(p_account_id, ''),
+        CASE WHEN p_status = 'Realizado' THEN p_sign * COALESCE(p_amount, 0) ELSE 0 END,
+        CASE WHEN p_status = 'Pendiente' THEN p_sign * COALESCE(p_amount, 0) ELSE 0 END,
+        CASE WHEN p_status = 'Realizado' THEN p_sign ELSE 0 END,
+        CASE WHEN p_status = 'Pendiente' THEN p_sign ELSE 0 END
+    )
+    ON CONFLICT (provider_id, account_id) DO UPDATE SET
+        realized = t.realized + EXCLUDED.realized,
+        pending = t.pending + EXCLUDED.pending,
+        realized_count = t.realized_count + EXCLUDED.realized_count,
+        pending_count = t.pending_count + EXCLUDED.pending_count,
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Solo la usa el trigger: no se puede llamar por la API
+REVOKE EXECUTE ON FUNCTION pagos_aplicar_delta(TEXT, TEXT, TEXT, NUMERIC, INTEGER) FROM PUBLIC, anon, authenticated;
+
+CREATE OR REPLACE FUNCTION actualizar_totales_pagos() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM pagos_aplicar_delta(OLD.provider_id::text, OLD.account_id::text, OLD.status::text, OLD.amount, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM pagos_aplicar_delta(NEW.provider_id::text, NEW.account_id::text, NEW.status::text, NEW.amount, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS trg_actualizar_totales_pagos ON transfers;
+CREATE TRIGGER trg_actualizar_totales_pagos
+    AFTER INSERT OR DELETE OR UPDATE OF provider_id, account_id, status, amount ON transfers
+    FOR EACH ROW EXECUTE FUNCTION actualizar_totales_pagos();
+
+-- Carga inicial con lo que ya existe
+DELETE FROM transfer_totals;
+
+INSERT INTO transfer_totals (provider_id, account_id, realized, pending, realized_count, pending_count)
+SELECT provider_id::text,
+       COALESCE(account_id::text, ''),
+       COALESCE(SUM(amount) FILTER (WHERE status::text = 'Realizado'), 0),
+       COALESCE(SUM(amount) FILTER (WHERE status::text = 'Pendiente'), 0),
+       COUNT(*) FILTER (WHERE status::text = 'Realizado'),
+       COUNT(*) FILTER (WHERE status::text = 'Pendiente')
+FROM transfers
+WHERE provider_id IS NOT NULL
+  AND status::text IN ('Realizado', 'Pendiente')
+GROUP BY provider_id::text, COALESCE(account_id::text, '');
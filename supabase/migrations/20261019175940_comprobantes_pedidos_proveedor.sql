@@ -0,0 +1,88 @@
+-- ========================================================
+-- COMPROBANTES DE PEDIDOS A PROVEEDOR (supplierAttachments.ts)
+-- El pedido se crea sin esperar al PDF y el comprobante se vincula cuando
+-- termina de subir. Sumar la URL en el servidor evita que dos subidas que
+-- terminan juntas (o una edición desde el detalle) se pisen la lista.
+-- Los archivos se nombran por el hash de su contenido: el mismo archivo en
+-- dos pedidos es un solo objeto en el bucket. Quitar un comprobante también
+-- se hace en el servidor. liberar_comprobantes_pedido_proveedor devuelve los
+-- archivos que ningún pedido usa y el navegador los borra por la API de
+-- Storage (storage.objects es de Storage: borrar la fila a mano deja el
+-- archivo huérfano o lo rechaza un trigger). Vincular y liberar toman el
+-- mismo candado, y vincular falla (y se reintenta subiendo) si el archivo ya
+-- no está.
+-- ========================================================
+
+CREATE OR REPLACE FUNCTION adjuntar_comprobante_pedido_proveedor(p_order_id TEXT, p_url TEXT)
+RETURNS TEXT AS $$
+DECLARE
+    v_pdf_url TEXT;
+    v_path TEXT := split_part(p_url, '/supplier-orders/', 2);
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('supplier_order_attachments'));
+
+    IF v_path <> '' AND NOT EXISTS (
+        SELECT 1 FROM storage.objects WHERE bucket_id = 'supplier-orders' AND name = v_path
+    ) THEN
+        RAISE EXCEPTION 'El comprobante % ya no está en el bucket', v_path;
+    END IF;
+
+    UPDATE supplier_orders SET
+        pdf_url = CASE
+            WHEN pdf_url IS NULL OR pdf_url = '' THEN p_url
+            WHEN p_url = ANY(string_to_array(pdf_url, ',')) THEN pdf_url
+            ELSE pdf_url || ',' || p_url
+        END
+    WHERE id::text = p_order_id
+    RETURNING pdf_url INTO v_pdf_url;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Pedido % inexistente', p_order_id;
+    END IF;
+
+    RETURN v_pdf_url;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, storage;
+
+CREATE OR REPLACE FUNCTION quitar_comprobante_pedido_proveedor(p_order_id TEXT, p_url TEXT)
+RETURNS TEXT AS $$
+DECLARE
+    v_pdf_url TEXT;
+BEGIN
+    UPDATE supplier_orders SET
+        pdf_url = array_to_string(array_remove(string_to_array(pdf_url, ','), p_url), ',')
+    WHERE id::text = p_order_id
+    RETURNING pdf_url INTO v_pdf_url;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Pedido % inexistente', p_order_id;
+    END IF;
+
+    RETURN v_pdf_url;
+END;
+$$ LANGUAGE plpgsql SET search_path = public;
+
+-- De los archivos dados, los que ningún pedido referencia (para borrarlos del bucket)
+CREATE OR REPLACE FUNCTION liberar_comprobantes_pedido_proveedor(p_paths TEXT[])
+RETURNS TEXT[] AS $$
+DECLARE
+    v_unused TEXT[];
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('supplier_order_attachments'));
+
+    SELECT COALESCE(array_agg(DISTINCT p.path), '{}')
+    INTO v_unused
+    FROM unnest(p_paths) AS p(path)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM supplier_orders s
+        WHERE s.pdf_url LIKE '%/supplier-orders/' || p.path || '%'
+    );
+
+    RETURN v_unused;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION adjuntar_comprobante_pedido_proveedor(TEXT, TEXT) FROM PUBLIC, anon;
+REVOKE EXECUTE ON FUNCTION liberar_comprobantes_pedido_proveedor(TEXT[]) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION adjuntar_comprobante_pedido_proveedor(TEXT, TEXT) TO authenticated;
+GRANT EXECUTE ON FUNCTION liberar_comprobantes_pedido_proveedor(TEXT[]) TO authenticated;
@@ -0,0 +1,142 @@
+-- ========================================================
+-- PRESUPUESTOS GUARDADOS: FOTO DE PRECIOS Y PASE A PEDIDO
+-- El presupuestador insertaba la cabecera y después los ítems en dos
+-- llamadas (si la segunda fallaba quedaba un presupuesto vacío), y al usarlo
+-- en un pedido el navegador rearmaba el pedido renglón por renglón y borraba
+-- el presupuesto en otra llamada. Ahora:
+--   * guardar_presupuesto toma precios de master_products según la lista del
+--     cliente, aplica el redondeo comercial y guarda cabecera e ítems juntos.
+--   * convertir_presupuesto_en_pedido crea orders + order_items desde esa
+--     foto y borra el presupuesto en la misma transacción.
+-- ========================================================
+
+ALTER TABLE saved_budgets ADD COLUMN IF NOT EXISTS price_list INTEGER;
+ALTER TABLE saved_budgets ADD COLUMN IF NOT EXISTS item_count INTEGER;
+ALTER TABLE saved_budgets ADD COLUMN IF NOT EXISTS created_by UUID;
+
+-- Precio de lista al momento de presupuestar (unit_price es el ya redondeado)
+ALTER TABLE saved_budget_items ADD COLUMN IF NOT EXISTS list_price NUMERIC;
+
+UPDATE saved_budgets b SET item_count = (
+    SELECT COUNT(*) FROM saved_budget_items i WHERE i.budget_id = b.id
+)
+WHERE item_count IS NULL;
+
+-- Mismo criterio que roundToCommercial (logic.ts): múltiplos de 50. Un
+-- precio que redondeado daría cero se deja como está.
+CREATE OR REPLACE FUNCTION redondeo_comercial(p_value NUMERIC) RETURNS NUMERIC AS $$
+    SELECT CASE
+        WHEN COALESCE(p_value, 0) = 0 THEN 0
+        WHEN ROUND(p_value / 50) * 50 = 0 THEN p_value
+        ELSE ROUND(p_value / 50) * 50
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- p_items: [{ "codart": "...", "quantity": 3 }, ...]
+CREATE OR REPLACE FUNCTION guardar_presupuesto(
+    p_client_code TEXT,
+    p_price_list INTEGER,
+    p_items JSONB,
+    p_user_id UUID DEFAULT auth.uid()
+) RETURNS JSONB AS $$
+DECLARE
+    v_budget_id saved_budgets.id%TYPE;
+    v_total NUMERIC;
+    v_count INTEGER;
+    v_missing TEXT;
+BEGIN
+    IF p_items IS NULL OR jsonb_array_length(p_items) = 0 THEN
+        RAISE EXCEPTION 'El presupuesto no tiene artículos';
+    END IF;
+
+    CREATE TEMP TABLE tmp_presupuesto ON COMMIT DROP AS
+    SELECT x.codart,
+           SUM(x.quantity) AS quantity,
+           m.desart AS name,
+           CASE p_price_list
+               WHEN 2 THEN m.pventa_2
+               WHEN 3 THEN m.pventa_3
+               WHEN 4 THEN m.pventa_4
+               ELSE m.pventa_1
+           END AS list_price,
+           bool_or(m.codart IS NULL) AS missing
+    FROM jsonb_to_recordset(p_items) AS x(codart TEXT, quantity NUMERIC)
+    LEFT JOIN master_products m ON m.codart = x.codart
+    GROUP BY x.codart, m.desart, m.pventa_1, m.pventa_2, m.pventa_3, m.pventa_4;
+
+    SELECT string_agg(codart, ', ') INTO v_missing FROM tmp_presupuesto WHERE missing;
+    IF v_missing IS NOT NULL THEN
+        RAISE EXCEPTION 'Artículos inexistentes: %', v_missing;
+    END IF;
+
+    SELECT COALESCE(SUM(quantity * redondeo_comercial(list_price)), 0), COUNT(*)
+    INTO v_total, v_count
+    FROM tmp_presupuesto;
+
+    INSERT INTO saved_budgets (client_code, total, price_list, item_count, created_by)
+    VALUES (p_client_code, v_total, p_price_list, v_count, p_user_id)
+    RETURNING id INTO v_budget_id;
+
+    INSERT INTO saved_budget_items (budget_id, codart, name, quantity, list_price, unit_price)
+    SELECT v_budget_id, codart, name, quantity, list_price, redondeo_comercial(list_price)
+    FROM tmp_presupuesto
+    ORDER BY name;
+
+    RETURN jsonb_build_object('id', v_budget_id, 'total', v_total, 'item_count', v_count);
+END;
+$$ LANGUAGE plpgsql;
+
+-- p_order: cabecera del pedido con los nombres de columna de orders
+-- (client_name, zone, observations, history, is_reservation, scheduled_date,
+-- created_by). Estado, total, número e ítems los pone la función.
+CREATE OR REPLACE FUNCTION convertir_presupuesto_en_pedido(p_budget_id TEXT, p_order JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    v_budget saved_budgets%ROWTYPE;
+    v_order_id orders.id%TYPE;
+    v_display_id TEXT;
+    v_total NUMERIC;
+    v_count INTEGER;
+BEGIN
+    -- Dos clics seguidos no generan dos pedidos
+    SELECT * INTO v_budget FROM saved_budgets WHERE id::text = p_budget_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'El presupuesto ya no existe (¿ya se convirtió en pedido?)';
+    END IF;
+
+    SELECT COALESCE(SUM(quantity * unit_price), 0), COUNT(*)
+    INTO v_total, v_count
+    FROM saved_budget_items
+    WHERE budget_id = v_budget.id;
+
+    IF v_count = 0 THEN
+        RAISE EXCEPTION 'El presupuesto no tiene artículos';
+    END IF;
+
+    v_display_id := 'PED-' || FLOOR(EXTRACT(EPOCH FROM clock_timestamp()) * 1000)::BIGINT;
+
+    -- jsonb_populate_record convierte cada campo al tipo de su columna (zona, estado)
+    INSERT INTO orders (
+        display_id, client_name, total, status, zone, observations, history,
+        is_reservation, scheduled_date, created_by
+    )
+    SELECT r.display_id, r.client_name, r.total, r.status, r.zone, r.observations, r.history,
+           COALESCE(r.is_reservation, FALSE), r.scheduled_date, r.created_by
+    FROM jsonb_populate_record(
+        NULL::orders,
+        p_order || jsonb_build_object('display_id', v_display_id, 'total', v_total, 'status', 'en_armado')
+    ) r
+    RETURNING id INTO v_order_id;
+
+    INSERT INTO order_items (order_id, code, name, quantity, original_quantity, unit_price, subtotal, is_checked)
+    SELECT v_order_id, codart, name, quantity, quantity, unit_price, quantity * unit_price, FALSE
+    FROM saved_budget_items
+    WHERE budget_id = v_budget.id
+    ORDER BY name;
+
+    DELETE FROM saved_budget_items WHERE budget_id = v_budget.id;
+    DELETE FROM saved_budgets WHERE id = v_budget.id;
+
+    RETURN jsonb_build_object('id', v_order_id, 'display_id', v_display_id, 'total', v_total, 'item_count', v_count);
+END;
+$$ LANGUAGE plpgsql;
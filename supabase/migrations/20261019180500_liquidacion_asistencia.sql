@@ -0,0 +1,75 @@
+-- ========================================================
+-- LIQUIDACIÓN DE ASISTENCIA EN UNA TRANSACCIÓN
+-- Guardar una quincena sumaba las métricas en attendance_performance y
+-- después insertaba el período en attendance_periods, en dos llamadas: si
+-- la segunda fallaba las métricas ya estaban sumadas y reintentar las sumaba
+-- otra vez, y nada impedía guardar dos veces la misma quincena.
+-- guardar_liquidacion_asistencia recibe uno o varios períodos (liquidación
+-- individual o "Liquidar todos"), rechaza los que ya existen para ese
+-- trabajador y rango de fechas, y hace inserción y acumulado juntos.
+-- ========================================================
+
+CREATE INDEX IF NOT EXISTS idx_attendance_periods_user_range
+    ON attendance_periods (user_id, start_date, end_date);
+
+-- p_periods: [{ ...columnas de attendance_periods, "metrics": { early_arrivals, late_arrivals, ... } }, ...]
+CREATE OR REPLACE FUNCTION guardar_liquidacion_asistencia(p_periods JSONB) RETURNS JSONB AS $$
+DECLARE
+    v_duplicados TEXT;
+    v_count INTEGER;
+BEGIN
+    IF p_periods IS NULL OR jsonb_array_length(p_periods) = 0 THEN
+        RAISE EXCEPTION 'No hay quincenas para guardar';
+    END IF;
+
+    -- Dos guardados simultáneos de la misma quincena se ordenan y el segundo la encuentra
+    PERFORM pg_advisory_xact_lock(hashtext('attendance_periods'));
+
+    SELECT string_agg(DISTINCT COALESCE(pr.name, p.user_id::text) || ' (' || p.period_label || ')', ', ')
+    INTO v_duplicados
+    FROM jsonb_populate_recordset(NULL::attendance_periods, p_periods) p
+    LEFT JOIN profiles pr ON pr.id = p.user_id
+    WHERE EXISTS (
+        SELECT 1 FROM attendance_periods a
+        WHERE a.user_id = p.user_id AND a.start_date = p.start_date AND a.end_date = p.end_date
+    );
+
+    IF v_duplicados IS NOT NULL THEN
+        RAISE EXCEPTION 'Ya hay quincenas guardadas para: %', v_duplicados;
+    END IF;
+
+    INSERT INTO attendance_periods (
+        user_id, start_date, end_date, period_label, total_hours, total_penalty_hours,
+        hourly_rate, bonus_amount, extra_amount, debt_amount, total_to_pay, details,
+        score_obtained, days_worked
+    )
+    SELECT user_id, start_date, end_date, period_label, total_hours, total_penalty_hours,
+           hourly_rate, bonus_amount, extra_amount, debt_amount, total_to_pay, details,
+           score_obtained, days_worked
+    FROM jsonb_populate_recordset(NULL::attendance_periods, p_periods);
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+
+    INSERT INTO attendance_performance AS a (
+        user_id, early_arrivals, late_arrivals, justified_count, total_issues,
+        holidays_worked, absences, scheduled_days, marked_days, updated_at
+    )
+    SELECT m.user_id,
+           SUM(m.early_arrivals), SUM(m.late_arrivals), SUM(m.justified_count), SUM(m.total_issues),
+           SUM(m.holidays_worked), SUM(m.absences), SUM(m.scheduled_days), SUM(m.marked_days), NOW()
+    FROM jsonb_array_elements(p_periods) e
+    CROSS JOIN LATERAL jsonb_populate_record(NULL::attendance_performance, e->'metrics') m
+    GROUP BY m.user_id
+    ON CONFLICT (user_id) DO UPDATE SET
+        early_arrivals = COALESCE(a.early_arrivals, 0) + EXCLUDED.early_arrivals,
+        late_arrivals = COALESCE(a.late_arrivals, 0) + EXCLUDED.late_arrivals,
+        justified_count = COALESCE(a.justified_count, 0) + EXCLUDED.justified_count,
+        total_issues = COALESCE(a.total_issues, 0) + EXCLUDED.total_issues,
+        holidays_worked = COALESCE(a.holidays_worked, 0) + EXCLUDED.holidays_worked,
+        absences = COALESCE(a.absences, 0) + EXCLUDED.absences,
+        scheduled_days = COALESCE(a.scheduled_days, 0) + EXCLUDED.scheduled_days,
+        marked_days = COALESCE(a.marked_days, 0) + EXCLUDED.marked_days,
+        updated_at = NOW();
+
+    RETURN jsonb_build_object('saved', v_count);
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,127 @@
+-- ========================================================
+-- VENCIMIENTOS MANUALES VINCULADOS A MASTER_PRODUCTS
+-- La carga manual guardaba solo el nombre tipeado ("2x4 speed 250"), así que
+-- ni el tablero ni nadie podía cruzar un vencimiento con stock o precio.
+-- Ahora el navegador separa los renglones y ingresar_vencimientos busca el
+-- artículo de cada uno: primero por código, código de barras o descripción
+-- exacta, y si no, por parecido de palabras contra un índice de trigramas de
+-- las descripciones. Se guarda el codart (o NULL si no hubo candidato) con el
+-- puntaje, y la función devuelve el resultado de cada renglón para que se
+-- revisen los que no se pudieron vincular.
+-- La vista vencimientos_alertas junta carga manual e ingresos ya resueltos
+-- contra master_products para el tablero.
+-- ========================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Índice de nombres para la búsqueda aproximada
+CREATE INDEX IF NOT EXISTS idx_master_products_desart_trgm
+    ON master_products USING GIN (lower(desart) gin_trgm_ops);
+
+ALTER TABLE product_expirations ADD COLUMN IF NOT EXISTS codart TEXT;
+ALTER TABLE product_expirations ADD COLUMN IF NOT EXISTS remaining_quantity NUMERIC;
+ALTER TABLE product_expirations ADD COLUMN IF NOT EXISTS match_score REAL;
+ALTER TABLE product_expirations ADD COLUMN IF NOT EXISTS raw_line TEXT;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'product_expirations_codart_fkey') THEN
+        ALTER TABLE product_expirations
+            ADD CONSTRAINT product_expirations_codart_fkey
+            FOREIGN KEY (codart) REFERENCES master_products(codart) ON DELETE SET NULL;
+    END IF;
+END $$;
+
+UPDATE product_expirations SET remaining_quantity = total_quantity WHERE remaining_quantity IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_product_expirations_codart ON product_expirations (codart);
+CREATE INDEX IF NOT EXISTS idx_product_expirations_expiry ON product_expirations (expiry_date);
+CREATE INDEX IF NOT EXISTS idx_stock_inbound_items_expiry
+    ON stock_inbound_items (expiry_date) WHERE expiry_date IS NOT NULL;
+
+-- Mejor candidato por parecido de palabras (el nombre tipeado suele ser una
+-- parte de la descripción: "speed 250" dentro de "SPEED ENERGY 250CC")
+CREATE OR REPLACE FUNCTION buscar_articulo_por_nombre(
+    p_name TEXT,
+    OUT codart TEXT,
+    OUT desart TEXT,
+    OUT score REAL
+) AS $$
+    SELECT m.codart, m.desart, word_similarity(lower(p_name), lower(m.desart))
+    FROM master_products m
+    WHERE lower(p_name) <% lower(m.desart)
+      AND COALESCE(m.familia, '') <> 'ELIMINADOS'
+    ORDER BY lower(p_name) <<-> lower(m.desart), m.desart
+    LIMIT 1;
+$$ LANGUAGE sql STABLE SET pg_trgm.word_similarity_threshold = 0.45;
+
+-- p_items: [{ "raw_line": "...", "product_name": "speed 250", "quantity": 8, "expiry_date": "2026-06-02" }, ...]
+CREATE OR REPLACE FUNCTION ingresar_vencimientos(p_items JSONB) RETURNS JSONB AS $$
+DECLARE
+    v_result JSONB;
+BEGIN
+    IF p_items IS NULL OR jsonb_array_length(p_items) = 0 THEN
+        RETURN '[]'::JSONB;
+    END IF;
+
+    WITH entrada AS (
+        SELECT x.raw_line, trim(x.product_name) AS product_name, x.quantity, x.expiry_date
+        FROM jsonb_to_recordset(p_items) AS x(raw_line TEXT, product_name TEXT, quantity NUMERIC, expiry_date DATE)
+    ), emparejado AS (
+        SELECT e.*,
+               COALESCE(exacto.codart, aprox.codart) AS codart,
+               CASE WHEN exacto.codart IS NOT NULL THEN 1 ELSE aprox.score END AS score
+        FROM entrada e
+        LEFT JOIN LATERAL (
+            SELECT m.codart FROM master_products m
+            WHERE m.codart = e.product_name
+               OR m.cbarra = e.product_name
+               OR lower(m.desart) = lower(e.product_name)
+            LIMIT 1
+        ) exacto ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT b.codart, b.score FROM buscar_articulo_por_nombre(e.product_name) b
+            WHERE exacto.codart IS NULL
+        ) aprox ON TRUE
+    ), insertado AS (
+        INSERT INTO product_expirations (product_name, total_quantity, remaining_quantity, expiry_date, codart, match_score, raw_line)
+        SELECT product_name, quantity, quantity, expiry_date, codart, score, raw_line
+        FROM emparejado
+        RETURNING id, raw_line, product_name, codart, match_score
+    )
+    SELECT COALESCE(jsonb_agg(jsonb_build_object(
+               'id', i.id,
+               'raw_line', i.raw_line,
+               'product_name', i.product_name,
+               'codart', i.codart,
+               'desart', m.desart,
+               'match_score', i.match_score
+           )), '[]'::JSONB)
+    INTO v_result
+    FROM insertado i
+    LEFT JOIN master_products m ON m.codart = i.codart;
+
+    RETURN v_result;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Vencimientos de carga manual e ingresos con la descripción del maestro
+CREATE OR REPLACE VIEW vencimientos_alertas WITH (security_invoker = true) AS
+SELECT 'manual'::TEXT AS origen,
+       e.id::TEXT AS id,
+       e.codart,
+       COALESCE(m.desart, e.product_name) AS product_name,
+       COALESCE(e.remaining_quantity, e.total_quantity) AS quantity,
+       e.expiry_date
+FROM product_expirations e
+LEFT JOIN master_products m ON m.codart = e.codart
+UNION ALL
+SELECT 'ingreso'::TEXT,
+       i.id::TEXT,
+       i.codart,
+       m.desart,
+       i.quantity,
+       i.expiry_date
+FROM stock_inbound_items i
+LEFT JOIN master_products m ON m.codart = i.codart
+WHERE i.expiry_date IS NOT NULL;
@@ -0,0 +1,278 @@
+import { supabase, supabaseUrl, supabaseAnonKey } from './supabase';
+
+// ==========================================
+// COMPROBANTES DE PEDIDOS A PROVEEDOR
+// ==========================================
+// El pedido se guarda primero y el comprobante se sube después, sin que el
+// formulario espere. Cada archivo se guarda bajo el hash de su contenido: si
+// ya estaba subido (el mismo PDF en dos pedidos) no se vuelve a mandar. Los
+// archivos grandes van por la subida reanudable de Storage (protocolo tus) en
+// tramos: si la conexión se corta, el reintento sigue desde el último tramo
+// confirmado en lugar de empezar de cero. Las fotos de comprobantes se
+// reducen y recomprimen en el navegador antes de subir.
+
+const BUCKET = 'supplier-orders';
+
+// Por encima de este tamaño se usa la subida por tramos (Storage exige tramos de 6 MB)
+const RESUMABLE_THRESHOLD = 6 * 1024 * 1024;
+const CHUNK_SIZE = 6 * 1024 * 1024;
+const CHUNK_RETRIES = 3;
+const JOB_RETRY_DELAYS_MS = [2000, 8000, 30000];
+
+// Fotos de comprobantes: lado mayor y calidad JPEG tras recomprimir
+const IMAGE_MAX_SIDE = 2000;
+const IMAGE_QUALITY = 0.8;
+
+const RESUME_KEY_PREFIX = 'supplier_upload_';
+
+export interface AttachmentUpload {
+    orderId: string;
+    fileName: string;
+    /** 0..1 */
+    progress: number;
+    error?: string;
+}
+
+type Listener = (uploads: Map<string, AttachmentUpload>) => void;
+
+let uploads = new Map<string, AttachmentUpload>();
+const listeners = new Set<Listener>();
+
+const setUpload = (orderId: string, upload: AttachmentUpload | null) => {
+    uploads = new Map(uploads);
+    if (upload) uploads.set(orderId, upload);
+    else uploads.delete(orderId);
+    listeners.forEach(l => l(uploads));
+};
+
+/** Se suscribe a las subidas en segundo plano (por id de pedido). */
+export const subscribeAttachmentUploads = (listener: Listener): (() => void) => {
+    listeners.add(listener);
+    listener(uploads);
+    return () => { listeners.delete(listener); };
+};
+
+// Cerrar la pestaña con una subida en curso la corta: se avisa antes
+if (typeof window !== 'undefined') {
+    window.addEventListener('beforeunload', (e) => {
+        const active = Array.from(uploads.values()).some(u => !u.error);
+        if (active) {
+            e.preventDefault();
+            e.returnValue = '';
+        }
+    });
+}
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+const hashBlob = async (blob: Blob): Promise<string> => {
+    const buffer = await blob.arrayBuffer();
+    if (typeof crypto !== 'undefined' && crypto.subtle) {
+        const digest = await crypto.subtle.digest('SHA-256', buffer);
+        return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+    }
+    // Sin contexto seguro (http en la red local) no hay crypto.subtle. Un hash
+    // corto puede chocar y vincular el archivo de otro pedido: se usa un nombre
+    // único y ese archivo no se comparte
+    const suffix = Array.from(crypto.getRandomValues(new Uint8Array(8))).map(b => b.toString(16).padStart(2, '0')).join('');
+    return `u${Date.now().toString(36)}_${suffix}`;
+};
+
+/**
+ * Reduce fotos y escaneos en imagen a JPEG de hasta IMAGE_MAX_SIDE px.
+ * Los PDF se suben tal cual: recomprimirlos exigiría rasterizar cada página.
+ */
+const compressScan = async (file: File): Promise<{ blob: Blob; ext: string; contentType: string }> => {
+    const original = { blob: file as Blob, ext: (file.name.split('.').pop() || 'pdf').toLowerCase(), contentType: file.type || 'application/pdf' };
+    if (!file.type.startsWith('image/') || typeof createImageBitmap === 'undefined') return original;
+    try {
+        const bitmap = await createImageBitmap(file);
+        const scale = Math.min(1, IMAGE_MAX_SIDE / Math.max(bitmap.width, bitmap.height));
+        const canvas = document.createElement('canvas');
+        canvas.width = Math.round(bitmap.width * scale);
+        canvas.height = Math.round(bitmap.height * scale);
+        const ctx = canvas.getContext('2d');
+        if (!ctx) return original;
+        ctx.fillStyle = '#fff';
+        ctx.fillRect(0, 0, canvas.width, canvas.height);
+        ctx.drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+        bitmap.close();
+        const blob = await new Promise<Blob | null>(resolve => canvas.toBlob(resolve, 'image/jpeg', IMAGE_QUALITY));
+        if (!blob || blob.size >= file.size) return original;
+        return { blob, ext: 'jpg', contentType: 'image/jpeg' };
+    } catch {
+        return original;
+    }
+};
+
+const isAlreadyStored = (status: number, message?: string) =>
+    status === 409 || /exists|duplicate/i.test(message || '');
+
+const b64 = (text: string) => btoa(unescape(encodeURIComponent(text)));
+
+const tusHeaders = async (): Promise<Record<string, string>> => {
+    const { data: { session } } = await supabase.auth.getSession();
+    return {
+        'Tus-Resumable': '1.0.0',
+        apikey: supabaseAnonKey,
+        authorization: `Bearer ${session?.access_token || supabaseAnonKey}`
+    };
+};
+
+// Sube por tramos; la URL de la subida queda en localStorage para retomarla
+const uploadResumable = async (path: string, blob: Blob, contentType: string, onProgress: (p: number) => void) => {
+    const endpoint = `${supabaseUrl}/storage/v1/upload/resumable`;
+    const resumeKey = RESUME_KEY_PREFIX + path;
+    const headers = await tusHeaders();
+
+    let location = localStorage.getItem(resumeKey);
+    let offset = 0;
+
+    if (location) {
+        const head = await fetch(location, { method: 'HEAD', headers });
+        if (head.ok) {
+            offset = Number(head.headers.get('Upload-Offset')) || 0;
+        } else {
+            localStorage.removeItem(resumeKey);
+            location = null;
+        }
+    }
+
+    if (!location) {
+        const res = await fetch(endpoint, {
+            method: 'POST',
+            headers: {
+                ...headers,
+                'Upload-Length': String(blob.size),
+                'Upload-Metadata': [
+                    `bucketName ${b64(BUCKET)}`,
+                    `objectName ${b64(path)}`,
+                    `contentType ${b64(contentType)}`,
+                    `cacheControl ${b64('3600')}`
+                ].join(','),
+                'x-upsert': 'false'
+            }
+        });
+        if (isAlreadyStored(res.status)) return;
+        if (!res.ok) throw new Error(`No se pudo iniciar la subida (${res.status})`);
+        location = res.headers.get('Location');
+        if (!location) throw new Error('El servidor no devolvió la dirección de la subida');
+        if (location.startsWith('/')) location = new URL(location, supabaseUrl).toString();
+        localStorage.setItem(resumeKey, location);
+    }
+
+    while (offset < blob.size) {
+        onProgress(offset / blob.size);
+        let attempt = 0;
+        while (true) {
+            try {
+                const res = await fetch(location, {
+                    method: 'PATCH',
+                    headers: {
+                        ...headers,
+                        'Upload-Offset': String(offset),
+                        'Content-Type': 'application/offset+octet-stream'
+                    },
+                    body: blob.slice(offset, offset + CHUNK_SIZE)
+                });
+                if (isAlreadyStored(res.status)) {
+                    localStorage.removeItem(resumeKey);
+                    return;
+                }
+                if (!res.ok) throw new Error(`Falló un tramo de la subida (${res.status})`);
+                offset = Number(res.headers.get('Upload-Offset')) || offset + CHUNK_SIZE;
+                break;
+            } catch (e) {
+                if (++attempt >= CHUNK_RETRIES) throw e;
+                await sleep(1000 * attempt);
+                // Tras un corte, el servidor dice hasta dónde llegó
+                const head = await fetch(location, { method: 'HEAD', headers }).catch(() => null);
+                if (head?.ok) offset = Number(head.headers.get('Upload-Offset')) || offset;
+            }
+        }
+    }
+    localStorage.removeItem(resumeKey);
+};
+
+/**
+ * Sube el archivo (recomprimido si es una imagen) con nombre por hash y
+ * devuelve su URL pública. Si ya existe en el bucket no lo vuelve a subir.
+ */
+export const uploadSupplierAttachment = async (file: File, onProgress: (p: number) => void = () => {}): Promise<string> => {
+    const { blob, ext, contentType } = await compressScan(file);
+    const path = `${await hashBlob(blob)}.${ext}`;
+
+    if (blob.size > RESUMABLE_THRESHOLD) {
+        await uploadResumable(path, blob, contentType, onProgress);
+    } else {
+        const { error } = await supabase.storage.from(BUCKET).upload(path, blob, { contentType, upsert: false });
+        if (error && !isAlreadyStored(0, error.message)) throw error;
+    }
+    onProgress(1);
+    return supabase.storage.from(BUCKET).getPublicUrl(path).data.publicUrl;
+};
+
+/** Suma la URL a los comprobantes del pedido (en el servidor, sin pisar otras). */
+export const linkSupplierAttachment = async (orderId: string, url: string): Promise<string> => {
+    const { data, error } = await supabase.rpc('adjuntar_comprobante_pedido_proveedor', { p_order_id: orderId, p_url: url });
+    if (error) throw error;
+    return data as string;
+};
+
+/**
+ * Sube y vincula el comprobante en segundo plano, con reintentos. El avance
+ * se publica por `subscribeAttachmentUploads`; `onLinked` avisa al terminar.
+ */
+export const attachSupplierOrderFile = (orderId: string, file: File, onLinked?: (pdfUrl: string) => void): void => {
+    const run = async () => {
+        setUpload(orderId, { orderId, fileName: file.name, progress: 0 });
+        for (let attempt = 0; ; attempt++) {
+            try {
+                const url = await uploadSupplierAttachment(file, progress => setUpload(orderId, { orderId, fileName: file.name, progress }));
+                const pdfUrl = await linkSupplierAttachment(orderId, url);
+                setUpload(orderId, null);
+                onLinked?.(pdfUrl);
+                return;
+            } catch (e: any) {
+                if (attempt >= JOB_RETRY_DELAYS_MS.length) {
+                    setUpload(orderId, { orderId, fileName: file.name, progress: 0, error: e?.message || 'Error al subir' });
+                    return;
+                }
+                await sleep(JOB_RETRY_DELAYS_MS[attempt]);
+            }
+        }
+    };
+    run();
+};
+
+/** Quita la URL de los comprobantes del pedido (en el servidor) y devuelve la lista que queda. */
+export const unlinkSupplierAttachment = async (orderId: string, url: string): Promise<string> => {
+    const { data, error } = await supabase.rpc('quitar_comprobante_pedido_proveedor', { p_order_id: orderId, p_url: url });
+    if (error) throw error;
+    return (data as string) || '';
+};
+
+/** Descarta el aviso de una subida que falló. */
+export const dismissAttachmentUpload = (orderId: string) => setUpload(orderId, null);
+
+export const splitAttachmentUrls = (pdfUrl?: string | null): string[] =>
+    (pdfUrl || '').split(',').map(u => u.trim()).filter(Boolean);
+
+/**
+ * Borra del bucket los archivos de `pdfUrl` que ya ningún pedido usa (con
+ * nombres por hash, un mismo archivo puede estar en varios pedidos). Se
+ * llama después de borrar el pedido o de quitarle el comprobante: el
+ * servidor dice cuáles quedaron sin uso y se borran por la API de Storage.
+ */
+export const releaseSupplierAttachments = async (pdfUrl?: string | null) => {
+    const marker = `/${BUCKET}/`;
+    const paths = splitAttachmentUrls(pdfUrl)
+        .map(u => u.includes(marker) ? decodeURIComponent(u.slice(u.indexOf(marker) + marker.length)) : '')
+        .filter(Boolean);
+    if (paths.length === 0) return;
+
+    // Si falla, el archivo solo queda huérfano en el bucket: no se corta el flujo
+    const { data, error } = await supabase.rpc('liberar_comprobantes_pedido_proveedor', { p_paths: paths });
+    const unused = (data || []) as string[];
+    if (!error && unused.length > 0) await supabase.storage.from(BUCKET).remove(unused);
+};
@@ -0,0 +1,27 @@
+/** @type {import('tailwindcss').Config} */
+export default {
+  content: [
+    './index.html',
+    './*.{ts,tsx}',
+    './views/**/*.{ts,tsx}',
+    './components/**/*.{ts,tsx}',
+  ],
+  darkMode: 'class',
+  theme: {
+    extend: {
+      fontFamily: {
+        sans: ['"Spline Sans"', 'sans-serif'],
+      },
+      colors: {
+        background: 'var(--background)',
+        surface: 'var(--surface)',
+        surfaceHighlight: 'var(--surface-highlight)',
+        primary: 'var(--primary)',
+        primaryHover: 'var(--primary-hover)',
+        muted: 'var(--muted)',
+        text: 'var(--text)',
+      }
+    }
+  },
+  plugins: [],
+};
@@ -0,0 +1,151 @@
+import type { Transfer } from './types';
+
+// ==========================================
+// ÍNDICE DE PAGOS POR PROVEEDOR Y CUENTA
+// ==========================================
+// El tablero de pagos recorría todas las transferencias por cada proveedor y
+// por cada cuenta en cada render. Este índice las agrupa una sola vez por
+// proveedor y por cuenta con sus totales (los de `transfer_totals`, que el
+// servidor mantiene sobre todo el historial), y cada alta, cambio o baja
+// solo toca los grupos afectados. Las archivadas no cuentan ni se listan.
+
+export interface TransferBucket {
+    realized: number;
+    pending: number;
+    /** Transferencias cargadas del grupo, más recientes primero. */
+    items: Transfer[];
+}
+
+export interface TransferIndex {
+    byProvider: Map<string, TransferBucket>;
+    byAccount: Map<string, TransferBucket>;
+}
+
+/** Fila de la tabla transfer_totals. */
+export interface TransferTotalsRow {
+    provider_id: string;
+    account_id: string;
+    realized: number;
+    pending: number;
+}
+
+export const EMPTY_TRANSFER_BUCKET: TransferBucket = { realized: 0, pending: 0, items: [] };
+
+export const EMPTY_TRANSFER_INDEX: TransferIndex = { byProvider: new Map(), byAccount: new Map() };
+
+export const mapTransfer = (t: any): Transfer => ({
+    ...t, clientName: t.client_name, date: t.date_text, providerId: t.provider_id, accountId: t.account_id, isLoadedInSystem: t.is_loaded_in_system
+});
+
+const counts = (t: Transfer | undefined): t is Transfer =>
+    !!t && (t.status === 'Realizado' || t.status === 'Pendiente');
+
+const amountOf = (t: Transfer) => Number(t.amount) || 0;
+
+const ensure = (map: Map<string, TransferBucket>, key: string): TransferBucket => {
+    let bucket = map.get(key);
+    if (!bucket) {
+        bucket = { realized: 0, pending: 0, items: [] };
+        map.set(key, bucket);
+    }
+    return bucket;
+};
+
+const addAmount = (bucket: TransferBucket, t: Transfer, sign: 1 | -1) => {
+    if (t.status === 'Realizado') bucket.realized += sign * amountOf(t);
+    else bucket.pending += sign * amountOf(t);
+};
+
+/**
+ * Arma el índice desde la lista cargada. Si vienen los totales del servidor,
+ * los montos salen de ahí (cubren transferencias fuera de la ventana cargada);
+ * si no, se suman las transferencias de la lista.
+ */
+export const buildTransferIndex = (transfers: Transfer[], totals?: TransferTotalsRow[] | null): TransferIndex => {
+    const byProvider = new Map<string, TransferBucket>();
+    const byAccount = new Map<string, TransferBucket>();
+
+    for (const t of transfers) {
+        if (!counts(t)) continue;
+        const p = ensure(byProvider, t.providerId);
+        const a = ensure(byAccount, t.accountId);
+        p.items.push(t);
+        a.items.push(t);
+        if (!totals) {
+            addAmount(p, t, 1);
+            addAmount(a, t, 1);
+        }
+    }
+
+    if (totals) {
+        for (const row of totals) {
+            const realized = Number(row.realized) || 0;
+            const pending = Number(row.pending) || 0;
+            const p = ensure(byProvider, row.provider_id);
+            p.realized += realized;
+            p.pending += pending;
+            if (row.account_id) {
+                const a = ensure(byAccount, row.account_id);
+                a.realized += realized;
+                a.pending += pending;
+            }
+        }
+    }
+
+    return { byProvider, byAccount };
+};
+
+// Copia del grupo sin la transferencia anterior y con la nueva (si cuentan)
+const patchBucket = (bucket: TransferBucket | undefined, prev: Transfer | undefined, next: Transfer | undefined): TransferBucket => {
+    const patched: TransferBucket = {
+        realized: bucket?.realized || 0,
+        pending: bucket?.pending || 0,
+        items: bucket?.items || []
+    };
+    if (prev) addAmount(patched, prev, -1);
+    if (next) addAmount(patched, next, 1);
+
+    const at = prev ? patched.items.findIndex(t => t.id === prev.id) : -1;
+    if (next && at >= 0) {
+        patched.items = patched.items.slice();
+        patched.items[at] = next;
+    } else if (next) {
+        patched.items = [next, ...patched.items];
+    } else if (at >= 0) {
+        patched.items = patched.items.filter((_, i) => i !== at);
+    }
+    return patched;
+};
+
+const patchMap = (
+    map: Map<string, TransferBucket>,
+    keyOf: (t: Transfer) => string,
+    prev: Transfer | undefined,
+    next: Transfer | undefined
+): Map<string, TransferBucket> => {
+    const prevKey = prev ? keyOf(prev) : null;
+    const nextKey = next ? keyOf(next) : null;
+    const out = new Map(map);
+    if (prevKey !== null && prevKey === nextKey) {
+        out.set(prevKey, patchBucket(map.get(prevKey), prev, next));
+        return out;
+    }
+    if (prevKey !== null) out.set(prevKey, patchBucket(map.get(prevKey), prev, undefined));
+    if (nextKey !== null) out.set(nextKey, patchBucket(map.get(nextKey), undefined, next));
+    return out;
+};
+
+/**
+ * Aplica un cambio puntual: `prev` es la transferencia como estaba (undefined
+ * si es un alta) y `next` como queda (undefined si se borró). Devuelve un
+ * índice nuevo que comparte todos los grupos que no cambiaron.
+ */
+export const applyTransferChange = (index: TransferIndex, prev: Transfer | undefined, next: Transfer | undefined): TransferIndex => {
+    const before = counts(prev) ? prev : undefined;
+    const after = counts(next) ? next : undefined;
+    if (!before && !after) return index;
+    return {
+        byProvider: patchMap(index.byProvider, t => t.providerId, before, after),
+        byAccount: patchMap(index.byAccount, t => t.accountId, before, after)
+    };
+};
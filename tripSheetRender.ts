@@ -0,0 +1,280 @@
+import type { Trip } from './types';
+import { loadAutoTable, loadJsPDF } from './lazyLibs';
+
+// ==========================================
+// RENDER DE PLANILLAS DE VIAJE (PDF)
+// ==========================================
+// Dibujo puro con jsPDF + autotable, sin DOM: lo usa el worker
+// (workers/tripSheet.worker.ts) y, si no hay workers, el hilo principal.
+
+export type TripSheetKind = 'delivery' | 'report';
+
+type AutoTable = Awaited<ReturnType<typeof loadAutoTable>>;
+
+const drawDeliverySheet = (doc: any, autoTable: AutoTable, trip: Trip) => {
+    // --- CONFIGURACIÓN ---
+    const marginLeft = 15;
+    const marginTop = 15;
+    doc.setFont('helvetica', 'bold');
+    doc.setFontSize(18);
+    doc.text('PLANILLA DE REPARTO', marginLeft, marginTop);
+
+    doc.setFontSize(11);
+    doc.setFont('helvetica', 'normal');
+    
+    // --- ENCABEZADO ---
+    const headerY = marginTop + 10;
+    const col2X = 150;
+
+    doc.text(`Viaje: ${trip.name || trip.displayId}`, marginLeft, headerY);
+    doc.text(`Chofer: ${trip.driverName}`, marginLeft, headerY + 6);
+    doc.text(`Fecha: ${trip.date}`, marginLeft, headerY + 12);
+    
+    doc.text(`Zona / Ruta: ${trip.route || 'General'}`, col2X, headerY);
+    doc.text(`Total Clientes: ${trip.clients.length}`, col2X, headerY + 6);
+
+    // --- TABLA PRINCIPAL ---
+    const tableStartY = headerY + 20;
+
+    const tableBody = trip.clients.map(client => {
+        const totalDebt = (client.previousBalance || 0) + (client.currentInvoiceAmount || 0);
+        return [
+            client.name.substring(0, 35), // Limitar largo nombre
+            `$ ${(client.previousBalance || 0).toLocaleString('es-AR')}`,
+            `$ ${(client.currentInvoiceAmount || 0).toLocaleString('es-AR')}`,
+            `$ ${totalDebt.toLocaleString('es-AR')}`,
+            '', // Entrega efectivo (Vacío)
+            '', // Transferencia (Vacío)
+            ''  // Saldo actual (Vacío)
+        ];
+    });
+
+    autoTable(doc, {
+        startY: tableStartY,
+        head: [['CLIENTE', 'SALDO ANT.', 'FACTURA', 'TOTAL', 'EFECTIVO', 'TRANSF.', 'SALDO FINAL']],
+        body: tableBody,
+        theme: 'grid', // Bordes visibles
+        styles: {
+            fontSize: 11,
+            cellPadding: 3,
+            textColor: [0, 0, 0], // Negro
+            lineColor: [0, 0, 0], // Bordes negros
+            lineWidth: 0.1,
+            valign: 'middle'
+        },
+        headStyles: {
+            fillColor: [220, 220, 220], // Gris claro para encabezado
+            textColor: [0, 0, 0],
+            fontStyle: 'bold',
+            lineWidth: 0.1,
+            lineColor: [0, 0, 0]
+        },
+        columnStyles: {
+            0: { cellWidth: 70 }, // Cliente
+            1: { cellWidth: 30, halign: 'right' }, // Saldo Ant
+            2: { cellWidth: 30, halign: 'right' }, // Factura
+            3: { cellWidth: 30, halign: 'right', fontStyle: 'bold' }, // Total
+            4: { cellWidth: 35 }, // Efectivo (Espacio manual)
+            5: { cellWidth: 35 }, // Transf (Espacio manual)
+            6: { cellWidth: 35 }  // Saldo Final (Espacio manual)
+        },
+        margin: { left: marginLeft, right: marginLeft }
+    });
+
+    // --- SECCIÓN FINAL (RENDICIÓN DE CAJA) ---
+    // Usamos autoTable para generar la estructura de rendición al final
+    const finalY = (doc as any).lastAutoTable.finalY + 15;
+    
+    // Verificar si hay espacio, sino nueva página
+    if (finalY > 150) {
+        doc.addPage();
+        doc.text('GASTOS', marginLeft, 20);
+        // Reset Y for new page
+    } else {
+        doc.setFont('helvetica', 'bold');
+        doc.text('GASTOS', marginLeft, finalY);
+    }
+
+    const gastosStartY = finalY > 150 ? 25 : finalY + 5;
+
+    // TABLA GASTOS (HORIZONTAL)
+    autoTable(doc, {
+        startY: gastosStartY,
+        head: [['VIÁTICOS', 'COMBUSTIBLE', 'PEAJE', 'OTROS', 'TOTAL']],
+        body: [['', '', '', '', '']], // Fila vacía para completar
+        theme: 'grid',
+        styles: {
+            fontSize: 11,
+            textColor: [0, 0, 0],
+            lineColor: [0, 0, 0],
+            lineWidth: 0.1,
+            cellPadding: 3, // Reducido para igualar tabla principal
+            halign: 'center',
+            valign: 'middle'
+        },
+        headStyles: {
+            fillColor: [220, 220, 220],
+            textColor: [0, 0, 0],
+            fontStyle: 'bold',
+            lineWidth: 0.1,
+            lineColor: [0, 0, 0]
+        },
+        margin: { left: marginLeft, right: marginLeft }
+    });
+
+    const rendicionTitleY = (doc as any).lastAutoTable.finalY + 10;
+    doc.text('RENDICIÓN DE CAJA', marginLeft, rendicionTitleY);
+
+    const rendicionStartY = rendicionTitleY + 5;
+
+    // TABLA RENDICIÓN (HORIZONTAL)
+    autoTable(doc, {
+        startY: rendicionStartY,
+        head: [['TOTAL EFECTIVO', 'TOTAL GASTOS', 'TOTAL CAJA REPARTO']],
+        body: [['', '', '']], // Fila vacía para completar
+        theme: 'grid',
+        styles: {
+            fontSize: 11, // Reducido para igualar tabla principal
+            textColor: [0, 0, 0],
+            lineColor: [0, 0, 0],
+            lineWidth: 0.1,
+            cellPadding: 3, // Reducido para igualar tabla principal
+            halign: 'center',
+            valign: 'middle',
+            fontStyle: 'bold'
+        },
+        headStyles: {
+            fillColor: [220, 220, 220],
+            textColor: [0, 0, 0],
+            fontStyle: 'bold',
+            lineWidth: 0.1,
+            lineColor: [0, 0, 0]
+        },
+        margin: { left: marginLeft, right: marginLeft }
+    });
+};
+
+const drawTripReport = (doc: any, autoTable: AutoTable, trip: Trip) => {
+    const marginLeft = 15;
+    const marginTop = 15;
+    const pageWidth = doc.internal.pageSize.getWidth();
+
+    // --- ENCABEZADO ---
+    doc.setFont('helvetica', 'bold');
+    doc.setFontSize(18);
+    doc.text('RENDICIÓN DETALLADA DE VIAJE', marginLeft, marginTop);
+
+    doc.setFontSize(11);
+    doc.setFont('helvetica', 'normal');
+    doc.text(`Viaje: ${trip.name || trip.displayId}`, marginLeft, marginTop + 10);
+    doc.text(`Chofer: ${trip.driverName}`, marginLeft, marginTop + 16);
+    doc.text(`Fecha: ${trip.date}`, marginLeft, marginTop + 22);
+
+    // --- RESUMEN ---
+    const cashTotal = trip.clients.reduce((acc, c) => acc + (c.paymentCash || 0), 0);
+    const transferTotal = trip.clients.reduce((acc, c) => acc + (c.paymentTransfer || 0), 0);
+    const expensesTotal = trip.expenses.reduce((acc, e) => acc + (e.amount || 0), 0);
+    const netCash = cashTotal - expensesTotal;
+
+    doc.setFont('helvetica', 'bold');
+    doc.text('RESUMEN DE CAJA', marginLeft, marginTop + 35);
+    doc.setFont('helvetica', 'normal');
+
+    const summaryData = [
+        ['Cobrado en Efectivo', `$ ${cashTotal.toLocaleString('es-AR')}`],
+        ['Cobrado por Transferencia', `$ ${transferTotal.toLocaleString('es-AR')}`],
+        ['Total Cobrado', `$ ${(cashTotal + transferTotal).toLocaleString('es-AR')}`],
+        ['Total Gastos (-)', `$ ${expensesTotal.toLocaleString('es-AR')}`],
+        ['SALDO NETO A ENTREGAR', `$ ${netCash.toLocaleString('es-AR')}`]
+    ];
+
+    autoTable(doc, {
+        startY: marginTop + 38,
+        body: summaryData,
+        theme: 'plain',
+        styles: { fontSize: 10, cellPadding: 2 },
+        columnStyles: {
+            0: { fontStyle: 'bold', cellWidth: 50 },
+            1: { halign: 'right' }
+        },
+        margin: { left: marginLeft }
+    });
+
+    // --- TABLA COBRANZAS ---
+    const collectionsY = (doc as any).lastAutoTable.finalY + 10;
+    doc.setFont('helvetica', 'bold');
+    doc.text('DETALLE DE COBRANZAS', marginLeft, collectionsY);
+
+    const collectionsBody = trip.clients.map(c => {
+        const totalDebt = (c.previousBalance || 0) + (c.currentInvoiceAmount || 0);
+        const totalPaid = (c.paymentCash || 0) + (c.paymentTransfer || 0);
+        return [
+            c.name.substring(0, 30),
+            `$ ${totalDebt.toLocaleString('es-AR')}`,
+            `$ ${c.paymentCash.toLocaleString('es-AR')}`,
+            `$ ${c.paymentTransfer.toLocaleString('es-AR')}`,
+            `$ ${totalPaid.toLocaleString('es-AR')}`,
+            c.status === 'PAID' ? 'PAGADO' : c.status === 'PARTIAL' ? 'PARCIAL' : 'PENDIENTE'
+        ];
+    });
+
+    autoTable(doc, {
+        startY: collectionsY + 5,
+        head: [['CLIENTE', 'DEUDA', 'EFECTIVO', 'TRANSF.', 'TOTAL PAG.', 'ESTADO']],
+        body: collectionsBody,
+        theme: 'grid',
+        styles: { fontSize: 8, cellPadding: 2 },
+        headStyles: { fillColor: [220, 220, 220], textColor: [0, 0, 0], fontStyle: 'bold' },
+        columnStyles: {
+            1: { halign: 'right' },
+            2: { halign: 'right' },
+            3: { halign: 'right' },
+            4: { halign: 'right', fontStyle: 'bold' },
+            5: { halign: 'center' }
+        },
+        margin: { left: marginLeft, right: marginLeft }
+    });
+
+    // --- TABLA GASTOS ---
+    const expensesY = (doc as any).lastAutoTable.finalY + 10;
+    if (expensesY > 250) doc.addPage();
+    
+    doc.setFont('helvetica', 'bold');
+    doc.text('DETALLE DE GASTOS', marginLeft, expensesY > 250 ? marginTop : expensesY);
+
+    const expensesBody = trip.expenses.map(e => [
+        e.type.toUpperCase(),
+        e.note || '-',
+        `$ ${e.amount.toLocaleString('es-AR')}`
+    ]);
+
+    autoTable(doc, {
+        startY: (expensesY > 250 ? marginTop : expensesY) + 5,
+        head: [['TIPO', 'DETALLE', 'MONTO']],
+        body: expensesBody.length > 0 ? expensesBody : [['-', 'Sin gastos registrados', '$ 0']],
+        theme: 'grid',
+        styles: { fontSize: 9, cellPadding: 2 },
+        headStyles: { fillColor: [220, 220, 220], textColor: [0, 0, 0], fontStyle: 'bold' },
+        columnStyles: {
+            2: { halign: 'right', fontStyle: 'bold' }
+        },
+        margin: { left: marginLeft, right: marginLeft }
+    });
+};
+
+const LAYOUTS: Record<TripSheetKind, { orientation: 'landscape' | 'portrait'; draw: (doc: any, autoTable: AutoTable, trip: Trip) => void }> = {
+    delivery: { orientation: 'landscape', draw: drawDeliverySheet },
+    report: { orientation: 'portrait', draw: drawTripReport }
+};
+
+/** Arma un PDF con un viaje por sección (cada uno arranca en hoja nueva). */
+export const renderTripSheet = async (kind: TripSheetKind, trips: Trip[]): Promise<ArrayBuffer> => {
+    const [jsPDF, autoTable] = await Promise.all([loadJsPDF(), loadAutoTable()]);
+    const layout = LAYOUTS[kind];
+    const doc = new jsPDF({ orientation: layout.orientation, unit: 'mm', format: 'a4' });
+    trips.forEach((trip, i) => {
+        if (i > 0) doc.addPage();
+        layout.draw(doc, autoTable, trip);
+    });
+    return doc.output('arraybuffer');
+};
@@ -0,0 +1,156 @@
+import { supabase } from './supabase';
+import type { Trip } from './types';
+import type { TripSheetKind } from './tripSheetRender';
+import type { TripSheetJob, TripSheetMessage } from './workers/tripSheet.worker';
+
+// ==========================================
+// PLANILLAS DE VIAJE: RENDER EN WORKER + CACHÉ POR CONTENIDO
+// ==========================================
+// Cada PDF se guarda en Storage bajo el hash de lo que imprime. Si el viaje
+// no cambió, reimprimir es bajar el archivo ya armado (en cualquier equipo);
+// si cambió, el hash es otro y se vuelve a generar. El armado corre en un
+// worker y en modo lote la oficina deja listas las planillas del día.
+
+const BUCKET = 'trip-sheets';
+
+// Subir cuando cambie el diseño de las planillas: invalida todo lo guardado
+const TEMPLATE_VERSION = 1;
+
+const memoryCache = new Map<string, Blob>();
+
+// Solo lo que sale impreso: cargar un cobro no invalida la planilla de reparto
+const sheetContent = (kind: TripSheetKind, trip: Trip) => {
+    const base = [trip.displayId, trip.name, trip.driverName, trip.date, trip.route];
+    if (kind === 'delivery') {
+        return [base, trip.clients.map(c => [c.name, c.previousBalance || 0, c.currentInvoiceAmount || 0])];
+    }
+    return [
+        base,
+        trip.clients.map(c => [c.name, c.previousBalance || 0, c.currentInvoiceAmount || 0, c.paymentCash || 0, c.paymentTransfer || 0, c.status]),
+        trip.expenses.map(e => [e.type, e.note, e.amount])
+    ];
+};
+
+const hashText = async (text: string): Promise<string> => {
+    if (typeof crypto !== 'undefined' && crypto.subtle) {
+        const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(text));
+        return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+    }
+    // Sin contexto seguro (http en la red local) no hay crypto.subtle: FNV-1a de 32 bits
+    let h = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+        h ^= text.charCodeAt(i);
+        h = Math.imul(h, 0x01000193);
+    }
+    return `fnv${(h >>> 0).toString(16)}_${text.length}`;
+};
+
+const sheetPath = async (kind: TripSheetKind, trips: Trip[]) => {
+    const hash = await hashText(JSON.stringify([TEMPLATE_VERSION, kind, trips.map(t => sheetContent(kind, t))]));
+    return `${kind}/${hash}.pdf`;
+};
+
+const readCached = async (path: string): Promise<Blob | null> => {
+    const local = memoryCache.get(path);
+    if (local) return local;
+    const { data, error } = await supabase.storage.from(BUCKET).download(path);
+    if (error || !data) return null;
+    memoryCache.set(path, data);
+    return data;
+};
+
+const storeSheet = (path: string, blob: Blob) => {
+    memoryCache.set(path, blob);
+    // Sin await: imprimir no espera la subida. Si ya existe (otro equipo lo subió) es el mismo archivo
+    supabase.storage.from(BUCKET).upload(path, blob, { contentType: 'application/pdf', upsert: false })
+        .then(({ error }) => {
+            if (error && !/exists|duplicate/i.test(error.message)) console.warn('No se pudo guardar la planilla:', error.message);
+        });
+};
+
+const renderOnMainThread = async (jobs: TripSheetJob[]): Promise<ArrayBuffer[]> => {
+    const { renderTripSheet } = await import('./tripSheetRender');
+    const files: ArrayBuffer[] = [];
+    for (const job of jobs) files.push(await renderTripSheet(job.kind, job.trips));
+    return files;
+};
+
+const renderSheets = async (jobs: TripSheetJob[]): Promise<Blob[]> => {
+    if (jobs.length === 0) return [];
+    let files: ArrayBuffer[];
+    try {
+        if (typeof Worker === 'undefined') throw new Error('Workers no disponibles');
+        const worker = new Worker(new URL('./workers/tripSheet.worker.ts', import.meta.url), { type: 'module' });
+        try {
+            files = await new Promise<ArrayBuffer[]>((resolve, reject) => {
+                worker.onmessage = (e: MessageEvent<TripSheetMessage>) => {
+                    if (e.data.type === 'done') resolve(e.data.files);
+                    else reject(new Error(e.data.message));
+                };
+                worker.onerror = (e) => reject(new Error(e.message));
+                worker.postMessage({ jobs });
+            });
+        } finally {
+            worker.terminate();
+        }
+    } catch (err) {
+        console.warn('Render de planillas en el hilo principal:', err);
+        files = await renderOnMainThread(jobs);
+    }
+    return files.map(buffer => new Blob([buffer], { type: 'application/pdf' }));
+};
+
+const saveBlob = (blob: Blob, fileName: string) => {
+    const url = URL.createObjectURL(blob);
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = fileName;
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+    setTimeout(() => URL.revokeObjectURL(url), 1000);
+};
+
+const sheetFileName = (kind: TripSheetKind, trip: Trip) => {
+    const prefix = kind === 'delivery' ? 'Planilla_Reparto' : 'Rendicion_Detallada';
+    return `${prefix}_${trip.driverName.replace(/\s+/g, '_')}_${trip.date}.pdf`;
+};
+
+/** Devuelve el PDF del viaje desde la caché o lo arma si el contenido cambió. */
+export const getTripSheet = async (kind: TripSheetKind, trip: Trip): Promise<Blob> => {
+    const path = await sheetPath(kind, [trip]);
+    const cached = await readCached(path);
+    if (cached) return cached;
+    const [blob] = await renderSheets([{ kind, trips: [trip] }]);
+    storeSheet(path, blob);
+    return blob;
+};
+
+export const downloadTripSheet = async (kind: TripSheetKind, trip: Trip) => {
+    saveBlob(await getTripSheet(kind, trip), sheetFileName(kind, trip));
+};
+
+/**
+ * Modo lote: arma en un solo paso las planillas de reparto que falten de los
+ * viajes indicados (las deja en caché para los choferes) y descarga un PDF
+ * con todas juntas para imprimir en la oficina.
+ */
+export const downloadDaySheets = async (trips: Trip[], date: string) => {
+    const paths = await Promise.all(trips.map(trip => sheetPath('delivery', [trip])));
+    const cached = await Promise.all(paths.map(readCached));
+    const missing = trips.map((trip, i) => ({ trip, path: paths[i] })).filter((_, i) => !cached[i]);
+
+    const combinedPath = await sheetPath('delivery', trips);
+    const combinedCached = await readCached(combinedPath);
+
+    const jobs: TripSheetJob[] = missing.map(({ trip }) => ({ kind: 'delivery', trips: [trip] }));
+    if (!combinedCached) jobs.push({ kind: 'delivery', trips });
+    const rendered = await renderSheets(jobs);
+
+    missing.forEach(({ path }, i) => storeSheet(path, rendered[i]));
+    const combined = combinedCached || rendered[rendered.length - 1];
+    if (!combinedCached) storeSheet(combinedPath, combined);
+
+    saveBlob(combined, `Planillas_Reparto_${date}.pdf`);
+    return { rendered: missing.length, cached: trips.length - missing.length };
+};
@@ -125,6 +125,15 @@ export interface ClientClassification {
     active: boolean;
 }
 
+export interface CashConcept {
+    id: string;
+    name: string;
+    type: 'ingreso' | 'egreso';
+    category: 'caja' | 'banco';
+    active: boolean;
+    created_at?: string;
+}
+
 export interface AccountMovement {
     id: string;
     client_code: string;
@@ -157,6 +166,8 @@ export interface SavedBudget {
     client_code: string;
     total: number;
     created_at: string;
+    price_list?: number;
+    item_count?: number;
     items?: SavedBudgetItem[];
 }
 
@@ -167,6 +178,7 @@ export interface SavedBudgetItem {
     name: string;
     quantity: number;
     unit_price: number;
+    list_price?: number;
 }
 
 export interface SupplierOrder {
@@ -294,6 +306,7 @@ export interface StockMovement {
     reference_id: string;
     transfer_group_code?: string;
     created_by: string;
+    balance_after?: number;
     user_name?: string;
     warehouse_name?: string;
     inbound_display_number?: number;
@@ -351,6 +364,7 @@ export type ExpirationStatus = 'CRÍTICO' | 'PRÓXIMO' | 'MODERADO' | 'NORMAL';
 export interface ProductExpiration {
     id: string;
     productName: string;
+    codart?: string | null;
     quantity: string;
     expiryDate: Date;
     daysRemaining: number;
@@ -458,6 +472,9 @@ export interface Order {
 }
 export interface DetailedOrder extends Order {
     productCount: number;
+    // Resumen de cabecera: en las listas `products` llega vacío hasta abrir el pedido
+    checkedCount?: number;
+    linesVersion?: number;
 }
 export type TripStatus = 'PLANNING' | 'IN_PROGRESS' | 'CLOSED';
 export type PaymentStatus = 'PENDING' | 'PARTIAL' | 'PAID';
@@ -488,6 +505,7 @@ export interface Trip {
     driverName: string;
     date: string;
     route: string;
+    createdAt?: string;
     clients: TripClient[];
     expenses: TripExpense[];
 }
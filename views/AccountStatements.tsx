@@ -26,9 +26,9 @@ import {
     Upload
 } from 'lucide-react';
 import { supabase } from '../supabase';
+import { getReferenceData } from '../referenceData';
 import { ClientMaster, AccountMovement, MasterProduct, User } from '../types';
-import { jsPDF } from 'jspdf';
-import * as XLSX from 'xlsx';
+import { exportRowsToExcel, loadJsPDF, loadXLSX } from '../lazyLibs';
 
 export const AccountStatements: React.FC<{ currentUser: User }> = ({ currentUser }) => {
     // --- ESTADOS DE BÚSQUEDA Y LISTA ---
@@ -202,7 +202,7 @@ export const AccountStatements: React.FC<{ currentUser: User }> = ({ currentUser
         return movements[0].balance; 
     }, [movements]);
 
-    const handleExportExcel = () => {
+    const handleExportExcel = async () => {
         if (!selectedClient) return;
         const data = movements.map(m => ({
             'Fecha': m.date,
@@ -212,14 +212,12 @@ export const AccountStatements: React.FC<{ currentUser: User }> = ({ currentUser
             'Saldo': m.balance,
             'Estado': m.is_annulled ? 'ANULADO' : 'ACTIVO'
         }));
-        const ws = XLSX.utils.json_to_sheet(data);
-        const wb = XLSX.utils.book_new();
-        XLSX.utils.book_append_sheet(wb, ws, "Estado de Cuenta");
-        XLSX.writeFile(wb, `EstadoCuenta_${selectedClient.codigo}.xlsx`);
+        await exportRowsToExcel(data, "Estado de Cuenta", `EstadoCuenta_${selectedClient.codigo}.xlsx`);
     };
 
-    const handleGeneratePDF = () => {
+    const handleGeneratePDF = async () => {
         if (!selectedClient) return;
+        const jsPDF = await loadJsPDF();
         const doc = new jsPDF();
         doc.setFontSize(18);
         doc.setTextColor(228, 124, 0);
@@ -295,6 +293,7 @@ export const AccountStatements: React.FC<{ currentUser: User }> = ({ currentUser
         reader.onload = async (evt) => {
             try {
                 const bstr = evt.target?.result;
+                const XLSX = await loadXLSX();
                 const wb = XLSX.read(bstr, { type: 'binary' });
                 const wsname = wb.SheetNames[0];
                 const ws = wb.Sheets[wsname];
@@ -362,17 +361,14 @@ export const AccountStatements: React.FC<{ currentUser: User }> = ({ currentUser
         reader.readAsBinaryString(file);
     };
 
-    const exportClientsListToExcel = () => {
+    const exportClientsListToExcel = async () => {
         const data = filteredClients.map(c => ({
             'Código': c.codigo,
             'Cliente / Razón Social': c.nombre,
             'Localidad': c.localidad || '',
             'Saldo': c.balance
         }));
-        const ws = XLSX.utils.json_to_sheet(data);
-        const wb = XLSX.utils.book_new();
-        XLSX.utils.book_append_sheet(wb, ws, "Saldos Clientes");
-        XLSX.writeFile(wb, `Saldos_Clientes_${new Date().toISOString().split('T')[0]}.xlsx`);
+        await exportRowsToExcel(data, "Saldos Clientes", `Saldos_Clientes_${new Date().toISOString().split('T')[0]}.xlsx`);
     };
 
     return (
@@ -943,8 +939,7 @@ const TransactionModal: React.FC<TransactionModalProps> = ({ client, onClose, on
                 finalOrderId = selectedPendingCreditNote;
                 
                 // Obtener el ID del depósito
-                const { data: wh } = await supabase.from('warehouses').select('id').eq('name', warehouse).single();
-                const warehouseId = wh?.id;
+                const warehouseId = (await getReferenceData('warehouses')).find(w => w.name === warehouse)?.id;
 
                 // Actualizar stock de los items devueltos insertando en stock_movements
                 if (warehouseId) {
@@ -995,8 +990,7 @@ const TransactionModal: React.FC<TransactionModalProps> = ({ client, onClose, on
                 if (itemsErr) throw itemsErr;
 
                 // Obtener el ID del depósito
-                const { data: wh } = await supabase.from('warehouses').select('id').eq('name', warehouse).single();
-                const warehouseId = wh?.id;
+                const warehouseId = (await getReferenceData('warehouses')).find(w => w.name === warehouse)?.id;
 
                 if (warehouseId) {
                     const stockMovements = items.map(item => ({
@@ -1359,7 +1353,8 @@ const TransactionDetailModal: React.FC<{ movement: AccountMovement, onClose: ()
         fetchItems();
     }, [movement.order_id, isCreditNote]);
 
-    const handlePrint = () => {
+    const handlePrint = async () => {
+        const jsPDF = await loadJsPDF();
         const doc = new jsPDF();
         doc.setFont("helvetica", "bold");
         doc.setFontSize(20);
@@ -1,5 +1,5 @@
 
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useMemo, useRef } from 'react';
 import { 
     Clock, 
     PackageMinus, 
@@ -77,10 +77,62 @@ const CATEGORIES: { id: AnnotationCategory, label: string, icon: React.ReactNode
     }
 ];
 
+const PAGE_SIZE = 50;
+
+interface AuthorProfile {
+    name: string;
+    role: string;
+    avatar_url?: string;
+}
+
+// Perfiles de autores compartidos entre montajes: un cambio realtime no vuelve a pedir el join
+const profileCache = new Map<string, Promise<AuthorProfile | null>>();
+
+const getProfile = (userId: string): Promise<AuthorProfile | null> => {
+    let cached = profileCache.get(userId);
+    if (!cached) {
+        cached = Promise.resolve(
+            supabase.from('profiles').select('name, role, avatar_url').eq('id', userId).maybeSingle()
+        ).then(({ data }) => data as AuthorProfile | null).catch(() => null);
+        profileCache.set(userId, cached);
+    }
+    return cached;
+};
+
+const toAnnotation = (row: any, profile: AuthorProfile | null): Annotation => ({
+    ...row,
+    user_name: profile?.name || 'Usuario',
+    user_role: profile?.role || 'staff',
+    user_avatar: profile?.avatar_url
+});
+
+interface PageCursor {
+    created_at: string;
+    id: string;
+}
+
+// Orden de la lista y de la paginación: fecha descendente y, a igual fecha, id descendente
+const compareAnnotations = (a: PageCursor, b: PageCursor): number =>
+    (new Date(b.created_at).getTime() - new Date(a.created_at).getTime()) || (a.id < b.id ? 1 : a.id > b.id ? -1 : 0);
+
+/** Une filas por id (la versión nueva gana) y mantiene el orden de la lista. */
+const mergeAnnotations = (current: Annotation[], incoming: Annotation[]): Annotation[] => {
+    const byId = new Map(current.map(a => [a.id, a]));
+    incoming.forEach(a => byId.set(a.id, a));
+    return Array.from(byId.values()).sort(compareAnnotations);
+};
+
 export const Annotations: React.FC<AnnotationsProps> = ({ currentUser }) => {
     const [annotations, setAnnotations] = useState<Annotation[]>([]);
     const [isLoading, setIsLoading] = useState(true);
+    const [hasMore, setHasMore] = useState(false);
     const [filter, setFilter] = useState<AnnotationCategory | 'TODOS'>('TODOS');
+    const filterRef = useRef(filter);
+    filterRef.current = filter;
+    // Última fila de la última página pedida: solo la mueve fetchAnnotations, no realtime
+    const cursorRef = useRef<PageCursor | null>(null);
+    const hasMoreRef = useRef(hasMore);
+    hasMoreRef.current = hasMore;
     
     // Create Modal
     const [isCreateOpen, setIsCreateOpen] = useState(false);
@@ -103,10 +155,10 @@ export const Annotations: React.FC<AnnotationsProps> = ({ currentUser }) => {
     // Permission check for "Mark as Read" (Only Admin)
     const canMarkAsRead = currentUser.role === 'vale';
 
-    const fetchAnnotations = async () => {
+    const fetchAnnotations = async (reset: boolean = true) => {
         setIsLoading(true);
         try {
-            const { data, error } = await supabase
+            let query = supabase
                 .from('annotations')
                 .select(`
                     *,
@@ -116,19 +168,31 @@ export const Annotations: React.FC<AnnotationsProps> = ({ currentUser }) => {
                         avatar_url
                     )
                 `)
-                .order('created_at', { ascending: false });
+                .order('created_at', { ascending: false })
+                .order('id', { ascending: false })
+                .limit(PAGE_SIZE);
 
-            if (error) throw error;
+            if (filter !== 'TODOS') query = query.eq('category', filter);
 
-            if (data) {
-                const mapped = data.map((a: any) => ({
-                    ...a,
-                    user_name: a.profiles?.name || 'Usuario',
-                    user_role: a.profiles?.role || 'staff',
-                    user_avatar: a.profiles?.avatar_url
-                }));
-                setAnnotations(mapped);
+            // Paginación por cursor: las notas nuevas que llegan por realtime no corren las
+            // páginas, y el id desempata las que comparten fecha
+            const cursor = cursorRef.current;
+            if (!reset && cursor) {
+                query = query.or(`created_at.lt."${cursor.created_at}",and(created_at.eq."${cursor.created_at}",id.lt.${cursor.id})`);
             }
+
+            const { data, error } = await query;
+            if (error) throw error;
+
+            const page = (data || []).map((a: any) => {
+                const { profiles, ...row } = a;
+                if (profiles) profileCache.set(a.user_id, Promise.resolve(profiles));
+                return toAnnotation(row, profiles);
+            });
+            const last = page[page.length - 1];
+            if (reset || last) cursorRef.current = last ? { created_at: last.created_at, id: last.id } : null;
+            setAnnotations(prev => reset ? page : mergeAnnotations(prev, page));
+            setHasMore(page.length === PAGE_SIZE);
         } catch (err) {
             console.error("Error fetching annotations:", err);
         } finally {
@@ -137,13 +201,31 @@ export const Annotations: React.FC<AnnotationsProps> = ({ currentUser }) => {
     };
 
     useEffect(() => {
-        fetchAnnotations();
-        
-        // Subscribe to changes
+        fetchAnnotations(true);
+    }, [filter]);
+
+    // Realtime: se aplica el cambio de la fila sobre el estado local, sin recargar la lista
+    useEffect(() => {
         const channel = supabase
             .channel('annotations_realtime')
-            .on('postgres_changes', { event: '*', schema: 'public', table: 'annotations' }, () => {
-                fetchAnnotations();
+            .on('postgres_changes', { event: '*', schema: 'public', table: 'annotations' }, async (payload: any) => {
+                if (payload.eventType === 'DELETE') {
+                    setAnnotations(prev => prev.filter(a => a.id !== payload.old.id));
+                    return;
+                }
+                const row = payload.new;
+                if (filterRef.current !== 'TODOS' && row.category !== filterRef.current) {
+                    setAnnotations(prev => prev.filter(a => a.id !== row.id));
+                    return;
+                }
+                // Una fila más vieja que las páginas cargadas no entra: abriría un hueco
+                // entre lo cargado y ella que "Cargar anteriores" no pediría
+                const cursor = cursorRef.current;
+                const inWindow = !hasMoreRef.current || !cursor || compareAnnotations(row, cursor) <= 0;
+                const profile = await getProfile(row.user_id);
+                setAnnotations(prev => inWindow || prev.some(a => a.id === row.id)
+                    ? mergeAnnotations(prev, [toAnnotation(row, profile)])
+                    : prev);
             })
             .subscribe();
 
@@ -250,7 +332,7 @@ export const Annotations: React.FC<AnnotationsProps> = ({ currentUser }) => {
             if (error) throw error;
         } catch (e: any) {
             alert("Error al eliminar: " + e.message);
-            fetchAnnotations(); // Revert
+            fetchAnnotations(true); // Revert
         }
     };
 
@@ -269,7 +351,7 @@ export const Annotations: React.FC<AnnotationsProps> = ({ currentUser }) => {
         } catch (e) {
             console.error(e);
             // Revert on error
-            fetchAnnotations();
+            fetchAnnotations(true);
         }
     };
 
@@ -328,7 +410,7 @@ export const Annotations: React.FC<AnnotationsProps> = ({ currentUser }) => {
                 </div>
                 <div className="flex items-center gap-3 w-full md:w-auto">
                     <button 
-                        onClick={fetchAnnotations} 
+                        onClick={() => fetchAnnotations(true)} 
                         className="p-4 rounded-2xl bg-surface border border-surfaceHighlight text-muted hover:text-primary transition-all shadow-sm"
                         title="Actualizar"
                     >
@@ -411,6 +493,17 @@ export const Annotations: React.FC<AnnotationsProps> = ({ currentUser }) => {
                         ))
                     ) : null
                 )}
+
+                {hasMore && annotations.length > 0 && (
+                    <button
+                        onClick={() => fetchAnnotations(false)}
+                        disabled={isLoading}
+                        className="mx-auto flex items-center gap-2 px-6 py-3 rounded-2xl bg-surface border border-surfaceHighlight text-muted hover:text-primary text-[10px] font-black uppercase transition-all disabled:opacity-50"
+                    >
+                        {isLoading ? <Loader2 size={16} className="animate-spin" /> : <ChevronDown size={16} />}
+                        Cargar anteriores
+                    </button>
+                )}
             </div>
 
             {/* CREATE MODAL */}
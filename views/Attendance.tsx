@@ -46,39 +46,16 @@ import {
 import { supabase } from '../supabase';
 import { User, WorkerAttendanceConfig, GlobalAttendanceSettings, AttendancePeriod } from '../types';
 import { hasPermission } from '../logic';
-
-const DAYS_OF_WEEK = [
-    { key: 'Lunes', short: 'Lun' },
-    { key: 'Martes', short: 'Mar' },
-    { key: 'Miércoles', short: 'Mié' },
-    { key: 'Jueves', short: 'Ju' },
-    { key: 'Viernes', short: 'Vie' },
-    { key: 'Sábado', short: 'Sáb' },
-    { key: 'Domingo', short: 'Dom' }
-];
-
-const DAY_MAP: Record<string, string> = {
-    'Lu': 'Lunes', 'Ma': 'Martes', 'Mi': 'Miércoles', 'Ju': 'Jueves', 'Vi': 'Viernes', 'Sa': 'Sábado', 'Do': 'Domingo',
-    'Lunes': 'Lunes', 'Martes': 'Martes', 'Miercoles': 'Miércoles', 'Miércoles': 'Miércoles', 'Jueves': 'Jueves', 'Viernes': 'Viernes', 'Sabado': 'Sábado', 'Sábado': 'Sábado', 'Domingo': 'Domingo'
-};
-
-interface ParsedDay {
-    date: string; // YYYY-MM-DD
-    dayName: string;
-    entry: string;
-    exit: string;
-    observation: string;
-    isFeriado: boolean;
-    isJustified: boolean;
-    isNoMark: boolean; 
-    hours: number;
-    penaltyHours: number;
-    status: string;
-    isEarly: boolean;
-    isLate: boolean;
-    minutesLate: number;
-    originalRawDate?: string;
-}
+import {
+    DAYS_OF_WEEK,
+    ParsedDay,
+    WorkerPayroll,
+    parseClockExport,
+    evaluateAttendance,
+    computeAttendancePay,
+    computePayroll,
+    buildPeriodRecord
+} from '../attendanceEngine';
 
 interface PerformanceRecord {
     user_id: string;
@@ -95,6 +72,13 @@ interface PerformanceRecord {
     score?: number;
 }
 
+// Inserta las quincenas y suma sus métricas al acumulado en una sola
+// transacción; rechaza quincenas ya guardadas (guardar_liquidacion_asistencia)
+const saveAttendancePeriods = async (periods: object[]) => {
+    const { error } = await supabase.rpc('guardar_liquidacion_asistencia', { p_periods: periods });
+    if (error) throw error;
+};
+
 export const Attendance: React.FC<{ currentUser?: User }> = ({ currentUser }) => {
     const [activeTab, setActiveTab] = useState<'workers' | 'settings' | 'report' | 'performance'>('workers');
     const [armadores, setArmadores] = useState<User[]>([]);
@@ -115,6 +99,9 @@ export const Attendance: React.FC<{ currentUser?: User }> = ({ currentUser }) =>
     const [extraHoursInput, setExtraHoursInput] = useState<number>(0);
     const [manualExtraAmount, setManualExtraAmount] = useState<number>(0);
 
+    const [payrollPreview, setPayrollPreview] = useState<WorkerPayroll[] | null>(null);
+    const [payrollSaveStatus, setPayrollSaveStatus] = useState<'idle' | 'saving'>('idle');
+
     const [selectedPerfDetail, setSelectedPerfDetail] = useState<PerformanceRecord | null>(null);
     const [selectedPeriodDetail, setSelectedPeriodDetail] = useState<AttendancePeriod | null>(null);
     
@@ -233,147 +220,9 @@ export const Attendance: React.FC<{ currentUser?: User }> = ({ currentUser }) =>
         } catch (e) { setSaveStatus('error'); }
     };
 
-    const timeToMinutes = (time: string) => {
-        if (!time) return 0;
-        const [h, m] = (time || "00:00").split(':').map(Number);
-        return h * 60 + m;
-    };
-
     const processReport = () => {
         if (!rawReport.trim() || !currentConfig) return;
-        const lines = rawReport.split('\n');
-        const results: ParsedDay[] = [];
-        
-        const today = new Date();
-        let monthOffset = 0;
-
-        for (const line of lines) {
-            const match = line.trim().match(/^(\d{2})\s+([A-Za-z]+)/);
-            if (match) {
-                const dayNum = parseInt(match[1]);
-                if (dayNum > today.getDate() + 5) {
-                    monthOffset = -1;
-                }
-                break;
-            }
-        }
-
-        let currentYear = today.getFullYear();
-        let currentMonth = today.getMonth() + monthOffset;
-        if (currentMonth < 0) {
-            currentMonth = 11;
-            currentYear -= 1;
-        }
-
-        let previousDayNum = -1;
-
-        lines.forEach(line => {
-            const trimmed = line.trim();
-            if (!trimmed || /tabla|asistencia|dd\/ss|ent|sal|am|pm|extra|Primer registro|Ultimo registro|Horas cumplidas/i.test(trimmed) || trimmed.includes('==')) return;
-
-            const llerenaRegex = /^(\d{2})\s+([A-Za-z]+)(.*)/;
-            const matchLlerena = trimmed.match(llerenaRegex);
-
-            if (matchLlerena) {
-                const dayNumStr = matchLlerena[1];
-                const dayNum = parseInt(dayNumStr);
-                const dayShort = matchLlerena[2]; 
-                const restOfLine = matchLlerena[3];
-
-                if (previousDayNum !== -1 && dayNum < previousDayNum) {
-                    currentMonth++;
-                    if (currentMonth > 11) {
-                        currentMonth = 0;
-                        currentYear++;
-                    }
-                }
-                previousDayNum = dayNum;
-
-                const fullDate = new Date(currentYear, currentMonth, dayNum);
-                const isoDate = fullDate.toISOString().split('T')[0];
-
-                const timesMatch = restOfLine.match(/(\d{1,2}:\d{2})/g) || [];
-                let entry = ""; 
-                let exit = "";
-
-                if (timesMatch.length >= 2) { 
-                    entry = timesMatch[0]; 
-                    exit = timesMatch[timesMatch.length - 1]; 
-                } 
-                else if (timesMatch.length === 1) { 
-                    const foundTime = timesMatch[0];
-                    const foundMins = timeToMinutes(foundTime);
-                    
-                    // Lógica inteligente: ¿Qué está más cerca según la configuración del trabajador?
-                    const schedEntry = timeToMinutes(currentConfig.entry_time);
-                    const schedExit = timeToMinutes(currentConfig.exit_time);
-                    const schedEntryPm = timeToMinutes(currentConfig.entry_time_pm || "");
-                    const schedExitPm = timeToMinutes(currentConfig.exit_time_pm || "");
-
-                    const distEntry = Math.abs(foundMins - schedEntry);
-                    const distExit = Math.abs(foundMins - schedExit);
-                    const distEntryPm = currentConfig.entry_time_pm ? Math.abs(foundMins - schedEntryPm) : 9999;
-                    const distExitPm = currentConfig.exit_time_pm ? Math.abs(foundMins - schedExitPm) : 9999;
-
-                    const minDist = Math.min(distEntry, distExit, distEntryPm, distExitPm);
-
-                    if (minDist === distEntry || minDist === distEntryPm) {
-                        entry = foundTime;
-                    } else {
-                        exit = foundTime;
-                    }
-                }
-
-                const dayName = DAY_MAP[dayShort.substring(0, 2)] || dayShort;
-
-                results.push({ 
-                    date: isoDate, dayName, entry, exit, observation: "", 
-                    isFeriado: false, isJustified: false, isNoMark: false, hours: 0, penaltyHours: 0, 
-                    status: '', isEarly: false, isLate: false, minutesLate: 0, 
-                    originalRawDate: dayNumStr 
-                });
-                return;
-            }
-
-            const betbederRegex = /^(\d{2}\/\d{2})\s+(\d{2}:\d{2})\s+(\d{2}:\d{2}).*?([a-zA-Z]+)$/;
-            const matchBetbeder = trimmed.match(betbederRegex);
-
-            if (matchBetbeder) {
-                const datePart = matchBetbeder[1]; 
-                const entry = matchBetbeder[2];    
-                const exit = matchBetbeder[3];     
-                const dayText = matchBetbeder[4];  
-
-                const [d, m] = datePart.split('/').map(Number);
-                
-                let itemYear = today.getFullYear();
-                if (today.getMonth() === 0 && m === 12) {
-                    itemYear = itemYear - 1;
-                }
-
-                const fullDate = new Date(itemYear, m - 1, d);
-                const isoDate = fullDate.toISOString().split('T')[0];
-                const dayName = DAY_MAP[dayText] || dayText;
-
-                results.push({
-                    date: isoDate,
-                    dayName: dayName,
-                    entry,
-                    exit,
-                    observation: "",
-                    isFeriado: false,
-                    isJustified: false,
-                    isNoMark: false,
-                    hours: 0,
-                    penaltyHours: 0,
-                    status: '',
-                    isEarly: false,
-                    isLate: false,
-                    minutesLate: 0,
-                    originalRawDate: String(d).padStart(2, '0')
-                });
-            }
-        });
+        const results = parseClockExport(rawReport, currentConfig);
 
         if (results.length > 0) {
             setParsedReport(results);
@@ -383,233 +232,26 @@ export const Attendance: React.FC<{ currentUser?: User }> = ({ currentUser }) =>
         }
     };
 
-    const finalReportData = useMemo(() => {
-        if (!selectedWorkerId || !currentConfig || parsedReport.length === 0) return null;
+    // La evaluación de los días solo depende del informe y del horario: cambiar
+    // la tarifa, la deuda o los extras recalcula montos sin volver a recorrer el período.
+    const scheduleKey = currentConfig
+        ? [currentConfig.location, currentConfig.entry_time, currentConfig.exit_time, currentConfig.entry_time_pm, currentConfig.exit_time_pm, (currentConfig.work_days || []).join(',')].join('|')
+        : '';
 
-        const reportMap = new Map<string, ParsedDay>(parsedReport.map(r => [r.date, r] as [string, ParsedDay]));
-        
-        const sortedDates = [...parsedReport].map(r => r.date).sort();
-        const startIso = sortedDates[0];
-        const endIso = sortedDates[sortedDates.length - 1];
-        
-        const [sy, sm, sd] = startIso.split('-').map(Number);
-        const startDate = new Date(sy, sm - 1, sd);
-        
-        const [ey, em, ed] = endIso.split('-').map(Number);
-        const endDate = new Date(ey, em - 1, ed);
-
-        const diffTime = Math.abs(endDate.getTime() - startDate.getTime());
-        const diffDays = Math.ceil(diffTime / (1000 * 60 * 60 * 24));
-
-        const fullPeriod: ParsedDay[] = [];
-        
-        for (let i = 0; i <= diffDays; i++) {
-            const current = new Date(startDate);
-            current.setDate(startDate.getDate() + i);
-            const iso = current.toISOString().split('T')[0];
-            
-            const existing = reportMap.get(iso);
-            if (existing) {
-                fullPeriod.push({ ...existing });
-            } else {
-                const dayIdx = current.getDay();
-                const dayName = DAYS_OF_WEEK[dayIdx === 0 ? 6 : dayIdx - 1].key;
-                fullPeriod.push({ 
-                    date: iso, 
-                    dayName, 
-                    entry: "", exit: "", observation: "", 
-                    isFeriado: false, isJustified: false, isNoMark: false,
-                    hours: 0, penaltyHours: 0, status: "", 
-                    isEarly: false, isLate: false, minutesLate: 0,
-                    originalRawDate: String(current.getDate()).padStart(2, '0')
-                });
-            }
-        }
-
-        let totalGrossHours = 0; // Horas trabajadas (Brutas)
-        let totalPenaltyHours = 0;
-        let totalLateCount = 0;
-
-        const detailedDays = fullPeriod.map(day => {
-            let hours = 0; let penaltyHours = 0; let status = "";
-            const isWorkDay = currentConfig.work_days.includes(day.dayName);
-            const entryMins = day.entry ? timeToMinutes(day.entry) : null;
-            const exitMins = day.exit ? timeToMinutes(day.exit) : null;
-
-            const amEntry = timeToMinutes(currentConfig.entry_time);
-            const pmEntry = currentConfig.entry_time_pm ? timeToMinutes(currentConfig.entry_time_pm) : null;
-            
-            let targetEntry = amEntry; 
-            if (entryMins !== null && pmEntry !== null) {
-                const diffAm = Math.abs(entryMins - amEntry);
-                const diffPm = Math.abs(entryMins - pmEntry);
-                if (diffPm < diffAm) { 
-                    targetEntry = pmEntry; 
-                }
-            }
-
-            const scheduledDailyHours = 8;
-            let isEarly = false; let isLate = false;
-            let diffMinutes = 0;
-
-            if (day.isFeriado) {
-                if (day.entry && day.exit) {
-                    hours = ((exitMins! - entryMins!) / 60) * 2;
-                    status = "FERIADO TRABAJADO";
-                } else { 
-                    hours = 7;
-                    status = "FERIADO"; 
-                }
-            } else if (day.entry && day.exit) {
-                hours = (exitMins! - entryMins!) / 60;
-                diffMinutes = entryMins! - targetEntry;
-
-                if (diffMinutes <= 0) isEarly = true;
-
-                if (diffMinutes > 0) {
-                    isLate = true;
-                    if (currentConfig.location === 'LLERENA') {
-                        if (diffMinutes <= 10) {
-                            status = "TARDE (SIN BONO)"; 
-                        } else {
-                            totalLateCount++; 
-                            if (diffMinutes >= 120) { 
-                                penaltyHours = 4; status = "TARDE (>2H) -4Hs";
-                            } else if (diffMinutes >= 60) { 
-                                penaltyHours = 2; status = "TARDE (>1H) -2Hs";
-                            } else if (diffMinutes > 30) {
-                                penaltyHours = 1; status = "TARDE (>30m) -1Hs";
-                            } else {
-                                penaltyHours = 1; status = "TARDE (11-30m) -1Hs";
-                            }
-                        }
-                    } else {
-                        if (diffMinutes <= 10) {
-                            status = "TARDE (TOLERANCIA)"; 
-                        } else {
-                            totalLateCount++; 
-                            if (diffMinutes >= 120) { 
-                                penaltyHours = 4; status = "TARDE (>2H) -4Hs";
-                            } else if (diffMinutes >= 60) { 
-                                penaltyHours = 2; status = "TARDE (>1H) -2Hs";
-                            } else {
-                                penaltyHours = 1; status = "TARDE (>10m) -1Hs";
-                            }
-                        }
-                    }
-                } else {
-                    status = "TRABAJADO";
-                }
-            } else if ((day.entry && !day.exit) || (!day.entry && day.exit)) {
-                status = "REGISTRO INCOMPLETO (-6Hs)";
-                penaltyHours = 6;
-                totalLateCount++; 
-            } else {
-                if (isWorkDay) {
-                    if (day.isJustified) { 
-                        hours = 3.5;
-                        status = "FALTA JUSTIFICADA"; 
-                    } else { 
-                        status = "FALTA"; 
-                    }
-                } else { 
-                    status = "NO TRABAJA"; 
-                }
-            }
-
-            totalGrossHours += hours; // Sumamos horas reales sin restar multa
-            totalPenaltyHours += penaltyHours;
-            
-            return { 
-                ...day, 
-                hours, 
-                penaltyHours, 
-                status, 
-                isEarly, 
-                isLate, 
-                minutesLate: Math.max(0, diffMinutes) 
-            };
-        });
+    const evaluation = useMemo(() => {
+        if (!selectedWorkerId || !currentConfig || parsedReport.length === 0) return null;
+        return evaluateAttendance(selectedWorkerId, parsedReport, currentConfig);
+    }, [parsedReport, selectedWorkerId, scheduleKey]);
 
-        const settings = globalSettings[currentConfig.location] || { bonus_1: 30000, bonus_2: 20000 };
-        const roundedHours = Math.round(totalGrossHours); // Horas totales para el cálculo base
-        const baseSalary = roundedHours * currentConfig.hourly_rate; // Salario Base Bruto
-        const penaltyDeduction = totalPenaltyHours * currentConfig.hourly_rate; // Deducción monetaria
-
-        const workedDays = detailedDays.filter(d => d.entry && d.exit);
-        const isAlwaysEarly = workedDays.length > 0 && workedDays.every(d => d.isEarly);
-        const hasFatalIssues = detailedDays.some(d => {
-            if (d.minutesLate > 10 && !d.isJustified) return true;
-            if ((d.status === 'FALTA' || d.status.includes('INCOMPLETO')) && !d.isJustified) return true;
-            return false;
+    const finalReportData = useMemo(() => {
+        if (!evaluation || !currentConfig) return null;
+        const pay = computeAttendancePay(evaluation, currentConfig, globalSettings, {
+            extraHours: extraHoursInput,
+            manualExtra: manualExtraAmount,
+            debt: debtAmount
         });
-        const hasJustifiedAbsence = detailedDays.some(d => d.status === 'FALTA JUSTIFICADA');
-        const hasJustifiedLateness = detailedDays.some(d => d.minutesLate > 10 && d.isJustified);
-
-        let bonusAmount = 0;
-        let bonusStatus = "SIN BONO";
-
-        if (!hasFatalIssues) {
-            if (isAlwaysEarly && !hasJustifiedAbsence && !hasJustifiedLateness) {
-                bonusAmount = settings.bonus_1;
-                bonusStatus = "BONO EXCELENCIA (1)";
-            } else {
-                bonusAmount = settings.bonus_2;
-                bonusStatus = "BONO CUMPLIMIENTO (2)";
-            }
-        }
-
-        const calculatedExtraFromHours = extraHoursInput * currentConfig.hourly_rate;
-        const totalAdditions = calculatedExtraFromHours + manualExtraAmount;
-        
-        // CÁLCULO FINAL: (Base Bruto - Multas) + Bonos + Extras - Deuda
-        const totalToPay = baseSalary - penaltyDeduction + bonusAmount + totalAdditions - debtAmount;
-
-        const markedCount = detailedDays.filter(d => {
-            if (d.isNoMark) return false; 
-            if (d.entry && d.exit) return true;
-            return false;
-        }).length;
-
-        const effectiveScheduledDays = detailedDays.filter(d => {
-            const isWorkDay = currentConfig.work_days.includes(d.dayName);
-            const isHoliday = d.status === 'FERIADO';
-            const isJustified = d.isJustified;
-            
-            if (!isWorkDay) return false;
-            if (isHoliday || isJustified) return false;
-            
-            return true;
-        }).length;
-
-        const metrics = {
-            user_id: selectedWorkerId,
-            early_arrivals: detailedDays.filter(d => d.isEarly).length,
-            late_arrivals: totalLateCount, 
-            justified_count: detailedDays.filter(d => d.isJustified && (d.isLate || d.status.includes('FALTA'))).length,
-            total_issues: detailedDays.filter(d => d.minutesLate > 0 || d.status === 'FALTA' || d.status.includes('INCOMPLETO')).length,
-            holidays_worked: detailedDays.filter(d => d.status === 'FERIADO TRABAJADO').length,
-            absences: detailedDays.filter(d => d.status === 'FALTA').length,
-            scheduled_days: effectiveScheduledDays, 
-            marked_days: markedCount
-        };
-
-        return { 
-            detailedDays, 
-            totalHours: roundedHours, 
-            totalPenaltyHours, 
-            penaltyDeduction,
-            totalLateCount, 
-            subtotal: baseSalary, 
-            bonusAmount, 
-            bonusStatus, 
-            totalToPay, 
-            metrics, 
-            calculatedExtraFromHours,
-            startDate,
-            endDate
-        };
-    }, [parsedReport, currentConfig, globalSettings, debtAmount, extraHoursInput, manualExtraAmount]);
+        return { ...evaluation, ...pay };
+    }, [evaluation, currentConfig?.hourly_rate, currentConfig?.location, globalSettings, debtAmount, extraHoursInput, manualExtraAmount]);
 
     const toggleFlag = (idx: number, field: 'isFeriado' | 'isJustified' | 'isNoMark') => {
         const dayToFlag = finalReportData?.detailedDays[idx];
@@ -654,66 +296,12 @@ export const Attendance: React.FC<{ currentUser?: User }> = ({ currentUser }) =>
         if (!finalReportData?.metrics || !selectedWorkerId || !currentConfig) return;
         setPerfSaveStatus('saving');
         try {
-            // 1. Update Accumulated Performance
-            const { data: existing } = await supabase.from('attendance_performance').select('*').eq('user_id', selectedWorkerId).maybeSingle();
-            
-            const perfPayload = {
-                user_id: selectedWorkerId,
-                early_arrivals: (existing?.early_arrivals || 0) + finalReportData.metrics.early_arrivals,
-                late_arrivals: (existing?.late_arrivals || 0) + finalReportData.metrics.late_arrivals,
-                justified_count: (existing?.justified_count || 0) + finalReportData.metrics.justified_count,
-                total_issues: (existing?.total_issues || 0) + finalReportData.metrics.total_issues,
-                holidays_worked: (existing?.holidays_worked || 0) + finalReportData.metrics.holidays_worked,
-                absences: (existing?.absences || 0) + finalReportData.metrics.absences,
-                scheduled_days: (existing?.scheduled_days || 0) + finalReportData.metrics.scheduled_days,
-                marked_days: (existing?.marked_days || 0) + finalReportData.metrics.marked_days,
-                updated_at: new Date().toISOString()
-            };
-
-            const { error: perfError } = await supabase.from('attendance_performance').upsert(perfPayload);
-            if (perfError) throw perfError;
-
-            // 2. Insert Period Record (History)
-            const startD = finalReportData.startDate;
-            const day = startD.getDate();
-            const month = startD.toLocaleString('es-AR', { month: 'long' });
-            const year = startD.getFullYear();
-            const periodLabel = day <= 15 
-                ? `Primera Quincena ${month} ${year}` 
-                : `Segunda Quincena ${month} ${year}`;
-
-            let score = 0;
-            const m = finalReportData.metrics;
-            score += m.early_arrivals * 1;
-            score -= m.late_arrivals * 1;
-            score -= m.absences * 1;
-            if (m.late_arrivals > 0 && (m.justified_count / m.late_arrivals) >= 0.8) score += 1;
-            else if (m.late_arrivals > 0) score -= 1;
-            
-            const markingEff = m.marked_days / (m.scheduled_days || 1);
-            if (markingEff >= 1) score += 2;
-            else if (markingEff > 0.8) score += 1;
-            else if (markingEff < 0.5) score -= 1;
-
-            const periodPayload = {
-                user_id: selectedWorkerId,
-                start_date: finalReportData.startDate.toISOString().split('T')[0],
-                end_date: finalReportData.endDate.toISOString().split('T')[0],
-                period_label: periodLabel,
-                total_hours: finalReportData.totalHours, // Saves Gross Hours
-                total_penalty_hours: finalReportData.totalPenaltyHours,
-                hourly_rate: currentConfig.hourly_rate,
-                bonus_amount: finalReportData.bonusAmount,
-                extra_amount: finalReportData.calculatedExtraFromHours + manualExtraAmount,
-                debt_amount: debtAmount,
-                total_to_pay: finalReportData.totalToPay,
-                details: finalReportData.detailedDays, 
-                score_obtained: score,
-                days_worked: finalReportData.detailedDays.filter(d => d.hours > 0).length
-            };
-
-            const { error: periodError } = await supabase.from('attendance_periods').insert(periodPayload);
-            if (periodError) throw periodError;
+            const periodPayload = buildPeriodRecord(selectedWorkerId, finalReportData, finalReportData, currentConfig, {
+                extraHours: extraHoursInput,
+                manualExtra: manualExtraAmount,
+                debt: debtAmount
+            });
+            await saveAttendancePeriods([{ ...periodPayload, metrics: finalReportData.metrics }]);
 
             setPerfSaveStatus('success');
             setTimeout(() => setPerfSaveStatus('idle'), 3000);
@@ -725,6 +313,38 @@ export const Attendance: React.FC<{ currentUser?: User }> = ({ currentUser }) =>
         }
     };
 
+    // --- Liquidación general: todos los armadores de un mismo informe ---
+
+    const handleComputePayroll = () => {
+        if (!rawReport.trim()) return;
+        const results = computePayroll(rawReport, armadores, workerConfigs, globalSettings);
+        if (results.length === 0) {
+            alert("No se encontró ningún armador configurado en el informe. La liquidación general necesita el nombre de cada trabajador antes de sus marcas.");
+            return;
+        }
+        setPayrollPreview(results);
+    };
+
+    const handleSavePayroll = async () => {
+        if (!payrollPreview || payrollPreview.length === 0) return;
+        setPayrollSaveStatus('saving');
+        try {
+            const noAdjustments = { extraHours: 0, manualExtra: 0, debt: 0 };
+            await saveAttendancePeriods(payrollPreview.map(p => ({
+                ...buildPeriodRecord(p.userId, p.evaluation, p.pay, workerConfigs[p.userId], noAdjustments),
+                metrics: p.evaluation.metrics
+            })));
+
+            setPayrollSaveStatus('idle');
+            setPayrollPreview(null);
+            loadData();
+        } catch (e: any) {
+            console.error(e);
+            alert("Error al guardar la liquidación: " + e.message);
+            setPayrollSaveStatus('idle');
+        }
+    };
+
     const rankingSorted = useMemo(() => {
         return [...performanceHistory].map(p => {
             let score = 0;
@@ -918,6 +538,11 @@ export const Attendance: React.FC<{ currentUser?: User }> = ({ currentUser }) =>
                                                 <button onClick={processReport} disabled={!rawReport.trim()} className="py-4 rounded-2xl font-black uppercase text-xs bg-slate-900 text-white shadow-xl hover:bg-black transition-all active:scale-[0.98] flex items-center justify-center gap-3 disabled:opacity-30">
                                                     <FileText size={18} /> Generar Detalle Quincenal
                                                 </button>
+                                                {canSavePerformance && (
+                                                    <button onClick={handleComputePayroll} disabled={!rawReport.trim()} title="Informe con varios trabajadores: el nombre de cada uno antes de sus marcas" className="sm:col-span-2 py-4 rounded-2xl font-black uppercase text-xs bg-surface border border-surfaceHighlight text-text shadow-sm hover:border-primary hover:text-primary transition-all active:scale-[0.98] flex items-center justify-center gap-3 disabled:opacity-30">
+                                                        <Users size={18} /> Liquidar Todos
+                                                    </button>
+                                                )}
                                             </div>
                                         </div>
                                     </div>
@@ -1322,6 +947,16 @@ export const Attendance: React.FC<{ currentUser?: User }> = ({ currentUser }) =>
                     onBack={() => setSelectedPeriodDetail(null)} 
                 />
             )}
+
+            {payrollPreview && (
+                <PayrollSummaryModal
+                    payroll={payrollPreview}
+                    workers={armadores}
+                    isSaving={payrollSaveStatus === 'saving'}
+                    onClose={() => setPayrollPreview(null)}
+                    onSave={handleSavePayroll}
+                />
+            )}
         </div>
     );
 };
@@ -1467,6 +1102,70 @@ const RankingListItem: React.FC<{ worker: PerformanceRecord; rank: number; onCli
     );
 };
 
+// Resumen de la liquidación general antes de guardarla (sin deuda ni extras:
+// esos ajustes se cargan trabajador por trabajador en el detalle quincenal)
+const PayrollSummaryModal: React.FC<{
+    payroll: WorkerPayroll[];
+    workers: User[];
+    isSaving: boolean;
+    onClose: () => void;
+    onSave: () => void;
+}> = ({ payroll, workers, isSaving, onClose, onSave }) => {
+    const total = payroll.reduce((acc, p) => acc + p.pay.totalToPay, 0);
+
+    return (
+        <div className="fixed inset-0 z-50 flex items-center justify-center p-4 bg-black/80 backdrop-blur-sm animate-in fade-in">
+            <div className="bg-surface w-full max-w-3xl rounded-3xl border border-surfaceHighlight shadow-2xl overflow-hidden flex flex-col max-h-[85vh]">
+                <div className="p-6 border-b border-surfaceHighlight bg-background/50 flex justify-between items-center">
+                    <div>
+                        <h3 className="text-2xl font-black text-text uppercase italic tracking-tighter leading-none">Liquidación General</h3>
+                        <p className="text-xs font-bold text-muted uppercase tracking-widest mt-1">{payroll.length} trabajadores en el informe</p>
+                    </div>
+                    <button onClick={onClose} className="p-2 hover:bg-surfaceHighlight rounded-full text-muted transition-all"><X size={24}/></button>
+                </div>
+
+                <div className="flex-1 overflow-y-auto">
+                    <table className="w-full text-left">
+                        <thead className="bg-background/50 text-[10px] font-black text-muted uppercase tracking-widest">
+                            <tr>
+                                <th className="p-4">Trabajador</th>
+                                <th className="p-4">Período</th>
+                                <th className="p-4 text-center">Horas</th>
+                                <th className="p-4 text-center">Multas</th>
+                                <th className="p-4">Bono</th>
+                                <th className="p-4 text-right">A Pagar</th>
+                            </tr>
+                        </thead>
+                        <tbody className="divide-y divide-surfaceHighlight">
+                            {payroll.map(p => (
+                                <tr key={p.userId} className="text-xs">
+                                    <td className="p-4 font-black text-text uppercase">{workers.find(w => w.id === p.userId)?.name || p.userId}</td>
+                                    <td className="p-4 font-bold text-muted">{p.evaluation.startIso} → {p.evaluation.endIso}</td>
+                                    <td className="p-4 text-center font-black text-text">{p.evaluation.totalHours}</td>
+                                    <td className="p-4 text-center font-black text-red-500">{p.evaluation.totalPenaltyHours}</td>
+                                    <td className="p-4"><span className={`px-2 py-0.5 rounded text-[8px] font-black uppercase border ${p.pay.bonusAmount > 0 ? 'bg-green-500/10 text-green-600 border-green-200' : 'bg-surfaceHighlight text-muted'}`}>{p.pay.bonusStatus}</span></td>
+                                    <td className="p-4 text-right font-black text-green-600">$ {p.pay.totalToPay.toLocaleString()}</td>
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                </div>
+
+                <div className="p-6 border-t border-surfaceHighlight bg-background/50 flex justify-between items-center gap-4">
+                    <div>
+                        <p className="text-[10px] font-black text-muted uppercase tracking-widest">Total Quincena</p>
+                        <p className="text-2xl font-black text-green-600 tracking-tighter">$ {total.toLocaleString()}</p>
+                    </div>
+                    <button onClick={onSave} disabled={isSaving} className="px-8 py-4 rounded-2xl font-black uppercase text-xs bg-primary text-white shadow-xl shadow-primary/30 hover:bg-primaryHover transition-all active:scale-[0.98] flex items-center gap-3 disabled:opacity-50">
+                        {isSaving ? <Loader2 size={18} className="animate-spin" /> : <Save size={18} />}
+                        Guardar Liquidación
+                    </button>
+                </div>
+            </div>
+        </div>
+    );
+};
+
 const WorkerHistoryView: React.FC<{
     worker: PerformanceRecord;
     periods: AttendancePeriod[];
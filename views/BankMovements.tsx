@@ -15,14 +15,8 @@ import {
     CreditCard
 } from 'lucide-react';
 import { supabase } from '../supabase';
-import { User } from '../types';
-
-interface CashConcept {
-    id: string;
-    name: string;
-    type: 'ingreso' | 'egreso';
-    category: 'caja' | 'banco';
-}
+import { getReferenceData } from '../referenceData';
+import { User, CashConcept } from '../types';
 
 interface CheckItem {
     id: string;
@@ -67,17 +61,11 @@ export const BankMovements: React.FC<{ currentUser: User }> = ({ currentUser })
 
     const fetchConcepts = async () => {
         setIsLoading(true);
-        const { data, error } = await supabase
-            .from('cash_concepts')
-            .select('*')
-            .eq('category', 'banco')
-            .eq('active', true)
-            .order('name');
-        
-        if (error) {
+        try {
+            const data = await getReferenceData('cash_concepts');
+            setConcepts(data.filter(c => c.category === 'banco' && c.active));
+        } catch (error) {
             console.error('Error fetching concepts:', error);
-        } else {
-            setConcepts(data || []);
         }
         setIsLoading(false);
     };
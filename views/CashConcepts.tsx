@@ -17,16 +17,8 @@ import {
     Landmark
 } from 'lucide-react';
 import { supabase } from '../supabase';
-
-// Types
-interface CashConcept {
-    id: string;
-    name: string;
-    type: 'ingreso' | 'egreso';
-    category: 'caja' | 'banco';
-    active: boolean;
-    created_at?: string;
-}
+import { getReferenceData, invalidateReferenceData } from '../referenceData';
+import { CashConcept } from '../types';
 
 export const CashConcepts: React.FC = () => {
     // State
@@ -50,16 +42,11 @@ export const CashConcepts: React.FC = () => {
     // Fetch Data
     const fetchConcepts = async () => {
         setIsLoading(true);
-        const { data, error } = await supabase
-            .from('cash_concepts')
-            .select('*')
-            .order('name');
-        
-        if (error) {
+        try {
+            setConcepts(await getReferenceData('cash_concepts'));
+        } catch (error) {
             console.error('Error fetching concepts:', error);
             // Fallback or empty if table doesn't exist
-        } else {
-            setConcepts(data || []);
         }
         setIsLoading(false);
     };
@@ -106,6 +93,7 @@ export const CashConcepts: React.FC = () => {
                     });
                 if (error) throw error;
             }
+            await invalidateReferenceData('cash_concepts');
             await fetchConcepts();
             setIsModalOpen(false);
         } catch (e) {
@@ -127,6 +115,7 @@ export const CashConcepts: React.FC = () => {
                 .delete()
                 .eq('id', editingConcept.id);
             if (error) throw error;
+            await invalidateReferenceData('cash_concepts');
             await fetchConcepts();
             setIsModalOpen(false);
         } catch (e) {
@@ -185,6 +185,8 @@ export const CashCount: React.FC<{ currentUser: User }> = ({ currentUser }) => {
 
     // System Comparison
     const [systemTotal, setSystemTotal] = useState(0);
+    // Saldo del día según la planilla de caja (cash_daily_totals), como referencia
+    const [ledgerSaldo, setLedgerSaldo] = useState<number | null>(null);
     
     // UI State
     const [isSaving, setIsSaving] = useState(false);
@@ -195,6 +197,7 @@ export const CashCount: React.FC<{ currentUser: User }> = ({ currentUser }) => {
             fetchHistory();
         } else if (view === 'new') {
             fetchLatestSession();
+            fetchLedgerSaldo();
         }
     }, [view]);
 
@@ -248,6 +251,21 @@ export const CashCount: React.FC<{ currentUser: User }> = ({ currentUser }) => {
         }
     };
 
+    const fetchLedgerSaldo = async () => {
+        const today = new Date().toISOString().split('T')[0];
+        const { data, error } = await supabase
+            .from('cash_daily_totals')
+            .select('ingresos_ars, egresos_ars')
+            .eq('date', today)
+            .eq('branch', 'Llerena')
+            .maybeSingle();
+        if (error) {
+            console.error("Error loading daily totals:", error);
+            return;
+        }
+        setLedgerSaldo(data ? Number(data.ingresos_ars) - Number(data.egresos_ars) : 0);
+    };
+
     const fetchHistory = async () => {
         setIsLoadingHistory(true);
         try {
@@ -655,6 +673,15 @@ export const CashCount: React.FC<{ currentUser: User }> = ({ currentUser }) => {
                                         placeholder="Pegar Monto..."
                                         className="w-full bg-transparent text-lg md:text-xl font-black text-text outline-none placeholder-muted/30"
                                     />
+                                    {ledgerSaldo !== null && ledgerSaldo !== systemTotal && (
+                                        <button
+                                            type="button"
+                                            onClick={() => setSystemTotal(ledgerSaldo)}
+                                            className="text-[9px] font-bold text-primary hover:underline"
+                                        >
+                                            Planilla del día: $ {ledgerSaldo.toLocaleString('es-AR')}
+                                        </button>
+                                    )}
                                 </div>
                             </div>
 
@@ -14,14 +14,8 @@ import {
     MessageSquare
 } from 'lucide-react';
 import { supabase } from '../supabase';
-import { User } from '../types';
-
-interface CashConcept {
-    id: string;
-    name: string;
-    type: 'ingreso' | 'egreso';
-    category: 'caja' | 'banco';
-}
+import { getReferenceData } from '../referenceData';
+import { User, CashConcept } from '../types';
 
 interface CheckItem {
     id: string;
@@ -60,32 +54,25 @@ export const CashMovements: React.FC<{ currentUser: User }> = ({ currentUser })
 
     const fetchDailyTotal = async () => {
         const today = new Date().toISOString().split('T')[0];
+        // Totales mantenidos por el servidor: una fila por sucursal
         const { data, error } = await supabase
-            .from('cash_movements')
-            .select('amount_ars, type')
+            .from('cash_daily_totals')
+            .select('ingresos_ars, egresos_ars')
             .eq('date', today);
         
         if (!error && data) {
-            const total = data.reduce((acc, curr) => {
-                return curr.type === 'ingreso' ? acc + Number(curr.amount_ars) : acc - Number(curr.amount_ars);
-            }, 0);
+            const total = data.reduce((acc, curr) => acc + Number(curr.ingresos_ars) - Number(curr.egresos_ars), 0);
             setDailyTotal(total);
         }
     };
 
     const fetchConcepts = async () => {
         setIsLoading(true);
-        const { data, error } = await supabase
-            .from('cash_concepts')
-            .select('*')
-            .eq('category', 'caja')
-            .eq('active', true)
-            .order('name');
-        
-        if (error) {
+        try {
+            const data = await getReferenceData('cash_concepts');
+            setConcepts(data.filter(c => c.category === 'caja' && c.active));
+        } catch (error) {
             console.error('Error fetching concepts:', error);
-        } else {
-            setConcepts(data || []);
         }
         setIsLoading(false);
     };
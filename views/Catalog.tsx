@@ -1,5 +1,5 @@
 
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useMemo, useRef } from 'react';
 import { 
     Search, 
     Filter, 
@@ -17,7 +17,9 @@ import {
     Settings
 } from 'lucide-react';
 import { supabase } from '../supabase';
-import { MasterProduct, User, SupplierMaster } from '../types';
+import { loadAllPages, isAbortError } from '../pagedLoader';
+import { useReferenceData } from '../referenceData';
+import { MasterProduct, User } from '../types';
 import { ProductDetailModal } from '../components/ProductDetailModal';
 import { BulkEditStockModal } from '../components/BulkEditStockModal';
 
@@ -27,7 +29,7 @@ interface CatalogProps {
 
 export const Catalog: React.FC<CatalogProps> = ({ currentUser }) => {
     const [products, setProducts] = useState<MasterProduct[]>([]);
-    const [masterSuppliers, setMasterSuppliers] = useState<SupplierMaster[]>([]);
+    const { rows: masterSuppliers } = useReferenceData('providers_master');
     const [isLoading, setIsLoading] = useState(true);
     const [searchTerm, setSearchTerm] = useState('');
     const [selectedProduct, setSelectedProduct] = useState<MasterProduct | null>(null);
@@ -43,27 +45,21 @@ export const Catalog: React.FC<CatalogProps> = ({ currentUser }) => {
     const [currentPage, setCurrentPage] = useState(1);
     const ITEMS_PER_PAGE = 100;
 
+    // Carga en curso: un cambio de filtros o salir de la vista la cancela
+    const loadControllerRef = useRef<AbortController | null>(null);
+
     const fetchData = async () => {
+        loadControllerRef.current?.abort();
+        const controller = new AbortController();
+        loadControllerRef.current = controller;
         setIsLoading(true);
         try {
-            const { data: suppData } = await supabase
-                .from('providers_master')
-                .select('*')
-                .order('razon_social', { ascending: true });
-            
-            if (suppData) setMasterSuppliers(suppData);
-
-            const PAGE_SIZE = 1000;
-            let allProducts: MasterProduct[] = [];
-            let from = 0;
-            let hasMore = true;
-
-            while (hasMore) {
+            await loadAllPages<MasterProduct>((withCount) => {
                 let query = supabase
                     .from('master_products')
-                    .select('*')
+                    .select('*', withCount ? { count: 'exact' } : undefined)
                     .order('desart', { ascending: true })
-                    .range(from, from + PAGE_SIZE - 1);
+                    .order('codart', { ascending: true });
 
                 if (!showDeleted) {
                     query = query.neq('familia', 'ELIMINADOS');
@@ -72,24 +68,19 @@ export const Catalog: React.FC<CatalogProps> = ({ currentUser }) => {
                 if (!showWithoutStock) {
                     query = query.or('stock_betbeder.gt.0,stock_llerena.gt.0');
                 }
-
-                const { data, error } = await query;
-
-                if (error) throw error;
-                if (data && data.length > 0) {
-                    allProducts = [...allProducts, ...data];
-                    if (data.length < PAGE_SIZE) hasMore = false;
-                    else from += PAGE_SIZE;
-                } else {
-                    hasMore = false;
+                return query;
+            }, {
+                signal: controller.signal,
+                // La primera página se muestra apenas llega y el resto se va sumando
+                onProgress: (rows) => {
+                    setProducts(rows.slice());
+                    setIsLoading(false);
                 }
-            }
-            setProducts(allProducts);
-
+            });
         } catch (err: any) {
-            console.error("Error crítico cargando maestro:", err);
+            if (!isAbortError(err)) console.error("Error crítico cargando maestro:", err);
         } finally {
-            setIsLoading(false);
+            if (loadControllerRef.current === controller) setIsLoading(false);
         }
     };
 
@@ -97,6 +88,8 @@ export const Catalog: React.FC<CatalogProps> = ({ currentUser }) => {
         fetchData();
     }, [showDeleted, showWithoutStock]);
 
+    useEffect(() => () => loadControllerRef.current?.abort(), []);
+
     const suppliersMap = useMemo(() => {
         const map = new Map<string, string>();
         masterSuppliers.forEach(s => map.set(s.codigo, s.razon_social));
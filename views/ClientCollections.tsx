@@ -22,6 +22,7 @@ import {
     Calendar
 } from 'lucide-react';
 import { supabase } from '../supabase';
+import { getReferenceData } from '../referenceData';
 import { ClientMaster, User, ClientCollection, SupplierMaster } from '../types';
 
 interface ClientCollectionsProps {
@@ -46,7 +47,6 @@ export const ClientCollections: React.FC<ClientCollectionsProps> = ({ currentUse
     // Pago a Proveedor
     const [supplierPayment, setSupplierPayment] = useState('');
     const [targetSupplierCode, setTargetSupplierCode] = useState('');
-    const [suppliers, setSuppliers] = useState<SupplierMaster[]>([]);
     const [notes, setNotes] = useState('');
     const [supplierNotes, setSupplierNotes] = useState('');
 
@@ -84,15 +84,6 @@ export const ClientCollections: React.FC<ClientCollectionsProps> = ({ currentUse
         return () => document.removeEventListener('mousedown', handleClickOutside);
     }, []);
 
-    // Cargar proveedores al iniciar
-    useEffect(() => {
-        const loadSuppliers = async () => {
-            const { data } = await supabase.from('providers_master').select('*').eq('activo', true).order('razon_social');
-            if (data) setSuppliers(data);
-        };
-        loadSuppliers();
-    }, []);
-
     const handleSearchSupplier = async (val: string) => {
         setSupplierSearchTerm(val);
         if (selectedSupplier && val !== selectedSupplier.razon_social) {
@@ -107,17 +98,13 @@ export const ClientCollections: React.FC<ClientCollectionsProps> = ({ currentUse
 
         setIsSearchingSupplier(true);
         try {
-            const words = trimmed.split(/\s+/).filter(w => w.length > 0);
-            let query = supabase.from('providers_master').select('*');
-            
-            words.forEach(word => {
-                query = query.or(`razon_social.ilike.%${word}%,codigo.ilike.%${word}%`);
+            const words = trimmed.toLowerCase().split(/\s+/).filter(w => w.length > 0);
+            const all = await getReferenceData('providers_master');
+            const matches = all.filter(s => {
+                const haystack = `${s.razon_social} ${s.codigo}`.toLowerCase();
+                return words.every(word => haystack.includes(word));
             });
-
-            const { data, error } = await query.limit(8);
-
-            if (error) throw error;
-            setSupplierSearchResults(data || []);
+            setSupplierSearchResults(matches.slice(0, 8));
         } catch (err) {
             console.error(err);
         } finally {
@@ -270,11 +257,7 @@ export const ClientCollections: React.FC<ClientCollectionsProps> = ({ currentUse
             // 3. Registrar Movimiento de Caja (Solo si hay efectivo)
             if (totalEfectivo > 0) {
                 // Intentamos buscar el concepto "COBRANZA DE CLIENTES"
-                const { data: conceptData } = await supabase
-                    .from('cash_concepts')
-                    .select('id')
-                    .eq('name', 'COBRANZA DE CLIENTES')
-                    .maybeSingle();
+                const conceptData = (await getReferenceData('cash_concepts')).find(c => c.name === 'COBRANZA DE CLIENTES');
 
                 await supabase.from('cash_movements').insert({
                     date: new Date().toISOString().split('T')[0],
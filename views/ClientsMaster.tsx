@@ -23,9 +23,14 @@ import {
     Wand2
 } from 'lucide-react';
 import { supabase } from '../supabase';
+import { useReferenceData } from '../referenceData';
 import { ClientMaster, User } from '../types';
-import * as XLSX from 'xlsx';
+import { exportRowsToExcel } from '../lazyLibs';
 import { ClientModal } from '../components/ClientModal';
+import type { ClientImportMessage, ClientImportRow } from '../workers/clientImport.worker';
+
+const IMPORT_CONCURRENCY = 3;
+const IMPORT_PROGRESS_INTERVAL_MS = 250;
 
 interface ClientsMasterProps {
     currentUser: User;
@@ -46,11 +51,12 @@ export const ClientsMaster: React.FC<ClientsMasterProps> = ({ currentUser }) =>
     const [isProcessing, setIsProcessing] = useState(false);
     const [importLog, setImportLog] = useState<string[]>([]);
     const [importSuccess, setImportSuccess] = useState(false);
+    const [importProgress, setImportProgress] = useState<{ parsed: number, total: number, uploaded: number } | null>(null);
     
     // Estado para Eliminación
     const [clientToDelete, setClientToDelete] = useState<ClientMaster | null>(null);
-    const [classifications, setClassifications] = useState<any[]>([]);
-    const [zones, setZones] = useState<any[]>([]);
+    const { rows: classifications } = useReferenceData('client_classifications');
+    const { rows: zones } = useReferenceData('delivery_zones');
 
     const fileInputRef = useRef<HTMLInputElement>(null);
 
@@ -108,13 +114,6 @@ export const ClientsMaster: React.FC<ClientsMasterProps> = ({ currentUser }) =>
             } else {
                 setClients(data || []);
             }
-            
-            const [classData, zonesData] = await Promise.all([
-                supabase.from('client_classifications').select('*'),
-                supabase.from('delivery_zones').select('*')
-            ]);
-            if (!classData.error && classData.data) setClassifications(classData.data);
-            if (!zonesData.error && zonesData.data) setZones(zonesData.data);
         } catch (err: any) {
             console.error("Error cargando clientes:", err);
         } finally {
@@ -154,95 +153,102 @@ export const ClientsMaster: React.FC<ClientsMasterProps> = ({ currentUser }) =>
     };
 
     // --- LÓGICA DE IMPORTACIÓN ---
-    const normalizeHeader = (s: any): string => {
-        if (s === undefined || s === null) return "";
-        return String(s).trim().toLowerCase()
-            .normalize("NFD").replace(/[\u0300-\u036f]/g, "")
-            .replace(/[^a-z0-9_]/g, "");
-    };
-
+    // El Excel se lee en un Web Worker que envía lotes ya validados; cada lote se
+    // sube con un máximo de IMPORT_CONCURRENCY upserts en paralelo.
     const processExcel = async (e: React.ChangeEvent<HTMLInputElement>) => {
         const file = e.target.files?.[0];
         if (!file) return;
 
         setIsProcessing(true);
         setImportLog(["Leyendo archivo Excel..."]);
+        setImportProgress(null);
         setImportSuccess(false);
 
-        const reader = new FileReader();
-        reader.onload = async (evt) => {
-            try {
-                const dataArr = new Uint8Array(evt.target?.result as ArrayBuffer);
-                const workbook = XLSX.read(dataArr, { type: 'array' });
-                const worksheet = workbook.Sheets[workbook.SheetNames[0]];
-                const jsonData: any[][] = XLSX.utils.sheet_to_json(worksheet, { header: 1, defval: null });
-
-                if (jsonData.length < 2) throw new Error("El archivo no tiene suficientes datos.");
-
-                const headers = jsonData[0].map(h => normalizeHeader(h));
-                const rows = jsonData.slice(1);
-
-                const colIdx = {
-                    codigo: headers.indexOf('codigo'),
-                    nombre: headers.indexOf('nombre'),
-                    domicilio: headers.indexOf('domicilio'),
-                    localidad: headers.indexOf('localidad'),
-                    provincia: headers.indexOf('provincia'),
-                    celular: headers.findIndex(h => h === 'celular' || h === 'telefono'),
-                    email: headers.findIndex(h => h === 'email' || h === 'e_mail')
+        const worker = new Worker(new URL('../workers/clientImport.worker.ts', import.meta.url), { type: 'module' });
+        const progress = { parsed: 0, total: 0, uploaded: 0 };
+        let lastProgressAt = 0;
+        const reportProgress = (force = false) => {
+            const now = Date.now();
+            if (!force && now - lastProgressAt < IMPORT_PROGRESS_INTERVAL_MS) return;
+            lastProgressAt = now;
+            setImportProgress({ ...progress });
+        };
+
+        try {
+            const buffer = await file.arrayBuffer();
+
+            const summary = await new Promise<ClientImportMessage & { type: 'done' }>((resolve, reject) => {
+                const queue: ClientImportRow[][] = [];
+                let inFlight = 0;
+                let parseDone: (ClientImportMessage & { type: 'done' }) | null = null;
+                let failed = false;
+
+                const fail = (err: any) => {
+                    if (failed) return;
+                    failed = true;
+                    reject(err);
                 };
 
-                if (colIdx.codigo === -1) throw new Error("No se encontró la columna obligatoria 'codigo'.");
-
-                const clientsToUpsert = rows.map(row => {
-                    const getVal = (idx: number) => {
-                        const val = row[idx];
-                        if (val === null || val === undefined || String(val).trim() === "") return null;
-                        return String(val).trim();
-                    };
-
-                    return {
-                        codigo: getVal(colIdx.codigo),
-                        nombre: getVal(colIdx.nombre),
-                        domicilio: getVal(colIdx.domicilio),
-                        localidad: getVal(colIdx.localidad),
-                        provincia: getVal(colIdx.provincia),
-                        celular: getVal(colIdx.celular),
-                        email: getVal(colIdx.email)
-                    };
-                }).filter(c => c.codigo !== null);
-
-                setImportLog(prev => [...prev, `Se detectaron ${clientsToUpsert.length} clientes válidos.`, "Iniciando carga a base de datos..."]);
-
-                const chunkSize = 100;
-                for (let i = 0; i < clientsToUpsert.length; i += chunkSize) {
-                    const chunk = clientsToUpsert.slice(i, i + chunkSize);
-                    const { error } = await supabase.from('clients_master').upsert(chunk, { onConflict: 'codigo' });
-                    
-                    if (error) {
-                        if (error.code === '42501') throw new Error("Permiso denegado (RLS). Revise políticas SQL.");
-                        throw error;
+                const pump = () => {
+                    if (failed) return;
+                    while (inFlight < IMPORT_CONCURRENCY && queue.length > 0) {
+                        const chunk = queue.shift()!;
+                        inFlight++;
+                        supabase.from('clients_master').upsert(chunk, { onConflict: 'codigo' }).then(({ error }) => {
+                            inFlight--;
+                            if (error) {
+                                if (error.code === '42501') return fail(new Error("Permiso denegado (RLS). Revise políticas SQL."));
+                                return fail(error);
+                            }
+                            progress.uploaded += chunk.length;
+                            reportProgress();
+                            pump();
+                        }, fail);
                     }
-                    
-                    const progress = Math.min(100, Math.round(((i + chunk.length) / clientsToUpsert.length) * 100));
-                    setImportLog(prev => [...prev, `Progreso: ${progress}%`]);
-                }
+                    if (parseDone && inFlight === 0 && queue.length === 0) resolve(parseDone);
+                };
 
-                setImportSuccess(true);
-                setImportLog(prev => [...prev, "✅ IMPORTACIÓN FINALIZADA CON ÉXITO."]);
-                fetchData();
-            } catch (err: any) {
-                console.error("Error en importación:", err);
-                setImportLog(prev => [...prev, `❌ ERROR: ${err.message}`]);
-            } finally {
-                setIsProcessing(false);
-                if (fileInputRef.current) fileInputRef.current.value = "";
-            }
-        };
-        reader.readAsArrayBuffer(file);
+                worker.onmessage = (evt: MessageEvent<ClientImportMessage>) => {
+                    const msg = evt.data;
+                    if (msg.type === 'rows') {
+                        progress.parsed = msg.parsed;
+                        progress.total = msg.total;
+                        queue.push(msg.rows);
+                        reportProgress();
+                        pump();
+                    } else if (msg.type === 'done') {
+                        parseDone = msg;
+                        progress.total = msg.valid;
+                        setImportLog(prev => [...prev, `Se detectaron ${msg.valid} clientes válidos.`, "Completando carga a base de datos..."]);
+                        pump();
+                    } else {
+                        fail(new Error(msg.message));
+                    }
+                };
+                worker.onerror = (err) => fail(new Error(err.message || "Error leyendo el archivo."));
+                worker.postMessage({ buffer }, [buffer]);
+            });
+
+            reportProgress(true);
+            const omitted = summary.skipped + summary.duplicates;
+            setImportSuccess(true);
+            setImportLog(prev => [
+                ...prev,
+                ...(omitted > 0 ? [`Se omitieron ${omitted} filas (${summary.skipped} sin código, ${summary.duplicates} códigos repetidos).`] : []),
+                "✅ IMPORTACIÓN FINALIZADA CON ÉXITO."
+            ]);
+            fetchData();
+        } catch (err: any) {
+            console.error("Error en importación:", err);
+            setImportLog(prev => [...prev, `❌ ERROR: ${err.message}`]);
+        } finally {
+            worker.terminate();
+            setIsProcessing(false);
+            if (fileInputRef.current) fileInputRef.current.value = "";
+        }
     };
 
-    const exportToExcel = () => {
+    const exportToExcel = async () => {
         const data = filteredClients.map(c => ({
             'Código': c.codigo,
             'Nombre': c.nombre,
@@ -255,10 +261,7 @@ export const ClientsMaster: React.FC<ClientsMasterProps> = ({ currentUser }) =>
             'Lista de Precios': c.price_list || 1,
             'Estado': c.activo ? 'Activo' : 'Inactivo'
         }));
-        const ws = XLSX.utils.json_to_sheet(data);
-        const wb = XLSX.utils.book_new();
-        XLSX.utils.book_append_sheet(wb, ws, "Clientes");
-        XLSX.writeFile(wb, `Maestro_Clientes_${new Date().toISOString().split('T')[0]}.xlsx`);
+        await exportRowsToExcel(data, "Clientes", `Maestro_Clientes_${new Date().toISOString().split('T')[0]}.xlsx`);
     };
 
     const optimizeClients = async () => {
@@ -557,7 +560,7 @@ export const ClientsMaster: React.FC<ClientsMasterProps> = ({ currentUser }) =>
                                 <UploadCloud className="text-primary" size={24} />
                                 <h3 className="text-xl font-black text-text uppercase italic">Importar desde Excel</h3>
                             </div>
-                            <button onClick={() => { setIsImportModalOpen(false); setImportLog([]); setImportSuccess(false); }} className="p-2 hover:bg-surfaceHighlight rounded-full text-muted transition-all">
+                            <button onClick={() => { setIsImportModalOpen(false); setImportLog([]); setImportProgress(null); setImportSuccess(false); }} className="p-2 hover:bg-surfaceHighlight rounded-full text-muted transition-all">
                                 <X size={24} />
                             </button>
                         </div>
@@ -587,6 +590,18 @@ export const ClientsMaster: React.FC<ClientsMasterProps> = ({ currentUser }) =>
                                 </div>
                             )}
 
+                            {importProgress && importProgress.total > 0 && (
+                                <div className="space-y-2">
+                                    <div className="flex justify-between text-[10px] font-black text-muted uppercase">
+                                        <span>Subidos {importProgress.uploaded} / {importProgress.total}</span>
+                                        <span>{Math.min(100, Math.round((importProgress.uploaded / importProgress.total) * 100))}%</span>
+                                    </div>
+                                    <div className="h-2 bg-background rounded-full overflow-hidden border border-surfaceHighlight">
+                                        <div className="h-full bg-primary transition-all" style={{ width: `${Math.min(100, (importProgress.uploaded / importProgress.total) * 100)}%` }} />
+                                    </div>
+                                </div>
+                            )}
+
                             {importLog.length > 0 && (
                                 <div className="bg-background rounded-2xl p-4 border border-surfaceHighlight max-h-48 overflow-y-auto font-mono text-[10px] text-muted space-y-1 shadow-inner">
                                     {importLog.map((log, i) => (
@@ -602,7 +617,7 @@ export const ClientsMaster: React.FC<ClientsMasterProps> = ({ currentUser }) =>
                                     <CheckCircle2 size={64} />
                                     <p className="font-black text-center uppercase">Base de Clientes Actualizada</p>
                                     <button 
-                                        onClick={() => { setIsImportModalOpen(false); setImportLog([]); setImportSuccess(false); }}
+                                        onClick={() => { setIsImportModalOpen(false); setImportLog([]); setImportProgress(null); setImportSuccess(false); }}
                                         className="w-full py-4 bg-green-600 text-white font-black rounded-2xl uppercase text-xs"
                                     >
                                         Entendido
@@ -24,17 +24,24 @@ import {
   Clipboard
 } from 'lucide-react';
 import { View, Product, OrderStatus, DetailedOrder, User, OrderZone, ClientMaster, SavedBudget, MasterProduct, DeliveryZone } from '../types';
-import { parseOrderText } from '../logic';
+import { parseOrderTextDetailed, UnparsedOrderLine, budgetUnitPrice } from '../logic';
 import { supabase } from '../supabase';
+import { getReferenceData } from '../referenceData';
 import { ClientModal } from '../components/ClientModal';
 
 interface CreateBudgetProps {
   onNavigate: (view: View) => void;
   onCreateOrder: (newOrder: DetailedOrder) => Promise<void>;
+  /** Pedido creado en el servidor a partir de un presupuesto guardado. */
+  onBudgetConverted: (order: { id: string; displayId: string; clientName: string }) => Promise<void>;
   currentUser: User;
 }
 
-export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreateOrder, currentUser }) => {
+// Firma de los renglones: si no cambió desde que se cargó el presupuesto, el pedido sale de la foto guardada
+const linesSignature = (lines: { code: string; quantity: number; unitPrice: number }[]) =>
+  lines.map(l => `${l.code}|${l.quantity}|${l.unitPrice}`).sort().join('\n');
+
+export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreateOrder, onBudgetConverted, currentUser }) => {
   const [clientName, setClientName] = useState('');
   const [address, setAddress] = useState('');
   const [phone, setPhone] = useState('');
@@ -85,6 +92,8 @@ export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreate
   // Presupuestos guardados
   const [savedBudgets, setSavedBudgets] = useState<SavedBudget[]>([]);
   const [selectedBudgetId, setSelectedBudgetId] = useState<string | null>(null);
+  const [loadingBudgetId, setLoadingBudgetId] = useState<string | null>(null);
+  const budgetSignatureRef = useRef('');
   
   const dropdownRef = useRef<HTMLDivElement>(null);
   const productDropdownRef = useRef<HTMLDivElement>(null);
@@ -93,8 +102,8 @@ export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreate
   // Cargar zonas disponibles
   useEffect(() => {
       const fetchZones = async () => {
-          const { data } = await supabase.from('delivery_zones').select('*').eq('active', true).order('name');
-          if (data && data.length > 0) {
+          const data = await getReferenceData('delivery_zones').then(rows => rows.filter(z => z.active)).catch(() => [] as DeliveryZone[]);
+          if (data.length > 0) {
               setAvailableZones(data);
               // Set default if exists, preferably 'V. Mercedes' or first one
               const defaultZone = data.find(z => z.name === 'V. Mercedes') || data[0];
@@ -148,7 +157,8 @@ export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreate
                   case 3: newPrice = p.pventa_3; break;
                   case 4: newPrice = p.pventa_4; break;
               }
-              priceMap.set(p.codart, newPrice);
+              // Mismo redondeo que el presupuesto guardado y el Presupuestador
+              priceMap.set(p.codart, budgetUnitPrice(newPrice));
           });
           
           setProducts(prev => prev.map(p => {
@@ -169,19 +179,14 @@ export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreate
   }, [selectedPriceList]);
 
   const fetchSavedBudgets = async (clientCode: string) => {
+      // Solo cabeceras: los ítems se piden al elegir un presupuesto
       const { data, error } = await supabase
         .from('saved_budgets')
-        .select('*, saved_budget_items(*)')
+        .select('*')
         .eq('client_code', clientCode)
         .order('created_at', { ascending: false });
       
-      if (!error && data) {
-          const mappedBudgets: SavedBudget[] = data.map((b: any) => ({
-              ...b,
-              items: b.saved_budget_items || []
-          }));
-          setSavedBudgets(mappedBudgets);
-      }
+      if (!error && data) setSavedBudgets(data as SavedBudget[]);
   };
 
   const handleSearchClient = async (val: string) => {
@@ -316,13 +321,24 @@ export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreate
       setIsAddingSinCargo(false);
   };
 
-  const useSavedBudget = (budget: SavedBudget) => {
-      if (!budget.items || budget.items.length === 0) {
+  const useSavedBudget = async (budget: SavedBudget) => {
+      setLoadingBudgetId(budget.id);
+      const { data: items, error } = await supabase
+          .from('saved_budget_items')
+          .select('codart, name, quantity, unit_price, list_price')
+          .eq('budget_id', budget.id);
+      setLoadingBudgetId(null);
+      if (error) {
+          alert("Error al cargar el presupuesto: " + error.message);
+          return;
+      }
+      if (!items || items.length === 0) {
           alert("El presupuesto seleccionado no contiene artículos.");
           return;
       }
       
-      const budgetProducts: Product[] = budget.items.map(item => ({
+      // Precios de la foto guardada: no se recalculan contra el maestro
+      const budgetProducts: Product[] = items.map(item => ({
           code: item.codart,
           name: item.name,
           originalQuantity: item.quantity,
@@ -334,9 +350,10 @@ export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreate
 
       setProducts(budgetProducts);
       setSelectedBudgetId(budget.id);
+      budgetSignatureRef.current = linesSignature(budgetProducts);
 
       let generatedText = "";
-      budget.items.forEach(item => {
+      items.forEach(item => {
           const unitPriceStr = item.unit_price.toLocaleString('es-AR', { minimumFractionDigits: 2 });
           const subtotalStr = (item.unit_price * item.quantity).toLocaleString('es-AR', { minimumFractionDigits: 2 });
           generatedText += `${item.quantity} (x1) ${item.codart} ${item.name} - $ ${unitPriceStr} $ ${subtotalStr}\n`;
@@ -411,14 +428,21 @@ export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreate
     }
   };
 
+  const describeUnparsed = (unparsed: UnparsedOrderLine[]) => {
+    const shown = unparsed.slice(0, 5).map(u => `• Renglón ${u.line}: ${u.reason}\n   "${u.text.length > 60 ? u.text.slice(0, 60) + '…' : u.text}"`);
+    if (unparsed.length > shown.length) shown.push(`… y ${unparsed.length - shown.length} más`);
+    return shown.join('\n');
+  };
+
   const handleProcessText = () => {
     if (!rawText.trim()) return;
     setIsProcessing(true);
+    // El parser es lineal: el timeout solo deja pintar el spinner antes de procesar
     setTimeout(() => {
         try {
-            const parsedProducts = parseOrderText(rawText);
+            const { products: parsedProducts, unparsed } = parseOrderTextDetailed(rawText);
             if (parsedProducts.length === 0) {
-                alert("No se detectaron productos. Verifique que el texto tenga el formato correcto.");
+                alert("No se detectaron productos. Verifique que el texto tenga el formato correcto." + (unparsed.length > 0 ? "\n\n" + describeUnparsed(unparsed) : ""));
             } else {
                 // Verificar duplicados contra los ya existentes y dentro del nuevo lote
                 const existingKeys = new Set(products.map(p => `${p.code}-${p.unitPrice}`));
@@ -441,7 +465,12 @@ export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreate
 
                 if (uniqueNewProducts.length > 0) {
                     setProducts(prev => [...prev, ...uniqueNewProducts]);
-                    setRawText(''); // Limpiar texto tras procesar
+                    // Limpiar texto tras procesar, dejando solo los renglones a corregir
+                    setRawText(unparsed.map(u => u.text).join('\n'));
+                }
+
+                if (unparsed.length > 0) {
+                    alert(`Se cargaron ${uniqueNewProducts.length} productos. ${unparsed.length} renglones no se pudieron interpretar:\n\n` + describeUnparsed(unparsed));
                 }
             }
         } catch (err: any) {
@@ -450,7 +479,7 @@ export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreate
         } finally {
             setIsProcessing(false);
         }
-    }, 600);
+    }, 0);
   };
 
   const handleClear = () => {
@@ -475,6 +504,31 @@ export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreate
         
         const finalObservations = obsParts.length > 0 ? obsParts.join('\n') : undefined;
 
+        // Presupuesto sin tocar: el servidor arma el pedido desde la foto y lo borra, en una llamada
+        if (selectedBudgetId && !isInterdeposito && linesSignature(products) === budgetSignatureRef.current) {
+            const { data, error } = await supabase.rpc('convertir_presupuesto_en_pedido', {
+                p_budget_id: selectedBudgetId,
+                p_order: {
+                    client_name: clientName,
+                    zone: selectedZone,
+                    observations: finalObservations ?? null,
+                    is_reservation: isReservation,
+                    scheduled_date: isReservation ? scheduledDate : null,
+                    created_by: currentUser.id,
+                    history: [{
+                        timestamp: new Date().toISOString(),
+                        userId: currentUser.id,
+                        userName: currentUser.name,
+                        action: 'CREATE_ORDER',
+                        details: 'Pedido creado desde presupuesto guardado'
+                    }]
+                }
+            });
+            if (error) throw error;
+            await onBudgetConverted({ id: data.id, displayId: data.display_id, clientName });
+            return;
+        }
+
         const newOrder: DetailedOrder = {
             id: '', 
             displayId: displayId,
@@ -690,14 +744,16 @@ export const CreateBudget: React.FC<CreateBudgetProps> = ({ onNavigate, onCreate
                         <button 
                             key={b.id} 
                             onClick={() => useSavedBudget(b)}
+                            disabled={loadingBudgetId !== null}
                             className="bg-surface border border-primary/20 p-4 rounded-xl flex items-center justify-between hover:border-primary transition-all group shadow-sm text-left"
                         >
                             <div>
                                 <p className="text-[10px] font-black text-muted uppercase">Creado: {new Date(b.created_at).toLocaleString()}</p>
                                 <p className="text-lg font-black text-text group-hover:text-primary transition-colors">$ {b.total.toLocaleString('es-AR')}</p>
+                                {b.item_count != null && <p className="text-[10px] font-bold text-muted uppercase">{b.item_count} artículos · Lista {b.price_list || '-'}</p>}
                             </div>
                             <div className="bg-primary text-white p-2 rounded-lg group-hover:scale-110 transition-transform">
-                                <Plus size={16} />
+                                {loadingBudgetId === b.id ? <Loader2 size={16} className="animate-spin" /> : <Plus size={16} />}
                             </div>
                         </button>
                     ))}
@@ -8,6 +8,7 @@ import {
     Printer,
     FileSpreadsheet,
     Lock,
+    Unlock,
     CheckCircle2,
     Building2,
     CalendarDays,
@@ -22,37 +23,21 @@ export const DailyCashSheet: React.FC<{ currentUser: User, onNavigate: (view: Vi
 
     const [movements, setMovements] = useState<any[]>([]);
     const [checks, setChecks] = useState<any[]>([]);
+    const [totals, setTotals] = useState<any>(null);
     const [isLoading, setIsLoading] = useState(false);
+    const [isClosing, setIsClosing] = useState(false);
 
     const fetchData = async () => {
         setIsLoading(true);
         try {
-            // Fetch movements
-            const { data: movementsData, error: movementsError } = await supabase
-                .from('cash_movements')
-                .select(`
-                    *,
-                    cash_concepts (name, type)
-                `)
-                .eq('date', date)
-                .eq('branch', branch);
+            // Movimientos con concepto y cheques, y totales del día ya calculados
+            const { data, error } = await supabase.rpc('planilla_caja_diaria', { p_date: date, p_branch: branch });
+            if (error) throw error;
 
-            if (movementsError) throw movementsError;
-            setMovements(movementsData || []);
-
-            // Fetch checks for these movements
-            if (movementsData && movementsData.length > 0) {
-                const movementIds = movementsData.map(m => m.id);
-                const { data: checksData, error: checksError } = await supabase
-                    .from('checks')
-                    .select('*')
-                    .in('movement_id', movementIds);
-                
-                if (checksError) throw checksError;
-                setChecks(checksData || []);
-            } else {
-                setChecks([]);
-            }
+            const movementsData = data?.movements || [];
+            setMovements(movementsData);
+            setChecks(movementsData.flatMap((m: any) => m.checks || []));
+            setTotals(data?.totals || null);
         } catch (e) {
             console.error('Error fetching daily sheet data:', e);
         } finally {
@@ -64,21 +49,40 @@ export const DailyCashSheet: React.FC<{ currentUser: User, onNavigate: (view: Vi
         fetchData();
     }, [date, branch]);
 
-    const totalIngresosARS = movements
-        .filter(m => m.type === 'ingreso')
-        .reduce((acc, curr) => acc + Number(curr.amount_ars), 0);
-    
-    const totalEgresosARS = movements
-        .filter(m => m.type === 'egreso')
-        .reduce((acc, curr) => acc + Number(curr.amount_ars), 0);
+    const handleCloseDay = async () => {
+        if (!confirm(`¿Cerrar la caja de ${branch} del ${date.split('-').reverse().join('/')}?\n\nDespués no se podrán cargar ni modificar movimientos de ese día.`)) return;
+        setIsClosing(true);
+        try {
+            const { data, error } = await supabase.rpc('cerrar_caja_diaria', { p_date: date, p_branch: branch });
+            if (error) throw error;
+            setTotals(data);
+        } catch (e: any) {
+            alert('Error al cerrar la caja: ' + e.message);
+        } finally {
+            setIsClosing(false);
+        }
+    };
 
-    const totalIngresosUSD = movements
-        .filter(m => m.type === 'ingreso')
-        .reduce((acc, curr) => acc + Number(curr.amount_usd), 0);
+    const handleReopenDay = async () => {
+        if (!confirm(`¿Reabrir la caja de ${branch} del ${date.split('-').reverse().join('/')}?`)) return;
+        setIsClosing(true);
+        try {
+            const { data, error } = await supabase.rpc('reabrir_caja_diaria', { p_date: date, p_branch: branch });
+            if (error) throw error;
+            setTotals(data);
+        } catch (e: any) {
+            alert('Error al reabrir la caja: ' + e.message);
+        } finally {
+            setIsClosing(false);
+        }
+    };
 
-    const totalCheques = checks.reduce((acc, curr) => acc + Number(curr.amount), 0);
-    
+    const totalIngresosARS = Number(totals?.ingresos_ars) || 0;
+    const totalEgresosARS = Number(totals?.egresos_ars) || 0;
+    const totalIngresosUSD = Number(totals?.ingresos_usd) || 0;
+    const totalCheques = Number(totals?.cheques_total) || 0;
     const saldoFinal = totalIngresosARS - totalEgresosARS;
+    const isClosed = !!totals?.closed_at;
 
     return (
         <div className="flex flex-col gap-6 pb-20 animate-in fade-in duration-300 max-w-7xl mx-auto">
@@ -338,8 +342,22 @@ export const DailyCashSheet: React.FC<{ currentUser: User, onNavigate: (view: Vi
                 </div>
 
                 <div className="flex gap-3 w-full sm:w-auto">
-                    <button className="flex-1 sm:flex-none px-6 py-2.5 bg-red-50 text-red-500 border border-red-200 hover:bg-red-100 rounded-xl text-xs font-black uppercase transition-colors flex items-center justify-center gap-2">
-                        <Lock size={16} /> Cerrar Caja
+                    {isClosed && currentUser.role === 'vale' && (
+                        <button
+                            onClick={handleReopenDay}
+                            disabled={isClosing || isLoading}
+                            className="flex-1 sm:flex-none px-4 py-2.5 bg-surface border border-surfaceHighlight hover:bg-surfaceHighlight rounded-xl text-xs font-black text-text uppercase transition-colors flex items-center justify-center gap-2 disabled:opacity-60 disabled:cursor-not-allowed"
+                        >
+                            <Unlock size={16} /> Reabrir
+                        </button>
+                    )}
+                    <button
+                        onClick={handleCloseDay}
+                        disabled={isClosed || isClosing || isLoading}
+                        title={isClosed ? `Cerrada el ${new Date(totals.closed_at).toLocaleString('es-AR')}` : undefined}
+                        className="flex-1 sm:flex-none px-6 py-2.5 bg-red-50 text-red-500 border border-red-200 hover:bg-red-100 rounded-xl text-xs font-black uppercase transition-colors flex items-center justify-center gap-2 disabled:opacity-60 disabled:cursor-not-allowed"
+                    >
+                        {isClosing ? <Loader2 size={16} className="animate-spin" /> : <Lock size={16} />} {isClosed ? 'Caja Cerrada' : 'Cerrar Caja'}
                     </button>
                     <button className="flex-1 sm:flex-none px-8 py-2.5 bg-[#e47c00] hover:bg-[#cc6f00] text-white rounded-xl text-xs font-black uppercase shadow-lg shadow-orange-500/20 transition-all active:scale-95 flex items-center justify-center gap-2">
                         Finalizar Planilla <CheckCircle2 size={16} />
@@ -69,7 +69,7 @@ export const Dashboard: React.FC<DashboardProps> = ({ onNavigate }) => {
         // 2. FETCH ORDERS (ALL STATUSES)
         const { data: ordersData, error: ordersError } = await supabase
             .from('orders')
-            .select('*, order_items(*)')
+            .select('*')
             .gte('created_at', startDateStr)
             .lte('created_at', endDateStr)
             .order('created_at', { ascending: false });
@@ -89,50 +89,32 @@ export const Dashboard: React.FC<DashboardProps> = ({ onNavigate }) => {
                 lastUpdated: o.updated_at || o.created_at,
                 paymentMethod: o.payment_method,
                 total: o.total,
-                productCount: (o.order_items || []).length,
-                products: (o.order_items || []).map((i: any) => ({
-                    code: i.code,
-                    name: i.name || (i.master_products?.desart) || 'S/N',
-                    quantity: i.quantity,
-                    originalQuantity: i.original_quantity,
-                    shippedQuantity: i.shipped_quantity,
-                    unitPrice: i.unit_price,
-                    subtotal: i.subtotal,
-                    isChecked: i.is_checked
-                })),
+                productCount: o.item_count ?? 0,
+                checkedCount: o.checked_count ?? 0,
+                products: [],
                 history: []
             }));
             setDashboardOrders(mappedOrders);
         }
 
         // 3. FETCH EXPIRATIONS (MANUAL + SYSTEM)
-        const [manualRes, systemRes] = await Promise.all([
-            supabase.from('product_expirations').select('*'),
-            supabase.from('stock_inbound_items').select('*, master_products(desart)').not('expiry_date', 'is', null)
-        ]);
-
-        let allExpirations: ProductExpiration[] = [];
-
-        // Process Manual
-        if (manualRes.data) {
-            manualRes.data.forEach((item: any) => {
-                allExpirations.push(mapToExpiration(item.id, item.product_name, item.total_quantity, item.expiry_date));
-            });
-        }
-
-        // Process System
-        if (systemRes.data) {
-            systemRes.data.forEach((item: any) => {
-                const name = item.master_products?.desart || 'Producto Sistema';
-                allExpirations.push(mapToExpiration(item.id, name, item.quantity, item.expiry_date));
-            });
-        }
+        // La vista ya une carga manual e ingresos con master_products; se piden
+        // solo los 5 más próximos que no son NORMAL (mismo corte que mapToExpiration)
+        const cutoff = new Date();
+        cutoff.setDate(cutoff.getDate() + 179);
+        const cutoffIso = `${cutoff.getFullYear()}-${String(cutoff.getMonth() + 1).padStart(2, '0')}-${String(cutoff.getDate()).padStart(2, '0')}`;
+        const { data: expiryRows } = await supabase
+            .from('vencimientos_alertas')
+            .select('*')
+            .lt('expiry_date', cutoffIso)
+            .order('expiry_date', { ascending: true })
+            .limit(5);
+
+        const allExpirations: ProductExpiration[] = (expiryRows || []).map((item: any) =>
+            mapToExpiration(item.id, item.product_name || 'Producto Sistema', item.quantity, item.expiry_date)
+        );
 
-        // Filter valid, sort by nearest, take top 5
         const validExpirations = allExpirations
-            .filter(e => e.status !== 'NORMAL') // Only show moderate/critical on dashboard
-            .sort((a, b) => a.daysRemaining - b.daysRemaining)
-            .slice(0, 5)
             .map(e => ({
                 id: e.id,
                 title: e.productName,
@@ -21,8 +21,9 @@ import {
     Circle
 } from 'lucide-react';
 import { supabase } from '../supabase';
+import { loadAllPages } from '../pagedLoader';
 import { MasterProduct } from '../types';
-import { jsPDF } from 'jspdf';
+import { loadJsPDF } from '../lazyLibs';
 
 interface LabelQueueItem {
     id: string;
@@ -66,33 +67,10 @@ export const Etiquetador: React.FC = () => {
     const fetchData = async () => {
         setIsLoading(true);
         try {
-            const fetchAllProducts = async () => {
-                let all: MasterProduct[] = [];
-                let page = 0;
-                while (true) {
-                    const { data, error } = await supabase.from('master_products').select('*').neq('familia', 'ELIMINADOS').gt('stock_betbeder', 0).order('desart', { ascending: true }).range(page * 1000, (page + 1) * 1000 - 1);
-                    if (error) throw error;
-                    if (data) all.push(...data);
-                    if (!data || data.length < 1000) break;
-                    page++;
-                }
-                return all;
-            };
-
-            const fetchAllStates = async () => {
-                let all: any[] = [];
-                let page = 0;
-                while (true) {
-                    const { data, error } = await supabase.from('printed_labels_state').select('*').range(page * 1000, (page + 1) * 1000 - 1);
-                    if (error) throw error;
-                    if (data) all.push(...data);
-                    if (!data || data.length < 1000) break;
-                    page++;
-                }
-                return all;
-            };
-
-            const [allProducts, allStates] = await Promise.all([fetchAllProducts(), fetchAllStates()]);
+            const [allProducts, allStates] = await Promise.all([
+                loadAllPages<MasterProduct>((withCount) => supabase.from('master_products').select('*', withCount ? { count: 'exact' } : undefined).neq('familia', 'ELIMINADOS').gt('stock_betbeder', 0).order('desart', { ascending: true }).order('codart', { ascending: true })),
+                loadAllPages<any>((withCount) => supabase.from('printed_labels_state').select('*', withCount ? { count: 'exact' } : undefined).order('codart'))
+            ]);
             
             setProducts(allProducts);
             
@@ -224,6 +202,7 @@ export const Etiquetador: React.FC = () => {
         if (itemsToPrint.length === 0) { alert("No hay productos seleccionados."); return; }
 
         try {
+            const jsPDF = await loadJsPDF();
             const doc = new jsPDF({ orientation: 'portrait', unit: 'mm', format: 'a4' });
             const margin = 10;
             const labelWidth = labelWidthCm * 10;
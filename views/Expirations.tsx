@@ -22,6 +22,7 @@ import {
 } from 'lucide-react';
 import { ProductExpiration, ExpirationStatus } from '../types';
 import { supabase } from '../supabase';
+import { ingestExpirations, ExpirationIngestResult } from '../expirationIngest';
 
 type ExpiryTab = 'manual' | 'system';
 
@@ -34,6 +35,7 @@ export const Expirations: React.FC = () => {
     const [isSaving, setIsSaving] = useState(false);
     const [searchTerm, setSearchTerm] = useState('');
     const [statusFilter, setStatusFilter] = useState<ExpirationStatus | 'TODOS'>('TODOS');
+    const [ingestResult, setIngestResult] = useState<ExpirationIngestResult | null>(null);
     
     // Estado para confirmación de eliminación
     const [confirmingId, setConfirmingId] = useState<string | null>(null);
@@ -42,11 +44,15 @@ export const Expirations: React.FC = () => {
     const fetchManualExpirations = async () => {
         const { data, error } = await supabase
             .from('product_expirations')
-            .select('*')
+            .select('*, master_products(desart)')
             .order('expiry_date', { ascending: true });
         
         if (!error && data) {
-            setManualItems(data.map(mapToAppFormat));
+            setManualItems(data.map(item => mapToAppFormat({
+                ...item,
+                product_name: item.master_products?.desart || item.product_name,
+                total_quantity: item.remaining_quantity ?? item.total_quantity
+            })));
         }
     };
 
@@ -71,6 +77,7 @@ export const Expirations: React.FC = () => {
             setSystemItems(data.map(item => {
                 const mapped = mapToAppFormat({
                     id: item.id,
+                    codart: item.codart,
                     product_name: item.master_products?.desart || 'Desc. no disponible',
                     total_quantity: item.quantity,
                     expiry_date: item.expiry_date
@@ -100,6 +107,7 @@ export const Expirations: React.FC = () => {
         return {
             id: item.id,
             productName: item.product_name,
+            codart: item.codart,
             quantity: `${item.total_quantity} unidades`,
             expiryDate,
             daysRemaining,
@@ -121,32 +129,22 @@ export const Expirations: React.FC = () => {
     const processAndSaveManual = async () => {
         if (!rawText.trim()) return;
         setIsSaving(true);
-        const regex = /(?:(\d+)\s*x\s*(\d+)\s+)?(.*?)\s*\(([\d/]+)\)/gi;
-        const matches = Array.from(rawText.matchAll(regex));
-        const inserts = matches.map(match => {
-            const qty1 = match[1] ? parseInt(match[1]) : 1;
-            const qty2 = match[2] ? parseInt(match[2]) : 1;
-            const totalQty = qty1 * qty2;
-            const productName = match[3].trim();
-            const dateStr = match[4];
-            const dateParts = dateStr.split('/');
-            let day = parseInt(dateParts[0]);
-            let month = parseInt(dateParts[1]) - 1;
-            let year = parseInt(dateParts[2]);
-            if (year < 100) year += 2000;
-            return {
-                product_name: productName,
-                total_quantity: totalQty,
-                expiry_date: `${year}-${String(month + 1).padStart(2, '0')}-${String(day).padStart(2, '0')}`
-            };
-        });
-
-        if (inserts.length > 0) {
-            const { error } = await supabase.from('product_expirations').insert(inserts);
-            if (!error) { setRawText(''); await fetchManualExpirations(); }
-            else alert("Error al guardar.");
-        } else alert("Formato incorrecto. Ejemplo: 2x4 speed (02/06/26)");
-        setIsSaving(false);
+        try {
+            const result = await ingestExpirations(rawText);
+            if (result.linked.length === 0 && result.unmatched.length === 0) {
+                alert("Formato incorrecto. Ejemplo: 2x4 speed (02/06/26)");
+                return;
+            }
+            // Quedan en el cuadro solo los renglones que no se pudieron leer, para corregirlos
+            setRawText(result.invalidLines.join('\n'));
+            setIngestResult(result);
+            await fetchManualExpirations();
+        } catch (e) {
+            console.error(e);
+            alert("Error al guardar.");
+        } finally {
+            setIsSaving(false);
+        }
     };
 
     // --- ACCIONES DE ELIMINACIÓN ---
@@ -235,6 +233,26 @@ export const Expirations: React.FC = () => {
                             {isSaving ? <Loader2 size={16} className="animate-spin" /> : <Wand2 size={16} />}
                             Guardar en Historial Manual
                         </button>
+                        {ingestResult && (
+                            <div className="bg-background border border-surfaceHighlight rounded-2xl p-4 flex flex-col gap-2 animate-in fade-in">
+                                <div className="flex items-center justify-between">
+                                    <p className="text-[10px] font-black uppercase tracking-widest text-muted">
+                                        <span className="text-green-600">{ingestResult.linked.length} vinculados</span>
+                                        {ingestResult.unmatched.length > 0 && <span className="text-orange-500"> · {ingestResult.unmatched.length} sin vincular</span>}
+                                        {ingestResult.invalidLines.length > 0 && <span className="text-red-500"> · {ingestResult.invalidLines.length} sin formato</span>}
+                                    </p>
+                                    <button onClick={() => setIngestResult(null)} className="p-1 text-muted hover:text-text"><X size={14}/></button>
+                                </div>
+                                {ingestResult.unmatched.map(r => (
+                                    <p key={r.id} className="text-xs text-orange-600 font-mono flex items-center gap-2">
+                                        <AlertCircle size={12} className="shrink-0" /> {r.raw_line}
+                                    </p>
+                                ))}
+                                {ingestResult.invalidLines.length > 0 && (
+                                    <p className="text-[10px] text-muted italic">Los renglones sin formato quedaron en el cuadro para corregirlos.</p>
+                                )}
+                            </div>
+                        )}
                     </div>
                 </div>
             )}
@@ -295,6 +313,10 @@ export const Expirations: React.FC = () => {
                                                         <div>
                                                             <p className="text-sm font-black text-text uppercase leading-tight">{item.productName}</p>
                                                             {activeTab === 'system' && <p className="text-[9px] font-bold text-primary uppercase mt-1">Depósito: {item.warehouse}</p>}
+                                                            {activeTab === 'manual' && (item.codart
+                                                                ? <p className="text-[9px] font-bold text-muted uppercase mt-1">Cód: {item.codart}</p>
+                                                                : <p className="text-[9px] font-black text-orange-500 uppercase mt-1">Sin vincular</p>
+                                                            )}
                                                         </div>
                                                     </div>
                                                 </td>
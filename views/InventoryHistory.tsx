@@ -18,6 +18,8 @@ interface MovementExtended extends StockMovement {
     inbound_info?: StockInbound & { supplier_name?: string };
     order_info?: { display_id: string, client_name: string };
     transfer_info?: { reference_code: string };
+    group_key?: string | null;
+    group_label?: string | null;
 }
 
 interface ProviderGroupData {
@@ -27,10 +29,28 @@ interface ProviderGroupData {
 
 type GroupEntry = [string, ProviderGroupData];
 
+const HISTORY_PAGE_SIZE = 500;
+const SEARCH_DEBOUNCE_MS = 300;
+
+// Adapta una fila de `stock_movement_ledger` a la forma que usan los grupos y el modal
+const mapLedgerRow = (r: any): MovementExtended => ({
+    ...r,
+    inbound_info: r.type === 'ingreso' && r.supplier_name ? {
+        id: r.reference_id,
+        display_number: r.inbound_display_number,
+        supplier_code: r.inbound_supplier_code,
+        observations: r.inbound_observations,
+        supplier_name: r.supplier_name
+    } as StockInbound & { supplier_name?: string } : undefined,
+    order_info: r.order_display_id ? { display_id: r.order_display_id, client_name: r.order_client_name } : undefined,
+    transfer_info: r.transfer_reference_code ? { reference_code: r.transfer_reference_code } : undefined
+});
+
 export const InventoryHistory: React.FC<{ currentUser: UserType }> = ({ currentUser }) => {
     const [movements, setMovements] = useState<MovementExtended[]>([]);
     const [isLoading, setIsLoading] = useState(true);
     const [searchTerm, setSearchTerm] = useState('');
+    const [debouncedSearch, setDebouncedSearch] = useState('');
     const [warehouseFilter, setWarehouseFilter] = useState<string>('TODOS');
     const [typeFilter, setTypeFilter] = useState<string>('TODOS');
     
@@ -46,108 +66,32 @@ export const InventoryHistory: React.FC<{ currentUser: UserType }> = ({ currentU
     const [expandedProviders, setExpandedProviders] = useState<Set<string>>(new Set());
     const [selectedGroup, setSelectedGroup] = useState<{ id: string, title: string, movements: MovementExtended[] } | null>(null);
 
+    const [hasMore, setHasMore] = useState(false);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
+
+    // Una sola consulta al libro de movimientos (vista desnormalizada + cursor)
+    const fetchPage = async (cursor?: { created_at: string, id: string }): Promise<MovementExtended[]> => {
+        const { data, error } = await supabase.rpc('obtener_libro_movimientos', {
+            p_desde: startDate,
+            p_hasta: endDate,
+            p_warehouse: warehouseFilter === 'TODOS' ? null : warehouseFilter,
+            p_type: typeFilter === 'TODOS' ? null : typeFilter,
+            p_cursor_created_at: cursor?.created_at ?? null,
+            p_cursor_id: cursor?.id ?? null,
+            p_limit: HISTORY_PAGE_SIZE,
+            p_search: debouncedSearch || null
+        });
+        if (error) throw error;
+
+        const rows = (data as any[]) || [];
+        setHasMore(rows.length === HISTORY_PAGE_SIZE);
+        return rows.map(mapLedgerRow);
+    };
+
     const fetchData = async () => {
         setIsLoading(true);
         try {
-            // 1. Cargar Movimientos
-            let query = supabase
-                .from('stock_movements')
-                .select(`
-                    *,
-                    master_products(desart),
-                    profiles:created_by(name),
-                    warehouses(name)
-                `)
-                .gte('created_at', `${startDate}T00:00:00`)
-                .lte('created_at', `${endDate}T23:59:59`)
-                .order('created_at', { ascending: false });
-            
-            const { data: movs, error: movErr } = await query;
-            if (movErr) throw movErr;
-
-            // Evitar tipo 'unknown' de Supabase
-            const movementsRaw = (movs as any[]) || [];
-
-            // 2. Obtener IDs únicos de ingresos
-            const inboundIds = Array.from(new Set(
-                movementsRaw
-                    .filter(m => m.type === 'ingreso' && m.reference_id)
-                    .map(m => m.reference_id)
-            ));
-            
-            let inboundsMap: Record<string, any> = {};
-            if (inboundIds.length > 0) {
-                const { data: inbs, error: inbErr } = await supabase
-                    .from('stock_inbounds')
-                    .select('*, providers_master(razon_social)')
-                    .in('id', inboundIds);
-                
-                if (inbErr) throw inbErr;
-                
-                const inboundsRaw = (inbs as any[]) || [];
-                inboundsRaw.forEach(i => {
-                    inboundsMap[i.id] = {
-                        ...i,
-                        supplier_name: i.providers_master?.razon_social || i.supplier_code || 'S/D'
-                    };
-                });
-            }
-
-            // 3. Obtener IDs únicos de pedidos (ventas y NC)
-            const orderIds = Array.from(new Set(
-                movementsRaw
-                    .filter(m => (m.type === 'venta' || m.type === 'nota de crédito') && m.reference_id)
-                    .map(m => m.reference_id)
-            ));
-            
-            let ordersMap: Record<string, any> = {};
-            if (orderIds.length > 0) {
-                const { data: ords, error: ordErr } = await supabase
-                    .from('orders')
-                    .select('id, display_id, client_name')
-                    .in('id', orderIds);
-                
-                if (ordErr) throw ordErr;
-                
-                const ordersRaw = (ords as any[]) || [];
-                ordersRaw.forEach(o => {
-                    ordersMap[o.id] = o;
-                });
-            }
-
-            // 4. Obtener IDs únicos de transferencias
-            const transferIds = Array.from(new Set(
-                movementsRaw
-                    .filter(m => m.type === 'transferencia' && m.reference_id)
-                    .map(m => m.reference_id)
-            ));
-            
-            let transfersMap: Record<string, any> = {};
-            if (transferIds.length > 0) {
-                const { data: trfs, error: trfErr } = await supabase
-                    .from('stock_transfers')
-                    .select('id, reference_code')
-                    .in('id', transferIds);
-                
-                if (trfErr) throw trfErr;
-                
-                const transfersRaw = (trfs as any[]) || [];
-                transfersRaw.forEach(t => {
-                    transfersMap[t.id] = t;
-                });
-            }
-
-            const mapped: MovementExtended[] = movementsRaw.map((m: any) => ({
-                ...m,
-                desart: m.master_products?.desart,
-                user_name: m.profiles?.name || 'Sistema',
-                warehouse_name: m.warehouses?.name || 'N/A',
-                inbound_info: m.type === 'ingreso' ? inboundsMap[m.reference_id] : undefined,
-                order_info: (m.type === 'venta' || m.type === 'nota de crédito') ? ordersMap[m.reference_id] : undefined,
-                transfer_info: m.type === 'transferencia' ? transfersMap[m.reference_id] : undefined
-            }));
-            
-            setMovements(mapped);
+            setMovements(await fetchPage());
         } catch (err: any) {
             console.error("Error historial:", err);
         } finally {
@@ -155,7 +99,27 @@ export const InventoryHistory: React.FC<{ currentUser: UserType }> = ({ currentU
         }
     };
 
-    useEffect(() => { fetchData(); }, [startDate, endDate]);
+    const loadMore = async () => {
+        const last = movements[movements.length - 1];
+        if (!last || isLoadingMore) return;
+        setIsLoadingMore(true);
+        try {
+            const next = await fetchPage({ created_at: last.created_at, id: last.id });
+            setMovements(prev => [...prev, ...next]);
+        } catch (err: any) {
+            console.error("Error historial:", err);
+        } finally {
+            setIsLoadingMore(false);
+        }
+    };
+
+    useEffect(() => {
+        const timer = setTimeout(() => setDebouncedSearch(searchTerm.trim()), SEARCH_DEBOUNCE_MS);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
+
+    // Cualquier cambio de filtro (incluida la búsqueda) vuelve a la primera página
+    useEffect(() => { fetchData(); }, [startDate, endDate, warehouseFilter, typeFilter, debouncedSearch]);
 
     const toggleProvider = (name: string) => {
         const next = new Set(expandedProviders);
@@ -163,27 +127,16 @@ export const InventoryHistory: React.FC<{ currentUser: UserType }> = ({ currentU
         setExpandedProviders(next);
     };
 
-    // Filtro principal por palabras clave
-    const filteredMovements = useMemo<MovementExtended[]>(() => {
-        const keywords = searchTerm.toLowerCase().split(/\s+/).filter(k => k.length > 0);
-        return movements.filter(m => {
-            const textToSearch = `${m.desart} ${m.codart} ${m.inbound_info?.supplier_name || ''} ${m.inbound_info?.observations || ''}`.toLowerCase();
-            const matchesSearch = keywords.every(k => textToSearch.includes(k));
-            
-            const matchesWarehouse = warehouseFilter === 'TODOS' || m.warehouse_name === warehouseFilter;
-            const matchesType = typeFilter === 'TODOS' || m.type === typeFilter;
-
-            return matchesSearch && matchesWarehouse && matchesType;
-        });
-    }, [movements, searchTerm, warehouseFilter, typeFilter]);
+    // La búsqueda por palabras clave la resuelve obtener_libro_movimientos
+    const filteredMovements = movements;
 
     // Agrupación compleja con tipado GroupEntry
     const providerGroups = useMemo<GroupEntry[]>(() => {
         const groups: Record<string, ProviderGroupData> = {};
         
         filteredMovements.filter(m => m.type === 'ingreso').forEach(m => {
-            const pName = m.inbound_info?.supplier_name || 'OTROS / MANUALES';
-            const refId = m.reference_id || 'SIN_REF';
+            const pName = m.group_label || 'OTROS / MANUALES';
+            const refId = m.group_key || 'SIN_REF';
 
             if (!groups[pName]) groups[pName] = { name: pName, events: {} };
             if (!groups[pName].events[refId]) groups[pName].events[refId] = [];
@@ -209,24 +162,9 @@ export const InventoryHistory: React.FC<{ currentUser: UserType }> = ({ currentU
         const individual: MovementExtended[] = [];
 
         filteredMovements.filter(m => m.type !== 'ingreso').forEach(m => {
-            let groupId = null;
-            let groupRef = '';
-
-            if (m.type === 'venta' || m.type === 'nota de crédito') {
-                groupId = m.reference_id;
-                groupRef = m.order_info ? `Pedido #${m.order_info.display_id} - ${m.order_info.client_name}` : (m.transfer_group_code || m.reference_id || 'S/REF');
-            } else if (m.type === 'transferencia') {
-                groupId = m.transfer_group_code || m.reference_id;
-                groupRef = m.transfer_info ? `Transferencia ${m.transfer_info.reference_code}` : (m.transfer_group_code || m.reference_id || 'S/REF');
-            } else if (m.type === 'ajuste') {
-                if (m.transfer_group_code) {
-                    groupId = m.transfer_group_code;
-                    groupRef = m.transfer_group_code;
-                } else if (m.reference_id) {
-                    groupId = m.reference_id;
-                    groupRef = m.reference_id;
-                }
-            }
+            // La clave y la etiqueta de grupo vienen resueltas desde el libro
+            const groupId = m.group_key;
+            const groupRef = m.group_label || '';
 
             if (groupId) {
                 if (!groups[groupId]) {
@@ -483,6 +421,17 @@ export const InventoryHistory: React.FC<{ currentUser: UserType }> = ({ currentU
                                 </div>
                             </div>
                         )}
+                        {hasMore && (
+                            <div className="flex justify-center pt-6">
+                                <button 
+                                    onClick={loadMore}
+                                    disabled={isLoadingMore}
+                                    className="flex items-center gap-2 px-6 py-3 bg-surface border border-surfaceHighlight text-text hover:text-primary rounded-2xl transition-all text-[10px] font-black uppercase shadow-sm disabled:opacity-50"
+                                >
+                                    {isLoadingMore ? <Loader2 size={14} className="animate-spin"/> : <History size={14}/>} Cargar movimientos anteriores
+                                </button>
+                            </div>
+                        )}
                     </>
                 )}
             </div>
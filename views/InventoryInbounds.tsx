@@ -15,6 +15,7 @@ import {
     Copy
 } from 'lucide-react';
 import { supabase } from '../supabase';
+import { useReferenceData } from '../referenceData';
 import { StockInbound, MasterProduct, User as UserType, WarehouseCode } from '../types';
 
 export const InventoryInbounds: React.FC<{ currentUser: UserType }> = ({ currentUser }) => {
@@ -38,8 +39,9 @@ export const InventoryInbounds: React.FC<{ currentUser: UserType }> = ({ current
     const [assemblerComment, setAssemblerComment] = useState('');
     const [lastReference, setLastReference] = useState<string | null>(null);
     const [selectedWarehouse, setSelectedWarehouse] = useState<string>('');
-    const [warehouses, setWarehouses] = useState<{id: string, name: string}[]>([]);
-    const [providers, setProviders] = useState<{codigo: string, razon_social: string}[]>([]);
+    const { rows: warehouses } = useReferenceData('warehouses');
+    const { rows: allProviders } = useReferenceData('providers_master');
+    const providers = useMemo(() => allProviders.filter(p => p.activo === true), [allProviders]);
     const [draftItems, setDraftItems] = useState<any[]>([]);
 
     // Estados para búsqueda avanzada
@@ -68,13 +70,9 @@ export const InventoryInbounds: React.FC<{ currentUser: UserType }> = ({ current
     const fetchInitialData = async () => {
         setIsLoading(true);
         try {
-            const [inbRes, whRes, provRes] = await Promise.all([
-                supabase.from('stock_inbounds')
-                    .select('*, providers_master(razon_social), warehouses(name), profiles:created_by(name)')
-                    .order('created_at', { ascending: false }),
-                supabase.from('warehouses').select('*'),
-                supabase.from('providers_master').select('codigo, razon_social').eq('activo', true)
-            ]);
+            const inbRes = await supabase.from('stock_inbounds')
+                .select('*, providers_master(razon_social), warehouses(name), profiles:created_by(name)')
+                .order('created_at', { ascending: false });
 
             if (inbRes.data) {
                 const mapped = inbRes.data.map((i: any) => ({
@@ -91,16 +89,6 @@ export const InventoryInbounds: React.FC<{ currentUser: UserType }> = ({ current
                     if (latestRef) setLastReference(latestRef);
                 }
             }
-
-            if (whRes.data) setWarehouses(whRes.data);
-            
-            if (provRes.data) {
-                // Ordenar proveedores alfabéticamente por razon_social
-                const sortedProviders = [...provRes.data].sort((a, b) => 
-                    a.razon_social.localeCompare(b.razon_social)
-                );
-                setProviders(sortedProviders);
-            }
         } catch (err) { 
             console.error("Error cargando ingresos:", err); 
         } finally { 
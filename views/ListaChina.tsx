@@ -19,6 +19,7 @@ import {
     History
 } from 'lucide-react';
 import { supabase } from '../supabase';
+import { loadAllPages } from '../pagedLoader';
 import { MasterProduct } from '../types';
 
 // ==========================================
@@ -72,7 +73,10 @@ const SUB_CONFIG: Record<string, { label: string, emoji: string }> = {
 
 export const ListaChina: React.FC = () => {
     const [products, setProducts] = useState<MasterProduct[]>([]);
-    const [snapshotMap, setSnapshotMap] = useState<Record<string, number>>({});
+    // Novedades contra la última base fijada (calculadas en el servidor)
+    const [newCodes, setNewCodes] = useState<Set<string>>(new Set());
+    const [changedCount, setChangedCount] = useState(0);
+    const [baseCount, setBaseCount] = useState(0);
     const [lastSnapshotDate, setLastSnapshotDate] = useState<string | null>(null);
     const [isLoading, setIsLoading] = useState(true);
     const [isSaving, setIsSaving] = useState(false);
@@ -88,46 +92,24 @@ export const ListaChina: React.FC = () => {
         if (!isSilent) setIsLoading(true);
         setDbError(null);
         try {
-            const PAGE_SIZE = 1000;
-            let from = 0;
-            let allProducts: MasterProduct[] = [];
-            let hasMore = true;
-
-            while (hasMore) {
-                const { data, error } = await supabase
+            // Productos (en páginas paralelas) y novedades contra la base a la vez
+            const [allProducts, { data: news, error: newsError }] = await Promise.all([
+                loadAllPages<MasterProduct>((withCount) => supabase
                     .from('master_products')
-                    .select('codart, desart, pventa_4, familia, nsubf, stock_llerena, costo, pventa_1, pventa_2, pventa_3')
+                    .select('codart, desart, pventa_4, familia, nsubf, stock_llerena, costo, pventa_1, pventa_2, pventa_3', withCount ? { count: 'exact' } : undefined)
                     .neq('familia', 'ELIMINADOS')
                     .gt('stock_llerena', 0)
-                    .order('desart', { ascending: true })
-                    .range(from, from + PAGE_SIZE - 1);
-
-                if (error) throw error;
-                if (data && data.length > 0) {
-                    allProducts = [...allProducts, ...data];
-                    if (data.length < PAGE_SIZE) hasMore = false;
-                    else from += PAGE_SIZE;
-                } else {
-                    hasMore = false;
-                }
-            }
+                    .order('desart', { ascending: true }).order('codart', { ascending: true })),
+                supabase.rpc('novedades_lista_whatsapp')
+            ]);
 
-            const { data: allSnapshots, error: snapError } = await supabase
-                .from('whatsapp_list_snapshot')
-                .select('codart, last_price, created_at');
-
-            if (snapError) throw snapError;
-
-            const map: Record<string, number> = {};
-            let latestDate: string | null = null;
-            if (allSnapshots && allSnapshots.length > 0) {
-                allSnapshots.forEach(s => { map[s.codart] = s.last_price; });
-                latestDate = allSnapshots[0].created_at;
-            }
+            if (newsError) throw newsError;
 
             setProducts(allProducts);
-            setSnapshotMap(map);
-            setLastSnapshotDate(latestDate ? new Date(latestDate).toLocaleString('es-AR') : null);
+            setNewCodes(new Set<string>(news?.new_codes || []));
+            setChangedCount((news?.changed_codes || []).length);
+            setBaseCount(news?.base_count || 0);
+            setLastSnapshotDate(news?.created_at ? new Date(news.created_at).toLocaleString('es-AR') : null);
         } catch (err: any) {
             setDbError(err.message || "Error de conexión.");
         } finally {
@@ -140,7 +122,7 @@ export const ListaChina: React.FC = () => {
     const generateListText = useCallback(() => {
         if (products.length === 0) return "";
         
-        const baseExists = Object.keys(snapshotMap).length > 0;
+        const baseExists = baseCount > 0;
 
         // Categorías Principales permitidas (Regla 2)
         const hierarchy: Record<string, Record<string, MasterProduct[]>> = {
@@ -153,7 +135,7 @@ export const ListaChina: React.FC = () => {
         products.forEach(p => {
             const matchesSearch = p.desart.toLowerCase().includes(searchTerm.toLowerCase()) ||
                                  p.codart.toLowerCase().includes(searchTerm.toLowerCase());
-            const isNew = baseExists && snapshotMap[p.codart] === undefined;
+            const isNew = baseExists && newCodes.has(p.codart);
             if (!matchesSearch || (showOnlyNew && !isNew)) return;
 
             const rawSub = (p.nsubf || p.familia || 'OTROS').toUpperCase();
@@ -213,7 +195,7 @@ export const ListaChina: React.FC = () => {
                 
                 // Ordenar productos alfabéticamente
                 items.sort((a, b) => a.desart.localeCompare(b.desart)).forEach(p => {
-                    const isNew = baseExists && snapshotMap[p.codart] === undefined;
+                    const isNew = baseExists && newCodes.has(p.codart);
                     text += `${p.desart.toUpperCase()} $${Math.round(p.pventa_4)}${isNew ? ' 🆕' : ''}\n`;
                 });
                 
@@ -226,11 +208,11 @@ export const ListaChina: React.FC = () => {
         });
 
         return text.trim();
-    }, [products, snapshotMap, searchTerm, showOnlyNew]);
+    }, [products, newCodes, baseCount, searchTerm, showOnlyNew]);
 
     useEffect(() => {
         if (!isLoading) setGeneratedText(generateListText());
-    }, [products, snapshotMap, searchTerm, isLoading, showOnlyNew, generateListText]);
+    }, [products, newCodes, baseCount, searchTerm, isLoading, showOnlyNew, generateListText]);
 
     const startSaveProcess = async () => {
         setIsSaving(true);
@@ -238,25 +220,14 @@ export const ListaChina: React.FC = () => {
         setShowConfirm(false);
 
         try {
-            await supabase.from('whatsapp_list_snapshot').delete().neq('codart', '._._._.'); 
-            const payload = products.map(p => ({ 
-                codart: p.codart, 
-                desart: p.desart, 
-                last_price: p.pventa_4 
-            }));
-
-            const CHUNK_SIZE = 150;
-            for (let i = 0; i < payload.length; i += CHUNK_SIZE) {
-                const chunk = payload.slice(i, i + CHUNK_SIZE);
-                const { error: insError } = await supabase.from('whatsapp_list_snapshot').upsert(chunk);
-                if (insError) throw insError;
-            }
-
-            const newSnapshotMap: Record<string, number> = {};
-            products.forEach(p => { newSnapshotMap[p.codart] = p.pventa_4; });
-            
-            setSnapshotMap(newSnapshotMap);
-            setLastSnapshotDate(new Date().toLocaleString('es-AR'));
+            // El servidor aplica solo altas, bajas y cambios de precio, todo o nada
+            const { data: saved, error } = await supabase.rpc('fijar_lista_whatsapp');
+            if (error) throw error;
+
+            setNewCodes(new Set());
+            setChangedCount(0);
+            setBaseCount(saved?.base_count || 0);
+            setLastSnapshotDate(new Date(saved?.created_at || Date.now()).toLocaleString('es-AR'));
             setSaveSuccess(true);
             setShowOnlyNew(false);
             
@@ -284,7 +255,7 @@ export const ListaChina: React.FC = () => {
         window.open(url, '_blank');
     };
 
-    const newItemsCount = products.filter(p => snapshotMap[p.codart] === undefined && Object.keys(snapshotMap).length > 0).length;
+    const newItemsCount = baseCount > 0 ? products.filter(p => newCodes.has(p.codart)).length : 0;
 
     return (
         <div className="flex flex-col gap-6 pb-20 max-w-6xl mx-auto animate-in fade-in">
@@ -375,7 +346,7 @@ export const ListaChina: React.FC = () => {
 
                         <button 
                             onClick={() => setShowOnlyNew(!showOnlyNew)}
-                            disabled={Object.keys(snapshotMap).length === 0}
+                            disabled={baseCount === 0}
                             className={`w-full py-5 rounded-2xl flex flex-col items-center justify-center gap-1 font-black uppercase transition-all border shadow-lg relative group ${showOnlyNew ? 'bg-primary text-white border-primary shadow-primary/30' : 'bg-background border-surfaceHighlight text-muted hover:border-primary/50'}`}
                         >
                             <div className="flex items-center gap-2 text-xs">
@@ -385,6 +356,11 @@ export const ListaChina: React.FC = () => {
                             <span className={`text-[10px] font-bold ${showOnlyNew ? 'text-white/80' : 'text-primary'}`}>
                                 {newItemsCount} artículos nuevos detectados
                             </span>
+                            {changedCount > 0 && (
+                                <span className={`text-[9px] font-bold ${showOnlyNew ? 'text-white/70' : 'text-muted'}`}>
+                                    {changedCount} con precio cambiado
+                                </span>
+                            )}
                             {showOnlyNew && <div className="absolute top-2 right-2 w-2 h-2 bg-white rounded-full animate-ping"></div>}
                         </button>
                     </div>
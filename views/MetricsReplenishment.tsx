@@ -1,154 +1,227 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { supabase } from '../supabase';
-import { Loader2, Package, AlertTriangle, XCircle, ShoppingCart, Search, Filter, ChevronLeft, ChevronRight } from 'lucide-react';
+import { useReferenceData } from '../referenceData';
+import { Loader2, Package, AlertTriangle, XCircle, ShoppingCart, Search, Filter, ChevronLeft, ChevronRight, RefreshCw } from 'lucide-react';
 
+type ReplenishmentStatus = 'normal' | 'reponer' | 'sin_stock';
+
+// Fila calculada por la RPC analisis_reposicion
 interface ReplenishmentItem {
     codart: string;
     desart: string;
-    stock_llerena: number;
-    stock_minimo: number;
-    stock_ideal: number;
     nomprov: string;
+    current: number;
+    min: number;
+    ideal: number;
+    status: ReplenishmentStatus;
+    suggested: number;
+    units_sold: number;
+    daily_velocity: number;
+    days_of_cover: number | null;
+}
+
+interface ReplenishmentStats {
+    normal: number;
+    reponer: number;
+    sin_stock: number;
+    total_suggested: number;
+}
+
+type LevelEdit = { stock_minimo?: number; stock_ideal?: number };
+
+// Niveles calculados por calcular_sugerencias_stock (tabla sugerencias_stock)
+interface StockSuggestion {
+    codart: string;
+    forecast_daily: number;
+    seasonal_factor: number;
+    suggested_min: number;
+    suggested_ideal: number;
+    computed_at: string;
 }
 
+const EMPTY_STATS: ReplenishmentStats = { normal: 0, reponer: 0, sin_stock: 0, total_suggested: 0 };
+const ITEMS_PER_PAGE = 100;
+const VELOCITY_DAYS = 30;
+const SEARCH_DEBOUNCE_MS = 300;
+const SAVE_DEBOUNCE_MS = 800;
+
+// Mismo criterio que el servidor, para reflejar la edición sin esperar la recarga
+const withLevels = (item: ReplenishmentItem, min: number, ideal: number): ReplenishmentItem => ({
+    ...item,
+    min,
+    ideal,
+    status: item.current === 0 ? 'sin_stock' : item.current <= min ? 'reponer' : 'normal',
+    suggested: Math.max(ideal - item.current, 0)
+});
+
+const SuggestionHint: React.FC<{
+    suggestion?: StockSuggestion;
+    value?: number;
+    current: number;
+    onApply: (value: number) => void;
+}> = ({ suggestion, value, current, onApply }) => {
+    if (!suggestion || value === undefined) return null;
+    const title = `Consumo estimado ${suggestion.forecast_daily}/día (estacionalidad x${suggestion.seasonal_factor}) · ${new Date(suggestion.computed_at).toLocaleDateString('es-AR')}`;
+    if (value === current) {
+        return <span className="block text-[10px] text-muted mt-1" title={title}>sug. {value}</span>;
+    }
+    return (
+        <button onClick={() => onApply(value)} title={title} className="block mx-auto text-[10px] font-bold text-primary hover:underline mt-1">
+            sug. {value}
+        </button>
+    );
+};
+
 export const MetricsReplenishment: React.FC = () => {
     const [items, setItems] = useState<ReplenishmentItem[]>([]);
+    const [stats, setStats] = useState<ReplenishmentStats>(EMPTY_STATS);
+    const [totalCount, setTotalCount] = useState(0);
+    const [providers, setProviders] = useState<string[]>([]);
     const [isLoading, setIsLoading] = useState(true);
     
     // Filters
     const [searchTerm, setSearchTerm] = useState('');
+    const [debouncedSearch, setDebouncedSearch] = useState('');
     const [statusFilter, setStatusFilter] = useState<string>('all');
     const [providerFilter, setProviderFilter] = useState<string>('all');
     
     // Pagination
     const [currentPage, setCurrentPage] = useState(1);
-    const ITEMS_PER_PAGE = 100;
+
+    // Ediciones de mínimo/ideal pendientes de guardar, por artículo
+    const pendingEditsRef = useRef<Map<string, LevelEdit>>(new Map());
+    const saveTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+    const requestIdRef = useRef(0);
+
+    // Sugerencias de mínimo/ideal para el depósito que mira el tablero (LLERENA)
+    const { rows: warehouses } = useReferenceData('warehouses');
+    const llerenaId = warehouses.find(w => (w.name || '').toUpperCase() === 'LLERENA')?.id;
+    const [suggestions, setSuggestions] = useState<Record<string, StockSuggestion>>({});
+    const [isRecalculating, setIsRecalculating] = useState(false);
 
     useEffect(() => {
-        fetchData();
+        supabase.rpc('valores_filtro_productos').then(({ data, error }) => {
+            if (error) console.error("Error loading providers:", error);
+            else setProviders((data as any)?.proveedores || []);
+        });
     }, []);
 
-    const fetchData = async () => {
-        setIsLoading(true);
+    useEffect(() => {
+        const timer = setTimeout(() => {
+            setDebouncedSearch(searchTerm.trim());
+            setCurrentPage(1);
+        }, SEARCH_DEBOUNCE_MS);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
+
+    const fetchData = useCallback(async (silent = false) => {
+        const requestId = ++requestIdRef.current;
+        if (!silent) setIsLoading(true);
         try {
-            const { data, error } = await supabase
-                .from('master_products')
-                .select('codart, desart, stock_llerena, stock_minimo, stock_ideal, nomprov');
+            const { data, error } = await supabase.rpc('analisis_reposicion', {
+                p_search: debouncedSearch,
+                p_status: statusFilter,
+                p_provider: providerFilter,
+                p_offset: (currentPage - 1) * ITEMS_PER_PAGE,
+                p_limit: ITEMS_PER_PAGE,
+                p_velocity_days: VELOCITY_DAYS
+            });
 
             if (error) throw error;
-            setItems(data || []);
+            // Una respuesta vieja no pisa la de filtros más nuevos
+            if (requestId !== requestIdRef.current) return;
+            setItems(data?.items || []);
+            setStats(data?.stats || EMPTY_STATS);
+            setTotalCount(data?.total || 0);
         } catch (error: any) {
             console.error("Error fetching replenishment data:", error);
-            alert("Error al cargar datos de reposición.");
+            if (!silent) alert("Error al cargar datos de reposición.");
         } finally {
-            setIsLoading(false);
+            if (requestId === requestIdRef.current) setIsLoading(false);
         }
-    };
+    }, [debouncedSearch, statusFilter, providerFilter, currentPage]);
 
-    const handleUpdateStock = async (codart: string, field: 'stock_minimo' | 'stock_ideal', value: string) => {
-        const numValue = value === '' ? 0 : parseInt(value, 10);
-        if (value !== '' && isNaN(numValue)) return;
+    useEffect(() => {
+        fetchData();
+    }, [fetchData]);
 
-        setItems(prev => prev.map(item => 
-            item.codart === codart ? { ...item, [field]: numValue } : item
-        ));
+    const flushEdits = useCallback(async () => {
+        if (saveTimerRef.current) {
+            clearTimeout(saveTimerRef.current);
+            saveTimerRef.current = null;
+        }
+        const pending = pendingEditsRef.current;
+        if (pending.size === 0) return;
+        pendingEditsRef.current = new Map();
 
+        const payload = Array.from(pending, ([codart, edit]) => ({ codart, ...edit }));
         try {
-            const { error } = await supabase
-                .from('master_products')
-                .update({ [field]: numValue })
-                .eq('codart', codart);
-            
+            const { error } = await supabase.rpc('actualizar_niveles_stock', { p_items: payload });
             if (error) throw error;
+            // Estados y totales vuelven a salir del servidor
+            if (pendingEditsRef.current.size === 0) fetchData(true);
         } catch (e: any) {
             console.error("Error updating stock:", e);
             alert("Error al actualizar el stock: " + e.message);
+            fetchData(true);
         }
-    };
+    }, [fetchData]);
 
-    const processedItems = useMemo(() => {
-        const processed = items.map(item => {
-            const current = item.stock_llerena || 0;
-            const min = item.stock_minimo || 0;
-            const ideal = item.stock_ideal || 0;
-
-            let status: 'normal' | 'reponer' | 'sin_stock' = 'normal';
-            if (current === 0) {
-                status = 'sin_stock';
-            } else if (current <= min) {
-                status = 'reponer';
-            }
-
-            let suggested = ideal - current;
-            if (suggested < 0) suggested = 0;
-
-            return {
-                ...item,
-                current,
-                min,
-                ideal,
-                status,
-                suggested
-            };
-        });
+    // Lo pendiente se guarda igual al salir de la pantalla
+    const flushEditsRef = useRef(flushEdits);
+    flushEditsRef.current = flushEdits;
+    useEffect(() => () => { flushEditsRef.current(); }, []);
 
-        // Ordenar: Sin stock primero, luego reponer, luego normal.
-        // Dentro de cada grupo, ordenar por cantidad sugerida (mayor a menor).
-        return processed.sort((a, b) => {
-            const statusWeight = { sin_stock: 1, reponer: 2, normal: 3 };
-            if (statusWeight[a.status] !== statusWeight[b.status]) {
-                return statusWeight[a.status] - statusWeight[b.status];
-            }
-            if (b.suggested !== a.suggested) {
-                return b.suggested - a.suggested;
-            }
-            return a.desart.localeCompare(b.desart);
-        });
-    }, [items]);
-
-    const uniqueProviders = useMemo(() => {
-        const providers = new Set(processedItems.map(item => item.nomprov).filter(Boolean));
-        return Array.from(providers).sort();
-    }, [processedItems]);
-
-    const filteredItems = useMemo(() => {
-        return processedItems.filter(item => {
-            const matchesSearch = !searchTerm || 
-                item.desart.toLowerCase().includes(searchTerm.toLowerCase()) || 
-                item.codart.toLowerCase().includes(searchTerm.toLowerCase());
-            
-            const matchesStatus = statusFilter === 'all' || item.status === statusFilter;
-            
-            const matchesProvider = providerFilter === 'all' || item.nomprov === providerFilter;
-
-            return matchesSearch && matchesStatus && matchesProvider;
-        });
-    }, [processedItems, searchTerm, statusFilter, providerFilter]);
+    const handleUpdateStock = (codart: string, field: 'stock_minimo' | 'stock_ideal', value: string) => {
+        const numValue = value === '' ? 0 : parseInt(value, 10);
+        if (value !== '' && isNaN(numValue)) return;
 
-    // Reset page when filters change
-    useEffect(() => {
-        setCurrentPage(1);
-    }, [searchTerm, statusFilter, providerFilter]);
+        setItems(prev => prev.map(item => {
+            if (item.codart !== codart) return item;
+            return field === 'stock_minimo'
+                ? withLevels(item, numValue, item.ideal)
+                : withLevels(item, item.min, numValue);
+        }));
 
-    const stats = useMemo(() => {
-        let normal = 0;
-        let reponer = 0;
-        let sinStock = 0;
-        let totalSuggested = 0;
+        const edit = pendingEditsRef.current.get(codart) || {};
+        pendingEditsRef.current.set(codart, { ...edit, [field]: numValue });
+        if (saveTimerRef.current) clearTimeout(saveTimerRef.current);
+        saveTimerRef.current = setTimeout(flushEdits, SAVE_DEBOUNCE_MS);
+    };
 
-        filteredItems.forEach(item => {
-            if (item.status === 'normal') normal++;
-            else if (item.status === 'reponer') reponer++;
-            else if (item.status === 'sin_stock') sinStock++;
+    // Solo los artículos de la página visible
+    const pageCodes = items.map(i => i.codart).join(',');
+    const fetchSuggestions = useCallback(async () => {
+        if (!llerenaId || !pageCodes) { setSuggestions({}); return; }
+        const { data, error } = await supabase
+            .from('sugerencias_stock')
+            .select('codart, forecast_daily, seasonal_factor, suggested_min, suggested_ideal, computed_at')
+            .eq('warehouse_id', llerenaId)
+            .in('codart', pageCodes.split(','));
+        if (error) { console.error("Error loading suggestions:", error); return; }
+        const byCode: Record<string, StockSuggestion> = {};
+        (data || []).forEach((s: StockSuggestion) => { byCode[s.codart] = s; });
+        setSuggestions(byCode);
+    }, [llerenaId, pageCodes]);
 
-            totalSuggested += item.suggested;
-        });
+    useEffect(() => {
+        fetchSuggestions();
+    }, [fetchSuggestions]);
 
-        return { normal, reponer, sinStock, totalSuggested };
-    }, [filteredItems]);
+    const handleRecalculate = async () => {
+        setIsRecalculating(true);
+        try {
+            const { error } = await supabase.rpc('calcular_sugerencias_stock');
+            if (error) throw error;
+            await fetchSuggestions();
+        } catch (e: any) {
+            alert("Error al recalcular sugerencias: " + e.message);
+        } finally {
+            setIsRecalculating(false);
+        }
+    };
 
-    const totalPages = Math.max(1, Math.ceil(filteredItems.length / ITEMS_PER_PAGE));
-    const paginatedItems = filteredItems.slice((currentPage - 1) * ITEMS_PER_PAGE, currentPage * ITEMS_PER_PAGE);
+    const totalPages = Math.max(1, Math.ceil(totalCount / ITEMS_PER_PAGE));
 
     return (
         <div className="flex flex-col gap-6 pb-20 animate-in fade-in duration-500 max-w-7xl mx-auto w-full">
@@ -156,10 +229,19 @@ export const MetricsReplenishment: React.FC = () => {
                 <div className="p-3 bg-primary rounded-2xl text-white shadow-lg shadow-primary/20">
                     <ShoppingCart size={32} />
                 </div>
-                <div>
+                <div className="flex-1">
                     <h2 className="text-3xl font-black text-text tracking-tight uppercase italic">Reposición</h2>
                     <p className="text-muted font-medium">Control de stock y sugerencias de compra</p>
                 </div>
+                <button
+                    onClick={handleRecalculate}
+                    disabled={isRecalculating}
+                    title="Recalcula mínimo e ideal sugeridos según el consumo real"
+                    className="flex items-center gap-2 px-4 py-3 rounded-xl bg-surface border border-surfaceHighlight text-text font-black uppercase text-xs hover:bg-surfaceHighlight disabled:opacity-50 transition-all"
+                >
+                    {isRecalculating ? <Loader2 size={16} className="animate-spin" /> : <RefreshCw size={16} />}
+                    Recalcular sugerencias
+                </button>
             </div>
 
             {/* STATS CARDS */}
@@ -183,14 +265,14 @@ export const MetricsReplenishment: React.FC = () => {
                         <XCircle size={24} />
                         <span className="font-bold uppercase tracking-wider text-xs">Sin Stock</span>
                     </div>
-                    <span className="text-4xl font-black text-text">{stats.sinStock}</span>
+                    <span className="text-4xl font-black text-text">{stats.sin_stock}</span>
                 </div>
                 <div className="bg-surface border border-surfaceHighlight rounded-3xl p-6 shadow-sm flex flex-col gap-2">
                     <div className="flex items-center gap-3 text-primary">
                         <ShoppingCart size={24} />
                         <span className="font-bold uppercase tracking-wider text-xs">Total Sugerido</span>
                     </div>
-                    <span className="text-4xl font-black text-text">{stats.totalSuggested}</span>
+                    <span className="text-4xl font-black text-text">{stats.total_suggested}</span>
                 </div>
             </div>
 
@@ -212,7 +294,7 @@ export const MetricsReplenishment: React.FC = () => {
                             <Filter className="absolute left-4 top-1/2 -translate-y-1/2 text-muted" size={18} />
                             <select
                                 value={statusFilter}
-                                onChange={(e) => setStatusFilter(e.target.value)}
+                                onChange={(e) => { setStatusFilter(e.target.value); setCurrentPage(1); }}
                                 className="w-full bg-background border border-surfaceHighlight rounded-xl py-3 pl-12 pr-10 text-sm font-bold text-text outline-none focus:border-primary transition-all shadow-inner appearance-none cursor-pointer"
                             >
                                 <option value="all">Todos los estados</option>
@@ -226,11 +308,11 @@ export const MetricsReplenishment: React.FC = () => {
                             <Filter className="absolute left-4 top-1/2 -translate-y-1/2 text-muted" size={18} />
                             <select
                                 value={providerFilter}
-                                onChange={(e) => setProviderFilter(e.target.value)}
+                                onChange={(e) => { setProviderFilter(e.target.value); setCurrentPage(1); }}
                                 className="w-full bg-background border border-surfaceHighlight rounded-xl py-3 pl-12 pr-10 text-sm font-bold text-text outline-none focus:border-primary transition-all shadow-inner appearance-none cursor-pointer"
                             >
                                 <option value="all">Todos los proveedores</option>
-                                {uniqueProviders.map(prov => (
+                                {providers.map(prov => (
                                     <option key={prov} value={prov}>{prov}</option>
                                 ))}
                             </select>
@@ -247,18 +329,19 @@ export const MetricsReplenishment: React.FC = () => {
                                 <th className="p-2 md:p-4 text-center">Stock Actual</th>
                                 <th className="p-2 md:p-4 text-center hidden sm:table-cell">Stock Mínimo</th>
                                 <th className="p-2 md:p-4 text-center hidden sm:table-cell">Stock Ideal</th>
+                                <th className="p-2 md:p-4 text-center hidden lg:table-cell">Venta/Día</th>
                                 <th className="p-2 md:p-4 text-center">Sugerido</th>
                                 <th className="p-2 md:p-4 pr-4 md:pr-6 text-center">Estado</th>
                             </tr>
                         </thead>
                         <tbody className="divide-y divide-surfaceHighlight">
                             {isLoading ? (
-                                <tr><td colSpan={7} className="p-12 text-center"><Loader2 size={32} className="animate-spin text-primary mx-auto" /></td></tr>
-                            ) : paginatedItems.length === 0 ? (
-                                <tr><td colSpan={7} className="p-12 text-center text-muted font-medium">No se encontraron artículos.</td></tr>
+                                <tr><td colSpan={8} className="p-12 text-center"><Loader2 size={32} className="animate-spin text-primary mx-auto" /></td></tr>
+                            ) : items.length === 0 ? (
+                                <tr><td colSpan={8} className="p-12 text-center text-muted font-medium">No se encontraron artículos.</td></tr>
                             ) : (
-                                paginatedItems.map((item, idx) => (
-                                    <tr key={idx} className="hover:bg-background/50 transition-colors">
+                                items.map(item => (
+                                    <tr key={item.codart} className="hover:bg-background/50 transition-colors">
                                         <td className="p-2 md:p-4 pl-4 md:pl-6">
                                             <div className="flex flex-col">
                                                 <span className="font-bold text-xs md:text-sm text-text uppercase line-clamp-2">{item.desart}</span>
@@ -274,6 +357,12 @@ export const MetricsReplenishment: React.FC = () => {
                                                 onChange={e => handleUpdateStock(item.codart, 'stock_minimo', e.target.value)}
                                                 className="w-16 bg-background border border-surfaceHighlight rounded-lg p-1.5 text-center font-mono text-xs md:text-sm text-muted outline-none focus:border-primary"
                                             />
+                                            <SuggestionHint
+                                                suggestion={suggestions[item.codart]}
+                                                value={suggestions[item.codart]?.suggested_min}
+                                                current={item.min}
+                                                onApply={v => handleUpdateStock(item.codart, 'stock_minimo', String(v))}
+                                            />
                                         </td>
                                         <td className="p-2 md:p-4 text-center hidden sm:table-cell">
                                             <input 
@@ -282,6 +371,20 @@ export const MetricsReplenishment: React.FC = () => {
                                                 onChange={e => handleUpdateStock(item.codart, 'stock_ideal', e.target.value)}
                                                 className="w-16 bg-background border border-surfaceHighlight rounded-lg p-1.5 text-center font-mono text-xs md:text-sm text-muted outline-none focus:border-primary"
                                             />
+                                            <SuggestionHint
+                                                suggestion={suggestions[item.codart]}
+                                                value={suggestions[item.codart]?.suggested_ideal}
+                                                current={item.ideal}
+                                                onApply={v => handleUpdateStock(item.codart, 'stock_ideal', String(v))}
+                                            />
+                                        </td>
+                                        <td className="p-2 md:p-4 text-center hidden lg:table-cell" title={`${item.units_sold} u. en ${VELOCITY_DAYS} días`}>
+                                            <div className="flex flex-col">
+                                                <span className="font-mono text-xs md:text-sm font-bold text-text">{item.daily_velocity || '-'}</span>
+                                                {item.days_of_cover !== null && (
+                                                    <span className="text-[10px] text-muted">{item.days_of_cover} días</span>
+                                                )}
+                                            </div>
                                         </td>
                                         <td className="p-2 md:p-4 text-center font-mono text-xs md:text-sm font-black text-primary">{item.suggested}</td>
                                         <td className="p-2 md:p-4 pr-4 md:pr-6 text-center">
@@ -312,7 +415,7 @@ export const MetricsReplenishment: React.FC = () => {
                 {!isLoading && totalPages > 1 && (
                     <div className="flex flex-col sm:flex-row items-center justify-between px-4 md:px-6 py-4 border-t border-surfaceHighlight bg-background/30 rounded-b-3xl gap-4">
                         <span className="text-xs md:text-sm font-medium text-muted text-center sm:text-left">
-                            Mostrando {(currentPage - 1) * ITEMS_PER_PAGE + 1} a {Math.min(currentPage * ITEMS_PER_PAGE, filteredItems.length)} de {filteredItems.length} artículos
+                            Mostrando {(currentPage - 1) * ITEMS_PER_PAGE + 1} a {Math.min(currentPage * ITEMS_PER_PAGE, totalCount)} de {totalCount} artículos
                         </span>
                         <div className="flex items-center gap-2">
                             <button
@@ -49,6 +49,7 @@ import {
     advanceOrderStatus
 } from '../logic';
 import { supabase } from '../supabase';
+import { useReferenceData } from '../referenceData';
 
 interface OrderListProps {
   onNavigate: (view: View) => void;
@@ -106,19 +107,12 @@ export const OrderList: React.FC<OrderListProps> = ({
   const [isConfirmingDeleteMonth, setIsConfirmingDeleteMonth] = useState(false);
   const [isDeletingMonth, setIsDeletingMonth] = useState(false);
 
-  const [zones, setZones] = useState<DeliveryZone[]>([]);
+  const { rows: allZones } = useReferenceData('delivery_zones');
+  const zones = useMemo<DeliveryZone[]>(() => allZones.filter(z => z.active), [allZones]);
   
   // Transition Modal State
   const [transitionOrder, setTransitionOrder] = useState<DetailedOrder | null>(null);
 
-  useEffect(() => {
-      const fetchZones = async () => {
-          const { data } = await supabase.from('delivery_zones').select('*').eq('active', true).order('name');
-          if (data) setZones(data);
-      };
-      fetchZones();
-  }, []);
-
   // Fetch History when switching to Delivered tab OR changing date
   useEffect(() => {
       if (currentTab === 'delivered') {
@@ -141,7 +135,7 @@ export const OrderList: React.FC<OrderListProps> = ({
 
           let query = supabase
               .from('orders')
-              .select('*, order_items(*)')
+              .select('*')
               .in('status', ['entregado', 'pagado'])
               .gte('created_at', startDate.toISOString())
               .lte('created_at', endDate.toISOString())
@@ -169,17 +163,10 @@ export const OrderList: React.FC<OrderListProps> = ({
                   lastUpdated: o.updated_at || o.created_at,
                   paymentMethod: o.payment_method,
                   total: o.total,
-                  productCount: (o.order_items || []).length,
-                  products: (o.order_items || []).map((i: any) => ({
-                      code: i.code,
-                      name: i.name || (i.master_products?.desart) || 'S/N',
-                      quantity: i.quantity,
-                      originalQuantity: i.original_quantity,
-                      shippedQuantity: i.shipped_quantity,
-                      unitPrice: i.unit_price,
-                      subtotal: i.subtotal,
-                      isChecked: i.is_checked
-                  })),
+                  productCount: o.item_count ?? 0,
+                  checkedCount: o.checked_count ?? 0,
+                  linesVersion: o.lines_version ?? 0,
+                  products: [],
                   history: typeof o.history === 'string' ? JSON.parse(o.history) : o.history || []
               }));
 
@@ -589,6 +576,7 @@ const DetailedOrderCard: React.FC<{
   const zoneStyles = getZoneStyles(order.zone);
   
   const isFinished = order.status === OrderStatus.ENTREGADO || order.status === OrderStatus.PAGADO;
+  const showAssemblyProgress = (order.status === OrderStatus.EN_ARMADO || order.status === OrderStatus.ARMADO) && order.checkedCount !== undefined && order.productCount > 0;
   
   const isVale = currentUser.role === 'vale';
   const hasAdminLikeAccess = isVale || (currentUser.permissions || []).includes('orders.print_and_price');
@@ -878,6 +866,12 @@ const DetailedOrderCard: React.FC<{
                 <span className="text-[11px] text-muted font-bold">Productos:</span>
                 <span className="text-xs text-text font-black">{order.productCount}</span>
             </div>
+            {showAssemblyProgress && (
+                <div className="flex justify-between items-center">
+                    <span className="text-[11px] text-muted font-bold">Controlados:</span>
+                    <span className="text-xs text-text font-black">{order.checkedCount}/{order.productCount}</span>
+                </div>
+            )}
             
             {showFinancials ? (
                 <div className="flex justify-between items-center">
@@ -36,13 +36,23 @@ import {
     FileDown,
     Copy,
     ChevronDown,
-    ChevronUp
+    ChevronUp,
+    History,
+    Loader2
 } from 'lucide-react';
-import { Trip, TripClient, User as UserType, TripExpense, PaymentStatus, DetailedOrder, OrderStatus, DeliveryZone, ExpenseType, Provider, Transfer } from '../types';
-import { hasPermission } from '../logic';
+import { Trip, TripClient, User as UserType, TripExpense, PaymentStatus, DetailedOrder, OrderStatus, DeliveryZone, ExpenseType, Provider } from '../types';
+import { hasPermission, generateId } from '../logic';
 import { supabase } from '../supabase';
-import jsPDF from 'jspdf';
-import autoTable from 'jspdf-autotable';
+import { useReferenceData } from '../referenceData';
+import { TransferIndex, EMPTY_TRANSFER_INDEX, EMPTY_TRANSFER_BUCKET } from '../transferIndex';
+import { downloadTripSheet, downloadDaySheets } from '../tripSheets';
+
+const printTripSheet = (kind: 'delivery' | 'report', trip: Trip) => {
+    downloadTripSheet(kind, trip).catch(err => {
+        console.error("Error generando planilla:", err);
+        alert("No se pudo generar el PDF: " + (err.message || 'Error desconocido'));
+    });
+};
 
 interface OrderSheetProps {
     currentUser: UserType;
@@ -53,276 +63,11 @@ interface OrderSheetProps {
     selectedTripId: string | null;
     onSelectTrip: (id: string | null) => void;
     providers?: Provider[];
-    transfers?: Transfer[];
+    transferIndex?: TransferIndex;
+    hasMoreTrips?: boolean;
+    onLoadMoreTrips?: () => Promise<void>;
 }
 
-const generateDeliverySheetPDF = (trip: Trip) => {
-    const doc = new jsPDF({
-        orientation: 'landscape',
-        unit: 'mm',
-        format: 'a4'
-    });
-
-    // --- CONFIGURACIÓN ---
-    const marginLeft = 15;
-    const marginTop = 15;
-    doc.setFont('helvetica', 'bold');
-    doc.setFontSize(18);
-    doc.text('PLANILLA DE REPARTO', marginLeft, marginTop);
-
-    doc.setFontSize(11);
-    doc.setFont('helvetica', 'normal');
-    
-    // --- ENCABEZADO ---
-    const headerY = marginTop + 10;
-    const col2X = 150;
-
-    doc.text(`Viaje: ${trip.name || trip.displayId}`, marginLeft, headerY);
-    doc.text(`Chofer: ${trip.driverName}`, marginLeft, headerY + 6);
-    doc.text(`Fecha: ${trip.date}`, marginLeft, headerY + 12);
-    
-    doc.text(`Zona / Ruta: ${trip.route || 'General'}`, col2X, headerY);
-    doc.text(`Total Clientes: ${trip.clients.length}`, col2X, headerY + 6);
-
-    // --- TABLA PRINCIPAL ---
-    const tableStartY = headerY + 20;
-
-    const tableBody = trip.clients.map(client => {
-        const totalDebt = (client.previousBalance || 0) + (client.currentInvoiceAmount || 0);
-        return [
-            client.name.substring(0, 35), // Limitar largo nombre
-            `$ ${(client.previousBalance || 0).toLocaleString('es-AR')}`,
-            `$ ${(client.currentInvoiceAmount || 0).toLocaleString('es-AR')}`,
-            `$ ${totalDebt.toLocaleString('es-AR')}`,
-            '', // Entrega efectivo (Vacío)
-            '', // Transferencia (Vacío)
-            ''  // Saldo actual (Vacío)
-        ];
-    });
-
-    autoTable(doc, {
-        startY: tableStartY,
-        head: [['CLIENTE', 'SALDO ANT.', 'FACTURA', 'TOTAL', 'EFECTIVO', 'TRANSF.', 'SALDO FINAL']],
-        body: tableBody,
-        theme: 'grid', // Bordes visibles
-        styles: {
-            fontSize: 11,
-            cellPadding: 3,
-            textColor: [0, 0, 0], // Negro
-            lineColor: [0, 0, 0], // Bordes negros
-            lineWidth: 0.1,
-            valign: 'middle'
-        },
-        headStyles: {
-            fillColor: [220, 220, 220], // Gris claro para encabezado
-            textColor: [0, 0, 0],
-            fontStyle: 'bold',
-            lineWidth: 0.1,
-            lineColor: [0, 0, 0]
-        },
-        columnStyles: {
-            0: { cellWidth: 70 }, // Cliente
-            1: { cellWidth: 30, halign: 'right' }, // Saldo Ant
-            2: { cellWidth: 30, halign: 'right' }, // Factura
-            3: { cellWidth: 30, halign: 'right', fontStyle: 'bold' }, // Total
-            4: { cellWidth: 35 }, // Efectivo (Espacio manual)
-            5: { cellWidth: 35 }, // Transf (Espacio manual)
-            6: { cellWidth: 35 }  // Saldo Final (Espacio manual)
-        },
-        margin: { left: marginLeft, right: marginLeft }
-    });
-
-    // --- SECCIÓN FINAL (RENDICIÓN DE CAJA) ---
-    // Usamos autoTable para generar la estructura de rendición al final
-    const finalY = (doc as any).lastAutoTable.finalY + 15;
-    
-    // Verificar si hay espacio, sino nueva página
-    if (finalY > 150) {
-        doc.addPage();
-        doc.text('GASTOS', marginLeft, 20);
-        // Reset Y for new page
-    } else {
-        doc.setFont('helvetica', 'bold');
-        doc.text('GASTOS', marginLeft, finalY);
-    }
-
-    const gastosStartY = finalY > 150 ? 25 : finalY + 5;
-
-    // TABLA GASTOS (HORIZONTAL)
-    autoTable(doc, {
-        startY: gastosStartY,
-        head: [['VIÁTICOS', 'COMBUSTIBLE', 'PEAJE', 'OTROS', 'TOTAL']],
-        body: [['', '', '', '', '']], // Fila vacía para completar
-        theme: 'grid',
-        styles: {
-            fontSize: 11,
-            textColor: [0, 0, 0],
-            lineColor: [0, 0, 0],
-            lineWidth: 0.1,
-            cellPadding: 3, // Reducido para igualar tabla principal
-            halign: 'center',
-            valign: 'middle'
-        },
-        headStyles: {
-            fillColor: [220, 220, 220],
-            textColor: [0, 0, 0],
-            fontStyle: 'bold',
-            lineWidth: 0.1,
-            lineColor: [0, 0, 0]
-        },
-        margin: { left: marginLeft, right: marginLeft }
-    });
-
-    const rendicionTitleY = (doc as any).lastAutoTable.finalY + 10;
-    doc.text('RENDICIÓN DE CAJA', marginLeft, rendicionTitleY);
-
-    const rendicionStartY = rendicionTitleY + 5;
-
-    // TABLA RENDICIÓN (HORIZONTAL)
-    autoTable(doc, {
-        startY: rendicionStartY,
-        head: [['TOTAL EFECTIVO', 'TOTAL GASTOS', 'TOTAL CAJA REPARTO']],
-        body: [['', '', '']], // Fila vacía para completar
-        theme: 'grid',
-        styles: {
-            fontSize: 11, // Reducido para igualar tabla principal
-            textColor: [0, 0, 0],
-            lineColor: [0, 0, 0],
-            lineWidth: 0.1,
-            cellPadding: 3, // Reducido para igualar tabla principal
-            halign: 'center',
-            valign: 'middle',
-            fontStyle: 'bold'
-        },
-        headStyles: {
-            fillColor: [220, 220, 220],
-            textColor: [0, 0, 0],
-            fontStyle: 'bold',
-            lineWidth: 0.1,
-            lineColor: [0, 0, 0]
-        },
-        margin: { left: marginLeft, right: marginLeft }
-    });
-
-    doc.save(`Planilla_Reparto_${trip.driverName.replace(/\s+/g, '_')}_${trip.date}.pdf`);
-};
-
-const generateTripReportPDF = (trip: Trip) => {
-    const doc = new jsPDF({
-        orientation: 'portrait',
-        unit: 'mm',
-        format: 'a4'
-    });
-
-    const marginLeft = 15;
-    const marginTop = 15;
-    const pageWidth = doc.internal.pageSize.getWidth();
-
-    // --- ENCABEZADO ---
-    doc.setFont('helvetica', 'bold');
-    doc.setFontSize(18);
-    doc.text('RENDICIÓN DETALLADA DE VIAJE', marginLeft, marginTop);
-
-    doc.setFontSize(11);
-    doc.setFont('helvetica', 'normal');
-    doc.text(`Viaje: ${trip.name || trip.displayId}`, marginLeft, marginTop + 10);
-    doc.text(`Chofer: ${trip.driverName}`, marginLeft, marginTop + 16);
-    doc.text(`Fecha: ${trip.date}`, marginLeft, marginTop + 22);
-
-    // --- RESUMEN ---
-    const cashTotal = trip.clients.reduce((acc, c) => acc + (c.paymentCash || 0), 0);
-    const transferTotal = trip.clients.reduce((acc, c) => acc + (c.paymentTransfer || 0), 0);
-    const expensesTotal = trip.expenses.reduce((acc, e) => acc + (e.amount || 0), 0);
-    const netCash = cashTotal - expensesTotal;
-
-    doc.setFont('helvetica', 'bold');
-    doc.text('RESUMEN DE CAJA', marginLeft, marginTop + 35);
-    doc.setFont('helvetica', 'normal');
-
-    const summaryData = [
-        ['Cobrado en Efectivo', `$ ${cashTotal.toLocaleString('es-AR')}`],
-        ['Cobrado por Transferencia', `$ ${transferTotal.toLocaleString('es-AR')}`],
-        ['Total Cobrado', `$ ${(cashTotal + transferTotal).toLocaleString('es-AR')}`],
-        ['Total Gastos (-)', `$ ${expensesTotal.toLocaleString('es-AR')}`],
-        ['SALDO NETO A ENTREGAR', `$ ${netCash.toLocaleString('es-AR')}`]
-    ];
-
-    autoTable(doc, {
-        startY: marginTop + 38,
-        body: summaryData,
-        theme: 'plain',
-        styles: { fontSize: 10, cellPadding: 2 },
-        columnStyles: {
-            0: { fontStyle: 'bold', cellWidth: 50 },
-            1: { halign: 'right' }
-        },
-        margin: { left: marginLeft }
-    });
-
-    // --- TABLA COBRANZAS ---
-    const collectionsY = (doc as any).lastAutoTable.finalY + 10;
-    doc.setFont('helvetica', 'bold');
-    doc.text('DETALLE DE COBRANZAS', marginLeft, collectionsY);
-
-    const collectionsBody = trip.clients.map(c => {
-        const totalDebt = (c.previousBalance || 0) + (c.currentInvoiceAmount || 0);
-        const totalPaid = (c.paymentCash || 0) + (c.paymentTransfer || 0);
-        return [
-            c.name.substring(0, 30),
-            `$ ${totalDebt.toLocaleString('es-AR')}`,
-            `$ ${c.paymentCash.toLocaleString('es-AR')}`,
-            `$ ${c.paymentTransfer.toLocaleString('es-AR')}`,
-            `$ ${totalPaid.toLocaleString('es-AR')}`,
-            c.status === 'PAID' ? 'PAGADO' : c.status === 'PARTIAL' ? 'PARCIAL' : 'PENDIENTE'
-        ];
-    });
-
-    autoTable(doc, {
-        startY: collectionsY + 5,
-        head: [['CLIENTE', 'DEUDA', 'EFECTIVO', 'TRANSF.', 'TOTAL PAG.', 'ESTADO']],
-        body: collectionsBody,
-        theme: 'grid',
-        styles: { fontSize: 8, cellPadding: 2 },
-        headStyles: { fillColor: [220, 220, 220], textColor: [0, 0, 0], fontStyle: 'bold' },
-        columnStyles: {
-            1: { halign: 'right' },
-            2: { halign: 'right' },
-            3: { halign: 'right' },
-            4: { halign: 'right', fontStyle: 'bold' },
-            5: { halign: 'center' }
-        },
-        margin: { left: marginLeft, right: marginLeft }
-    });
-
-    // --- TABLA GASTOS ---
-    const expensesY = (doc as any).lastAutoTable.finalY + 10;
-    if (expensesY > 250) doc.addPage();
-    
-    doc.setFont('helvetica', 'bold');
-    doc.text('DETALLE DE GASTOS', marginLeft, expensesY > 250 ? marginTop : expensesY);
-
-    const expensesBody = trip.expenses.map(e => [
-        e.type.toUpperCase(),
-        e.note || '-',
-        `$ ${e.amount.toLocaleString('es-AR')}`
-    ]);
-
-    autoTable(doc, {
-        startY: (expensesY > 250 ? marginTop : expensesY) + 5,
-        head: [['TIPO', 'DETALLE', 'MONTO']],
-        body: expensesBody.length > 0 ? expensesBody : [['-', 'Sin gastos registrados', '$ 0']],
-        theme: 'grid',
-        styles: { fontSize: 9, cellPadding: 2 },
-        headStyles: { fillColor: [220, 220, 220], textColor: [0, 0, 0], fontStyle: 'bold' },
-        columnStyles: {
-            2: { halign: 'right', fontStyle: 'bold' }
-        },
-        margin: { left: marginLeft, right: marginLeft }
-    });
-
-    doc.save(`Rendicion_Detallada_${trip.driverName.replace(/\s+/g, '_')}_${trip.date}.pdf`);
-};
-
 export const OrderSheet: React.FC<OrderSheetProps> = ({ 
     currentUser, 
     orders, 
@@ -332,7 +77,9 @@ export const OrderSheet: React.FC<OrderSheetProps> = ({
     selectedTripId,
     onSelectTrip,
     providers = [],
-    transfers = []
+    transferIndex = EMPTY_TRANSFER_INDEX,
+    hasMoreTrips = false,
+    onLoadMoreTrips
 }) => {
     const [isEditorOpen, setIsEditorOpen] = useState(false);
     const [tripToEdit, setTripToEdit] = useState<Trip | null>(null);
@@ -396,11 +143,13 @@ export const OrderSheet: React.FC<OrderSheetProps> = ({
                 onDelete={handleDelete}
                 currentUser={currentUser}
                 onOpenAccounts={() => setIsAccountsModalOpen(true)}
+                hasMore={hasMoreTrips}
+                onLoadMore={onLoadMoreTrips}
             />
             {isAccountsModalOpen && (
                 <AccountsModal 
                     providers={providers} 
-                    transfers={transfers}
+                    transferIndex={transferIndex}
                     onClose={() => setIsAccountsModalOpen(false)} 
                 />
             )}
@@ -408,7 +157,7 @@ export const OrderSheet: React.FC<OrderSheetProps> = ({
     );
 };
 
-const AccountsModal: React.FC<{ providers: Provider[]; transfers: Transfer[]; onClose: () => void }> = ({ providers, transfers, onClose }) => {
+const AccountsModal: React.FC<{ providers: Provider[]; transferIndex: TransferIndex; onClose: () => void }> = ({ providers, transferIndex, onClose }) => {
     const [copiedId, setCopiedId] = useState<string | null>(null);
     const [expandedAccounts, setExpandedAccounts] = useState<Record<string, boolean>>({});
 
@@ -438,9 +187,7 @@ const AccountsModal: React.FC<{ providers: Provider[]; transfers: Transfer[]; on
                 
                 <div className="flex-1 overflow-y-auto p-6 space-y-6 bg-background/50">
                     {providers.filter(p => p.status !== 'Desactivado').map(provider => {
-                        const providerTransfers = (transfers || []).filter(t => t.providerId === provider.id && t.status !== 'Archivado');
-                        const totalRealized = providerTransfers.filter(t => t.status === 'Realizado').reduce((s, t) => s + (Number(t.amount) || 0), 0);
-                        const totalPending = providerTransfers.filter(t => t.status === 'Pendiente').reduce((s, t) => s + (Number(t.amount) || 0), 0);
+                        const { realized: totalRealized, pending: totalPending } = transferIndex.byProvider.get(provider.id) || EMPTY_TRANSFER_BUCKET;
                         const goal = Number(provider.goalAmount) || 0;
                         const providerFalta = Math.max(0, goal - totalRealized - totalPending);
 
@@ -459,9 +206,7 @@ const AccountsModal: React.FC<{ providers: Provider[]; transfers: Transfer[]; on
                                     <p className="text-sm text-muted italic">No hay cuentas registradas.</p>
                                 ) : (
                                     provider.accounts.map(account => {
-                                        const accountTransfers = (transfers || []).filter(t => t.accountId === account.id && t.status !== 'Archivado');
-                                        const accRealized = accountTransfers.filter(t => t.status === 'Realizado').reduce((s, t) => s + (Number(t.amount) || 0), 0);
-                                        const accPending = accountTransfers.filter(t => t.status === 'Pendiente').reduce((s, t) => s + (Number(t.amount) || 0), 0);
+                                        const { realized: accRealized, pending: accPending } = transferIndex.byAccount.get(account.id) || EMPTY_TRANSFER_BUCKET;
                                         const accMeta = Number(account.metaAmount) || 0;
                                         const falta = accMeta > 0 ? Math.max(0, accMeta - accRealized - accPending) : providerFalta;
                                         
@@ -554,8 +299,37 @@ const TripListView: React.FC<{
     onDelete: (id: string) => void;
     currentUser: UserType;
     onOpenAccounts: () => void;
-}> = ({ trips, onSelect, onCreate, onDelete, currentUser, onOpenAccounts }) => {
+    hasMore?: boolean;
+    onLoadMore?: () => Promise<void>;
+}> = ({ trips, onSelect, onCreate, onDelete, currentUser, onOpenAccounts, hasMore = false, onLoadMore }) => {
     const canManage = hasPermission(currentUser, 'orders.sheet_manage');
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
+    const [isPrintingDay, setIsPrintingDay] = useState(false);
+
+    const handlePrintDay = async () => {
+        const today = new Date().toLocaleDateString('es-AR');
+        const dayTrips = trips.filter(t => t.date === today);
+        if (dayTrips.length === 0) { alert(`No hay viajes con fecha ${today}.`); return; }
+        setIsPrintingDay(true);
+        try {
+            await downloadDaySheets(dayTrips, today);
+        } catch (err: any) {
+            console.error("Error generando planillas del día:", err);
+            alert("No se pudieron generar las planillas: " + (err.message || 'Error desconocido'));
+        } finally {
+            setIsPrintingDay(false);
+        }
+    };
+
+    const handleLoadMore = async () => {
+        if (!onLoadMore) return;
+        setIsLoadingMore(true);
+        try {
+            await onLoadMore();
+        } finally {
+            setIsLoadingMore(false);
+        }
+    };
 
     return (
         <div className="flex flex-col gap-6 pb-20 animate-in fade-in">
@@ -573,6 +347,14 @@ const TripListView: React.FC<{
                             <Wallet size={18} className="text-primary" />
                             Consultar Cuentas
                         </button>
+                        <button 
+                            onClick={handlePrintDay}
+                            disabled={isPrintingDay}
+                            className="flex items-center gap-2 px-4 py-2.5 rounded-full bg-surface border border-surfaceHighlight hover:border-primary/50 text-text font-bold text-sm shadow-sm transition-all disabled:opacity-50"
+                        >
+                            {isPrintingDay ? <Loader2 size={18} className="animate-spin" /> : <Printer size={18} className="text-primary" />}
+                            Planillas del Día
+                        </button>
                         <button 
                             onClick={onCreate}
                             className="flex items-center gap-2 px-5 py-2.5 rounded-full bg-primary hover:bg-primaryHover text-white font-bold text-sm shadow-lg shadow-primary/20 transition-all"
@@ -617,7 +399,7 @@ const TripListView: React.FC<{
                             </div>
                             
                             <button 
-                                onClick={(e) => { e.stopPropagation(); generateDeliverySheetPDF(trip); }}
+                                onClick={(e) => { e.stopPropagation(); printTripSheet('delivery', trip); }}
                                 className="mt-2 w-full py-2.5 rounded-xl bg-surfaceHighlight/50 hover:bg-surfaceHighlight text-text font-bold text-xs uppercase flex items-center justify-center gap-2 transition-all border border-surfaceHighlight group-hover:border-primary/20"
                             >
                                 <FileDown size={14} /> Planilla de Reparto (PDF)
@@ -631,6 +413,17 @@ const TripListView: React.FC<{
                     ))}
                 </div>
             )}
+
+            {hasMore && onLoadMore && (
+                <button
+                    onClick={handleLoadMore}
+                    disabled={isLoadingMore}
+                    className="self-center flex items-center gap-2 px-5 py-2.5 rounded-full bg-surface border border-surfaceHighlight hover:border-primary/50 text-text font-bold text-sm shadow-sm transition-all disabled:opacity-50"
+                >
+                    {isLoadingMore ? <Loader2 size={16} className="animate-spin" /> : <History size={16} className="text-primary" />}
+                    Cargar viajes anteriores
+                </button>
+            )}
         </div>
     );
 };
@@ -723,7 +516,7 @@ const TripDetailView: React.FC<{
             // Create new
             const newExpense: TripExpense = { 
                 ...expenseData, 
-                id: `exp-${Date.now()}`, 
+                id: generateId(), 
                 timestamp: new Date() 
             };
             newExpenses.push(newExpense);
@@ -1303,7 +1096,7 @@ const TripReportModal: React.FC<{ trip: Trip; onClose: () => void }> = ({ trip,
                     </div>
                     <div className="flex items-center gap-2">
                         <button 
-                            onClick={() => generateTripReportPDF(trip)}
+                            onClick={() => printTripSheet('report', trip)}
                             className="flex items-center gap-2 px-4 py-2 rounded-xl bg-surfaceHighlight hover:bg-surfaceHighlight/80 text-text font-bold text-xs uppercase transition-all border border-surfaceHighlight"
                             title="Descargar PDF"
                         >
@@ -1512,20 +1305,13 @@ const TripEditor: React.FC<{
     const [clients, setClients] = useState<TripClient[]>(initialData?.clients || []);
     const [isManualAddOpen, setIsManualAddOpen] = useState(false);
     const [isImportOpen, setIsImportOpen] = useState(false);
-    const [zones, setZones] = useState<DeliveryZone[]>([]);
-
-    useEffect(() => {
-        const fetchZones = async () => {
-            const { data } = await supabase.from('delivery_zones').select('*').eq('active', true).order('name');
-            if (data) setZones(data);
-        };
-        fetchZones();
-    }, []);
+    const { rows: allZones } = useReferenceData('delivery_zones');
+    const zones = useMemo<DeliveryZone[]>(() => allZones.filter(z => z.active), [allZones]);
     
     const handleSave = () => { 
         if (!name || !driverName) { alert("Complete Nombre y Conductor"); return; } 
         onSave({ 
-            id: initialData?.id || '', 
+            id: initialData?.id || generateId(), 
             displayId: initialData?.displayId || `#${Math.floor(Math.random()*10000)}`, 
             name, 
             status: initialData?.status || 'PLANNING', 
@@ -1554,8 +1340,8 @@ const TripEditor: React.FC<{
                 <div className="flex justify-between items-center border-b border-surfaceHighlight pb-4"><h3 className="text-lg font-bold text-text">Clientes ({clients.length})</h3><div className="flex gap-2"><button onClick={() => setIsImportOpen(true)} className="px-4 py-2 rounded-lg bg-blue-500/10 text-blue-500 font-bold text-xs">Importar</button><button onClick={() => setIsManualAddOpen(true)} className="px-4 py-2 rounded-lg bg-surfaceHighlight text-text font-bold text-xs">Manual</button></div></div>
                 <div className="overflow-x-auto"><table className="w-full text-left"><thead><tr className="text-xs text-muted uppercase"><th>Cliente</th><th className="text-right">Saldo Ant.</th><th className="text-right">Factura</th><th className="text-right">Total</th><th className="text-center w-12"></th></tr></thead><tbody className="divide-y divide-surfaceHighlight">{clients.map(c => (<tr key={c.id}><td className="py-3 font-bold text-sm">{c.name}</td><td className="py-3 text-right text-muted">$ {c.previousBalance.toLocaleString()}</td><td className="py-3 text-right text-muted">$ {c.currentInvoiceAmount.toLocaleString()}</td><td className="py-3 text-right font-black">$ {(c.previousBalance + c.currentInvoiceAmount).toLocaleString()}</td><td className="py-3 text-center"><button onClick={() => setClients(clients.filter(cl => cl.id !== c.id))} className="p-2 text-muted hover:text-red-500"><Trash2 size={16}/></button></td></tr>))}</tbody></table></div>
             </div>
-            {isManualAddOpen && <ManualClientModal onClose={() => setIsManualAddOpen(false)} onAdd={(d) => { setClients([...clients, { id: `tc-${Date.now()}`, ...d, paymentCash: 0, paymentTransfer: 0, isTransferExpected: false, status: 'PENDING' }]); setIsManualAddOpen(false); }} />}
-            {isImportOpen && <ImportOrdersModal orders={availableOrders} selectedRoute={route} onClose={() => setIsImportOpen(false)} onImport={(sel) => { setClients([...clients, ...sel.map(o => ({ id: `tc-${o.id}`, name: o.clientName, address: o.zone||'', previousBalance: 0, currentInvoiceAmount: o.total, paymentCash: 0, paymentTransfer: 0, isTransferExpected: false, status: 'PENDING' as PaymentStatus }))]); setIsImportOpen(false); }} />}
+            {isManualAddOpen && <ManualClientModal onClose={() => setIsManualAddOpen(false)} onAdd={(d) => { setClients([...clients, { id: generateId(), ...d, paymentCash: 0, paymentTransfer: 0, isTransferExpected: false, status: 'PENDING' }]); setIsManualAddOpen(false); }} />}
+            {isImportOpen && <ImportOrdersModal orders={availableOrders} selectedRoute={route} onClose={() => setIsImportOpen(false)} onImport={(sel) => { setClients([...clients, ...sel.map(o => ({ id: generateId(), name: o.clientName, address: o.zone||'', previousBalance: 0, currentInvoiceAmount: o.total, paymentCash: 0, paymentTransfer: 0, isTransferExpected: false, status: 'PENDING' as PaymentStatus }))]); setIsImportOpen(false); }} />}
         </div>
     );
 };
@@ -22,6 +22,7 @@ import {
     RotateCcw
 } from 'lucide-react';
 import { Provider, ProviderAccount, Transfer } from '../types';
+import { TransferIndex, EMPTY_TRANSFER_BUCKET } from '../transferIndex';
 
 const formatCurrencyInput = (val: string) => {
     const clean = val.replace(/\D/g, '');
@@ -38,6 +39,7 @@ interface PaymentsOverviewProps {
     onDeleteProvider: (id: string) => void;
     onUpdateProviders: (provider: Provider) => void;
     transfers: Transfer[];
+    transferIndex: TransferIndex;
     onUpdateTransfers: (transfer: Transfer) => void;
     onConfirmTransfer: (id: string, status: 'Pendiente' | 'Realizado') => void;
     onDeleteTransfer: (id: string) => void;
@@ -45,7 +47,7 @@ interface PaymentsOverviewProps {
 }
 
 export const PaymentsOverview: React.FC<PaymentsOverviewProps> = ({ 
-    providers, onDeleteProvider, onUpdateProviders, transfers, onUpdateTransfers, onConfirmTransfer, onDeleteTransfer, onRefresh
+    providers, onDeleteProvider, onUpdateProviders, transfers, transferIndex, onUpdateTransfers, onConfirmTransfer, onDeleteTransfer, onRefresh
 }) => {
     const [searchTerm, setSearchTerm] = useState('');
     const [expandedProviders, setExpandedProviders] = useState<Record<string, boolean>>({});
@@ -107,7 +109,8 @@ export const PaymentsOverview: React.FC<PaymentsOverviewProps> = ({
         );
     });
 
-    const pendingConfirmations = (transfers || []).filter(t => t.status === 'Pendiente');
+    const pendingConfirmations = useMemo(() => (transfers || []).filter(t => t.status === 'Pendiente'), [transfers]);
+    const providerNames = useMemo(() => new Map((providers || []).map(p => [p.id, p.name])), [providers]);
 
     return (
         <div className="flex flex-col gap-8 pb-20 animate-in fade-in">
@@ -125,7 +128,7 @@ export const PaymentsOverview: React.FC<PaymentsOverviewProps> = ({
                                         Pago: {t.clientName}
                                     </h4>
                                     <p className="text-[#e65100] dark:text-orange-300/80 text-[10px] font-black uppercase tracking-widest mt-0.5 truncate">
-                                        $ {(Number(t.amount) || 0).toLocaleString('es-AR')} → {providers.find(p => p.id === t.providerId)?.name || 'S/D'}
+                                        $ {(Number(t.amount) || 0).toLocaleString('es-AR')} → {providerNames.get(t.providerId) || 'S/D'}
                                     </p>
                                 </div>
                             </div>
@@ -180,9 +183,7 @@ export const PaymentsOverview: React.FC<PaymentsOverviewProps> = ({
             <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
                 {filteredProviders.map((provider) => {
                     const isFrenado = provider.status === 'Frenado';
-                    const providerTransfers = transfers.filter(t => t.providerId === provider.id && t.status !== 'Archivado');
-                    const totalRealized = providerTransfers.filter(t => t.status === 'Realizado').reduce((s, t) => s + (Number(t.amount) || 0), 0);
-                    const totalPending = providerTransfers.filter(t => t.status === 'Pendiente').reduce((s, t) => s + (Number(t.amount) || 0), 0);
+                    const { realized: totalRealized, pending: totalPending } = transferIndex.byProvider.get(provider.id) || EMPTY_TRANSFER_BUCKET;
                     const goal = Number(provider.goalAmount) || 0;
                     const realizedPct = goal > 0 ? (totalRealized / goal) * 100 : 0;
                     const pendingPct = goal > 0 ? (totalPending / goal) * 100 : 0;
@@ -240,9 +241,7 @@ export const PaymentsOverview: React.FC<PaymentsOverviewProps> = ({
                             {expandedProviders[provider.id] && (
                                 <div className="border-t border-surfaceHighlight bg-background/30 p-4 flex flex-col gap-4 animate-in slide-in-from-top-2">
                                     {(provider.accounts || []).filter(acc => acc.status === 'Activa').map(account => {
-                                        const accountTransfers = (transfers || []).filter(t => t.accountId === account.id && t.status !== 'Archivado');
-                                        const accRealized = accountTransfers.filter(t => t.status === 'Realizado').reduce((s, t) => s + (Number(t.amount) || 0), 0);
-                                        const accPending = accountTransfers.filter(t => t.status === 'Pendiente').reduce((s, t) => s + (Number(t.amount) || 0), 0);
+                                        const { realized: accRealized, pending: accPending, items: accountTransfers } = transferIndex.byAccount.get(account.id) || EMPTY_TRANSFER_BUCKET;
                                         const accMeta = Number(account.metaAmount) || 0;
                                         const isCompleted = accMeta > 0 && accRealized >= accMeta;
 
@@ -397,7 +396,7 @@ export const PaymentsOverview: React.FC<PaymentsOverviewProps> = ({
             {isModalOpen && (
                 <NewTransferModal 
                     providers={providers}
-                    transfers={transfers}
+                    transferIndex={transferIndex}
                     initialProviderId={preSelectedProviderId} initialAccountId={preSelectedAccountId}
                     onClose={() => setIsModalOpen(false)} 
                     onSave={(t) => { onUpdateTransfers(t); }}
@@ -418,7 +417,7 @@ const DualProgressBar: React.FC<{ realizedPct: number, pendingPct: number, heigh
     );
 };
 
-const NewTransferModal: React.FC<{ providers: Provider[], transfers: Transfer[], initialProviderId: string | null, initialAccountId: string | null, onClose: () => void, onSave: (t: Transfer) => void }> = ({ providers, transfers, initialProviderId, initialAccountId, onClose, onSave }) => {
+const NewTransferModal: React.FC<{ providers: Provider[], transferIndex: TransferIndex, initialProviderId: string | null, initialAccountId: string | null, onClose: () => void, onSave: (t: Transfer) => void }> = ({ providers, transferIndex, initialProviderId, initialAccountId, onClose, onSave }) => {
     const [activeTab, setActiveTab] = useState<'Pendiente' | 'Realizado'>('Pendiente');
     const [clientName, setClientName] = useState('');
     const [amountDisplay, setAmountDisplay] = useState(''); 
@@ -442,12 +441,7 @@ const NewTransferModal: React.FC<{ providers: Provider[], transfers: Transfer[],
 
     const providerMeta = Number(selectedProvider?.goalAmount) || 1;
     
-    const currentProviderTotal = useMemo(() => {
-        const pTransfers = transfers.filter(t => t.providerId === selectedProviderId && t.status !== 'Archivado');
-        const realized = pTransfers.filter(t => t.status === 'Realizado').reduce((s, t) => s + t.amount, 0);
-        const pending = pTransfers.filter(t => t.status === 'Pendiente').reduce((s, t) => s + t.amount, 0);
-        return { realized, pending };
-    }, [transfers, selectedProviderId]);
+    const currentProviderTotal = transferIndex.byProvider.get(selectedProviderId) || EMPTY_TRANSFER_BUCKET;
 
     return (
         <div className="fixed inset-0 z-[100] flex items-center justify-center bg-black/80 backdrop-blur-sm p-4 animate-in fade-in">
@@ -511,9 +505,7 @@ const NewTransferModal: React.FC<{ providers: Provider[], transfers: Transfer[],
                                     const isSel = selectedAccountId === acc.id;
                                     const accMeta = Number(acc.metaAmount) || 0;
                                     
-                                    const accTransfers = transfers.filter(t => t.accountId === acc.id && t.status !== 'Archivado');
-                                    const accRealized = accTransfers.filter(t => t.status === 'Realizado').reduce((s, t) => s + t.amount, 0);
-                                    const accPending = accTransfers.filter(t => t.status === 'Pendiente').reduce((s, t) => s + t.amount, 0);
+                                    const { realized: accRealized, pending: accPending } = transferIndex.byAccount.get(acc.id) || EMPTY_TRANSFER_BUCKET;
                                     
                                     const totalAccPaid = accRealized + accPending;
                                     const currentPct = accMeta > 0 ? (totalAccPaid / accMeta) * 100 : 0;
@@ -24,6 +24,7 @@ import {
 } from 'lucide-react';
 import { Provider, ProviderAccount, ProviderStatus, SupplierMaster } from '../types';
 import { supabase } from '../supabase';
+import { useReferenceData } from '../referenceData';
 
 const formatCurrencyInput = (val: string) => {
     const clean = val.replace(/\D/g, '');
@@ -182,8 +183,8 @@ const NewProviderModal: React.FC<{
     existingProviderNames: string[];
     onReset?: () => void 
 }> = ({ onClose, onSave, initialData, existingProviderNames, onReset }) => {
-    const [masterSuppliers, setMasterSuppliers] = useState<SupplierMaster[]>([]);
-    const [isMasterLoading, setIsMasterLoading] = useState(false);
+    const { rows: allMasterSuppliers, isLoading: isMasterLoading } = useReferenceData('providers_master');
+    const masterSuppliers = useMemo<SupplierMaster[]>(() => allMasterSuppliers.filter(s => s.activo === true), [allMasterSuppliers]);
     const [isSaving, setIsSaving] = useState(false);
     
     const [name, setName] = useState(initialData?.name || '');
@@ -206,28 +207,6 @@ const NewProviderModal: React.FC<{
         return () => document.removeEventListener('mousedown', handleClickOutside);
     }, []);
 
-    // Cargar proveedores del maestro al abrir el modal (solo si es nuevo)
-    useEffect(() => {
-        if (!initialData) {
-            const fetchMaster = async () => {
-                setIsMasterLoading(true);
-                try {
-                    const { data, error } = await supabase
-                        .from('providers_master')
-                        .select('*')
-                        .eq('activo', true)
-                        .order('razon_social')
-                        .limit(5000); // Aumentar límite para asegurar que se carguen todos los activos
-                    if (data) setMasterSuppliers(data);
-                } catch (e) {
-                    console.error("Error cargando maestro:", e);
-                } finally {
-                    setIsMasterLoading(false);
-                }
-            };
-            fetchMaster();
-        }
-    }, [initialData]);
 
     const handleAddAccount = () => {
         const newAcc: ProviderAccount = { id: `acc-${Date.now()}`, providerId: initialData?.id || '', condition: '', holder: '', identifierAlias: '', identifierCBU: '', metaAmount: 0, currentAmount: 0, pendingAmount: 0, status: 'Activa' };
@@ -21,8 +21,10 @@ import {
     Check
 } from 'lucide-react';
 import { supabase } from '../supabase';
+import { loadAllPages } from '../pagedLoader';
 import { MasterProduct, ClientMaster } from '../types';
-import { jsPDF } from 'jspdf';
+import { loadJsPDF } from '../lazyLibs';
+import { budgetUnitPrice } from '../logic';
 
 interface CartItem {
     codart: string;
@@ -51,25 +53,12 @@ export const Presupuestador: React.FC = () => {
     const fetchData = async () => {
         setIsLoading(true);
         try {
-            const PAGE_SIZE = 1000;
-            let allProducts: MasterProduct[] = [];
-            let from = 0;
-
-            while (true) {
-                const { data, error } = await supabase
-                    .from('master_products')
-                    .select('*')
-                    .neq('familia', 'ELIMINADOS')
-                    .order('desart', { ascending: true })
-                    .range(from, from + PAGE_SIZE - 1);
-
-                if (error) throw error;
-                if (!data || data.length === 0) break;
-
-                allProducts = [...allProducts, ...data];
-                if (data.length < PAGE_SIZE) break;
-                from += PAGE_SIZE;
-            }
+            const allProducts = await loadAllPages<MasterProduct>((withCount) => supabase
+                .from('master_products')
+                .select('*', withCount ? { count: 'exact' } : undefined)
+                .neq('familia', 'ELIMINADOS')
+                .order('desart', { ascending: true })
+                .order('codart', { ascending: true }));
             setProducts(allProducts);
         } catch (err) {
             console.error("Error cargando productos:", err);
@@ -119,13 +108,14 @@ export const Presupuestador: React.FC = () => {
         setShowClientDropdown(false);
     };
 
+    // Con redondeo comercial: es el precio que queda guardado en el presupuesto
     const getProductPrice = (product: MasterProduct, list: number) => {
         switch (list) {
-            case 1: return product.pventa_1;
-            case 2: return product.pventa_2;
-            case 3: return product.pventa_3;
-            case 4: return product.pventa_4;
-            default: return product.pventa_1;
+            case 1: return budgetUnitPrice(product.pventa_1);
+            case 2: return budgetUnitPrice(product.pventa_2);
+            case 3: return budgetUnitPrice(product.pventa_3);
+            case 4: return budgetUnitPrice(product.pventa_4);
+            default: return budgetUnitPrice(product.pventa_1);
         }
     };
 
@@ -185,25 +175,13 @@ export const Presupuestador: React.FC = () => {
         
         setIsSavingBudget(true);
         try {
-            const { data: budget, error: bErr } = await supabase
-                .from('saved_budgets')
-                .insert({
-                    client_code: selectedClient.codigo,
-                    total: totalBudget
-                }).select().single();
-
-            if (bErr) throw bErr;
-
-            const itemsToSave = cartDetails.map(item => ({
-                budget_id: budget.id,
-                codart: item!.codart,
-                name: item!.desart,
-                quantity: item!.qty,
-                unit_price: item!.price
-            }));
-
-            const { error: iErr } = await supabase.from('saved_budget_items').insert(itemsToSave);
-            if (iErr) throw iErr;
+            // Cabecera e ítems en una transacción; los precios los fija el servidor
+            const { error } = await supabase.rpc('guardar_presupuesto', {
+                p_client_code: selectedClient.codigo,
+                p_price_list: activeList,
+                p_items: cart.map(item => ({ codart: item.codart, quantity: item.qty }))
+            });
+            if (error) throw error;
 
             alert("Presupuesto guardado exitosamente. Ahora está disponible en la creación de pedidos.");
             setCart([]);
@@ -216,8 +194,9 @@ export const Presupuestador: React.FC = () => {
         }
     };
 
-    const generatePDF = () => {
+    const generatePDF = async () => {
         if (cartDetails.length === 0) return;
+        const jsPDF = await loadJsPDF();
         const doc = new jsPDF();
         doc.setFont('helvetica', 'bold').setFontSize(20).setTextColor(228, 124, 0);
         doc.text('ALFONSA - PRESUPUESTO', 20, 20);
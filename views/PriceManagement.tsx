@@ -1,5 +1,5 @@
 
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useMemo, useRef } from 'react';
 import { 
     Search, 
     RefreshCw, 
@@ -20,6 +20,7 @@ import {
     AlertTriangle
 } from 'lucide-react';
 import { supabase } from '../supabase';
+import { loadAllPages, isAbortError } from '../pagedLoader';
 import { MasterProduct, User } from '../types';
 import { roundToCommercial } from '../logic';
 
@@ -49,45 +50,41 @@ export const PriceManagement: React.FC<PriceManagementProps> = ({ currentUser })
     const [isConfirmModalOpen, setIsConfirmModalOpen] = useState(false);
     const [pendingPayload, setPendingPayload] = useState<any[]>([]);
 
+    // Carga en curso: recargar o salir de la vista la cancela
+    const loadControllerRef = useRef<AbortController | null>(null);
+
     const fetchData = async () => {
+        loadControllerRef.current?.abort();
+        const controller = new AbortController();
+        loadControllerRef.current = controller;
         setIsLoading(true);
         try {
-            const PAGE_SIZE = 1000;
-            let allProducts: MasterProduct[] = [];
-            let from = 0;
-            let hasMore = true;
-
-            while (hasMore) {
-                const { data, error } = await supabase
-                    .from('master_products')
-                    .select('*')
-                    .neq('familia', 'ELIMINADOS')
-                    .order('desart', { ascending: true })
-                    .range(from, from + PAGE_SIZE - 1);
-                
-                if (error) throw error;
-                if (data && data.length > 0) {
-                    allProducts = [...allProducts, ...data];
-                    if (data.length < PAGE_SIZE) hasMore = false;
-                    else from += PAGE_SIZE;
-                } else {
-                    hasMore = false;
-                }
-            }
+            const allProducts = await loadAllPages<MasterProduct>((withCount) => supabase
+                .from('master_products')
+                .select('*', withCount ? { count: 'exact' } : undefined)
+                .neq('familia', 'ELIMINADOS')
+                .order('desart', { ascending: true })
+                .order('codart', { ascending: true }),
+                { signal: controller.signal });
+            if (controller.signal.aborted) return;
             setDbProducts(allProducts);
             setWorkingProducts(allProducts);
             setPercentages({ 1: '0', 2: '0', 3: '0' });
             setList4Percentage('-8');
             setSelectedIds(new Set());
         } catch (err: any) {
+            if (isAbortError(err)) return;
             console.error("Error cargando maestro:", err);
             alert("Error al cargar los productos.");
         } finally {
-            setIsLoading(false);
+            if (loadControllerRef.current === controller) setIsLoading(false);
         }
     };
 
-    useEffect(() => { fetchData(); }, []);
+    useEffect(() => {
+        fetchData();
+        return () => loadControllerRef.current?.abort();
+    }, []);
 
     const providers = useMemo(() => {
         const unique = Array.from(new Set(dbProducts.map(p => p.nomprov).filter(Boolean)));
@@ -24,9 +24,9 @@ import {
     ArrowUpRight
 } from 'lucide-react';
 import { supabase } from '../supabase';
+import { getReferenceData } from '../referenceData';
 import { SupplierMaster, ProviderAccountMovement, User } from '../types';
-import { jsPDF } from 'jspdf';
-import * as XLSX from 'xlsx';
+import { exportRowsToExcel, loadJsPDF } from '../lazyLibs';
 
 export const ProviderStatements: React.FC<{ currentUser: User }> = ({ currentUser }) => {
     // --- ESTADOS DE BÚSQUEDA Y LISTA ---
@@ -58,8 +58,7 @@ export const ProviderStatements: React.FC<{ currentUser: User }> = ({ currentUse
     const fetchAllProvidersAndBalances = async () => {
         setIsLoadingProviders(true);
         try {
-            const { data: providersData, error: providersErr } = await supabase.from('providers_master').select('*').order('razon_social', { ascending: true });
-            if (providersErr) throw providersErr;
+            const providersData = await getReferenceData('providers_master');
 
             const { data: movementsData, error: movErr } = await supabase.from('provider_account_movements').select('provider_code, debit, credit').neq('is_annulled', true);
             if (movErr) throw movErr;
@@ -169,7 +168,7 @@ export const ProviderStatements: React.FC<{ currentUser: User }> = ({ currentUse
         return movements[0].balance; // El primer elemento (invertido) tiene el saldo acumulado final
     }, [movements]);
 
-    const handleExportExcel = () => {
+    const handleExportExcel = async () => {
         if (!selectedProvider) return;
         const data = movements.map(m => ({
             'Fecha': m.date,
@@ -179,14 +178,12 @@ export const ProviderStatements: React.FC<{ currentUser: User }> = ({ currentUse
             'Saldo': m.balance,
             'Estado': m.is_annulled ? 'ANULADO' : 'ACTIVO'
         }));
-        const ws = XLSX.utils.json_to_sheet(data);
-        const wb = XLSX.utils.book_new();
-        XLSX.utils.book_append_sheet(wb, ws, "Cuenta Proveedor");
-        XLSX.writeFile(wb, `EstadoProv_${selectedProvider.codigo}.xlsx`);
+        await exportRowsToExcel(data, "Cuenta Proveedor", `EstadoProv_${selectedProvider.codigo}.xlsx`);
     };
 
-    const handleGeneratePDF = () => {
+    const handleGeneratePDF = async () => {
         if (!selectedProvider) return;
+        const jsPDF = await loadJsPDF();
         const doc = new jsPDF();
         doc.setFontSize(18);
         doc.setTextColor(228, 124, 0);
@@ -252,16 +249,13 @@ export const ProviderStatements: React.FC<{ currentUser: User }> = ({ currentUse
         }).sort((a, b) => b.balance - a.balance);
     }, [providersList, listSearchTerm]);
 
-    const exportProvidersListToExcel = () => {
+    const exportProvidersListToExcel = async () => {
         const data = filteredProviders.map(p => ({
             'Código': p.codigo,
             'Proveedor / Razón Social': p.razon_social,
             'Saldo': p.balance
         }));
-        const ws = XLSX.utils.json_to_sheet(data);
-        const wb = XLSX.utils.book_new();
-        XLSX.utils.book_append_sheet(wb, ws, "Saldos Proveedores");
-        XLSX.writeFile(wb, `Saldos_Proveedores_${new Date().toISOString().split('T')[0]}.xlsx`);
+        await exportRowsToExcel(data, "Saldos Proveedores", `Saldos_Proveedores_${new Date().toISOString().split('T')[0]}.xlsx`);
     };
 
     return (
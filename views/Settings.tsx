@@ -48,8 +48,10 @@ import {
 } from 'lucide-react';
 import { User, MasterProduct, AppPermission, View, DeliveryZone } from '../types';
 import { supabase } from '../supabase';
+import { loadAllPages } from '../pagedLoader';
+import { getReferenceData, invalidateReferenceData } from '../referenceData';
 import { SYSTEM_NAV_STRUCTURE, EXTRA_PERMISSIONS } from '../logic';
-import * as XLSX from 'xlsx';
+import { exportRowsToExcel, loadXLSX } from '../lazyLibs';
 
 interface SettingsProps {
     currentUser: User;
@@ -114,9 +116,7 @@ export const Settings: React.FC<SettingsProps> = ({ currentUser, onUpdateProfile
     const fetchClassifications = async () => {
         setIsClassificationLoading(true);
         try {
-            const { data, error } = await supabase.from('client_classifications').select('*').order('name');
-            if (error) throw error;
-            setClassifications(data || []);
+            setClassifications(await getReferenceData('client_classifications'));
         } catch (e) {
             console.error("Error fetching classifications", e);
         } finally {
@@ -131,6 +131,7 @@ export const Settings: React.FC<SettingsProps> = ({ currentUser, onUpdateProfile
             const { error } = await supabase.from('client_classifications').insert({ name: newClassificationName.trim() });
             if (error) throw error;
             setNewClassificationName('');
+            await invalidateReferenceData('client_classifications');
             await fetchClassifications();
         } catch (e: any) {
             alert("Error al agregar clasificación: " + e.message);
@@ -145,6 +146,7 @@ export const Settings: React.FC<SettingsProps> = ({ currentUser, onUpdateProfile
         try {
             const { error } = await supabase.from('client_classifications').delete().eq('id', id);
             if (error) throw error;
+            await invalidateReferenceData('client_classifications');
             await fetchClassifications();
         } catch (e: any) {
             alert("Error al eliminar: " + e.message);
@@ -156,9 +158,7 @@ export const Settings: React.FC<SettingsProps> = ({ currentUser, onUpdateProfile
     const fetchZones = async () => {
         setIsZoneLoading(true);
         try {
-            const { data, error } = await supabase.from('delivery_zones').select('*').order('name');
-            if (error) throw error;
-            setZones(data || []);
+            setZones(await getReferenceData('delivery_zones'));
         } catch (e) {
             console.error("Error fetching zones", e);
         } finally {
@@ -173,6 +173,7 @@ export const Settings: React.FC<SettingsProps> = ({ currentUser, onUpdateProfile
             const { error } = await supabase.from('delivery_zones').insert({ name: newZoneName.trim() });
             if (error) throw error;
             setNewZoneName('');
+            await invalidateReferenceData('delivery_zones');
             await fetchZones();
         } catch (e: any) {
             alert("Error al agregar zona: " + e.message);
@@ -187,6 +188,7 @@ export const Settings: React.FC<SettingsProps> = ({ currentUser, onUpdateProfile
         try {
             const { error } = await supabase.from('delivery_zones').delete().eq('id', id);
             if (error) throw error;
+            await invalidateReferenceData('delivery_zones');
             await fetchZones();
         } catch (e: any) {
             alert("Error al eliminar: " + e.message);
@@ -340,15 +342,7 @@ export const Settings: React.FC<SettingsProps> = ({ currentUser, onUpdateProfile
         };
 
         try {
-            const PAGE_SIZE = 1000;
-            let allData: any[] = [];
-            let from = 0;
-            let hasMore = true;
-            while (hasMore) {
-                const { data, error } = await supabase.from('master_products').select('*').order('desart', { ascending: true }).range(from, from + PAGE_SIZE - 1);
-                if (error) throw error;
-                if (data && data.length > 0) { allData = [...allData, ...data]; if (data.length < PAGE_SIZE) hasMore = false; else from += PAGE_SIZE; } else { hasMore = false; }
-            }
+            const allData = await loadAllPages<any>((withCount) => supabase.from('master_products').select('*', withCount ? { count: 'exact' } : undefined).order('desart', { ascending: true }).order('codart', { ascending: true }));
             
             let excelData = [];
             if (type === 'prices') {
@@ -388,10 +382,7 @@ export const Settings: React.FC<SettingsProps> = ({ currentUser, onUpdateProfile
                     'DEFECTUOSO LLERENA': emptyIfZero(p.defectuosollerena) 
                 }));
             }
-            const ws = XLSX.utils.json_to_sheet(excelData);
-            const wb = XLSX.utils.book_new();
-            XLSX.utils.book_append_sheet(wb, ws, "Maestro");
-            XLSX.writeFile(wb, `${type}_${new Date().toISOString().split('T')[0]}.xlsx`);
+            await exportRowsToExcel(excelData, "Maestro", `${type}_${new Date().toISOString().split('T')[0]}.xlsx`);
             setSyncLog(prev => [...prev, `¡Exportación exitosa!`]);
             setSyncSuccess(true);
             setTimeout(() => setSyncSuccess(false), 3000);
@@ -404,6 +395,7 @@ export const Settings: React.FC<SettingsProps> = ({ currentUser, onUpdateProfile
         reader.onload = async (e) => {
             try {
                 const dataArr = new Uint8Array(e.target?.result as ArrayBuffer);
+                const XLSX = await loadXLSX();
                 let workbook = XLSX.read(dataArr, { type: 'array' });
                 const worksheet = workbook.Sheets[workbook.SheetNames[0]];
                 const rows: any[][] = XLSX.utils.sheet_to_json(worksheet, { header: 1, defval: "" });
@@ -1,5 +1,5 @@
 
-import React, { useState, useEffect, useMemo, useCallback } from 'react';
+import React, { useState, useEffect, useMemo, useCallback, useRef } from 'react';
 import { 
     Plus, 
     Search, 
@@ -37,13 +37,37 @@ import {
     Globe
 } from 'lucide-react';
 import { supabase } from '../supabase';
+import { loadAllPages, isAbortError } from '../pagedLoader';
+import { useReferenceData } from '../referenceData';
 import { User, StockControlSession, StockControlItem, MasterProduct } from '../types';
-import * as XLSX from 'xlsx';
+import { exportRowsToExcel } from '../lazyLibs';
+import { 
+    enqueueCount, 
+    getPendingCounts, 
+    syncPendingCounts, 
+    cacheSessionItems, 
+    getCachedSessionItems,
+    QueuedCount,
+    CountConflict
+} from '../stockCountQueue';
 
 interface StockControlProps {
     currentUser: User;
 }
 
+interface FilterMetadata {
+    familias: string[];
+    subfamilias: string[];
+    proveedores: string[];
+}
+
+// Los valores de familia/subfamilia/proveedor cambian poco: se reutilizan entre aperturas
+const FILTER_METADATA_TTL_MS = 10 * 60 * 1000;
+
+// Espera tras el último conteo antes de enviar el lote
+const COUNT_SYNC_DEBOUNCE_MS = 1500;
+let filterMetadataCache: { at: number, data: FilterMetadata } | null = null;
+
 export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
     const [mode, setMode] = useState<'list' | 'create' | 'execution' | 'review'>('list');
     const [sessions, setSessions] = useState<any[]>([]);
@@ -54,7 +78,7 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
     // --- CREATE MODE STATES ---
     const [newName, setNewName] = useState('');
     const [warehouseId, setWarehouseId] = useState('');
-    const [warehouses, setWarehouses] = useState<{id: string, name: string}[]>([]);
+    const { rows: warehouses } = useReferenceData('warehouses');
     
     // Productos y Filtros
     const [products, setProducts] = useState<MasterProduct[]>([]);
@@ -74,6 +98,8 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
     const PAGE_SIZE = 100;
     const [page, setPage] = useState(0);
     const [hasMore, setHasMore] = useState(true);
+    // "Cargar todo" en curso: un cambio de filtros o salir de la vista la cancela
+    const loadAllControllerRef = useRef<AbortController | null>(null);
 
     // --- METADATA FOR FILTERS ---
     const [metaFamilies, setMetaFamilies] = useState<string[]>([]);
@@ -83,6 +109,10 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
     // --- EXECUTION / REVIEW STATES ---
     const [controlItems, setControlItems] = useState<any[]>([]);
     const [isSavingCount, setIsSavingCount] = useState(false);
+    const [pendingSyncCount, setPendingSyncCount] = useState(0);
+    const [syncConflicts, setSyncConflicts] = useState<CountConflict[]>([]);
+    const [isOnline, setIsOnline] = useState(() => navigator.onLine);
+    const syncTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
     const [executionSearch, setExecutionSearch] = useState('');
     const [reviewSearch, setReviewSearch] = useState('');
     const [executionSort, setExecutionSort] = useState<'none' | 'diff' | 'pending'>('none');
@@ -96,81 +126,34 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
     const fetchSessions = async () => {
         setIsLoading(true);
         try {
-            const { data: sessionsData } = await supabase
-                .from('stock_control_sessions')
-                .select(`*, warehouses(name)`)
+            // Conteo de ítems y avance por contador calculados en el servidor
+            const { data: sessionsData, error } = await supabase
+                .from('stock_control_session_resumen')
+                .select('*')
                 .order('created_at', { ascending: false });
-            
-            if (sessionsData) {
-                const sessionIds = sessionsData.map(s => s.id);
-                let allItems: any[] = [];
-                
-                if (sessionIds.length > 0) {
-                    let keepFetching = true;
-                    let from = 0;
-                    const BATCH_SIZE = 1000;
-                    while (keepFetching) {
-                        const { data: itemsChunk, error } = await supabase
-                            .from('stock_control_items')
-                            .select('id, session_id, stock_control_counts(user_id)')
-                            .in('session_id', sessionIds)
-                            .range(from, from + BATCH_SIZE - 1);
-                        
-                        if (error) throw error;
-                        if (itemsChunk && itemsChunk.length > 0) {
-                            allItems = [...allItems, ...itemsChunk];
-                            if (itemsChunk.length < BATCH_SIZE) keepFetching = false;
-                            else from += BATCH_SIZE;
-                        } else {
-                            keepFetching = false;
-                        }
-                    }
-                }
+            if (error) throw error;
 
-                const mapped = sessionsData.map(s => {
-                    const items = allItems.filter(i => i.session_id === s.id);
-                    const allUserIds = items.flatMap((i: any) => i.stock_control_counts.map((c: any) => c.user_id));
-                    const uniqueUsers = Array.from(new Set(allUserIds));
-                    return {
-                        ...s, 
-                        warehouse_name: s.warehouses?.name, 
-                        item_count: items.length, 
-                        assigned_users: uniqueUsers,
-                        user_progress: uniqueUsers.map(uid => {
-                            const countedByThisUser = items.filter((i: any) => i.stock_control_counts.some((c: any) => c.user_id === uid)).length;
-                            return { userId: uid, count: countedByThisUser };
-                        })
-                    };
-                });
-                setSessions(mapped);
+            if (sessionsData) {
+                setSessions(sessionsData.map((s: any) => ({
+                    ...s,
+                    assigned_users: (s.user_progress || []).map((p: any) => p.userId)
+                })));
             }
         } catch (e) { console.error(e); } finally { setIsLoading(false); }
     };
 
-    // Cargar metadatos para los filtros (solo una vez)
+    // Cargar metadatos para los filtros (cacheados durante la sesión)
     const fetchFilterMetadata = async () => {
         try {
-            let page = 0;
-            const f = new Set<string>();
-            const s = new Set<string>();
-            const p = new Set<string>();
-            
-            while (true) {
-                const { data } = await supabase.from('master_products').select('familia, nsubf, nomprov').neq('familia', 'ELIMINADOS').range(page * 1000, (page + 1) * 1000 - 1);
-                if (data) {
-                    data.forEach((item: any) => {
-                        if (item.familia) f.add(item.familia);
-                        if (item.nsubf) s.add(item.nsubf);
-                        if (item.nomprov) p.add(item.nomprov);
-                    });
-                }
-                if (!data || data.length < 1000) break;
-                page++;
+            if (!filterMetadataCache || Date.now() - filterMetadataCache.at > FILTER_METADATA_TTL_MS) {
+                const { data, error } = await supabase.rpc('valores_filtro_productos');
+                if (error) throw error;
+                filterMetadataCache = { at: Date.now(), data: data as FilterMetadata };
             }
-            
-            setMetaFamilies(Array.from(f).sort());
-            setMetaSubfamilies(Array.from(s).sort());
-            setMetaProviders(Array.from(p).sort());
+            const { familias, subfamilias, proveedores } = filterMetadataCache.data;
+            setMetaFamilies(familias || []);
+            setMetaSubfamilies(subfamilias || []);
+            setMetaProviders(proveedores || []);
         } catch (e) { console.error("Error loading metadata", e); }
     };
 
@@ -239,15 +222,13 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
 
     // Función para cargar TODO el resultado de los filtros (Sin paginación visual, bucle interno)
     const handleLoadAll = async () => {
+        loadAllControllerRef.current?.abort();
+        const controller = new AbortController();
+        loadAllControllerRef.current = controller;
         setIsProductsLoading(true);
         try {
-            const BATCH_SIZE = 1000;
-            let from = 0;
-            let allFetched: MasterProduct[] = [];
-            let keepFetching = true;
-
-            while (keepFetching) {
-                let query = supabase.from('master_products').select('*').neq('familia', 'ELIMINADOS');
+            const allFetched = await loadAllPages<MasterProduct>((withCount) => {
+                let query = supabase.from('master_products').select('*', withCount ? { count: 'exact' } : undefined).neq('familia', 'ELIMINADOS');
 
                 // Aplicar mismos filtros
                 if (filters.search.trim()) {
@@ -274,32 +255,31 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
                     }
                 }
 
-                query = query.order('desart', { ascending: true }).range(from, from + BATCH_SIZE - 1);
-                
-                const { data, error } = await query;
-                if (error) throw error;
-
-                if (data && data.length > 0) {
-                    allFetched = [...allFetched, ...data];
-                    if (data.length < BATCH_SIZE) keepFetching = false;
-                    else from += BATCH_SIZE;
-                } else {
-                    keepFetching = false;
-                }
-            }
+                return query.order('desart', { ascending: true }).order('codart', { ascending: true });
+            }, {
+                signal: controller.signal,
+                // La primera página reemplaza la grilla enseguida y el resto se va sumando
+                onProgress: (rows) => setProducts(rows.slice())
+            });
+            if (controller.signal.aborted) return;
 
             setProducts(allFetched);
             setHasMore(false); // Ya trajimos todo
             setPage(0); // Reset page logic though it won't be used
         } catch (e: any) {
-            alert("Error al cargar todo: " + e.message);
+            if (!isAbortError(e)) alert("Error al cargar todo: " + e.message);
         } finally {
-            setIsProductsLoading(false);
+            if (loadAllControllerRef.current === controller) {
+                loadAllControllerRef.current = null;
+                setIsProductsLoading(false);
+            }
         }
     };
 
     // Efecto para recargar cuando cambian los filtros (reset)
     useEffect(() => {
+        // Lo que trajera un "Cargar todo" con los filtros anteriores ya no sirve
+        loadAllControllerRef.current?.abort();
         if (mode === 'create' && isVale) {
             // Debounce para la búsqueda de texto
             const timeoutId = setTimeout(() => {
@@ -309,6 +289,8 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
         }
     }, [filters, showWithStock, showWithoutStock, showNegativeStock, warehouseId]);
 
+    useEffect(() => () => loadAllControllerRef.current?.abort(), []);
+
     const fetchGlobalDifferences = async () => {
         setIsGlobalLoading(true);
         try {
@@ -370,7 +352,6 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
     useEffect(() => {
         fetchSessions();
         if (isVale) {
-            supabase.from('warehouses').select('*').then(res => res.data && setWarehouses(res.data));
             fetchFilterMetadata();
         }
     }, [isVale]);
@@ -441,47 +422,99 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
         setReviewSearch('');
         setIsLoading(true);
         try {
-            let allItems: any[] = [];
-            let keepFetching = true;
-            let from = 0;
-            const BATCH_SIZE = 1000;
-
-            while (keepFetching) {
-                const { data, error } = await supabase
+            let mappedItems: any[] | null = null;
+            try {
+                const allItems = await loadAllPages<any>((withCount) => supabase
                     .from('stock_control_items')
-                    .select('*, master_products(desart), stock_control_counts(user_id, qty, profiles(name))')
+                    .select('*, master_products(desart), stock_control_counts(user_id, qty, profiles(name))', withCount ? { count: 'exact' } : undefined)
                     .eq('session_id', session.id)
-                    .order('id')
-                    .range(from, from + BATCH_SIZE - 1);
-                
-                if (error) throw error;
-                
-                if (data && data.length > 0) {
-                    allItems = [...allItems, ...data];
-                    if (data.length < BATCH_SIZE) keepFetching = false;
-                    else from += BATCH_SIZE;
-                } else {
-                    keepFetching = false;
-                }
-            }
+                    .order('id'));
 
-            if (allItems.length > 0) {
-                setControlItems(allItems.map((item: any) => ({
+                mappedItems = allItems.map((item: any) => ({
                     id: item.id, session_id: item.session_id, codart: item.codart, desart: item.master_products?.desart, system_qty: item.system_qty, corrected_qty: item.corrected_qty,
                     counts: item.stock_control_counts.map((c: any) => ({ user_id: c.user_id, user_name: c.profiles?.name, qty: c.qty }))
-                })));
+                }));
+                cacheSessionItems(session.id, mappedItems).catch(err => console.warn("No se pudo cachear la sesión:", err));
+            } catch (fetchErr) {
+                // Sin conexión: se abre la última copia local de la sesión
+                console.warn("Cargando sesión desde la copia local:", fetchErr);
+                mappedItems = await getCachedSessionItems(session.id);
+                if (!mappedItems) throw fetchErr;
+            }
+
+            // Los conteos aún no sincronizados tienen prioridad sobre lo que devolvió el servidor
+            const pending = await getPendingCounts(session.id).catch(() => [] as QueuedCount[]);
+            const pendingByItem = new Map<string, QueuedCount[]>();
+            pending.forEach(p => {
+                const list = pendingByItem.get(p.item_id) || [];
+                list.push(p);
+                pendingByItem.set(p.item_id, list);
+            });
+            setPendingSyncCount(pending.length);
+
+            if (mappedItems.length > 0) {
+                setControlItems(mappedItems.map(item => {
+                    const local = pendingByItem.get(item.id);
+                    if (!local) return item;
+                    const localUsers = new Set(local.map(l => l.user_id));
+                    return {
+                        ...item,
+                        counts: [
+                            ...item.counts.filter((c: any) => !localUsers.has(c.user_id)),
+                            ...local.map(l => ({ user_id: l.user_id, user_name: l.user_id === currentUser.id ? currentUser.name : '', qty: l.qty }))
+                        ]
+                    };
+                }));
                 setMode(isVale ? 'review' : 'execution');
             }
         } catch (e) { console.error(e); } finally { setIsLoading(false); }
     };
 
-    const handleSavePhysicalCount = async (itemId: string, qty: number) => {
-        if (isNaN(qty)) return;
+    // --- SINCRONIZACIÓN DE CONTEOS OFFLINE ---
+    const runCountSync = useCallback(async () => {
+        if (!navigator.onLine) return;
         setIsSavingCount(true);
         try {
-            await supabase.from('stock_control_counts').upsert({ item_id: itemId, user_id: currentUser.id, qty: qty }, { onConflict: 'item_id,user_id' });
+            const result = await syncPendingCounts();
+            if (result.conflicts.length > 0) {
+                setSyncConflicts(prev => [...prev, ...result.conflicts]);
+            }
+        } catch (e) {
+            console.warn("Sincronización de conteos pendiente:", e);
+        } finally {
+            const remaining = await getPendingCounts().catch(() => [] as QueuedCount[]);
+            setPendingSyncCount(remaining.length);
+            setIsSavingCount(false);
+        }
+    }, []);
+
+    const scheduleCountSync = useCallback(() => {
+        if (syncTimerRef.current) clearTimeout(syncTimerRef.current);
+        syncTimerRef.current = setTimeout(runCountSync, COUNT_SYNC_DEBOUNCE_MS);
+    }, [runCountSync]);
+
+    useEffect(() => {
+        const handleOnline = () => { setIsOnline(true); runCountSync(); };
+        const handleOffline = () => setIsOnline(false);
+        window.addEventListener('online', handleOnline);
+        window.addEventListener('offline', handleOffline);
+        runCountSync();
+        return () => {
+            window.removeEventListener('online', handleOnline);
+            window.removeEventListener('offline', handleOffline);
+            if (syncTimerRef.current) clearTimeout(syncTimerRef.current);
+        };
+    }, [runCountSync]);
+
+    const handleSavePhysicalCount = async (itemId: string, qty: number) => {
+        if (isNaN(qty) || !activeSession) return;
+        try {
+            // Se guarda local y se sigue contando; la red se usa en segundo plano
+            await enqueueCount(activeSession.id, itemId, currentUser.id, qty);
             setControlItems(prev => prev.map(i => i.id === itemId ? { ...i, counts: [...i.counts.filter((c: any) => c.user_id !== currentUser.id), { user_id: currentUser.id, user_name: currentUser.name, qty: qty }] } : i));
-        } catch (e: any) { alert(e.message); } finally { setIsSavingCount(false); }
+            getPendingCounts().then(p => setPendingSyncCount(p.length)).catch(() => {});
+            scheduleCountSync();
+        } catch (e: any) { alert(e.message); }
     };
 
     const handleAdminCorrection = async (itemId: string, val: number | null) => {
@@ -526,7 +559,7 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
         }
     };
 
-    const handleExportGlobalDifferences = () => {
+    const handleExportGlobalDifferences = async () => {
         if (globalDifferences.length === 0) return;
 
         const data = globalDifferences.map(item => ({
@@ -538,13 +571,10 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
             'Diferencia (Ajuste)': item.ajuste
         }));
 
-        const ws = XLSX.utils.json_to_sheet(data);
-        const wb = XLSX.utils.book_new();
-        XLSX.utils.book_append_sheet(wb, ws, "Diferencias Globales");
-        XLSX.writeFile(wb, `Diferencias_Globales_Stock_${new Date().toISOString().split('T')[0]}.xlsx`);
+        await exportRowsToExcel(data, "Diferencias Globales", `Diferencias_Globales_Stock_${new Date().toISOString().split('T')[0]}.xlsx`);
     };
 
-    const handleExportExcel = () => {
+    const handleExportExcel = async () => {
         if (!activeSession || controlItems.length === 0) return;
 
         const data = controlItems.map(item => {
@@ -566,10 +596,7 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
             };
         });
 
-        const ws = XLSX.utils.json_to_sheet(data);
-        const wb = XLSX.utils.book_new();
-        XLSX.utils.book_append_sheet(wb, ws, "Auditoria");
-        XLSX.writeFile(wb, `Auditoria_${activeSession.name}_${new Date().toISOString().split('T')[0]}.xlsx`);
+        await exportRowsToExcel(data, "Auditoria", `Auditoria_${activeSession.name}_${new Date().toISOString().split('T')[0]}.xlsx`);
     };
 
     const filteredExecutionItems = useMemo(() => {
@@ -853,6 +880,35 @@ export const StockControl: React.FC<StockControlProps> = ({ currentUser }) => {
                     <p className="text-xs font-bold opacity-90 leading-relaxed uppercase tracking-widest max-w-lg mb-6">
                         Auditoría Ciega: Registra la cantidad física exacta.
                     </p>
+
+                    {/* ESTADO DE SINCRONIZACIÓN */}
+                    <div className="flex flex-wrap items-center gap-2 mb-6 relative z-10">
+                        <span className={`px-3 py-1.5 rounded-xl text-[10px] font-black uppercase flex items-center gap-2 border ${isOnline ? 'bg-white/10 border-white/20' : 'bg-red-700/60 border-red-300/40'}`}>
+                            {isOnline ? <Globe size={12} /> : <AlertTriangle size={12} />} {isOnline ? 'En línea' : 'Sin conexión'}
+                        </span>
+                        <span className="px-3 py-1.5 rounded-xl text-[10px] font-black uppercase flex items-center gap-2 bg-white/10 border border-white/20">
+                            {isSavingCount ? <Loader2 size={12} className="animate-spin" /> : <Database size={12} />}
+                            {pendingSyncCount > 0 ? `${pendingSyncCount} conteos por sincronizar` : 'Todo sincronizado'}
+                        </span>
+                        {pendingSyncCount > 0 && isOnline && (
+                            <button onClick={runCountSync} className="px-3 py-1.5 rounded-xl text-[10px] font-black uppercase flex items-center gap-2 bg-white text-orange-600 shadow-lg">
+                                <RotateCcw size={12} /> Sincronizar
+                            </button>
+                        )}
+                    </div>
+                    {syncConflicts.length > 0 && (
+                        <div className="mb-6 relative z-10 bg-white/95 text-red-600 rounded-2xl p-4 text-[10px] font-black uppercase flex items-start justify-between gap-4">
+                            <div className="flex flex-col gap-1">
+                                <span className="flex items-center gap-2"><AlertCircle size={14} /> {syncConflicts.length} conteos no se aplicaron</span>
+                                {syncConflicts.slice(0, 5).map(c => {
+                                    const item = controlItems.find(i => i.id === c.item_id);
+                                    const reason = c.reason === 'stale' ? `ya había un conteo más reciente (${c.server_qty})` : c.reason === 'session_finished' ? 'la auditoría ya fue cerrada' : 'el ítem ya no existe';
+                                    return <span key={c.client_id} className="text-red-500/80">#{item?.codart || c.item_id.substring(0, 8)}: {reason}</span>;
+                                })}
+                            </div>
+                            <button onClick={() => setSyncConflicts([])} className="text-red-400 hover:text-red-600"><X size={16} /></button>
+                        </div>
+                    )}
                     
                     {/* BUSCADOR INTELIGENTE PARA ARMADOR */}
                     <div className="flex flex-col gap-4 relative z-10">
@@ -31,8 +31,20 @@ import {
     Copy
 } from 'lucide-react';
 import { supabase } from '../supabase';
+import { useReferenceData } from '../referenceData';
 import { SupplierOrder, SupplierOrderItem, User, SupplierMaster, MasterProduct } from '../types';
 import { ProductDetailModal } from '../components/ProductDetailModal';
+import {
+    AttachmentUpload,
+    subscribeAttachmentUploads,
+    attachSupplierOrderFile,
+    dismissAttachmentUpload,
+    uploadSupplierAttachment,
+    linkSupplierAttachment,
+    releaseSupplierAttachments,
+    unlinkSupplierAttachment,
+    splitAttachmentUrls
+} from '../supplierAttachments';
 
 interface SupplierOrdersProps {
     currentUser: User;
@@ -50,6 +62,14 @@ export const SupplierOrders: React.FC<SupplierOrdersProps> = ({ currentUser }) =
     // Estado para manejar la confirmación de borrado local en cada tarjeta
     const [deletingId, setDeletingId] = useState<string | null>(null);
 
+    // Comprobantes que siguen subiendo después de guardar el pedido
+    const [attachmentUploads, setAttachmentUploads] = useState<Map<string, AttachmentUpload>>(new Map());
+    useEffect(() => subscribeAttachmentUploads(setAttachmentUploads), []);
+
+    const handleAttachmentLinked = (orderId: string, pdfUrl: string) => {
+        setOrders(prev => prev.map(o => o.id === orderId ? { ...o, pdf_url: pdfUrl } : o));
+    };
+
     const fetchOrders = async () => {
         setIsLoading(true);
         try {
@@ -134,18 +154,12 @@ export const SupplierOrders: React.FC<SupplierOrdersProps> = ({ currentUser }) =
         const order = orders.find(o => o.id === orderId);
         setIsLoading(true);
         try {
-            // 1. Borrar PDF del storage si existe
-            if (order?.pdf_url) {
-                const urlParts = order.pdf_url.split('/');
-                const filePath = urlParts[urlParts.length - 1];
-                if (filePath) {
-                    await supabase.storage.from('supplier-orders').remove([filePath]);
-                }
-            }
-            
-            // 2. Borrar de la base de datos (items se borran por CASCADE)
+            // 1. Borrar de la base de datos (items se borran por CASCADE)
             const { error } = await supabase.from('supplier_orders').delete().eq('id', orderId);
             if (error) throw error;
+
+            // 2. Borrar del storage los comprobantes que no use otro pedido
+            if (order?.pdf_url) await releaseSupplierAttachments(order.pdf_url);
             
             // 3. Limpiar estado y refrescar
             setDeletingId(null);
@@ -269,11 +283,22 @@ export const SupplierOrders: React.FC<SupplierOrdersProps> = ({ currentUser }) =
                                                     <span className="text-[10px] font-bold text-muted uppercase flex items-center gap-1">
                                                         <Package size={12} /> {order.items?.length || 0} Artículos
                                                     </span>
-                                                    {order.pdf_url && (
-                                                        <a href={order.pdf_url} target="_blank" rel="noreferrer" className="text-[10px] font-black text-blue-500 hover:underline flex items-center gap-1 bg-blue-500/5 px-2 py-0.5 rounded border border-blue-500/20">
+                                                    {splitAttachmentUrls(order.pdf_url).length > 0 && (
+                                                        <a href={splitAttachmentUrls(order.pdf_url)[0]} target="_blank" rel="noreferrer" className="text-[10px] font-black text-blue-500 hover:underline flex items-center gap-1 bg-blue-500/5 px-2 py-0.5 rounded border border-blue-500/20">
                                                             <FileText size={12} /> Ver PDF Adjunto
                                                         </a>
                                                     )}
+                                                    {attachmentUploads.get(order.id) && (
+                                                        attachmentUploads.get(order.id)!.error ? (
+                                                            <button onClick={() => dismissAttachmentUpload(order.id)} title={attachmentUploads.get(order.id)!.error} className="text-[10px] font-black text-red-500 flex items-center gap-1 bg-red-500/5 px-2 py-0.5 rounded border border-red-500/20">
+                                                                <XCircle size={12} /> No se pudo adjuntar el PDF
+                                                            </button>
+                                                        ) : (
+                                                            <span className="text-[10px] font-black text-blue-500 flex items-center gap-1 bg-blue-500/5 px-2 py-0.5 rounded border border-blue-500/20">
+                                                                <Loader2 size={12} className="animate-spin" /> Subiendo PDF {Math.round(attachmentUploads.get(order.id)!.progress * 100)}%
+                                                            </span>
+                                                        )
+                                                    )}
                                                 </div>
                                             </div>
 
@@ -344,6 +369,7 @@ export const SupplierOrders: React.FC<SupplierOrdersProps> = ({ currentUser }) =
                 <CreateSupplierOrderModal 
                     onClose={() => setIsCreateModalOpen(false)}
                     onSuccess={() => { setIsCreateModalOpen(false); fetchOrders(); }}
+                    onAttachmentLinked={handleAttachmentLinked}
                     currentUser={currentUser}
                 />
             )}
@@ -362,8 +388,9 @@ export const SupplierOrders: React.FC<SupplierOrdersProps> = ({ currentUser }) =
 };
 
 // --- MODAL DE CREACIÓN OPTIMIZADO PARA TECLADO ---
-const CreateSupplierOrderModal: React.FC<{ onClose: () => void, onSuccess: () => void, currentUser: User }> = ({ onClose, onSuccess, currentUser }) => {
-    const [suppliers, setSuppliers] = useState<SupplierMaster[]>([]);
+const CreateSupplierOrderModal: React.FC<{ onClose: () => void, onSuccess: () => void, onAttachmentLinked: (orderId: string, pdfUrl: string) => void, currentUser: User }> = ({ onClose, onSuccess, onAttachmentLinked, currentUser }) => {
+    const { rows: allSuppliers } = useReferenceData('providers_master');
+    const suppliers = useMemo<SupplierMaster[]>(() => allSuppliers.filter(s => s.activo === true), [allSuppliers]);
     const [selectedSupplier, setSelectedSupplier] = useState('');
     const [arrivalDate, setArrivalDate] = useState('');
     const [items, setItems] = useState<{codart: string, desart: string, qty: number, boxes: number, units_per_box: number}[]>([]);
@@ -391,10 +418,6 @@ const CreateSupplierOrderModal: React.FC<{ onClose: () => void, onSuccess: () =>
     const supplierInputRef = useRef<HTMLDivElement>(null);
     const [isCreatingProduct, setIsCreatingProduct] = useState(false);
 
-    useEffect(() => {
-        supabase.from('providers_master').select('*').eq('activo', true).order('razon_social').then(res => res.data && setSuppliers(res.data));
-    }, []);
-
     useEffect(() => {
         const handleClickOutside = (event: MouseEvent) => {
             if (supplierInputRef.current && !supplierInputRef.current.contains(event.target as Node)) {
@@ -530,26 +553,14 @@ const CreateSupplierOrderModal: React.FC<{ onClose: () => void, onSuccess: () =>
         setIsSaving(true);
         try {
             const supplier = suppliers.find(s => s.codigo === selectedSupplier);
-            let finalPdfUrl = null;
-
-            if (pdfFile) {
-                const fileExt = pdfFile.name.split('.').pop();
-                const fileName = `${Date.now()}_${selectedSupplier}.${fileExt}`;
-                const { data: uploadData, error: uploadErr } = await supabase.storage
-                    .from('supplier-orders')
-                    .upload(fileName, pdfFile);
-                
-                if (uploadErr) throw uploadErr;
-                const { data: { publicUrl } } = supabase.storage.from('supplier-orders').getPublicUrl(fileName);
-                finalPdfUrl = publicUrl;
-            }
             
+            // El comprobante se vincula después: guardar no espera la subida
             const { data: order, error: orderErr } = await supabase.from('supplier_orders').insert({
                 supplier_code: selectedSupplier,
                 supplier_name: supplier?.razon_social,
                 estimated_arrival: arrivalDate,
                 status: 'pendiente',
-                pdf_url: finalPdfUrl,
+                pdf_url: null,
                 created_by: currentUser.id
             }).select().single();
 
@@ -564,6 +575,7 @@ const CreateSupplierOrderModal: React.FC<{ onClose: () => void, onSuccess: () =>
             );
 
             if (itemsErr) throw itemsErr;
+            if (pdfFile) attachSupplierOrderFile(order.id, pdfFile, (pdfUrl) => onAttachmentLinked(order.id, pdfUrl));
             onSuccess();
         } catch (e: any) { 
             alert("Error al guardar: " + e.message); 
@@ -767,7 +779,7 @@ const CreateSupplierOrderModal: React.FC<{ onClose: () => void, onSuccess: () =>
                                         <p className="text-[10px] font-black text-muted uppercase tracking-tighter">Adjuntar PDF de Orden de Compra</p>
                                     </>
                                 )}
-                                <input ref={fileInputRef} type="file" accept=".pdf" className="hidden" onChange={(e) => setPdfFile(e.target.files?.[0] || null)} />
+                                <input ref={fileInputRef} type="file" accept=".pdf,image/*" className="hidden" onChange={(e) => setPdfFile(e.target.files?.[0] || null)} />
                             </div>
                         </div>
                     </div>
@@ -863,25 +875,8 @@ const SupplierOrderDetailModal: React.FC<{ order: SupplierOrder, onClose: () =>
         
         setIsUploading(true);
         try {
-            const fileExt = file.name.split('.').pop();
-            const fileName = `${Date.now()}_${order.supplier_code}.${fileExt}`;
-            const { data: uploadData, error: uploadErr } = await supabase.storage
-                .from('supplier-orders')
-                .upload(fileName, file);
-            
-            if (uploadErr) throw uploadErr;
-            const { data: { publicUrl } } = supabase.storage.from('supplier-orders').getPublicUrl(fileName);
-            
-            const newUrls = currentPdfUrl ? currentPdfUrl.split(',').filter(Boolean) : [];
-            newUrls.push(publicUrl);
-            const newPdfUrl = newUrls.join(',');
-
-            const { error: updateErr } = await supabase
-                .from('supplier_orders')
-                .update({ pdf_url: newPdfUrl })
-                .eq('id', order.id);
-            
-            if (updateErr) throw updateErr;
+            const publicUrl = await uploadSupplierAttachment(file);
+            const newPdfUrl = await linkSupplierAttachment(order.id, publicUrl);
             
             setCurrentPdfUrl(newPdfUrl);
             setHasChanges(true);
@@ -896,15 +891,8 @@ const SupplierOrderDetailModal: React.FC<{ order: SupplierOrder, onClose: () =>
     const handleDeletePdf = async (urlToDelete: string) => {
         setIsUploading(true);
         try {
-            const newUrls = currentPdfUrl ? currentPdfUrl.split(',').filter(Boolean).filter(u => u !== urlToDelete) : [];
-            const newPdfUrl = newUrls.join(',');
-
-            const { error: updateErr } = await supabase
-                .from('supplier_orders')
-                .update({ pdf_url: newPdfUrl })
-                .eq('id', order.id);
-            
-            if (updateErr) throw updateErr;
+            const newPdfUrl = await unlinkSupplierAttachment(order.id, urlToDelete);
+            await releaseSupplierAttachments(urlToDelete);
             setCurrentPdfUrl(newPdfUrl);
             setHasChanges(true);
         } catch (e: any) {
@@ -1155,7 +1143,7 @@ const SupplierOrderDetailModal: React.FC<{ order: SupplierOrder, onClose: () =>
                         <input 
                             ref={fileInputRef}
                             type="file" 
-                            accept=".pdf" 
+                            accept=".pdf,image/*" 
                             className="hidden" 
                             onChange={handleUploadPdf} 
                         />
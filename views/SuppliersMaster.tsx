@@ -21,8 +21,9 @@ import {
     FileSpreadsheet
 } from 'lucide-react';
 import { supabase } from '../supabase';
+import { getReferenceData, invalidateReferenceData } from '../referenceData';
 import { SupplierMaster, User as UserType } from '../types';
-import * as XLSX from 'xlsx';
+import { exportRowsToExcel } from '../lazyLibs';
 
 interface SuppliersMasterProps {
     currentUser: UserType;
@@ -39,20 +40,8 @@ export const SuppliersMaster: React.FC<SuppliersMasterProps> = ({ currentUser })
     const fetchSuppliers = async () => {
         setIsLoading(true);
         try {
-            let query = supabase
-                .from('providers_master')
-                .select('*')
-                .order('razon_social', { ascending: true });
-
-            if (showInactive) {
-                query = query.eq('activo', false);
-            } else {
-                query = query.neq('activo', false);
-            }
-
-            const { data, error } = await query;
-            if (error) throw error;
-            setSuppliers(data || []);
+            const data = await getReferenceData('providers_master');
+            setSuppliers(data.filter(s => showInactive ? s.activo === false : s.activo !== false));
         } catch (err) {
             console.error("Error:", err);
         } finally {
@@ -78,13 +67,14 @@ export const SuppliersMaster: React.FC<SuppliersMasterProps> = ({ currentUser })
         try {
             const { error } = await supabase.from('providers_master').delete().eq('codigo', codigo);
             if (error) throw error;
+            await invalidateReferenceData('providers_master');
             await fetchSuppliers();
         } catch (err: any) {
             alert("Error al eliminar: " + err.message);
         }
     };
 
-    const exportToExcel = () => {
+    const exportToExcel = async () => {
         const data = filteredSuppliers.map(s => ({
             'Código': s.codigo,
             'Razón Social': s.razon_social,
@@ -99,10 +89,7 @@ export const SuppliersMaster: React.FC<SuppliersMasterProps> = ({ currentUser })
             'Días Vencimiento': s.dias_vencimiento || 0,
             'Estado': s.is_active ? 'Activo' : 'Inactivo'
         }));
-        const ws = XLSX.utils.json_to_sheet(data);
-        const wb = XLSX.utils.book_new();
-        XLSX.utils.book_append_sheet(wb, ws, "Proveedores");
-        XLSX.writeFile(wb, `Maestro_Proveedores_${new Date().toISOString().split('T')[0]}.xlsx`);
+        await exportRowsToExcel(data, "Proveedores", `Maestro_Proveedores_${new Date().toISOString().split('T')[0]}.xlsx`);
     };
 
     const handleSave = async (data: Partial<SupplierMaster>) => {
@@ -132,6 +119,7 @@ export const SuppliersMaster: React.FC<SuppliersMasterProps> = ({ currentUser })
             }
             setIsModalOpen(false);
             setEditingSupplier(null);
+            await invalidateReferenceData('providers_master');
             await fetchSuppliers();
         } catch (err: any) {
             alert("Error al guardar: " + err.message);
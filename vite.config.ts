@@ -1,6 +1,8 @@
 import path from 'path';
 import { defineConfig, loadEnv } from 'vite';
 import react from '@vitejs/plugin-react';
+import tailwindcss from 'tailwindcss';
+import autoprefixer from 'autoprefixer';
 
 export default defineConfig(({ mode }) => {
     const env = loadEnv(mode, '.', '');
@@ -10,7 +12,18 @@ export default defineConfig(({ mode }) => {
         host: '0.0.0.0',
       },
       plugins: [react()],
+      // Tailwind se compila en el build (tailwind.config.js): CSS purgado y con hash, sin el compilador del CDN
+      css: {
+        postcss: {
+          plugins: [tailwindcss(), autoprefixer()],
+        }
+      },
+      build: {
+        // Lo lee public/sw.js para precachear los assets versionados
+        manifest: 'asset-manifest.json',
+      },
       define: {
+        __APP_VERSION__: JSON.stringify(Date.now().toString(36)),
         'process.env.API_KEY': JSON.stringify(env.GEMINI_API_KEY),
         'process.env.GEMINI_API_KEY': JSON.stringify(env.GEMINI_API_KEY)
       },
@@ -0,0 +1,111 @@
+import * as XLSX from 'xlsx';
+
+// ==========================================
+// WORKER: LECTURA DEL EXCEL DE CLIENTES
+// ==========================================
+// Lee el libro fuera del hilo principal y recorre la hoja celda por celda,
+// enviando lotes de clientes válidos a medida que los arma en lugar de
+// materializar `sheet_to_json` completo.
+
+export interface ClientImportRow {
+    codigo: string;
+    nombre: string | null;
+    domicilio: string | null;
+    localidad: string | null;
+    provincia: string | null;
+    celular: string | null;
+    email: string | null;
+}
+
+export type ClientImportMessage =
+    | { type: 'rows'; rows: ClientImportRow[]; parsed: number; total: number }
+    | { type: 'done'; valid: number; skipped: number; duplicates: number; total: number }
+    | { type: 'error'; message: string };
+
+const ROWS_PER_MESSAGE = 500;
+
+const ctx = self as unknown as {
+    onmessage: ((e: MessageEvent<{ buffer: ArrayBuffer }>) => void) | null;
+    postMessage: (msg: ClientImportMessage) => void;
+};
+
+const normalizeHeader = (s: any): string => {
+    if (s === undefined || s === null) return "";
+    return String(s).trim().toLowerCase()
+        .normalize("NFD").replace(/[\u0300-\u036f]/g, "")
+        .replace(/[^a-z0-9_]/g, "");
+};
+
+ctx.onmessage = (e) => {
+    try {
+        const workbook = XLSX.read(new Uint8Array(e.data.buffer), { type: 'array', cellHTML: false, cellText: false });
+        const worksheet = workbook.Sheets[workbook.SheetNames[0]];
+        if (!worksheet || !worksheet['!ref']) throw new Error("El archivo no tiene suficientes datos.");
+
+        const range = XLSX.utils.decode_range(worksheet['!ref']);
+        const total = range.e.r - range.s.r;
+        if (total < 1) throw new Error("El archivo no tiene suficientes datos.");
+
+        const cellValue = (r: number, c: number): any => {
+            if (c < 0) return null;
+            const cell = worksheet[XLSX.utils.encode_cell({ r, c })];
+            return cell ? cell.v : null;
+        };
+
+        const headers: string[] = [];
+        for (let c = range.s.c; c <= range.e.c; c++) headers[c] = normalizeHeader(cellValue(range.s.r, c));
+
+        const colIdx = {
+            codigo: headers.indexOf('codigo'),
+            nombre: headers.indexOf('nombre'),
+            domicilio: headers.indexOf('domicilio'),
+            localidad: headers.indexOf('localidad'),
+            provincia: headers.indexOf('provincia'),
+            celular: headers.findIndex(h => h === 'celular' || h === 'telefono'),
+            email: headers.findIndex(h => h === 'email' || h === 'e_mail')
+        };
+
+        if (colIdx.codigo === -1) throw new Error("No se encontró la columna obligatoria 'codigo'.");
+
+        const seen = new Set<string>();
+        let batch: ClientImportRow[] = [];
+        let valid = 0;
+        let skipped = 0;
+        let duplicates = 0;
+
+        for (let r = range.s.r + 1; r <= range.e.r; r++) {
+            const getVal = (idx: number) => {
+                const val = cellValue(r, idx);
+                if (val === null || val === undefined || String(val).trim() === "") return null;
+                return String(val).trim();
+            };
+
+            const codigo = getVal(colIdx.codigo);
+            if (codigo === null) { skipped++; continue; }
+            // Un código repetido en el mismo lote haría fallar el upsert
+            if (seen.has(codigo)) { duplicates++; continue; }
+            seen.add(codigo);
+
+            batch.push({
+                codigo,
+                nombre: getVal(colIdx.nombre),
+                domicilio: getVal(colIdx.domicilio),
+                localidad: getVal(colIdx.localidad),
+                provincia: getVal(colIdx.provincia),
+                celular: getVal(colIdx.celular),
+                email: getVal(colIdx.email)
+            });
+            valid++;
+
+            if (batch.length >= ROWS_PER_MESSAGE) {
+                ctx.postMessage({ type: 'rows', rows: batch, parsed: r - range.s.r, total });
+                batch = [];
+            }
+        }
+
+        if (batch.length > 0) ctx.postMessage({ type: 'rows', rows: batch, parsed: total, total });
+        ctx.postMessage({ type: 'done', valid, skipped, duplicates, total });
+    } catch (err: any) {
+        ctx.postMessage({ type: 'error', message: err?.message || String(err) });
+    }
+};
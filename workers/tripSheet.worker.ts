@@ -0,0 +1,37 @@
+import type { Trip } from '../types';
+import { renderTripSheet, TripSheetKind } from '../tripSheetRender';
+
+// ==========================================
+// WORKER: PLANILLAS DE VIAJE EN PDF
+// ==========================================
+// jsPDF + autotable corren acá para no trabar la UI en los celulares de los
+// choferes. Cada trabajo es una lista de PDFs a armar; en modo lote llegan
+// todos los viajes del día en un solo mensaje.
+
+export interface TripSheetJob {
+    kind: TripSheetKind;
+    trips: Trip[];
+}
+
+export type TripSheetRequest = { jobs: TripSheetJob[] };
+
+export type TripSheetMessage =
+    | { type: 'done'; files: ArrayBuffer[] }
+    | { type: 'error'; message: string };
+
+const ctx = self as unknown as {
+    onmessage: ((e: MessageEvent<TripSheetRequest>) => void) | null;
+    postMessage: (msg: TripSheetMessage, transfer?: Transferable[]) => void;
+};
+
+ctx.onmessage = async (e) => {
+    try {
+        const files: ArrayBuffer[] = [];
+        for (const job of e.data.jobs) {
+            files.push(await renderTripSheet(job.kind, job.trips));
+        }
+        ctx.postMessage({ type: 'done', files }, files);
+    } catch (err: any) {
+        ctx.postMessage({ type: 'error', message: err?.message || String(err) });
+    }
+};